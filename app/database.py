@@ -1,6 +1,9 @@
 import json
 import logging
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Optional
 
 import os
@@ -9,14 +12,338 @@ logger = logging.getLogger(__name__)
 
 DB_NAME = os.getenv("DB_PATH", "subscribers.db")
 
+# ---------------------------------------------------------------------------
+# Connection management
+# ---------------------------------------------------------------------------
+# Helpers used to open a fresh connection (and re-parse the schema) on every
+# call, from every sensor/debate pool thread. Connections are now cached per
+# thread and per DB path. The path is read from DB_NAME at call time, so
+# `monkeypatch.setattr(app.database, "DB_NAME", tmp)` keeps working, and a
+# cached connection is dropped if the file at that path was deleted or
+# replaced underneath it.
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# WAL lets the 5+3 ThreadPoolExecutor agent fan-out read while one thread
+# writes; NORMAL sync is durable across app crashes in WAL mode.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size=-16000",       # 16 MiB page cache
+    "PRAGMA mmap_size=268435456",     # 256 MiB memory-mapped reads
+)
+
+_local = threading.local()
+
+# Large free-text columns kept in decision_texts (keyed by decision id) rather
+# than inline in decision_points, so list queries and scans over the ~120
+# column table don't drag multi-KB overflow pages along with every row.
+# The same-named decision_points columns are left in place but NULL.
+DECISION_TEXT_COLUMNS = (
+    "deep_research_swot",
+    "deep_research_global_analysis",
+    "deep_research_local_analysis",
+    "deep_research_verification",
+    "deep_research_blindspots",
+    "reassess_reasoning",
+)
+
+
+def connect(db_path: str = None) -> sqlite3.Connection:
+    """Open a new caller-owned connection with the standard pragmas.
+
+    For one-shot scripts; long-running code should use get_connection().
+    """
+    conn = sqlite3.connect(db_path or DB_NAME, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _file_identity(path: str):
+    try:
+        st = os.stat(path)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return None
+
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """Return this thread's reusable connection to db_path (default DB_NAME).
+
+    Callers must not close it. Use transaction() for writes so a failed
+    statement never leaves the shared connection mid-transaction.
+    """
+    path = db_path or DB_NAME
+    cache = getattr(_local, "connections", None)
+    if cache is None:
+        cache = _local.connections = {}
+    entry = cache.get(path)
+    if entry is not None:
+        conn, identity = entry
+        if identity == _file_identity(path):
+            return conn
+        del cache[path]
+        conn.close()
+    conn = connect(path)
+    cache[path] = (conn, _file_identity(path))
+    return conn
+
+
+@contextmanager
+def transaction(db_path: str = None):
+    """Write transaction on this thread's pooled connection.
+
+    Starts with BEGIN IMMEDIATE (takes the write lock up front, so
+    busy_timeout applies instead of a lock-upgrade SQLITE_BUSY), commits on
+    success and rolls back on any exception. Nested use joins the outer
+    transaction.
+    """
+    path = db_path or DB_NAME
+    conn = get_connection(path)
+    depths = getattr(_local, "tx_depth", None)
+    if depths is None:
+        depths = _local.tx_depth = {}
+    depth = depths.get(path, 0)
+    if depth == 0 and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    depths[path] = depth + 1
+    try:
+        yield conn
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        raise
+    finally:
+        depths[path] = depth
+
+
+def close_thread_connections() -> None:
+    """Close every pooled connection owned by the calling thread."""
+    cache = getattr(_local, "connections", None) or {}
+    for conn, _ in cache.values():
+        conn.close()
+    cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Schema migrations
+# ---------------------------------------------------------------------------
+# init_db() runs at every startup and in every test fixture. Schema changes
+# are ordered steps (MIGRATIONS, below) whose numbers are recorded in the
+# schema_version table, so verifying an up-to-date DB is one SELECT. Each
+# step runs in its own transaction and must stay idempotent (IF NOT EXISTS,
+# column checks): DBs that predate schema_version replay every step once.
+# To change the schema, append a new step; never edit one that has shipped.
+
+
 def init_db():
-    """Initialize the database with the subscribers and decision_points tables."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    # Enable WAL so the 5+3 ThreadPoolExecutor agent fan-out doesn't
-    # serialize on a global write lock when each thread opens its own
-    # short-lived connection to insert a token_usage row.
-    cursor.execute("PRAGMA journal_mode=WAL")
+    """Create or upgrade the schema. A single query when already current."""
+    current = _schema_version()
+    if current >= SCHEMA_VERSION:
+        return
+
+    with transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                duration_ms REAL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    timings = []
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        start = time.perf_counter()
+        try:
+            with transaction() as conn:
+                step(conn.cursor())
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_version (version, description, duration_ms) VALUES (?, ?, ?)",
+                    (version, description, round(elapsed_ms, 2)),
+                )
+        except Exception as e:
+            # Rolled back and not recorded, so the step is retried next start.
+            print(f"Error during database migration {version} ({description}): {e}")
+            break
+        timings.append(f"v{version} {description} ({elapsed_ms:.1f} ms)")
+
+    if timings:
+        print(f"[DB Migration] Schema v{current} -> v{_schema_version()}: " + ", ".join(timings))
+
+
+def _schema_version() -> int:
+    try:
+        row = get_connection().execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:  # no such table: fresh or pre-versioning DB
+        return 0
+    return row[0] or 0
+
+
+def _add_missing_columns(cursor, table: str, columns: dict) -> int:
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {info[1] for info in cursor.fetchall()}
+    added = 0
+    for col_name, col_type in columns.items():
+        if col_name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
+            added += 1
+    return added
+
+
+# decision_points as first created; everything since lives in
+# _DECISION_POINTS_ADDED_COLUMNS.
+_DECISION_POINTS_TABLE = {
+    "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+    "symbol": "TEXT NOT NULL",
+    "price_at_decision": "REAL NOT NULL",
+    "drop_percent": "REAL NOT NULL",
+    "recommendation": "TEXT NOT NULL",
+    "reasoning": "TEXT",
+    "status": "TEXT DEFAULT 'Ignored'",
+    "timestamp": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    "company_name": "TEXT",
+    "pe_ratio": "REAL",
+    "market_cap": "REAL",
+    "sector": "TEXT",
+    "region": "TEXT",
+    "is_earnings_drop": "BOOLEAN DEFAULT 0",
+    "earnings_date": "TEXT",
+    "ai_score": "REAL",
+    "deep_research_verdict": "TEXT",
+    "deep_research_risk": "TEXT",
+    "deep_research_catalyst": "TEXT",
+    "deep_research_knife_catch": "TEXT",
+    "deep_research_score": "INTEGER",
+    "deep_research_swot": "TEXT",
+    "deep_research_global_analysis": "TEXT",
+    "deep_research_local_analysis": "TEXT",
+}
+
+_DECISION_POINTS_ADDED_COLUMNS = {
+    "company_name": "TEXT",
+    "pe_ratio": "REAL",
+    "market_cap": "REAL",
+    "sector": "TEXT",
+    "region": "TEXT",
+    "is_earnings_drop": "BOOLEAN DEFAULT 0",
+    "earnings_date": "TEXT",
+    "ai_score": "REAL",
+    "git_version": "TEXT",
+    "deep_research_score": "INTEGER",
+    "deep_research_swot": "TEXT",
+    "deep_research_global_analysis": "TEXT",
+    "deep_research_local_analysis": "TEXT",
+    "deep_research_verdict": "TEXT",
+    "deep_research_risk": "TEXT",
+    "deep_research_catalyst": "TEXT",
+    "deep_research_knife_catch": "TEXT",
+    # PM trading-level fields (v0.9)
+    "entry_price_low": "REAL",
+    "entry_price_high": "REAL",
+    "stop_loss": "REAL",
+    "take_profit_1": "REAL",
+    "take_profit_2": "REAL",
+    "pre_drop_price": "REAL",
+    "upside_percent": "REAL",
+    "downside_risk_percent": "REAL",
+    "risk_reward_ratio": "REAL",
+    "drop_type": "TEXT",
+    "conviction": "TEXT",
+    "entry_trigger": "TEXT",
+    "reassess_in_days": "INTEGER",
+    # Sell range fields (v1.0)
+    "sell_price_low": "REAL",
+    "sell_price_high": "REAL",
+    "ceiling_exit": "REAL",
+    "exit_trigger": "TEXT",
+    # Deep Research v2 fields
+    "deep_research_review_verdict": "TEXT",
+    "deep_research_action": "TEXT",
+    "deep_research_conviction": "TEXT",
+    "deep_research_entry_low": "REAL",
+    "deep_research_entry_high": "REAL",
+    "deep_research_stop_loss": "REAL",
+    "deep_research_tp1": "REAL",
+    "deep_research_tp2": "REAL",
+    "deep_research_upside": "REAL",
+    "deep_research_downside": "REAL",
+    "deep_research_rr_ratio": "REAL",
+    "deep_research_drop_type": "TEXT",
+    "deep_research_entry_trigger": "TEXT",
+    "deep_research_verification": "TEXT",
+    "deep_research_blindspots": "TEXT",
+    "deep_research_reason": "TEXT",
+    # Deep Research sell range fields (Plan B)
+    "deep_research_sell_price_low": "REAL",
+    "deep_research_sell_price_high": "REAL",
+    "deep_research_ceiling_exit": "REAL",
+    "deep_research_exit_trigger": "TEXT",
+    # Sell reassessment fields (Plan A)
+    "reassess_sell_action": "TEXT",
+    "reassess_thesis_status": "TEXT",
+    "reassess_sell_price_low": "REAL",
+    "reassess_sell_price_high": "REAL",
+    "reassess_ceiling_exit": "REAL",
+    "reassess_updated_stop_loss": "REAL",
+    "reassess_exit_trigger": "TEXT",
+    "reassess_timestamp": "TEXT",
+    "reassess_reasoning": "TEXT",
+    # Batch comparison linkage
+    "batch_id": "INTEGER",
+    # Tiered Bollinger gate label
+    "gatekeeper_tier": "TEXT",
+    # Pre-fetched EPS facts (canonical, from Finnhub)
+    "reported_eps": "REAL",
+    "consensus_eps": "REAL",
+    "surprise_pct": "REAL",
+    "earnings_fiscal_quarter": "TEXT",
+    # Deterministic post-PM earnings narrative consistency check
+    "earnings_narrative_flag": "TEXT",
+    # External ratings — informational only, NEVER passed into any LLM agent prompt.
+    # Sourced from data/SAgrades/SA_Quant_Ranked_Clean.csv at decision time.
+    "sa_quant_rating": "REAL",
+    "sa_authors_rating": "REAL",
+    "wall_street_rating": "REAL",
+    "sa_rank": "INTEGER",
+    # --- token usage tracking (2026-05-23) ---
+    "total_tokens_in":  "INTEGER",
+    "total_tokens_out": "INTEGER",
+    "total_cost_usd":   "REAL",
+    "total_llm_calls":  "INTEGER",
+    # --- deterministic decision gates (2026-06-10) ---
+    # pre_gate_action: PM's original action before gating (A/B baseline).
+    # gates_fired: comma-separated gate names, "" = layer ran, none fired.
+    "pre_gate_action": "TEXT",
+    "gates_fired": "TEXT",
+    "gate_reasons": "TEXT",
+    # DR override basis: NAMED_EVENT (verifiable dated event, honored)
+    # vs JUDGMENT (advisory only, council action stands).
+    "deep_research_override_basis": "TEXT",
+    "deep_research_named_event": "TEXT",
+    # --- structured agent verdicts (Phase 2, 2026-06-10) ---
+    # NULL = block not parsed (or predates the feature).
+    "tech_signal": "TEXT",
+    "news_sentiment": "TEXT",
+    "comp_attribution": "TEXT",
+    "bull_case_strength": "INTEGER",
+    "bear_verdict": "TEXT",
+    "risk_falling_knife": "TEXT",
+    "data_depth": "TEXT",
+    # Batch comparison winner flag
+    "batch_winner": "BOOLEAN DEFAULT 0",
+}
+
+
+def _migrate_base_schema(cursor):
+    """Tables and columns that existed before schema versioning (v1)."""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS subscribers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -24,166 +351,20 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS decision_points (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT NOT NULL,
-            price_at_decision REAL NOT NULL,
-            drop_percent REAL NOT NULL,
-            recommendation TEXT NOT NULL,
-            reasoning TEXT,
-            status TEXT DEFAULT 'Ignored',
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            company_name TEXT,
-            pe_ratio REAL,
-            market_cap REAL,
-            sector TEXT,
-            region TEXT,
-            is_earnings_drop BOOLEAN DEFAULT 0,
-            earnings_date TEXT,
-            ai_score REAL,
-            deep_research_verdict TEXT,
-            deep_research_risk TEXT,
-            deep_research_catalyst TEXT,
-            deep_research_knife_catch TEXT,
-            deep_research_score INTEGER,
-            deep_research_swot TEXT,
-            deep_research_global_analysis TEXT,
-            deep_research_local_analysis TEXT
-        )
-    ''')
-    
-    # Migration: Check for new columns and add them if missing
-    migrations_applied = []
-    try:
-        cursor.execute("PRAGMA table_info(decision_points)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        new_columns = {
-            "company_name": "TEXT",
-            "pe_ratio": "REAL",
-            "market_cap": "REAL",
-            "sector": "TEXT",
-            "region": "TEXT",
-            "is_earnings_drop": "BOOLEAN DEFAULT 0",
-            "earnings_date": "TEXT",
-            "ai_score": "REAL",
-            "git_version": "TEXT",
-            "deep_research_score": "INTEGER",
-            "deep_research_swot": "TEXT",
-            "deep_research_global_analysis": "TEXT",
-            "deep_research_local_analysis": "TEXT",
-            "deep_research_verdict": "TEXT",
-            "deep_research_risk": "TEXT",
-            "deep_research_catalyst": "TEXT",
-            "deep_research_knife_catch": "TEXT",
-            # PM trading-level fields (v0.9)
-            "entry_price_low": "REAL",
-            "entry_price_high": "REAL",
-            "stop_loss": "REAL",
-            "take_profit_1": "REAL",
-            "take_profit_2": "REAL",
-            "pre_drop_price": "REAL",
-            "upside_percent": "REAL",
-            "downside_risk_percent": "REAL",
-            "risk_reward_ratio": "REAL",
-            "drop_type": "TEXT",
-            "conviction": "TEXT",
-            "entry_trigger": "TEXT",
-            "reassess_in_days": "INTEGER",
-            # Sell range fields (v1.0)
-            "sell_price_low": "REAL",
-            "sell_price_high": "REAL",
-            "ceiling_exit": "REAL",
-            "exit_trigger": "TEXT",
-            # Deep Research v2 fields
-            "deep_research_review_verdict": "TEXT",
-            "deep_research_action": "TEXT",
-            "deep_research_conviction": "TEXT",
-            "deep_research_entry_low": "REAL",
-            "deep_research_entry_high": "REAL",
-            "deep_research_stop_loss": "REAL",
-            "deep_research_tp1": "REAL",
-            "deep_research_tp2": "REAL",
-            "deep_research_upside": "REAL",
-            "deep_research_downside": "REAL",
-            "deep_research_rr_ratio": "REAL",
-            "deep_research_drop_type": "TEXT",
-            "deep_research_entry_trigger": "TEXT",
-            "deep_research_verification": "TEXT",
-            "deep_research_blindspots": "TEXT",
-            "deep_research_reason": "TEXT",
-            # Deep Research sell range fields (Plan B)
-            "deep_research_sell_price_low": "REAL",
-            "deep_research_sell_price_high": "REAL",
-            "deep_research_ceiling_exit": "REAL",
-            "deep_research_exit_trigger": "TEXT",
-            # Sell reassessment fields (Plan A)
-            "reassess_sell_action": "TEXT",
-            "reassess_thesis_status": "TEXT",
-            "reassess_sell_price_low": "REAL",
-            "reassess_sell_price_high": "REAL",
-            "reassess_ceiling_exit": "REAL",
-            "reassess_updated_stop_loss": "REAL",
-            "reassess_exit_trigger": "TEXT",
-            "reassess_timestamp": "TEXT",
-            "reassess_reasoning": "TEXT",
-            # Batch comparison linkage
-            "batch_id": "INTEGER",
-            # Tiered Bollinger gate label
-            "gatekeeper_tier": "TEXT",
-            # Pre-fetched EPS facts (canonical, from Finnhub)
-            "reported_eps": "REAL",
-            "consensus_eps": "REAL",
-            "surprise_pct": "REAL",
-            "earnings_fiscal_quarter": "TEXT",
-            # Deterministic post-PM earnings narrative consistency check
-            "earnings_narrative_flag": "TEXT",
-            # External ratings — informational only, NEVER passed into any LLM agent prompt.
-            # Sourced from data/SAgrades/SA_Quant_Ranked_Clean.csv at decision time.
-            "sa_quant_rating": "REAL",
-            "sa_authors_rating": "REAL",
-            "wall_street_rating": "REAL",
-            "sa_rank": "INTEGER",
-            # --- token usage tracking (2026-05-23) ---
-            "total_tokens_in":  "INTEGER",
-            "total_tokens_out": "INTEGER",
-            "total_cost_usd":   "REAL",
-            "total_llm_calls":  "INTEGER",
-            # --- deterministic decision gates (2026-06-10) ---
-            # pre_gate_action: PM's original action before gating (A/B baseline).
-            # gates_fired: comma-separated gate names, "" = layer ran, none fired.
-            "pre_gate_action": "TEXT",
-            "gates_fired": "TEXT",
-            "gate_reasons": "TEXT",
-            # DR override basis: NAMED_EVENT (verifiable dated event, honored)
-            # vs JUDGMENT (advisory only, council action stands).
-            "deep_research_override_basis": "TEXT",
-            "deep_research_named_event": "TEXT",
-            # --- structured agent verdicts (Phase 2, 2026-06-10) ---
-            # NULL = block not parsed (or predates the feature).
-            "tech_signal": "TEXT",
-            "news_sentiment": "TEXT",
-            "comp_attribution": "TEXT",
-            "bull_case_strength": "INTEGER",
-            "bear_verdict": "TEXT",
-            "risk_falling_knife": "TEXT",
-        }
-        
-        
-        for col_name, col_type in new_columns.items():
-            if col_name not in columns:
-                cursor.execute(f"ALTER TABLE decision_points ADD COLUMN {col_name} {col_type}")
-                migrations_applied.append(f"decision_points.{col_name}")
-                
-        # Check for data_depth column separately as it is a newer addition
-        if "data_depth" not in columns:
-             cursor.execute(f"ALTER TABLE decision_points ADD COLUMN data_depth TEXT")
-             migrations_applied.append("decision_points.data_depth")
 
-    except Exception as e:
-        print(f"Error during database migration: {e}")
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'decision_points'")
+    if cursor.fetchone() is None:
+        # New DB: one CREATE TABLE with every column (same order the ALTERs
+        # would produce) instead of replaying ~75 ALTER TABLEs.
+        columns = dict(_DECISION_POINTS_TABLE)
+        for col_name, col_type in _DECISION_POINTS_ADDED_COLUMNS.items():
+            columns.setdefault(col_name, col_type)
+        column_sql = ",\n            ".join(f"{name} {col_type}" for name, col_type in columns.items())
+        cursor.execute(f"CREATE TABLE decision_points (\n            {column_sql}\n        )")
+    else:
+        added = _add_missing_columns(cursor, "decision_points", _DECISION_POINTS_ADDED_COLUMNS)
+        if added:
+            print(f"[DB Migration] Applied {added} column migrations.")
 
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS decision_tracking (
@@ -320,23 +501,24 @@ def init_db():
         'CREATE INDEX IF NOT EXISTS idx_drc_run_date ON dr_comparison(run_date)'
     )
 
-    # Migration for batch_comparisons
-    try:
-        cursor.execute("PRAGMA table_info(batch_comparisons)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        batch_columns = {
-            "status": "TEXT DEFAULT 'STARTED'",
-            "completed_at": "TIMESTAMP"
-        }
-        
-        for col_name, col_type in batch_columns.items():
-            if col_name not in columns:
-                cursor.execute(f"ALTER TABLE batch_comparisons ADD COLUMN {col_name} {col_type}")
-                migrations_applied.append(f"batch_comparisons.{col_name}")
+    _add_missing_columns(cursor, "batch_comparisons", {
+        "status": "TEXT DEFAULT 'STARTED'",
+        "completed_at": "TIMESTAMP",
+    })
 
-    except Exception as e:
-        print(f"Error during batch table migration: {e}")
+    # Batch-comparison file index: (filename, mtime, size) of every
+    # data/comparisons/batch_comparison_*.json already synced, so the
+    # periodic sync only parses new or changed files.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS batch_file_index (
+            filename TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            winner_symbol TEXT,
+            batch_date TEXT,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
 
     # Transcript cache: immutable rows of (symbol, fiscal_quarter) -> transcript text.
     # Populated by StockService.get_latest_transcript when the AV fallback fires.
@@ -353,33 +535,252 @@ def init_db():
         )
     ''')
 
-    # Migration: Add batch_winner to decision_points
-    try:
-        cursor.execute("PRAGMA table_info(decision_points)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        if "batch_winner" not in columns:
-            cursor.execute("ALTER TABLE decision_points ADD COLUMN batch_winner BOOLEAN DEFAULT 0")
-            migrations_applied.append("decision_points.batch_winner")
-            
-    except Exception as e:
-        print(f"Error during batch_winner migration: {e}")
-    
-    # Print single migration summary
-    if migrations_applied:
-        print(f"[DB Migration] Applied {len(migrations_applied)} column migrations.")
-        
-    conn.commit()
-    conn.close()
+
+def _migrate_decision_date(cursor):
+    """Stored decision_date (YYYY-MM-DD of timestamp) so the per-day dedup and
+    batch queries can hit an index instead of scanning date(timestamp).
+    Triggers keep it in sync for every writer, including scripts and tests
+    that INSERT directly.
+    """
+    cursor.execute("PRAGMA table_info(decision_points)")
+    columns = [info[1] for info in cursor.fetchall()]
+
+    if "decision_date" not in columns:
+        cursor.execute("ALTER TABLE decision_points ADD COLUMN decision_date TEXT")
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_decision_date_insert
+        AFTER INSERT ON decision_points
+        WHEN NEW.decision_date IS NULL
+        BEGIN
+            UPDATE decision_points SET decision_date = date(NEW.timestamp) WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_decision_date_update
+        AFTER UPDATE OF timestamp ON decision_points
+        BEGIN
+            UPDATE decision_points SET decision_date = date(NEW.timestamp) WHERE id = NEW.id;
+        END
+    ''')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_date_status ON decision_points(decision_date, status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_symbol_date ON decision_points(symbol, decision_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_company_name ON decision_points(company_name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_batch_id ON decision_points(batch_id)')
+    # Keyset pagination for /api/decisions: newest-first scans, optionally
+    # narrowed by one equality filter.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_timestamp_id ON decision_points(timestamp, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_sector_ts ON decision_points(sector, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_tier_ts ON decision_points(gatekeeper_tier, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_dr_action_ts ON decision_points(deep_research_action, timestamp)')
+
+    # Backfill rows written before the column/triggers existed.
+    cursor.execute('''
+        UPDATE decision_points SET decision_date = date(timestamp)
+        WHERE decision_date IS NULL AND date(timestamp) IS NOT NULL
+    ''')
+    if cursor.rowcount > 0:
+        print(f"[DB Migration] Backfilled decision_date for {cursor.rowcount} rows.")
+
+
+def _migrate_decision_texts(cursor):
+    # Side table for the heavy text blobs (see DECISION_TEXT_COLUMNS).
+    text_cols = ",\n            ".join(f"{col} TEXT" for col in DECISION_TEXT_COLUMNS)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS decision_texts (
+            decision_id INTEGER PRIMARY KEY,
+            {text_cols},
+            FOREIGN KEY (decision_id) REFERENCES decision_points (id)
+        )
+    ''')
+    any_inline = " OR ".join(f"{col} IS NOT NULL" for col in DECISION_TEXT_COLUMNS)
+    cols = ", ".join(DECISION_TEXT_COLUMNS)
+    updates = ", ".join(
+        f"{col} = COALESCE(excluded.{col}, decision_texts.{col})" for col in DECISION_TEXT_COLUMNS
+    )
+    cursor.execute(f'''
+        INSERT INTO decision_texts (decision_id, {cols})
+        SELECT id, {cols} FROM decision_points WHERE {any_inline}
+        ON CONFLICT(decision_id) DO UPDATE SET {updates}
+    ''')
+    if cursor.rowcount > 0:
+        nulls = ", ".join(f"{col} = NULL" for col in DECISION_TEXT_COLUMNS)
+        cursor.execute(f"UPDATE decision_points SET {nulls} WHERE {any_inline}")
+        print(f"[DB Migration] Moved text blobs for {cursor.rowcount} decisions to decision_texts.")
+
+
+# Full-text search (FTS5). decision_fts mirrors each decision's reasoning and
+# Deep Research text (rowid = decision_points.id) and is kept in sync by
+# triggers; council_fts holds the saved council agent reports, one document
+# per (symbol, date, agent) in council_docs. See report_search_service.
+_DECISION_FTS_SELECT = """
+    SELECT dp.id, dp.symbol, dp.reasoning,
+           COALESCE(dp.deep_research_reason, '') || char(10) ||
+           COALESCE(t.deep_research_swot, '') || char(10) ||
+           COALESCE(t.deep_research_global_analysis, '') || char(10) ||
+           COALESCE(t.deep_research_local_analysis, '') || char(10) ||
+           COALESCE(t.deep_research_verification, '') || char(10) ||
+           COALESCE(t.deep_research_blindspots, '')
+    FROM decision_points dp
+    LEFT JOIN decision_texts t ON t.decision_id = dp.id
+"""
+
+
+def _create_search_index(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'decision_fts'")
+    fresh = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS decision_fts
+        USING fts5(symbol UNINDEXED, reasoning, deep_research, tokenize = 'porter unicode61')
+    ''')
+    reindex_decision = f"""
+            DELETE FROM decision_fts WHERE rowid = {{id}};
+            INSERT INTO decision_fts (rowid, symbol, reasoning, deep_research)
+            {_DECISION_FTS_SELECT} WHERE dp.id = {{id}};
+    """
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_fts_insert AFTER INSERT ON decision_points
+        BEGIN {reindex_decision.format(id="NEW.id")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_fts_update
+        AFTER UPDATE OF symbol, reasoning, deep_research_reason ON decision_points
+        BEGIN {reindex_decision.format(id="NEW.id")} END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_fts_delete AFTER DELETE ON decision_points
+        BEGIN DELETE FROM decision_fts WHERE rowid = OLD.id; END
+    ''')
+    for event in ("INSERT", "UPDATE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_dt_fts_{event.lower()} AFTER {event} ON decision_texts
+            BEGIN {reindex_decision.format(id="NEW.decision_id")} END
+        ''')
+    if fresh:
+        cursor.execute(f"INSERT INTO decision_fts (rowid, symbol, reasoning, deep_research) {_DECISION_FTS_SELECT}")
+        if cursor.rowcount > 0:
+            print(f"[DB Migration] Indexed {cursor.rowcount} decisions for full-text search.")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS council_docs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            report_date TEXT NOT NULL,
+            agent TEXT NOT NULL,
+            source_file TEXT,
+            UNIQUE(symbol, report_date, agent)
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS council_fts
+        USING fts5(body, tokenize = 'porter unicode61')
+    ''')
+    # (filename, mtime, size) of council report files already indexed.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS council_report_files (
+            filename TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+    ''')
+
+
+# Change tracking for the incremental analytics snapshot
+# (app/services/analytics/snapshot.py). Every insert/update of a
+# decision_points row stamps it with the next value of a DB-wide counter,
+# and deletes leave a tombstone, so "what changed since watermark N" is an
+# indexed range scan. db_uid identifies this DB file to snapshot readers.
+def _migrate_change_tracking(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL,
+            db_uid TEXT NOT NULL
+        )
+    ''')
+    cursor.execute(
+        "INSERT OR IGNORE INTO change_counter (id, seq, db_uid) VALUES (1, 0, lower(hex(randomblob(8))))"
+    )
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS decision_point_deletes (
+            id INTEGER PRIMARY KEY,
+            change_seq INTEGER NOT NULL
+        )
+    ''')
+    _add_missing_columns(cursor, "decision_points", {"change_seq": "INTEGER"})
+    cursor.execute("UPDATE decision_points SET change_seq = id WHERE change_seq IS NULL")
+    cursor.execute('''
+        UPDATE change_counter
+        SET seq = MAX(seq, (SELECT COALESCE(MAX(change_seq), 0) FROM decision_points))
+        WHERE id = 1
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dp_change_seq ON decision_points(change_seq)')
+
+    stamp = """
+            UPDATE change_counter SET seq = seq + 1 WHERE id = 1;
+            UPDATE decision_points SET change_seq = (SELECT seq FROM change_counter WHERE id = 1)
+            WHERE id = NEW.id;
+    """
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_change_insert AFTER INSERT ON decision_points
+        BEGIN {stamp} DELETE FROM decision_point_deletes WHERE id = NEW.id; END
+    ''')
+    # The WHEN clause skips the trigger's own change_seq write.
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_change_update AFTER UPDATE ON decision_points
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN {stamp} END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dp_change_delete AFTER DELETE ON decision_points
+        BEGIN
+            UPDATE change_counter SET seq = seq + 1 WHERE id = 1;
+            INSERT OR REPLACE INTO decision_point_deletes (id, change_seq)
+            VALUES (OLD.id, (SELECT seq FROM change_counter WHERE id = 1));
+        END
+    ''')
+
+
+# Materialized trade report (scripts/core/generate_trade_report.py). One row
+# per (decision, tracking window) holding the rendered report row as JSON,
+# with the decision's change_seq and the price-store rewrite stamp it was
+# computed under. Rows whose horizon windows have all closed are marked
+# settled and are not recomputed unless one of those stamps moves; the CSV
+# is exported from this table.
+def _migrate_trade_report(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trade_report (
+            decision_id INTEGER NOT NULL,
+            window_days INTEGER NOT NULL,
+            change_seq INTEGER,
+            price_stamp INTEGER NOT NULL DEFAULT 0,
+            settled INTEGER NOT NULL DEFAULT 0,
+            decided_at TEXT,
+            row_json TEXT NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (decision_id, window_days)
+        )
+    ''')
+
+
+# (version, description, step), applied in order. Append only.
+MIGRATIONS = (
+    (1, "base schema", _migrate_base_schema),
+    (2, "decision_date column, triggers and indexes", _migrate_decision_date),
+    (3, "decision_texts side table", _migrate_decision_texts),
+    (4, "full-text search index", _create_search_index),
+    (5, "change tracking for the analytics snapshot", _migrate_change_tracking),
+    (6, "materialized trade report", _migrate_trade_report),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 
 def add_subscriber(email: str) -> bool:
     """Add a new subscriber. Returns True if added, False if already exists."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO subscribers (email) VALUES (?)", (email,))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute("INSERT INTO subscribers (email) VALUES (?)", (email,))
         return True
     except sqlite3.IntegrityError:
         # Email already exists
@@ -391,12 +792,8 @@ def add_subscriber(email: str) -> bool:
 def get_all_subscribers() -> List[str]:
     """Get a list of all subscriber emails."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT email FROM subscribers")
-        emails = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return emails
+        cursor = get_connection().execute("SELECT email FROM subscribers")
+        return [row[0] for row in cursor.fetchall()]
     except Exception as e:
         print(f"Error fetching subscribers: {e}")
         return []
@@ -406,16 +803,12 @@ def add_decision_point(symbol: str, price: float, drop_percent: float, recommend
                       is_earnings_drop: bool = False, earnings_date: str = None, git_version: str = None, gatekeeper_tier: str = None) -> int:
     """Add a new decision point."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, reasoning, status, company_name, pe_ratio, market_cap, sector, region, is_earnings_drop, earnings_date, git_version, gatekeeper_tier)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (symbol, price, drop_percent, recommendation, reasoning, status, company_name, pe_ratio, market_cap, sector, region, is_earnings_drop, earnings_date, git_version, gatekeeper_tier))
-        conn.commit()
-        last_id = cursor.lastrowid
-        conn.close()
-        return last_id
+        with transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, reasoning, status, company_name, pe_ratio, market_cap, sector, region, is_earnings_drop, earnings_date, git_version, gatekeeper_tier)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (symbol, price, drop_percent, recommendation, reasoning, status, company_name, pe_ratio, market_cap, sector, region, is_earnings_drop, earnings_date, git_version, gatekeeper_tier))
+        return cursor.lastrowid
     except Exception as e:
         print(f"Error adding decision point: {e}")
         return None
@@ -423,9 +816,6 @@ def add_decision_point(symbol: str, price: float, drop_percent: float, recommend
 def update_decision_point(decision_id: int, recommendation: str, reasoning: str, status: str, data_depth: str = None, **kwargs) -> bool:
     """Update an existing decision point."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
         # Build dynamic query
         query = "UPDATE decision_points SET recommendation = ?, reasoning = ?, status = ?"
         params = [recommendation, reasoning, status]
@@ -458,46 +848,174 @@ def update_decision_point(decision_id: int, recommendation: str, reasoning: str,
             "tech_signal", "news_sentiment", "comp_attribution",
             "bull_case_strength", "bear_verdict", "risk_falling_knife",
         ]
+        texts = {}
         for field in trading_fields:
             if field in kwargs and kwargs[field] is not None:
+                if field in DECISION_TEXT_COLUMNS:
+                    texts[field] = kwargs[field]
+                    continue
                 query += f", {field} = ?"
                 params.append(kwargs[field])
-            
+
         query += " WHERE id = ?"
         params.append(decision_id)
-            
-        cursor.execute(query, tuple(params))
-        conn.commit()
-        conn.close()
+
+        with transaction() as conn:
+            conn.execute(query, tuple(params))
+            if texts:
+                _save_decision_texts(conn, decision_id, texts)
         return True
     except Exception as e:
         print(f"Error updating decision point: {e}")
         return False
 
-def get_decision_points() -> List[dict]:
-    """Get all decision points."""
+def _save_decision_texts(conn: sqlite3.Connection, decision_id: int, texts: dict) -> None:
+    """Upsert the given DECISION_TEXT_COLUMNS values for one decision."""
+    cols = list(texts)
+    if not cols:
+        return
+    updates = ", ".join(f"{col} = excluded.{col}" for col in cols)
+    conn.execute(
+        f"INSERT INTO decision_texts (decision_id, {', '.join(cols)}) "
+        f"VALUES (?, {', '.join('?' * len(cols))}) "
+        f"ON CONFLICT(decision_id) DO UPDATE SET {updates}",
+        (decision_id, *texts.values()),
+    )
+
+_TEXT_ID_CHUNK = 500
+
+def _attach_decision_texts(cursor: sqlite3.Cursor, rows: List[dict]) -> None:
+    """Fill the DECISION_TEXT_COLUMNS keys on each row from decision_texts."""
+    by_id = {row["id"]: row for row in rows}
+    for row in rows:
+        for col in DECISION_TEXT_COLUMNS:
+            row[col] = None
+    ids = list(by_id)
+    # Chunked to stay under SQLite's bound-variable limit (999 before 3.32).
+    for i in range(0, len(ids), _TEXT_ID_CHUNK):
+        chunk = ids[i:i + _TEXT_ID_CHUNK]
+        cursor.execute(
+            f"SELECT * FROM decision_texts WHERE decision_id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        )
+        for text_row in cursor.fetchall():
+            by_id[text_row["decision_id"]].update({col: text_row[col] for col in DECISION_TEXT_COLUMNS})
+
+def get_decision_points(columns: Optional[List[str]] = None, include_texts: bool = False) -> List[dict]:
+    """
+    Get all decision points, newest first.
+
+    ``columns`` restricts the projection to what the caller actually renders
+    (default: every decision_points column). ``include_texts`` also attaches
+    the heavy blobs stored in decision_texts; list views should leave it off.
+    """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM decision_points ORDER BY timestamp DESC")
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        if columns:
+            bad = [c for c in columns if not c.isidentifier()]
+            if bad:
+                raise ValueError(f"invalid column names: {bad}")
+            if include_texts and "id" not in columns:
+                columns = ["id", *columns]
+            projection = ", ".join(columns)
+        else:
+            projection = "*"
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(f"SELECT {projection} FROM decision_points ORDER BY timestamp DESC")
+        rows = [dict(row) for row in cursor.fetchall()]
+        if include_texts:
+            _attach_decision_texts(cursor, rows)
+        return rows
     except Exception as e:
         print(f"Error fetching decision points: {e}")
         return []
 
+# SQL mirror of performance_service.normalize_to_intent, so the decisions API
+# can filter by intent without loading every row. Keep the two in sync.
+_REC = "UPPER(TRIM(COALESCE(recommendation, '')))"
+_ENTER_NOW_SQL = f"{_REC} IN ('STRONG BUY', 'STRONG_BUY', 'BUY')"
+_AVOID_SQL = (
+    f"{_REC} IN ('AVOID', 'SELL', 'STRONG SELL', 'STRONG_SELL', 'HARD_AVOID', "
+    f"'WAIT_FOR_STABILIZATION')"
+)
+_ENTER_LIMIT_SQL = (
+    f"({_REC} IN ('SPECULATIVE BUY', 'SPECULATIVE_BUY', 'BUY_LIMIT') "
+    f"OR ({_REC} LIKE '%BUY%' AND NOT {_ENTER_NOW_SQL} AND NOT {_AVOID_SQL} "
+    f"AND {_REC} NOT IN ('HOLD', 'WATCH')))"
+)
+INTENT_SQL = {
+    "ENTER_NOW": _ENTER_NOW_SQL,
+    "ENTER_LIMIT": _ENTER_LIMIT_SQL,
+    "AVOID": _AVOID_SQL,
+    "NEUTRAL": f"NOT ({_ENTER_NOW_SQL} OR {_ENTER_LIMIT_SQL} OR {_AVOID_SQL})",
+}
+
+def get_decisions_page(limit: int = 50, after: Optional[tuple] = None, columns: Optional[List[str]] = None,
+                       start_date: str = None, end_date: str = None, intent: str = None,
+                       dr_action: str = None, sector: str = None, gatekeeper_tier: str = None):
+    """
+    One newest-first page of decision points using keyset pagination.
+
+    ``after`` is the (timestamp, id) of the last row of the previous page.
+    Dates are inclusive YYYY-MM-DD bounds on decision_date; intent is one of
+    INTENT_SQL's keys. Returns (rows, next_after), where next_after is None
+    on the last page.
+    """
+    if columns:
+        bad = [c for c in columns if not c.isidentifier()]
+        if bad:
+            raise ValueError(f"invalid column names: {bad}")
+        projection = ", ".join(dict.fromkeys(["id", "timestamp", *columns]))
+    else:
+        projection = "*"
+
+    where, params = [], []
+    if after is not None:
+        where.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+        params += [after[0], after[0], after[1]]
+    if start_date:
+        where.append("decision_date >= ?")
+        params.append(start_date)
+    if end_date:
+        where.append("decision_date <= ?")
+        params.append(end_date)
+    if intent:
+        if intent not in INTENT_SQL:
+            raise ValueError(f"unknown intent: {intent}")
+        where.append(INTENT_SQL[intent])
+    for col, value in (("deep_research_action", dr_action), ("sector", sector),
+                       ("gatekeeper_tier", gatekeeper_tier)):
+        if value:
+            where.append(f"{col} = ?")
+            params.append(value)
+
+    sql = f"SELECT {projection} FROM decision_points"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(sql, params)
+    rows = [dict(row) for row in cursor.fetchall()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["timestamp"], rows[-1]["id"])
+
 def get_decision_point(decision_id: int) -> dict:
-    """Get a single decision point by ID."""
+    """Get a single decision point by ID, including its decision_texts blobs."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
         cursor.execute("SELECT * FROM decision_points WHERE id = ?", (decision_id,))
         row = cursor.fetchone()
-        conn.close()
-        return dict(row) if row else None
+        if not row:
+            return None
+        decision = dict(row)
+        _attach_decision_texts(cursor, [decision])
+        return decision
     except Exception as e:
         print(f"Error fetching decision point {decision_id}: {e}")
         return None
@@ -505,14 +1023,11 @@ def get_decision_point(decision_id: int) -> dict:
 def add_tracking_point(decision_id: int, price: float) -> bool:
     """Add a new tracking point for a decision."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO decision_tracking (decision_id, price)
-            VALUES (?, ?)
-        ''', (decision_id, price))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute('''
+                INSERT INTO decision_tracking (decision_id, price)
+                VALUES (?, ?)
+            ''', (decision_id, price))
         return True
     except Exception as e:
         print(f"Error adding tracking point: {e}")
@@ -521,13 +1036,10 @@ def add_tracking_point(decision_id: int, price: float) -> bool:
 def get_tracking_history(decision_id: int) -> List[dict]:
     """Get tracking history for a decision."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
         cursor.execute("SELECT * FROM decision_tracking WHERE decision_id = ? ORDER BY timestamp ASC", (decision_id,))
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
         print(f"Error fetching tracking history: {e}")
         return []
@@ -535,13 +1047,10 @@ def get_tracking_history(decision_id: int) -> List[dict]:
 def get_today_decision_symbols() -> List[str]:
     """Get a list of symbols that have been processed today."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        # SQLite 'date' function returns YYYY-MM-DD
-        cursor.execute("SELECT symbol FROM decision_points WHERE date(timestamp) = date('now') AND status != 'Pending'")
-        symbols = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return symbols
+        cursor = get_connection().cursor()
+        # decision_date is date(timestamp), stored and indexed (YYYY-MM-DD)
+        cursor.execute("SELECT symbol FROM decision_points WHERE decision_date = date('now') AND status != 'Pending'")
+        return [row[0] for row in cursor.fetchall()]
     except Exception as e:
         print(f"Error fetching today's decision symbols: {e}")
         return []
@@ -552,17 +1061,15 @@ def get_analyzed_companies_since(date_str: str) -> List[str]:
     Returns a list of uppercase company names.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
         # Filter where company_name is not null and date >= date_str
-        cursor.execute("SELECT DISTINCT company_name FROM decision_points WHERE company_name IS NOT NULL AND date(timestamp) >= date(?) AND status != 'Pending'", (date_str,))
+        cursor.execute("SELECT DISTINCT company_name FROM decision_points WHERE company_name IS NOT NULL AND decision_date >= date(?) AND status != 'Pending'", (date_str,))
         rows = cursor.fetchall()
         
         companies = []
         for row in rows:
             if row[0]:
                 companies.append(row[0].upper())
-        conn.close()
         return companies
     except Exception as e:
         print(f"Error fetching analyzed companies: {e}")
@@ -571,9 +1078,6 @@ def get_analyzed_companies_since(date_str: str) -> List[str]:
 def update_deep_research_data(decision_id: int, verdict: str, risk: str, catalyst: str, knife_catch: str, score: int = 0, swot: str = None, global_analysis: str = None, local_analysis: str = None, **kwargs) -> bool:
     """Update deep research fields for a decision point. Accepts new v2 fields via kwargs."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
         # Base fields (always updated)
         set_clauses = [
             "deep_research_verdict = ?",
@@ -581,11 +1085,13 @@ def update_deep_research_data(decision_id: int, verdict: str, risk: str, catalys
             "deep_research_catalyst = ?",
             "deep_research_knife_catch = ?",
             "deep_research_score = ?",
-            "deep_research_swot = ?",
-            "deep_research_global_analysis = ?",
-            "deep_research_local_analysis = ?",
         ]
-        values = [verdict, risk, catalyst, knife_catch, score, swot, global_analysis, local_analysis]
+        values = [verdict, risk, catalyst, knife_catch, score]
+        texts = {
+            "deep_research_swot": swot,
+            "deep_research_global_analysis": global_analysis,
+            "deep_research_local_analysis": local_analysis,
+        }
         
         # New v2 fields (dynamic via kwargs)
         new_field_map = {
@@ -617,15 +1123,18 @@ def update_deep_research_data(decision_id: int, verdict: str, risk: str, catalys
         
         for kwarg_key, db_col in new_field_map.items():
             if kwarg_key in kwargs and kwargs[kwarg_key] is not None:
-                set_clauses.append(f"{db_col} = ?")
-                values.append(kwargs[kwarg_key])
-        
+                if db_col in DECISION_TEXT_COLUMNS:
+                    texts[db_col] = kwargs[kwarg_key]
+                else:
+                    set_clauses.append(f"{db_col} = ?")
+                    values.append(kwargs[kwarg_key])
+
         values.append(decision_id)
-        
+
         sql = f"UPDATE decision_points SET {', '.join(set_clauses)} WHERE id = ?"
-        cursor.execute(sql, values)
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(sql, values)
+            _save_decision_texts(conn, decision_id, texts)
         return True
     except Exception as e:
         print(f"Error updating deep research data: {e}")
@@ -673,18 +1182,14 @@ def finalize_position_status_after_dr(
         new_status = "Not Owned"
 
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(
-            """UPDATE decision_points
-               SET status = ?
-               WHERE id = ? AND status = 'Pending DR Review'""",
-            (new_status, decision_id),
-        )
-        conn.commit()
-        updated = cursor.rowcount > 0
-        conn.close()
-        return updated
+        with transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE decision_points
+                   SET status = ?
+                   WHERE id = ? AND status = 'Pending DR Review'""",
+                (new_status, decision_id),
+            )
+        return cursor.rowcount > 0
     except Exception as e:
         print(f"[finalize_position_status_after_dr] error for decision_id={decision_id}: {e}")
         return False
@@ -699,24 +1204,20 @@ def lift_gated_watch_to_buy_limit(decision_id: int, named_event: str) -> bool:
     fired). Organic WATCH rows are never lifted. Returns True if lifted.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(
-            """UPDATE decision_points
-               SET recommendation = 'BUY_LIMIT',
-                   gates_fired = gates_fired || ',DR_NAMED_EVENT_LIFT',
-                   gate_reasons = COALESCE(gate_reasons, '')
-                       || '; DR lifted WATCH to BUY_LIMIT on named event: ' || ?
-               WHERE id = ?
-                 AND recommendation = 'WATCH'
-                 AND pre_gate_action IN ('BUY', 'BUY_LIMIT')
-                 AND gates_fired LIKE '%DROP_TYPE_GATE%'""",
-            (named_event, decision_id),
-        )
-        conn.commit()
-        lifted = cursor.rowcount > 0
-        conn.close()
-        return lifted
+        with transaction() as conn:
+            cursor = conn.execute(
+                """UPDATE decision_points
+                   SET recommendation = 'BUY_LIMIT',
+                       gates_fired = gates_fired || ',DR_NAMED_EVENT_LIFT',
+                       gate_reasons = COALESCE(gate_reasons, '')
+                           || '; DR lifted WATCH to BUY_LIMIT on named event: ' || ?
+                   WHERE id = ?
+                     AND recommendation = 'WATCH'
+                     AND pre_gate_action IN ('BUY', 'BUY_LIMIT')
+                     AND gates_fired LIKE '%DROP_TYPE_GATE%'""",
+                (named_event, decision_id),
+            )
+        return cursor.rowcount > 0
     except Exception as e:
         print(f"[lift_gated_watch_to_buy_limit] error for decision_id={decision_id}: {e}")
         return False
@@ -728,23 +1229,20 @@ def get_todays_strong_buy_candidates(date_str: str = None) -> List[dict]:
     Criteria: (Recommendation LIKE 'STRONG BUY') OR (Recommendation LIKE 'BUY' AND score >= 75)
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+
         target_date = date_str if date_str else "now"
         date_query = "date(?)" if date_str else "date('now')"
         params = (target_date,) if date_str else ()
 
         cursor.execute(f'''
             SELECT * FROM decision_points 
-            WHERE date(timestamp) = {date_query}
+            WHERE decision_date = {date_query}
             AND recommendation LIKE '%BUY%'
             ORDER BY timestamp DESC
         ''', params)
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
         print(f"Error fetching batch candidates: {e}")
         return []
@@ -756,10 +1254,9 @@ def check_if_batch_processed(symbols: List[str], date_str: str = None) -> bool:
     Returns False if never processed OR timed out (> 30 mins).
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+
         sorted_symbols = ",".join(sorted(symbols))
         target_date = date_str if date_str else "now"
         date_query = "date(?)" if date_str else "date('now')"
@@ -783,7 +1280,6 @@ def check_if_batch_processed(symbols: List[str], date_str: str = None) -> bool:
             ''', (sorted_symbols,))
             
         row = cursor.fetchone()
-        conn.close()
 
         if not row:
             return False # Never seen before
@@ -821,24 +1317,19 @@ def check_if_batch_processed(symbols: List[str], date_str: str = None) -> bool:
 def update_batch_status(batch_id: int, status: str) -> bool:
     """Update the status of a batch comparison."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
-        if status == 'COMPLETED':
-            cursor.execute('''
-                UPDATE batch_comparisons 
-                SET status = ?, completed_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (status, batch_id))
-        else:
-            cursor.execute('''
-                UPDATE batch_comparisons 
-                SET status = ?
-                WHERE id = ?
-            ''', (status, batch_id))
-            
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            if status == 'COMPLETED':
+                conn.execute('''
+                    UPDATE batch_comparisons
+                    SET status = ?, completed_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (status, batch_id))
+            else:
+                conn.execute('''
+                    UPDATE batch_comparisons
+                    SET status = ?
+                    WHERE id = ?
+                ''', (status, batch_id))
         return True
     except Exception as e:
         print(f"Error updating batch status: {e}")
@@ -847,27 +1338,21 @@ def update_batch_status(batch_id: int, status: str) -> bool:
 def log_batch_run(symbols: List[str], date_str: str = None) -> int:
     """Log that a batch comparison has been queued/run. Returns batch_id."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
         sorted_symbols = ",".join(sorted(symbols))
-        
+
         # Insert with status STARTED
-        if date_str:
-            cursor.execute('''
-                INSERT INTO batch_comparisons (date, candidate_symbols, status)
-                VALUES (date(?), ?, 'STARTED')
-            ''', (date_str, sorted_symbols))
-        else:
-            cursor.execute('''
-                INSERT INTO batch_comparisons (date, candidate_symbols, status)
-                VALUES (date('now'), ?, 'STARTED')
-            ''', (sorted_symbols,))
-            
-        batch_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return batch_id
+        with transaction() as conn:
+            if date_str:
+                cursor = conn.execute('''
+                    INSERT INTO batch_comparisons (date, candidate_symbols, status)
+                    VALUES (date(?), ?, 'STARTED')
+                ''', (date_str, sorted_symbols))
+            else:
+                cursor = conn.execute('''
+                    INSERT INTO batch_comparisons (date, candidate_symbols, status)
+                    VALUES (date('now'), ?, 'STARTED')
+                ''', (sorted_symbols,))
+        return cursor.lastrowid
     except Exception as e:
         print(f"Error logging batch run: {e}")
         return None
@@ -877,13 +1362,12 @@ def get_unbatched_candidates_by_date(date_str: str) -> List[dict]:
     Get completed deep research candidates for a specific date that have NOT been batched yet.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+
         cursor.execute('''
             SELECT * FROM decision_points
-            WHERE date(timestamp) = ?
+            WHERE decision_date = ?
             AND deep_research_verdict IS NOT NULL
             AND deep_research_verdict != ''
             AND deep_research_verdict != '-'
@@ -897,10 +1381,7 @@ def get_unbatched_candidates_by_date(date_str: str) -> List[dict]:
             AND (batch_id IS NULL OR batch_id = '')
             ORDER BY deep_research_score DESC
         ''', (date_str,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        return [dict(row) for row in cursor.fetchall()]
     except Exception as e:
         print(f"Error fetching unbatched candidates: {e}")
         return []
@@ -910,42 +1391,127 @@ def mark_batch_winner(symbol: str, date_str: str = None) -> bool:
     Mark a specific stock as the winner of its batch.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
         # If date provided, use it to narrow scope, though symbol + recent timestamp might be enough.
         # Safest is update where symbol matches and batch_id is set.
-        
-        if date_str:
-            cursor.execute('''
-                UPDATE decision_points 
-                SET batch_winner = 1 
-                WHERE symbol = ? AND date(timestamp) = ?
-            ''', (symbol, date_str))
-        else:
-             cursor.execute('''
-                UPDATE decision_points 
-                SET batch_winner = 1 
-                WHERE symbol = ? AND date(timestamp) = date('now')
-            ''', (symbol,))
-            
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            if date_str:
+                conn.execute('''
+                    UPDATE decision_points
+                    SET batch_winner = 1
+                    WHERE symbol = ? AND decision_date = ?
+                ''', (symbol, date_str))
+            else:
+                conn.execute('''
+                    UPDATE decision_points
+                    SET batch_winner = 1
+                    WHERE symbol = ? AND decision_date = date('now')
+                ''', (symbol,))
         return True
     except Exception as e:
         print(f"Error marking batch winner: {e}")
         return False
 
+def get_batch_file_index() -> dict:
+    """Return {filename: (mtime, size)} for every batch-comparison file already synced."""
+    try:
+        cursor = get_connection().execute("SELECT filename, mtime, size FROM batch_file_index")
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"Error reading batch file index: {e}")
+        return {}
+
+def apply_batch_file_sync(entries: List[dict], removed: List[str] = ()) -> int:
+    """
+    Record synced batch-comparison files and mark their winners in one transaction.
+
+    Each entry carries filename, mtime, size, winner_symbol and batch_date
+    (YYYY-MM-DD). Winners are only applied for the entries passed in, so a
+    historical winner later cleared in the DB is not re-flagged on every sync.
+    ``removed`` filenames are dropped from the index. Returns the number of
+    decision rows flagged as winners.
+    """
+    with transaction() as conn:
+        cursor = conn.cursor()
+        flagged = 0
+        for entry in entries:
+            if entry.get("winner_symbol") and entry.get("batch_date"):
+                cursor.execute('''
+                    UPDATE decision_points
+                    SET batch_winner = 1
+                    WHERE symbol = ? AND decision_date = ?
+                ''', (entry["winner_symbol"], entry["batch_date"]))
+                flagged += cursor.rowcount
+        cursor.executemany('''
+            INSERT OR REPLACE INTO batch_file_index
+                (filename, mtime, size, winner_symbol, batch_date, synced_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [
+            (e["filename"], e["mtime"], e["size"], e.get("winner_symbol"), e.get("batch_date"))
+            for e in entries
+        ])
+        cursor.executemany(
+            "DELETE FROM batch_file_index WHERE filename = ?",
+            [(name,) for name in removed],
+        )
+    return flagged
+
+def get_trade_report_rows(window_days: int, db_path: str = None) -> Optional[dict]:
+    """Return {decision_id: (change_seq, price_stamp, settled, row)} from the
+    materialized trade report, or None when the table does not exist."""
+    try:
+        cursor = get_connection(db_path).execute(
+            "SELECT decision_id, change_seq, price_stamp, settled, row_json "
+            "FROM trade_report WHERE window_days = ?",
+            (window_days,),
+        )
+        return {
+            row[0]: (row[1], row[2], bool(row[3]), json.loads(row[4]))
+            for row in cursor.fetchall()
+        }
+    except sqlite3.OperationalError as e:
+        print(f"Error reading trade report table: {e}")
+        return None
+
+def apply_trade_report_update(window_days: int, rows: List[dict], removed: List[int] = (),
+                              db_path: str = None) -> None:
+    """
+    Upsert recomputed trade-report rows and drop rows of deleted decisions, in one transaction.
+
+    Each entry carries decision_id, change_seq, price_stamp, settled,
+    decided_at (the decision timestamp, used for export order) and row (the
+    report row dict).
+    """
+    with transaction(db_path) as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO trade_report
+                (decision_id, window_days, change_seq, price_stamp, settled, decided_at, row_json, computed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [
+            (e["decision_id"], window_days, e["change_seq"], e["price_stamp"], int(e["settled"]),
+             e["decided_at"], json.dumps(e["row"], ensure_ascii=False))
+            for e in rows
+        ])
+        conn.executemany(
+            "DELETE FROM trade_report WHERE decision_id = ? AND window_days = ?",
+            [(decision_id, window_days) for decision_id in removed],
+        )
+
+def export_trade_report_rows(window_days: int, db_path: str = None) -> List[dict]:
+    """All materialized report rows for window_days, newest decision first."""
+    cursor = get_connection(db_path).execute(
+        "SELECT row_json FROM trade_report WHERE window_days = ? ORDER BY decided_at DESC, decision_id DESC",
+        (window_days,),
+    )
+    return [json.loads(row[0]) for row in cursor.fetchall()]
+
 def get_distinct_dates_with_unbatched_candidates() -> List[str]:
     """
     Get a list of date strings (YYYY-MM-DD) that have unbatched completed candidates.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
+        cursor = get_connection().cursor()
         cursor.execute('''
-            SELECT DISTINCT date(timestamp) FROM decision_points
+            SELECT DISTINCT decision_date FROM decision_points
             WHERE deep_research_verdict IS NOT NULL
             AND deep_research_verdict != ''
             AND deep_research_verdict != '-'
@@ -959,9 +1525,7 @@ def get_distinct_dates_with_unbatched_candidates() -> List[str]:
             AND (batch_id IS NULL OR batch_id = '')
         ''')
 
-        rows = cursor.fetchall()
-        conn.close()
-        return [row[0] for row in rows if row[0]]
+        return [row[0] for row in cursor.fetchall() if row[0]]
     except Exception as e:
         print(f"Error fetching distinct dates: {e}")
         return []
@@ -972,60 +1536,44 @@ def get_cached_transcript(symbol: str, fiscal_quarter: str) -> dict | None:
 
     Returns a dict with keys {text, source, report_date} or None on miss.
     """
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            "SELECT text, source, report_date FROM transcript_cache "
-            "WHERE symbol=? AND fiscal_quarter=?",
-            (symbol, fiscal_quarter),
-        )
-        row = cur.fetchone()
-        if row is None:
-            return None
-        return {"text": row["text"], "source": row["source"], "report_date": row["report_date"]}
-    finally:
-        conn.close()
+    cur = get_connection().cursor()
+    cur.row_factory = sqlite3.Row
+    cur.execute(
+        "SELECT text, source, report_date FROM transcript_cache "
+        "WHERE symbol=? AND fiscal_quarter=?",
+        (symbol, fiscal_quarter),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return {"text": row["text"], "source": row["source"], "report_date": row["report_date"]}
 
 
 def save_cached_transcript(symbol: str, fiscal_quarter: str, source: str,
                            text: str, report_date: str | None) -> None:
     """Insert a transcript into the cache. Silently no-ops if (symbol, fiscal_quarter)
     is already present (first writer wins — transcripts are immutable per quarter)."""
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    try:
-        cur.execute(
+    with transaction() as conn:
+        conn.execute(
             "INSERT OR IGNORE INTO transcript_cache "
             "(symbol, fiscal_quarter, source, text, report_date) VALUES (?, ?, ?, ?, ?)",
             (symbol, fiscal_quarter, source, text, report_date),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def count_news_shadow_runs() -> int:
     """Number of completed shadow pairs (shadow call succeeded)."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT COUNT(*) FROM news_shadow_runs "
-            "WHERE shadow_report IS NOT NULL AND shadow_error IS NULL"
-        )
-        return cursor.fetchone()[0]
-    finally:
-        conn.close()
+    cursor = get_connection().execute(
+        "SELECT COUNT(*) FROM news_shadow_runs "
+        "WHERE shadow_report IS NOT NULL AND shadow_error IS NULL"
+    )
+    return cursor.fetchone()[0]
 
 
 def insert_news_shadow_run(decision_point_id: Optional[int], record: dict) -> None:
     """Persist one production/shadow comparison pair."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
+    with transaction() as conn:
+        conn.execute(
             '''
             INSERT INTO news_shadow_runs (
                 decision_point_id, symbol, decision_date,
@@ -1055,21 +1603,14 @@ def insert_news_shadow_run(decision_point_id: Optional[int], record: dict) -> No
                 record.get("shadow_error"),
             ),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def get_news_shadow_runs() -> List[dict]:
     """Return all shadow runs, oldest first."""
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM news_shadow_runs ORDER BY id ASC")
-        return [dict(r) for r in cursor.fetchall()]
-    finally:
-        conn.close()
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute("SELECT * FROM news_shadow_runs ORDER BY id ASC")
+    return [dict(r) for r in cursor.fetchall()]
 
 
 # ---------------------------------------------------------------------------
@@ -1087,9 +1628,8 @@ def snapshot_pm_baseline(decision_id: int) -> dict:
     Returns {} if the row does not exist.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
         cursor.execute(
             """
             SELECT recommendation, conviction,
@@ -1103,7 +1643,6 @@ def snapshot_pm_baseline(decision_id: int) -> dict:
             (decision_id,),
         )
         row = cursor.fetchone()
-        conn.close()
         if row is None:
             return {}
         return {
@@ -1135,40 +1674,36 @@ def create_dr_comparison(
     Returns the new row id, or -1 on failure.
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO dr_comparison (
-                decision_id, symbol, run_date, status,
-                pm_recommendation, pm_conviction,
-                pm_entry_low, pm_entry_high, pm_stop_loss,
-                pm_tp1, pm_tp2,
-                pm_sell_low, pm_sell_high, pm_ceiling_exit,
-                pm_rr_ratio
-            ) VALUES (?, ?, ?, 'PENDING', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                decision_id,
-                symbol,
-                run_date,
-                pm_baseline.get("pm_recommendation"),
-                pm_baseline.get("pm_conviction"),
-                pm_baseline.get("pm_entry_low"),
-                pm_baseline.get("pm_entry_high"),
-                pm_baseline.get("pm_stop_loss"),
-                pm_baseline.get("pm_tp1"),
-                pm_baseline.get("pm_tp2"),
-                pm_baseline.get("pm_sell_low"),
-                pm_baseline.get("pm_sell_high"),
-                pm_baseline.get("pm_ceiling_exit"),
-                pm_baseline.get("pm_rr_ratio"),
-            ),
-        )
-        conn.commit()
-        new_id = cursor.lastrowid
-        conn.close()
-        return new_id
+        with transaction() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO dr_comparison (
+                    decision_id, symbol, run_date, status,
+                    pm_recommendation, pm_conviction,
+                    pm_entry_low, pm_entry_high, pm_stop_loss,
+                    pm_tp1, pm_tp2,
+                    pm_sell_low, pm_sell_high, pm_ceiling_exit,
+                    pm_rr_ratio
+                ) VALUES (?, ?, ?, 'PENDING', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    decision_id,
+                    symbol,
+                    run_date,
+                    pm_baseline.get("pm_recommendation"),
+                    pm_baseline.get("pm_conviction"),
+                    pm_baseline.get("pm_entry_low"),
+                    pm_baseline.get("pm_entry_high"),
+                    pm_baseline.get("pm_stop_loss"),
+                    pm_baseline.get("pm_tp1"),
+                    pm_baseline.get("pm_tp2"),
+                    pm_baseline.get("pm_sell_low"),
+                    pm_baseline.get("pm_sell_high"),
+                    pm_baseline.get("pm_ceiling_exit"),
+                    pm_baseline.get("pm_rr_ratio"),
+                ),
+            )
+        return cursor.lastrowid
     except Exception as e:
         logger.error(
             "[create_dr_comparison] decision_id=%s symbol=%s error: %s",
@@ -1199,64 +1734,61 @@ def update_dr_comparison_claude(
         if isinstance(could_not_verify, list):
             could_not_verify = json.dumps(could_not_verify)
 
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            UPDATE dr_comparison SET
-                status = 'CLAUDE_DONE',
-                cl_review_verdict = ?,
-                cl_action = ?,
-                cl_conviction = ?,
-                cl_entry_low = ?,
-                cl_entry_high = ?,
-                cl_stop_loss = ?,
-                cl_tp1 = ?,
-                cl_tp2 = ?,
-                cl_sell_low = ?,
-                cl_sell_high = ?,
-                cl_ceiling_exit = ?,
-                cl_rr_ratio = ?,
-                cl_entry_trigger = ?,
-                cl_exit_trigger = ?,
-                cl_reason = ?,
-                cl_knife_catch = ?,
-                cl_could_not_verify = ?,
-                cl_search_count = ?,
-                cl_source_count = ?,
-                cl_cost_usd = ?,
-                cl_latency_s = ?,
-                cl_result_json = ?
-            WHERE id = ?
-            """,
-            (
-                claude.get("review_verdict"),
-                claude.get("action"),
-                claude.get("conviction"),
-                claude.get("entry_price_low"),
-                claude.get("entry_price_high"),
-                claude.get("stop_loss"),
-                claude.get("take_profit_1"),
-                claude.get("take_profit_2"),
-                claude.get("sell_price_low"),
-                claude.get("sell_price_high"),
-                claude.get("ceiling_exit"),
-                claude.get("risk_reward_ratio"),
-                claude.get("entry_trigger"),
-                claude.get("exit_trigger"),
-                claude.get("reason"),
-                claude.get("knife_catch_warning"),
-                could_not_verify,
-                meta.get("search_count"),
-                meta.get("source_count"),
-                meta.get("cost_usd"),
-                meta.get("latency_s"),
-                json.dumps(claude),
-                comparison_id,
-            ),
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(
+                """
+                UPDATE dr_comparison SET
+                    status = 'CLAUDE_DONE',
+                    cl_review_verdict = ?,
+                    cl_action = ?,
+                    cl_conviction = ?,
+                    cl_entry_low = ?,
+                    cl_entry_high = ?,
+                    cl_stop_loss = ?,
+                    cl_tp1 = ?,
+                    cl_tp2 = ?,
+                    cl_sell_low = ?,
+                    cl_sell_high = ?,
+                    cl_ceiling_exit = ?,
+                    cl_rr_ratio = ?,
+                    cl_entry_trigger = ?,
+                    cl_exit_trigger = ?,
+                    cl_reason = ?,
+                    cl_knife_catch = ?,
+                    cl_could_not_verify = ?,
+                    cl_search_count = ?,
+                    cl_source_count = ?,
+                    cl_cost_usd = ?,
+                    cl_latency_s = ?,
+                    cl_result_json = ?
+                WHERE id = ?
+                """,
+                (
+                    claude.get("review_verdict"),
+                    claude.get("action"),
+                    claude.get("conviction"),
+                    claude.get("entry_price_low"),
+                    claude.get("entry_price_high"),
+                    claude.get("stop_loss"),
+                    claude.get("take_profit_1"),
+                    claude.get("take_profit_2"),
+                    claude.get("sell_price_low"),
+                    claude.get("sell_price_high"),
+                    claude.get("ceiling_exit"),
+                    claude.get("risk_reward_ratio"),
+                    claude.get("entry_trigger"),
+                    claude.get("exit_trigger"),
+                    claude.get("reason"),
+                    claude.get("knife_catch_warning"),
+                    could_not_verify,
+                    meta.get("search_count"),
+                    meta.get("source_count"),
+                    meta.get("cost_usd"),
+                    meta.get("latency_s"),
+                    json.dumps(claude),
+                    comparison_id,
+                ),
+            )
     except Exception as e:
         logger.error(
             "[update_dr_comparison_claude] comparison_id=%s error: %s",
@@ -1293,119 +1825,116 @@ def finalize_dr_comparison(comparison_id: int) -> None:
         deep_research_ceiling_exit   → gem_ceiling_exit
     """
     try:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Fetch the comparison row to get decision_id and pm levels
-        cursor.execute(
-            "SELECT * FROM dr_comparison WHERE id = ?",
-            (comparison_id,),
-        )
-        comp = cursor.fetchone()
-        if comp is None:
-            logger.error(
-                "[finalize_dr_comparison] comparison_id=%s not found", comparison_id
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+
+            # Fetch the comparison row to get decision_id and pm levels
+            cursor.execute(
+                "SELECT * FROM dr_comparison WHERE id = ?",
+                (comparison_id,),
+            )
+            comp = cursor.fetchone()
+            if comp is None:
+                logger.error(
+                    "[finalize_dr_comparison] comparison_id=%s not found", comparison_id
+                )
+                return
+            comp = dict(comp)
+
+            # Fetch the linked decision_points row for Gemini DR fields
+            cursor.execute(
+                """
+                SELECT deep_research_review_verdict,
+                       deep_research_action,
+                       deep_research_conviction,
+                       deep_research_score,
+                       deep_research_entry_low,
+                       deep_research_entry_high,
+                       deep_research_stop_loss,
+                       deep_research_tp1,
+                       deep_research_tp2,
+                       deep_research_rr_ratio,
+                       deep_research_entry_trigger,
+                       deep_research_exit_trigger,
+                       deep_research_reason,
+                       deep_research_sell_price_low,
+                       deep_research_sell_price_high,
+                       deep_research_ceiling_exit
+                FROM decision_points
+                WHERE id = ?
+                """,
+                (comp["decision_id"],),
+            )
+            dp = cursor.fetchone()
+            dp = dict(dp) if dp is not None else {}
+
+            gem_entry_low = dp.get("deep_research_entry_low")
+            gem_entry_high = dp.get("deep_research_entry_high")
+            gem_stop_loss = dp.get("deep_research_stop_loss")
+
+            pm_entry_low = comp.get("pm_entry_low")
+            pm_entry_high = comp.get("pm_entry_high")
+            pm_stop_loss = comp.get("pm_stop_loss")
+
+            # anchored=1 if any PM key level is NULL
+            if any(v is None for v in (pm_entry_low, pm_entry_high, pm_stop_loss)):
+                anchored = 1
+            # anchored=1 if all three PM levels are byte-identical to the gem levels
+            # (includes CONFIRMED genuine no-change; conservative bias: discard maybe-clean rather than trust potentially contaminated)
+            elif (
+                pm_entry_low == gem_entry_low
+                and pm_entry_high == gem_entry_high
+                and pm_stop_loss == gem_stop_loss
+            ):
+                anchored = 1
+            else:
+                anchored = 0
+
+            cursor.execute(
+                """
+                UPDATE dr_comparison SET
+                    status = 'FINALIZED',
+                    anchored = ?,
+                    gem_review_verdict = ?,
+                    gem_action = ?,
+                    gem_conviction = ?,
+                    gem_score = ?,
+                    gem_entry_low = ?,
+                    gem_entry_high = ?,
+                    gem_stop_loss = ?,
+                    gem_tp1 = ?,
+                    gem_tp2 = ?,
+                    gem_rr_ratio = ?,
+                    gem_entry_trigger = ?,
+                    gem_exit_trigger = ?,
+                    gem_reason = ?,
+                    gem_sell_low = ?,
+                    gem_sell_high = ?,
+                    gem_ceiling_exit = ?
+                WHERE id = ?
+                """,
+                (
+                    anchored,
+                    dp.get("deep_research_review_verdict"),
+                    dp.get("deep_research_action"),
+                    dp.get("deep_research_conviction"),
+                    dp.get("deep_research_score"),
+                    gem_entry_low,
+                    gem_entry_high,
+                    gem_stop_loss,
+                    dp.get("deep_research_tp1"),
+                    dp.get("deep_research_tp2"),
+                    dp.get("deep_research_rr_ratio"),
+                    dp.get("deep_research_entry_trigger"),
+                    dp.get("deep_research_exit_trigger"),
+                    dp.get("deep_research_reason"),
+                    dp.get("deep_research_sell_price_low"),
+                    dp.get("deep_research_sell_price_high"),
+                    dp.get("deep_research_ceiling_exit"),
+                    comparison_id,
+                ),
             )
-            conn.close()
-            return
-        comp = dict(comp)
-
-        # Fetch the linked decision_points row for Gemini DR fields
-        cursor.execute(
-            """
-            SELECT deep_research_review_verdict,
-                   deep_research_action,
-                   deep_research_conviction,
-                   deep_research_score,
-                   deep_research_entry_low,
-                   deep_research_entry_high,
-                   deep_research_stop_loss,
-                   deep_research_tp1,
-                   deep_research_tp2,
-                   deep_research_rr_ratio,
-                   deep_research_entry_trigger,
-                   deep_research_exit_trigger,
-                   deep_research_reason,
-                   deep_research_sell_price_low,
-                   deep_research_sell_price_high,
-                   deep_research_ceiling_exit
-            FROM decision_points
-            WHERE id = ?
-            """,
-            (comp["decision_id"],),
-        )
-        dp = cursor.fetchone()
-        dp = dict(dp) if dp is not None else {}
-
-        gem_entry_low = dp.get("deep_research_entry_low")
-        gem_entry_high = dp.get("deep_research_entry_high")
-        gem_stop_loss = dp.get("deep_research_stop_loss")
-
-        pm_entry_low = comp.get("pm_entry_low")
-        pm_entry_high = comp.get("pm_entry_high")
-        pm_stop_loss = comp.get("pm_stop_loss")
-
-        # anchored=1 if any PM key level is NULL
-        if any(v is None for v in (pm_entry_low, pm_entry_high, pm_stop_loss)):
-            anchored = 1
-        # anchored=1 if all three PM levels are byte-identical to the gem levels
-        # (includes CONFIRMED genuine no-change; conservative bias: discard maybe-clean rather than trust potentially contaminated)
-        elif (
-            pm_entry_low == gem_entry_low
-            and pm_entry_high == gem_entry_high
-            and pm_stop_loss == gem_stop_loss
-        ):
-            anchored = 1
-        else:
-            anchored = 0
-
-        cursor.execute(
-            """
-            UPDATE dr_comparison SET
-                status = 'FINALIZED',
-                anchored = ?,
-                gem_review_verdict = ?,
-                gem_action = ?,
-                gem_conviction = ?,
-                gem_score = ?,
-                gem_entry_low = ?,
-                gem_entry_high = ?,
-                gem_stop_loss = ?,
-                gem_tp1 = ?,
-                gem_tp2 = ?,
-                gem_rr_ratio = ?,
-                gem_entry_trigger = ?,
-                gem_exit_trigger = ?,
-                gem_reason = ?,
-                gem_sell_low = ?,
-                gem_sell_high = ?,
-                gem_ceiling_exit = ?
-            WHERE id = ?
-            """,
-            (
-                anchored,
-                dp.get("deep_research_review_verdict"),
-                dp.get("deep_research_action"),
-                dp.get("deep_research_conviction"),
-                dp.get("deep_research_score"),
-                gem_entry_low,
-                gem_entry_high,
-                gem_stop_loss,
-                dp.get("deep_research_tp1"),
-                dp.get("deep_research_tp2"),
-                dp.get("deep_research_rr_ratio"),
-                dp.get("deep_research_entry_trigger"),
-                dp.get("deep_research_exit_trigger"),
-                dp.get("deep_research_reason"),
-                dp.get("deep_research_sell_price_low"),
-                dp.get("deep_research_sell_price_high"),
-                dp.get("deep_research_ceiling_exit"),
-                comparison_id,
-            ),
-        )
-        conn.commit()
-        conn.close()
     except Exception as e:
         logger.error(
             "[finalize_dr_comparison] comparison_id=%s error: %s",
@@ -1416,14 +1945,11 @@ def finalize_dr_comparison(comparison_id: int) -> None:
 def set_dr_comparison_status(comparison_id: int, status: str) -> None:
     """Update only the status column of a dr_comparison row."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE dr_comparison SET status = ? WHERE id = ?",
-            (status, comparison_id),
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(
+                "UPDATE dr_comparison SET status = ? WHERE id = ?",
+                (status, comparison_id),
+            )
     except Exception as e:
         logger.error(
             "[set_dr_comparison_status] comparison_id=%s status=%s error: %s",
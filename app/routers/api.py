@@ -1,5 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from typing import Optional
 from app.services.stock_service import stock_service
+import json
+import os
+import re
 import time
 
 router = APIRouter()
@@ -53,3 +58,120 @@ def get_deep_research_status():
             "batch": dr_service.batch_queue.qsize()
         }
     }
+
+_DR_REPORT_RE = re.compile(r"^deep_research_(.+?)_(\d{4}-\d{2}-\d{2})_\d+")
+
+
+def _report_json_path(directory: str, report_name: str) -> str:
+    # Bare filenames only — no path traversal out of the reports directory.
+    if os.path.basename(report_name) != report_name:
+        raise HTTPException(status_code=404, detail=f"Report {report_name} not found")
+    for ext in (".pdf", ".json"):
+        if report_name.endswith(ext):
+            report_name = report_name[:-len(ext)]
+    path = os.path.join(directory, f"{report_name}.json")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"Report {report_name} not found")
+    return path
+
+
+@router.get("/deep-research/reports/{report_name}/pdf")
+def get_deep_research_report_pdf(report_name: str):
+    """
+    Renders (or serves from the content-hash cache) the PDF for a saved
+    Deep Research JSON report in data/deep_research_reports.
+    """
+    from app.services.pdf_render_service import pdf_render_service
+
+    json_path = _report_json_path("data/deep_research_reports", report_name)
+    base = os.path.basename(json_path)[:-len(".json")]
+    match = _DR_REPORT_RE.match(base)
+    if not match:
+        raise HTTPException(status_code=404, detail=f"Report {report_name} not found")
+    with open(json_path) as f:
+        result = json.load(f)
+
+    pdf_path = pdf_render_service.render(
+        "deep_research", json_path[:-len(".json")] + ".pdf", match.group(1), result, match.group(2)
+    )
+    if not pdf_path:
+        raise HTTPException(status_code=500, detail="PDF rendering failed")
+    return FileResponse(pdf_path, media_type="application/pdf", filename=os.path.basename(pdf_path))
+
+
+@router.get("/comparisons/{report_name}/pdf")
+def get_batch_comparison_pdf(report_name: str):
+    """
+    Renders (or serves from the content-hash cache) the PDF for a saved
+    batch comparison in data/comparisons.
+    """
+    from app.services.pdf_render_service import pdf_render_service
+
+    json_path = _report_json_path("data/comparisons", report_name)
+    base = os.path.basename(json_path)[:-len(".json")]
+    # batch_comparison_<YYYY-MM-DD>_<SYM1>_<SYM2>...
+    parts = base.replace("batch_comparison_", "", 1).split("_")
+    if not base.startswith("batch_comparison_") or len(parts) < 2:
+        raise HTTPException(status_code=404, detail=f"Report {report_name} not found")
+    with open(json_path) as f:
+        result_text = f.read()
+
+    pdf_path = pdf_render_service.render(
+        "batch", json_path[:-len(".json")] + ".pdf", sorted(parts[1:]), result_text
+    )
+    if not pdf_path:
+        raise HTTPException(status_code=500, detail="PDF rendering failed")
+    return FileResponse(pdf_path, media_type="application/pdf", filename=os.path.basename(pdf_path))
+
+@router.get("/decisions")
+def get_decisions(limit: int = 50, cursor: Optional[str] = None,
+                  start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  intent: Optional[str] = None, dr_action: Optional[str] = None,
+                  sector: Optional[str] = None, gatekeeper_tier: Optional[str] = None,
+                  view: Optional[str] = None):
+    """
+    Keyset-paginated decision list, newest first.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page
+    (null on the last page). With ``view=dashboard|decisions`` the response
+    also carries the rendered table rows for that page, which the templates
+    append while scrolling.
+    """
+    from app.database import get_decisions_page
+    from app.routers.views import DECISION_VIEWS, decode_cursor, encode_cursor, render_decision_rows
+
+    if view is not None and view not in DECISION_VIEWS:
+        raise HTTPException(status_code=400, detail=f"Unknown view {view}")
+    limit = max(1, min(limit, 200))
+    columns = DECISION_VIEWS[view][1] if view else None
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        rows, next_key = get_decisions_page(
+            limit, after=after, columns=columns,
+            start_date=start_date, end_date=end_date, intent=intent,
+            dr_action=dr_action, sector=sector, gatekeeper_tier=gatekeeper_tier,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = {"items": rows, "next_cursor": encode_cursor(next_key)}
+    if view:
+        response["html"] = render_decision_rows(view, rows)
+    return response
+
+@router.get("/search")
+def search_reports(q: str, limit: int = 20, symbol: Optional[str] = None, council: bool = True):
+    """
+    Ranked full-text search over decision reasoning, Deep Research text and
+    council reports, e.g. /api/search?q="guidance cut" tariff. Matches are
+    marked «like this» in each snippet.
+    """
+    from app.services import report_search_service
+
+    if council:
+        report_search_service.sync_council_reports()
+    limit = max(1, min(limit, 100))
+    results = report_search_service.search_reports(
+        q, limit=limit, symbol=symbol, include_council=council
+    )
+    return {"query": q, "results": results}
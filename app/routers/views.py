@@ -1,22 +1,93 @@
+import base64
+import json
+from typing import Optional
+from urllib.parse import urlencode
+
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
-from app.database import get_decision_points, get_decision_point
+from app.database import INTENT_SQL, get_decision_point, get_decisions_page
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
+# First paint renders one page server-side; the rest is fetched from
+# /api/decisions as the user scrolls, so page weight no longer grows with
+# the whole decision history.
+PAGE_SIZE = 50
+
+# Columns each list template actually renders; keep in sync with the templates.
+DASHBOARD_COLUMNS = [
+    "id", "timestamp", "symbol", "company_name", "price_at_decision", "drop_percent",
+    "recommendation", "pe_ratio", "market_cap", "sector", "is_earnings_drop", "earnings_date",
+]
+DECISIONS_COLUMNS = [
+    "id", "timestamp", "symbol", "company_name", "price_at_decision", "drop_percent",
+    "recommendation", "reasoning", "pe_ratio", "market_cap", "sector",
+    "deep_research_verdict", "deep_research_score", "deep_research_review_verdict",
+    "deep_research_override_basis", "deep_research_reason", "deep_research_named_event",
+    "deep_research_risk", "deep_research_knife_catch", "deep_research_catalyst",
+    "gates_fired", "pre_gate_action", "gate_reasons",
+]
+
+# view name -> (row partial, projection)
+DECISION_VIEWS = {
+    "dashboard": ("partials/dashboard_rows.html", DASHBOARD_COLUMNS),
+    "decisions": ("partials/decision_rows.html", DECISIONS_COLUMNS),
+}
+
+
+def encode_cursor(key) -> Optional[str]:
+    """Opaque keyset cursor for a (timestamp, id) pair."""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(token: str) -> tuple:
+    """Inverse of encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        timestamp, decision_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return timestamp, int(decision_id)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {token!r}") from e
+
+
+def render_decision_rows(view: str, rows: list) -> str:
+    partial, _ = DECISION_VIEWS[view]
+    return templates.get_template(partial).render(decision_points=rows)
+
+
+def _first_page(request: Request, view: str, template: str, filters: dict):
+    _, columns = DECISION_VIEWS[view]
+    active = {k: v for k, v in filters.items() if v}
+    if active.get("intent") not in INTENT_SQL:
+        active.pop("intent", None)
+    rows, next_key = get_decisions_page(PAGE_SIZE, columns=columns, **active)
+    return templates.TemplateResponse(template, {
+        "request": request,
+        "decision_points": rows,
+        "next_cursor": encode_cursor(next_key),
+        "filters": active,
+        "filter_query": urlencode(active),
+        "intents": list(INTENT_SQL),
+    })
+
 @router.get("/")
 def dashboard(request: Request):
-    decision_points = get_decision_points()
-    return templates.TemplateResponse("dashboard.html", {"request": request, "decision_points": decision_points})
+    return _first_page(request, "dashboard", "dashboard.html", {})
 
 @router.get("/stock/{symbol}")
 def stock_details(request: Request, symbol: str):
     return templates.TemplateResponse("stock_details.html", {"request": request, "symbol": symbol})
 
 @router.get("/decisions")
-def decisions(request: Request):
-    decision_points = get_decision_points()
-    return templates.TemplateResponse("decisions.html", {"request": request, "decision_points": decision_points})
+def decisions(request: Request, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              intent: Optional[str] = None, dr_action: Optional[str] = None,
+              sector: Optional[str] = None, gatekeeper_tier: Optional[str] = None):
+    filters = {
+        "start_date": start_date, "end_date": end_date, "intent": intent,
+        "dr_action": dr_action, "sector": sector, "gatekeeper_tier": gatekeeper_tier,
+    }
+    return _first_page(request, "decisions", "decisions.html", filters)
 
 @router.get("/decision/{decision_id}")
 def decision_detail(request: Request, decision_id: int):
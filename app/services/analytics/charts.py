@@ -11,6 +11,8 @@ import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np  # noqa: E402
 import pandas as pd  # noqa: E402
 
+_MPL_VERSION = tuple(int(p) for p in matplotlib.__version__.split(".")[:2])
+
 # Stable palette so plots are consistent across reports
 INTENT_COLORS = {
     "ENTER_NOW": "#22c55e",
@@ -369,8 +371,10 @@ def rr_boxplot_by_group(
     palette = palette or {}
     box_colors = [palette.get(g, "#cbd5e1") for g in groups]
 
+    # boxplot's labels= became tick_labels= in matplotlib 3.9 (removed in 3.11).
+    label_kw = "tick_labels" if _MPL_VERSION >= (3, 9) else "labels"
     bp = ax.boxplot(
-        data, labels=groups, patch_artist=True, showmeans=True,
+        data, **{label_kw: groups}, patch_artist=True, showmeans=True,
         meanprops=dict(marker="D", markerfacecolor="#fbbf24", markeredgecolor="#1f2937",
                        markersize=7),
         medianprops=dict(color="#1f2937", linewidth=2),
@@ -1,15 +1,19 @@
 """Load and normalize the decision_points cohort for analysis."""
 from __future__ import annotations
 
+import logging
 import os
 import re
-import sqlite3
-from typing import Optional
+from typing import List, Optional
 
 import pandas as pd
 
+from app.database import get_connection
+from app.services.analytics import snapshot
 from app.services.performance_service import normalize_to_intent
 
+logger = logging.getLogger(__name__)
+
 # Synthetic / placeholder symbols created during dev or testing. Real tickers use
 # `.` or `-` for share-class separators, never `_`, so anything containing an
 # underscore is treated as fixture data. The bare "TEST" symbol is also dropped.
@@ -47,21 +51,36 @@ def _db_path() -> str:
     return os.getenv("DB_PATH", "subscribers.db")
 
 
-def load_cohort(start_date: Optional[str] = "2026-02-01") -> pd.DataFrame:
+def _read_decisions(columns: Optional[List[str]]) -> pd.DataFrame:
+    """decision_points from the Arrow snapshot, or straight from SQLite if unavailable."""
+    try:
+        return snapshot.read_table("decision_points", columns=columns, db_path=_db_path())
+    except snapshot.SnapshotUnavailable as e:
+        logger.debug("Analytics snapshot unavailable, reading SQLite: %s", e)
+    except Exception as e:
+        logger.warning("Analytics snapshot read failed, reading SQLite: %s", e)
+    select = ", ".join(columns) if columns else "*"
+    return pd.read_sql_query(f"SELECT {select} FROM decision_points", get_connection(_db_path()))
+
+
+def load_cohort(start_date: Optional[str] = "2026-02-01",
+                columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Return the decision_points table as a DataFrame, filtered to start_date and enriched.
 
+    Reads the incremental Arrow snapshot (see analytics.snapshot). Pass
+    `columns` to load only those (symbol, recommendation and timestamp are
+    always included).
+
     Adds:
       - decision_date: datetime (date portion of timestamp)
       - intent: normalized recommendation (ENTER_NOW / ENTER_LIMIT / AVOID / NEUTRAL)
 
     Synthetic test symbols (TEST, TEST_T3, etc.) are excluded.
     """
-    conn = sqlite3.connect(_db_path())
-    try:
-        df = pd.read_sql_query("SELECT * FROM decision_points", conn)
-    finally:
-        conn.close()
+    if columns is not None:
+        columns = list(dict.fromkeys(["symbol", "recommendation", "timestamp", *columns]))
+    df = _read_decisions(columns)
 
     if df.empty:
         return df
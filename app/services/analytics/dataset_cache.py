@@ -0,0 +1,208 @@
+"""Persisted, incremental state behind payload.compute_dataset.
+
+compute_dataset used to reload the cohort, re-enrich every decision and
+recompute every aggregation on each call. This module keeps, per
+start_date, under CACHE_DIR (ANALYTICS_DATASET_CACHE_DIR, default
+data/analytics_cache/<start_date>/):
+
+  manifest.json  key of the last build: the DB's (db_uid, change_seq)
+                 high-water mark, the price store version, the symbols and
+                 bar window it prefetched.
+  dataset.pkl    the finished dataset (enriched, spy_bars, payload).
+  rows.pkl       raw per-decision outcome values (outcomes._outcome_arrays)
+                 with the change_seq and price-store rewrite stamp they were
+                 computed under.
+
+lookup() returns the finished dataset when the DB has not changed, the
+price store would not download anything for the same window, and the
+store version is the one it was built from. Otherwise compute_dataset
+rebuilds, and enrich() only recomputes outcomes for decisions that are new
+or edited, are still inside their outcome window, or whose ticker's bars
+were rewritten since.
+
+Caching needs the DB's change tracking (app.database); without it
+db_mark() returns None and compute_dataset builds from scratch.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.database import get_connection
+from app.services.analytics import price_cache
+from app.services.analytics.outcomes import _GATHER_BARS, _assemble, _outcome_arrays, enrich_outcomes
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("ANALYTICS_DATASET_CACHE_DIR", "data/analytics_cache"))
+# Bump when the dataset or outcome layout changes; older caches are ignored.
+FORMAT = 2
+
+
+def _db_path() -> str:
+    return os.getenv("DB_PATH", "subscribers.db")
+
+
+def _root(start_date: str) -> Path:
+    return CACHE_DIR / re.sub(r"[^A-Za-z0-9_.-]", "_", str(start_date))
+
+
+def db_mark(db_path: Optional[str] = None) -> Optional[List]:
+    """The DB's [db_uid, change_seq] high-water mark, or None without change tracking."""
+    try:
+        row = get_connection(db_path or _db_path()).execute(
+            "SELECT db_uid, seq FROM change_counter WHERE id = 1"
+        ).fetchone()
+    except Exception:
+        return None
+    return [row[0], int(row[1])] if row else None
+
+
+def _load_manifest(root: Path) -> dict:
+    try:
+        with open(root / "manifest.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _read_pickle(path: Path):
+    try:
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def _write_pickle(path: Path, obj) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    pd.to_pickle(obj, tmp)
+    os.replace(tmp, path)
+
+
+class StoreBars(Mapping):
+    """ticker -> bars over a fixed window, read from the price store on first access.
+
+    Stands in for the dict prefetch() returns when a cached dataset is
+    served, so callers that never touch the bars never read them.
+    """
+
+    def __init__(self, tickers: List[str], start, end):
+        self._tickers = list(tickers)
+        self._start, self._end = start, end
+        self._loaded: Dict[str, pd.DataFrame] = {}
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._loaded:
+            if ticker not in self._tickers:
+                raise KeyError(ticker)
+            self._loaded[ticker] = price_cache.get_bars(ticker, self._start, self._end)
+        return self._loaded[ticker]
+
+    def __iter__(self):
+        return iter(self._tickers)
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+
+def lookup(start_date: str, mark: List) -> Optional[Dict[str, Any]]:
+    """The last build for start_date if nothing it depends on has changed, else None."""
+    root = _root(start_date)
+    manifest = _load_manifest(root)
+    if manifest.get("format") != FORMAT or manifest.get("db_mark") != mark:
+        return None
+    start = pd.Timestamp(manifest["bars_start"])
+    end = pd.Timestamp.now().normalize() + pd.Timedelta(days=2)
+    symbols = manifest["symbols"]
+    if price_cache.missing(symbols + ["SPY"], start, end):
+        return None
+    if price_cache.store_version() != manifest["store_version"]:
+        return None
+    dataset = _read_pickle(root / "dataset.pkl")
+    if dataset is None:
+        return None
+    dataset["bars"] = StoreBars(symbols, start, end)
+    logger.info("[Dataset Cache] %s: served cached dataset (%d decisions)",
+                start_date, len(dataset["enriched"]))
+    return dataset
+
+
+def enrich(cohort: pd.DataFrame, bars: dict, start_date: str) -> pd.DataFrame:
+    """enrich_outcomes(cohort, bars), reusing outcome rows from the last build.
+
+    A row is reused when its decision is unchanged (same change_seq), its
+    outcome window was already complete, and its ticker's bars have not
+    been rewritten since.
+    """
+    if cohort.empty or "id" not in cohort.columns or "change_seq" not in cohort.columns:
+        return enrich_outcomes(cohort, bars)
+    t0 = time.perf_counter()
+    root = _root(start_date)
+    ids = cohort["id"].to_numpy()
+    seq = pd.to_numeric(cohort["change_seq"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    symbols = cohort["symbol"].astype(str).str.upper()
+    stamps = price_cache.rewritten_at(symbols.unique())
+    rewritten = symbols.map(stamps).to_numpy(dtype=np.int64)
+
+    reuse = np.zeros(len(cohort), dtype=bool)
+    prev = _read_pickle(root / "rows.pkl")
+    if _load_manifest(root).get("format") == FORMAT and prev is not None and not prev.empty:
+        known = prev[["_n_forward", "_seq", "_rewritten"]].reindex(ids).fillna(-1).astype(np.int64)
+        reuse = (
+            (known["_n_forward"].to_numpy() > _GATHER_BARS)
+            & (known["_seq"].to_numpy() == seq)
+            & (known["_rewritten"].to_numpy() == rewritten)
+        )
+        prev = prev.loc[ids[reuse]]
+
+    fresh = None
+    if not reuse.all():
+        fresh = _outcome_arrays(cohort.loc[~reuse], bars)
+    arrays = {}
+    for key in (fresh if fresh is not None else prev.columns.drop(["_seq", "_rewritten"])):
+        if fresh is None:
+            arrays[key] = prev[key].to_numpy()
+        elif not reuse.any():
+            arrays[key] = fresh[key]
+        else:
+            old = prev[key].to_numpy()
+            col = np.empty(len(cohort), dtype=np.result_type(old.dtype, fresh[key].dtype))
+            col[reuse], col[~reuse] = old, fresh[key]
+            arrays[key] = col
+    enriched = _assemble(cohort, arrays)
+
+    rows = pd.DataFrame(arrays, index=pd.Index(ids, name="id"))
+    rows["_seq"], rows["_rewritten"] = seq, rewritten
+    root.mkdir(parents=True, exist_ok=True)
+    _write_pickle(root / "rows.pkl", rows)
+    logger.info("[Dataset Cache] %s: enriched %d of %d decisions, reused %d (%.0f ms)",
+                start_date, int((~reuse).sum()), len(cohort), int(reuse.sum()),
+                (time.perf_counter() - t0) * 1000)
+    return enriched
+
+
+def save(start_date: str, dataset: Dict[str, Any], mark: List, bars_start) -> None:
+    """Persist a finished build; mark must be the db_mark() read before it started."""
+    root = _root(start_date)
+    root.mkdir(parents=True, exist_ok=True)
+    _write_pickle(root / "dataset.pkl", {k: v for k, v in dataset.items() if k != "bars"})
+    manifest = {
+        "format": FORMAT,
+        "db_mark": mark,
+        "store_version": price_cache.store_version(),
+        "bars_start": pd.Timestamp(bars_start).isoformat(),
+        "symbols": sorted(dataset["bars"]),
+    }
+    tmp = root / "manifest.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, root / "manifest.json")
@@ -0,0 +1,460 @@
+"""Vectorized backtests of exit rules over a (trade × day) OHLC tensor.
+
+build_paths() loads each trade's forward bars once: column 0 is the
+decision day, columns 1..max_days the holding days. Every rule below then
+evaluates a whole parameter grid at once and returns an Exits holding
+(trade × parameter set) exit returns, exit days and reason codes.
+
+Rules reproduce the per-trade day loops in
+scripts/analysis/exit_strategy_comparison.py exactly, including the
+conservative intraday order: when one bar crosses both a lower exit and an
+upper one, the lower exit fires. First-hit days come from cumulative masks
+over the day axis; path-dependent stops (trailing, breakeven) use running
+maxima of the highs *before* each day.
+
+Parameters are scalars or equal-length 1-D arrays (one entry per parameter
+set); grid() builds the Cartesian product of parameter axes. sweep()
+evaluates a grid in blocks and summarize() turns exits into one P&L row per
+parameter set. Pure NumPy/pandas; no I/O.
+"""
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Reason codes stored in Exits.reason.
+REASONS = (
+    "TIMEOUT", "TP", "SL", "SL_FIRST", "TRAIL_SL", "INITIAL_SL",
+    "BE_TRAIL", "TIME_DECAY", "MULTI_TIER", "ORACLE",
+)
+(TIMEOUT, TP, SL, SL_FIRST, TRAIL_SL, INITIAL_SL,
+ BE_TRAIL, TIME_DECAY, MULTI_TIER, ORACLE) = range(len(REASONS))
+
+NEVER = np.iinfo(np.int64).max  # first-hit day of a level that is never reached
+# Cap on (trade × day × parameter set) cells sweep() evaluates at once.
+BLOCK_CELLS = 8_000_000
+
+
+@dataclass
+class Paths:
+    """Forward bars of the simulable trades, one row per trade.
+
+    high/low/close are (trade × max_days+1); days past a trade's last bar
+    are NaN. rows holds each trade's position in the frame passed to
+    build_paths, last its final usable day, dates each day's bar date
+    (NaT past last).
+    """
+    rows: np.ndarray
+    entry: np.ndarray
+    last: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    dates: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def max_days(self) -> int:
+        return self.close.shape[1] - 1
+
+
+@dataclass
+class Exits:
+    """Per-trade exits of one rule over P parameter sets: arrays are (trade × P)."""
+    params: pd.DataFrame
+    exit_return: np.ndarray
+    exit_day: np.ndarray
+    reason: np.ndarray
+    kinds: tuple  # reason codes this rule can produce
+
+    def column(self, j: int) -> pd.DataFrame:
+        return pd.DataFrame({
+            "exit_reason": np.asarray(REASONS)[self.reason[:, j]],
+            "exit_day": self.exit_day[:, j],
+            "exit_return": self.exit_return[:, j],
+        })
+
+
+def build_paths(trades: pd.DataFrame, bars_by_ticker: Dict[str, pd.DataFrame], max_days: int) -> Paths:
+    """Stack each trade's bars from its decision date into a Paths tensor.
+
+    A trade is left out when its ticker has no bars, its price_at_decision
+    is not positive, or fewer than two bars start at its decision date.
+    """
+    width = max_days + 1
+    by_ticker: Dict[str, Optional[tuple]] = {}
+    rows, entry, last, windows = [], [], [], []
+    for pos, (sym, price, date) in enumerate(zip(
+        trades["symbol"], trades["price_at_decision"], trades["decision_date"]
+    )):
+        sym = str(sym).upper()
+        if sym not in by_ticker:
+            bars = bars_by_ticker.get(sym)
+            if bars is None or bars.empty:
+                by_ticker[sym] = None
+            else:
+                bars = bars.sort_index()
+                by_ticker[sym] = (
+                    pd.DatetimeIndex(bars.index).asi8,
+                    bars[["High", "Low", "Close"]].to_numpy(dtype=float),
+                )
+        cached = by_ticker[sym]
+        price = float(price)
+        if cached is None or not price > 0:
+            continue
+        dates, hlc = cached
+        first = np.searchsorted(dates, pd.Timestamp(date).normalize().value, side="left")
+        window = hlc[first:first + width]
+        if len(window) < 2:
+            continue
+        rows.append(pos)
+        entry.append(price)
+        last.append(min(max_days, len(window) - 1))
+        windows.append((window, dates[first:first + width]))
+
+    stacked = np.full((len(rows), width, 3), np.nan)
+    stamps = np.full((len(rows), width), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for i, (window, days) in enumerate(windows):
+        stacked[i, :len(window)] = window
+        stamps[i, :len(days)] = days.view("datetime64[ns]")
+    return Paths(
+        rows=np.asarray(rows, dtype=np.int64),
+        entry=np.asarray(entry, dtype=float),
+        last=np.asarray(last, dtype=np.int64),
+        high=stacked[:, :, 0],
+        low=stacked[:, :, 1],
+        close=stacked[:, :, 2],
+        dates=stamps,
+    )
+
+
+def grid(**axes: Sequence) -> Dict[str, np.ndarray]:
+    """Cartesian product of parameter axes, first axis slowest, as flat arrays."""
+    names = list(axes)
+    combos = list(itertools.product(*(list(axes[k]) for k in names)))
+    return {k: np.asarray([c[i] for c in combos]) for i, k in enumerate(names)}
+
+
+# ---------------------------------------------------------------------------
+# Shared pieces
+# ---------------------------------------------------------------------------
+
+def _params(**values) -> pd.DataFrame:
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v)) for v in values.values()))
+    return pd.DataFrame(dict(zip(values, arrays)))
+
+
+def _window(paths: Paths, max_days: int):
+    """Days 1..max_days of high/low/close, the in-window mask and each trade's end day."""
+    if max_days > paths.max_days:
+        raise ValueError(f"paths hold {paths.max_days} days, not {max_days}")
+    end = np.minimum(max_days, paths.last)
+    days = np.arange(1, max_days + 1)
+    inside = days[None, :] <= end[:, None]
+    cols = slice(1, max_days + 1)
+    return paths.high[:, cols], paths.low[:, cols], inside, end
+
+
+def _timeout(paths: Paths, end: np.ndarray) -> np.ndarray:
+    close = paths.close[np.arange(len(paths)), end]
+    return (close - paths.entry) / paths.entry
+
+
+def _first_hits(mask: np.ndarray) -> np.ndarray:
+    """(trade × day × P) mask -> (trade × P) first day 1.. it holds, else NEVER."""
+    hit = mask.any(axis=1)
+    return np.where(hit, mask.argmax(axis=1) + 1, NEVER)
+
+
+def _first_crossings(values: np.ndarray, inside: np.ndarray, levels: np.ndarray, above: bool) -> np.ndarray:
+    """First day values reach each level (>= if above, else <=), per unique level.
+
+    levels is (trade × P); equal parameter values share one pass, so a
+    grid costs (trade × day × distinct levels), not × P.
+    """
+    with np.errstate(invalid="ignore"):
+        reached = values[:, :, None] >= levels[:, None, :] if above else values[:, :, None] <= levels[:, None, :]
+    return _first_hits(reached & inside[:, :, None])
+
+
+def _by_level(values, inside, entry, pct, sign, above):
+    """(trade × P) first crossing of entry * (1 + sign * pct), computed per distinct pct."""
+    unique, inverse = np.unique(pct, return_inverse=True)
+    levels = entry[:, None] * (1 + sign * unique)[None, :]
+    return _first_crossings(values, inside, levels, above)[:, inverse.ravel()]
+
+
+def _at(day_values: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Gather (trade × day × P) values at a (trade × P) 1-based day (clipped)."""
+    idx = np.clip(day, 1, day_values.shape[1]) - 1
+    return np.take_along_axis(day_values, idx[:, None, :], axis=1)[:, 0, :]
+
+
+def _prior_peak(high: np.ndarray, entry: np.ndarray) -> np.ndarray:
+    """(trade × day) max of entry and the highs of the days before each day.
+
+    fmax skips NaN highs, as max(peak, nan) does in the day loops.
+    """
+    shifted = np.concatenate([entry[:, None], high[:, :-1]], axis=1)
+    return np.fmax.accumulate(shifted, axis=1)
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+def hold(paths: Paths, max_days: int) -> Exits:
+    """No exits: sell at the close of day min(max_days, last)."""
+    _, _, _, end = _window(paths, max_days)
+    n = len(paths)
+    return Exits(
+        params=pd.DataFrame(index=[0]),
+        exit_return=_timeout(paths, end)[:, None],
+        exit_day=end[:, None],
+        reason=np.full((n, 1), TIMEOUT, dtype=np.int8),
+        kinds=(TIMEOUT,),
+    )
+
+
+def hard_tp_sl(paths: Paths, tp, sl, max_days: int) -> Exits:
+    """Fixed take-profit / stop-loss levels set at entry.
+
+    Exits at the first day High >= entry*(1+tp) or Low <= entry*(1-sl);
+    SL when both happen that day (reason SL_FIRST). First-hit days are
+    computed once per distinct TP and per distinct SL value.
+    """
+    params = _params(tp=tp, sl=sl)
+    high, low, inside, end = _window(paths, max_days)
+    tp, sl = params["tp"].to_numpy(float), params["sl"].to_numpy(float)
+    first_tp = _by_level(high, inside, paths.entry, tp, 1.0, above=True)
+    first_sl = _by_level(low, inside, paths.entry, sl, -1.0, above=False)
+    is_sl = (first_sl <= first_tp) & (first_sl != NEVER)
+    is_tp = ~is_sl & (first_tp != NEVER)
+    reason = np.select([is_sl & (first_sl == first_tp), is_sl, is_tp], [SL_FIRST, SL, TP], TIMEOUT)
+    return Exits(
+        params=params,
+        exit_return=np.where(is_sl, -sl[None, :], np.where(is_tp, tp[None, :], _timeout(paths, end)[:, None])),
+        exit_day=np.where(is_sl | is_tp, np.minimum(first_tp, first_sl), end[:, None]),
+        reason=reason.astype(np.int8),
+        kinds=(TP, SL, SL_FIRST, TIMEOUT),
+    )
+
+
+def _stop_exits(paths, params, stop, low, inside, end, stop_reason, use_stop_reason):
+    """Exit at the first day Low <= stop (trade × day × P), at the stop price.
+
+    The reason is stop_reason where use_stop_reason holds that day, else
+    INITIAL_SL.
+    """
+    with np.errstate(invalid="ignore"):
+        first = _first_hits((low[:, :, None] <= stop) & inside[:, :, None])
+    stopped = first != NEVER
+    price = _at(stop, first)
+    entry = paths.entry[:, None]
+    reason = np.where(stopped, np.where(_at(use_stop_reason, first), stop_reason, INITIAL_SL), TIMEOUT)
+    return Exits(
+        params=params,
+        exit_return=np.where(stopped, (price - entry) / entry, _timeout(paths, end)[:, None]),
+        exit_day=np.where(stopped, first, end[:, None]),
+        reason=reason.astype(np.int8),
+        kinds=(stop_reason, INITIAL_SL, TIMEOUT),
+    )
+
+
+def trailing_stop(paths: Paths, trail, initial_sl, max_days: int) -> Exits:
+    """Stop at max(initial SL, prior peak * (1 - trail)).
+
+    The trailing part only applies once the prior peak is more than 0.1%
+    above entry. Reason TRAIL_SL when the trailing level was the binding
+    one, INITIAL_SL otherwise.
+    """
+    params = _params(trail=trail, initial_sl=initial_sl)
+    high, low, inside, end = _window(paths, max_days)
+    trail = params["trail"].to_numpy(float)
+    initial = paths.entry[:, None] * (1 - params["initial_sl"].to_numpy(float))[None, :]
+    peak = _prior_peak(high, paths.entry)
+    active = (peak > paths.entry[:, None] * 1.001)[:, :, None]
+    trailing = peak[:, :, None] * (1 - trail)[None, None, :]
+    stop = np.where(active, np.maximum(initial[:, None, :], trailing), initial[:, None, :])
+    return _stop_exits(paths, params, stop, low, inside, end, TRAIL_SL, stop > initial[:, None, :])
+
+
+def breakeven_trail(paths: Paths, trigger, trail, initial_sl, max_days: int) -> Exits:
+    """Initial SL until a High reaches entry*(1+trigger); from the next day
+    on the stop is max(initial SL, entry, prior peak * (1 - trail)).
+
+    Reason BE_TRAIL once triggered, INITIAL_SL before.
+    """
+    params = _params(trigger=trigger, trail=trail, initial_sl=initial_sl)
+    high, low, inside, end = _window(paths, max_days)
+    trail = params["trail"].to_numpy(float)
+    entry = paths.entry
+    initial = entry[:, None] * (1 - params["initial_sl"].to_numpy(float))[None, :]
+    triggered_on = _by_level(high, inside, entry, params["trigger"].to_numpy(float), 1.0, above=True)
+    days = np.arange(1, max_days + 1)
+    triggered = triggered_on[:, None, :] < days[None, :, None]
+    peak = _prior_peak(high, entry)
+    lifted = np.maximum(np.maximum(initial[:, None, :], entry[:, None, None]),
+                        peak[:, :, None] * (1 - trail)[None, None, :])
+    stop = np.where(triggered, lifted, initial[:, None, :])
+    return _stop_exits(paths, params, stop, low, inside, end, BE_TRAIL, triggered)
+
+
+def time_decay(paths: Paths, check_day, min_progress, max_days: int) -> Exits:
+    """Sell at the close of check_day if the return then is below
+    min_progress; otherwise hold to the last day. A check_day at or past a
+    trade's last day means hold."""
+    params = _params(check_day=check_day, min_progress=min_progress)
+    _, _, _, end = _window(paths, max_days)
+    check = params["check_day"].to_numpy(np.int64)[None, :]
+    entry = paths.entry[:, None]
+    early = check < end[:, None]
+    close = paths.close[np.arange(len(paths))[:, None], np.minimum(check, paths.max_days)]
+    checked = (close - entry) / entry
+    with np.errstate(invalid="ignore"):
+        decay = early & (checked < params["min_progress"].to_numpy(float)[None, :])
+    return Exits(
+        params=params,
+        exit_return=np.where(decay, checked, _timeout(paths, end)[:, None]),
+        exit_day=np.where(decay, check, end[:, None]),
+        reason=np.where(decay, TIME_DECAY, TIMEOUT).astype(np.int8),
+        kinds=(TIME_DECAY, TIMEOUT),
+    )
+
+
+def multi_tier_tp(paths: Paths, tp1, tp2, sl, partial, max_days: int) -> Exits:
+    """Sell `partial` of the position at TP1 and the rest at TP2, with one SL.
+
+    Day order matches the loop: SL is checked first (stopping out whatever
+    is still held), then TP1, then TP2 (which may fill the same day as
+    TP1). Unfilled legs sell at the last close. The return is the
+    size-weighted mix of both legs; the exit day is the later leg's.
+    """
+    params = _params(tp1=tp1, tp2=tp2, sl=sl, partial=partial)
+    high, low, inside, end = _window(paths, max_days)
+    tp1, tp2 = params["tp1"].to_numpy(float), params["tp2"].to_numpy(float)
+    sl, partial = params["sl"].to_numpy(float), params["partial"].to_numpy(float)
+    entry = paths.entry
+
+    first_sl = _by_level(low, inside, entry, sl, -1.0, above=False)
+    first_tp1 = _by_level(high, inside, entry, tp1, 1.0, above=True)
+    days = np.arange(1, max_days + 1)
+    with np.errstate(invalid="ignore"):
+        tp2_hit = high[:, :, None] >= entry[:, None, None] * (1 + tp2)[None, None, :]
+    first_tp2 = _first_hits(tp2_hit & inside[:, :, None] & (days[None, :, None] >= first_tp1[:, None, :]))
+
+    timeout = _timeout(paths, end)[:, None]
+    end2 = np.broadcast_to(end[:, None], first_sl.shape)
+    stopped_out = (first_sl != NEVER) & (first_sl <= first_tp1)
+    tp1_filled = ~stopped_out & (first_tp1 != NEVER)
+    leg1 = np.where(stopped_out, -sl[None, :], np.where(tp1_filled, tp1[None, :], timeout))
+    day1 = np.where(stopped_out, first_sl, np.where(tp1_filled, first_tp1, end2))
+    tp2_filled = tp1_filled & (first_tp2 < first_sl)
+    sl2 = ~tp2_filled & (first_sl != NEVER)
+    leg2 = np.where(tp2_filled, tp2[None, :], np.where(sl2, -sl[None, :], timeout))
+    day2 = np.where(tp2_filled, first_tp2, np.where(sl2, first_sl, end2))
+    return Exits(
+        params=params,
+        exit_return=leg1 * partial[None, :] + leg2 * (1 - partial[None, :]),
+        exit_day=np.maximum(day1, day2),
+        reason=np.full(leg1.shape, MULTI_TIER, dtype=np.int8),
+        kinds=(MULTI_TIER,),
+    )
+
+
+def oracle(paths: Paths, max_days: int) -> Exits:
+    """Hindsight upper bound: sell at the highest close of days 1..last
+    (the first such day on ties; NaN closes are skipped)."""
+    _, _, inside, end = _window(paths, max_days)
+    close = np.where(inside, paths.close[:, 1:max_days + 1], np.nan)
+    best = np.fmax.reduce(close, axis=1)
+    with np.errstate(invalid="ignore"):
+        day = np.argmax(close == best[:, None], axis=1) + 1
+    return Exits(
+        params=pd.DataFrame(index=[0]),
+        exit_return=((best - paths.entry) / paths.entry)[:, None],
+        exit_day=day[:, None],
+        reason=np.full((len(paths), 1), ORACLE, dtype=np.int8),
+        kinds=(ORACLE,),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+def summarize(exits: Exits, investment: float, cost_total: float) -> pd.DataFrame:
+    """One row per parameter set: the parameters, then P&L totals and
+    distribution stats, then n_<reason> counts for the rule's reasons."""
+    ret = exits.exit_return
+    n = ret.shape[0]
+    out = exits.params.reset_index(drop=True).copy()
+    gross = investment * ret
+    net = gross - cost_total
+    total_net = net.sum(axis=0)
+    out["n"] = n
+    out["total_invested_eur"] = n * investment
+    out["total_gross_eur"] = gross.sum(axis=0)
+    out["total_net_eur"] = total_net
+    if n:
+        out["roi"] = total_net / (n * investment)
+        out["win_rate"] = (net > 0).mean(axis=0)
+        out["mean_return"] = ret.mean(axis=0)
+        out["median_return"] = np.median(ret, axis=0)
+        out["min_return"] = ret.min(axis=0)
+        out["max_return"] = ret.max(axis=0)
+    else:
+        for col in ("roi", "win_rate", "mean_return", "median_return", "min_return", "max_return"):
+            out[col] = 0.0
+    for code in exits.kinds:
+        out[f"n_{REASONS[code].lower()}"] = (exits.reason == code).sum(axis=0)
+    return out
+
+
+def sweep(
+    rule: Callable[..., Exits],
+    paths: Paths,
+    params: Dict[str, Sequence],
+    investment: float,
+    cost_total: float,
+    max_days: int,
+) -> pd.DataFrame:
+    """summarize(rule(paths, **params)) evaluated in blocks of parameter
+    sets, so memory stays bounded (BLOCK_CELLS) for large grids."""
+    table = _params(**params)
+    step = max(1, BLOCK_CELLS // max(1, len(paths) * max_days))
+    frames = []
+    for lo in range(0, len(table), step):
+        block = table.iloc[lo:lo + step]
+        exits = rule(paths, max_days=max_days, **{k: block[k].to_numpy() for k in table.columns})
+        frames.append(summarize(exits, investment, cost_total))
+    return pd.concat(frames, ignore_index=True)
+
+
+def ledger(
+    trades: pd.DataFrame,
+    paths: Paths,
+    exits: Exits,
+    j: int,
+    investment: float,
+    cost_total: float,
+) -> pd.DataFrame:
+    """Per-trade exits of parameter set j, in trade order."""
+    chosen = trades.iloc[paths.rows]
+    out = pd.DataFrame({
+        "symbol": chosen["symbol"].to_numpy(),
+        "decision_date": pd.to_datetime(chosen["decision_date"]).dt.strftime("%Y-%m-%d").to_numpy(),
+        "intent": chosen["intent"].to_numpy(),
+        "rr": chosen["risk_reward_ratio"].astype(float).to_numpy(),
+        "entry": paths.entry,
+    })
+    out = pd.concat([out, exits.column(j)], axis=1)
+    out["gross_eur"] = investment * out["exit_return"]
+    out["net_eur"] = out["gross_eur"] - cost_total
+    return out
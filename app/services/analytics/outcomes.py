@@ -110,10 +110,229 @@ def _simulate_buy_limit_fill(row: pd.Series, bars: pd.DataFrame):
     return False, None
 
 
+# ---------------------------------------------------------------------------
+# Vectorized engine
+# ---------------------------------------------------------------------------
+# enrich_outcomes() computes the same columns as the row-wise path without a
+# per-decision sort/slice of the ticker's bars. Every ticker's bars are laid
+# out once as a row of a ticker x bar-position matrix (each ticker keeps its
+# own trading calendar, so "N bars later" stays positional). np.searchsorted
+# finds each decision's first bar on/after its decision_date, and every
+# horizon, extreme, recovery and limit fill is a gather from that offset.
+
+_POST_RECOVER_DAYS = (5, 10, 20)
+# Bars needed past a decision's first bar: the 8w window plus the longest
+# post-recovery horizon measured from a recovery day inside it.
+_GATHER_BARS = HORIZON_DAYS["8w"] + 1 + max(_POST_RECOVER_DAYS)
+_BASE_COLUMNS = [f"return_{h}" for h in HORIZON_DAYS] + [
+    "max_roi_4w", "max_roi_8w", "max_drawdown_4w", "recovered", "days_to_recover",
+]
+
+
+def _bar_matrix(bars_by_ticker: dict, tickers: list):
+    """Stack each ticker's sorted bars into padded (ticker x position) arrays."""
+    frames = []
+    for t in tickers:
+        bars = bars_by_ticker.get(t)
+        frames.append(bars.sort_index() if bars is not None and not bars.empty else None)
+    lengths = np.array([0 if f is None else len(f) for f in frames], dtype=np.int64)
+    width = max(int(lengths.max(initial=0)), 1)
+    shape = (len(tickers), width)
+    dates = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+    close = np.full(shape, np.nan)
+    high = np.full(shape, np.nan)
+    low = np.full(shape, np.nan)
+    has_high_low = np.zeros(len(tickers), dtype=bool)
+    for i, f in enumerate(frames):
+        if f is None:
+            continue
+        n = len(f)
+        dates[i, :n] = pd.DatetimeIndex(f.index).asi8
+        close[i, :n] = f["Close"].astype(float).to_numpy()
+        # Same fallback as compute_outcome: no High/Low column -> use closes.
+        high[i, :n] = f["High"].astype(float).to_numpy() if "High" in f.columns else close[i, :n]
+        low[i, :n] = f["Low"].astype(float).to_numpy() if "Low" in f.columns else close[i, :n]
+        has_high_low[i] = "High" in f.columns and "Low" in f.columns
+    return lengths, dates, close, high, low, has_high_low
+
+
+def _column(cohort: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in cohort.columns:
+        return np.full(len(cohort), np.nan)
+    return pd.to_numeric(cohort[name], errors="coerce").to_numpy(dtype=float)
+
+
+def _pre_drop_prices(cohort: pd.DataFrame, price: np.ndarray) -> np.ndarray:
+    """Vector form of the pre-drop price rule in _enrich_outcomes_rowwise."""
+    drop = _column(cohort, "drop_percent")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = price / (1.0 + drop / 100.0)
+    implied = np.where(np.isfinite(implied) | np.isnan(implied), implied, np.nan)  # x/0 -> None
+    implied = np.where(np.isnan(drop) | (drop == 0), np.nan, implied)
+    if "pre_drop_price" in cohort.columns:
+        stored = _column(cohort, "pre_drop_price")
+        implied = np.where(np.isnan(stored), implied, stored)
+    return implied
+
+
+def _ordered_columns(optional_keys: list, present: np.ndarray) -> list:
+    """Column order pd.DataFrame(records) would give: first appearance across rows."""
+    columns = list(_BASE_COLUMNS)
+    if present.shape[1] == 0 or present.shape[0] == 0:
+        return columns
+    patterns, first = np.unique(present, axis=0, return_index=True)
+    for pattern in patterns[np.argsort(first)]:
+        for key, on in zip(optional_keys, pattern):
+            if on and key not in columns:
+                columns.append(key)
+    return columns
+
+
 def enrich_outcomes(cohort: pd.DataFrame, bars_by_ticker: dict) -> pd.DataFrame:
     """
     For each row in cohort, compute outcome columns using the matching bars.
     Adds columns and returns a new DataFrame.
+
+    Output matches _enrich_outcomes_rowwise column for column (names, order,
+    dtypes and values); see tests/test_analytics_outcomes.py.
+    """
+    if cohort.empty:
+        return cohort.copy()
+    return _assemble(cohort, _outcome_arrays(cohort, bars_by_ticker))
+
+
+def _outcome_arrays(cohort: pd.DataFrame, bars_by_ticker: dict) -> dict:
+    """Per-row outcome values before column selection and dtype rules.
+
+    Besides the outcome columns this holds the row masks _assemble needs
+    ("_ok", "_is_limit", "_filled_<h>") and "_n_forward", the number of
+    bars on/after the decision date. A row with n_forward > _GATHER_BARS
+    is final: its window ends before the last bar (which may still be a
+    live intraday bar), so later bars can no longer change it.
+    """
+    n_rows = len(cohort)
+    symbols = cohort["symbol"].astype(str).str.upper().to_numpy()
+    tickers, ticker_idx = np.unique(symbols, return_inverse=True)
+    lengths, dates, close, high, low, has_high_low = _bar_matrix(bars_by_ticker, list(tickers))
+
+    decision_ns = pd.to_datetime(cohort["decision_date"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    nat = pd.isna(cohort["decision_date"]).to_numpy()
+    start = np.zeros(n_rows, dtype=np.int64)
+    order = np.argsort(ticker_idx, kind="stable")
+    bounds = np.searchsorted(ticker_idx[order], np.arange(len(tickers) + 1))
+    for t in range(len(tickers)):
+        rows = order[bounds[t]:bounds[t + 1]]
+        start[rows] = np.searchsorted(dates[t, :lengths[t]], decision_ns[rows], side="left")
+    n_forward = np.where(nat, 0, lengths[ticker_idx] - start)
+
+    # Forward windows: [row, k] = k-th bar on/after the decision date.
+    offsets = np.arange(_GATHER_BARS)
+    valid = offsets[None, :] < n_forward[:, None]
+    pos = np.minimum(start[:, None] + offsets[None, :], close.shape[1] - 1)
+    rows_t = ticker_idx[:, None]
+    fwd_close = np.where(valid, close[rows_t, pos], np.nan)
+    fwd_high = np.where(valid, high[rows_t, pos], np.nan)
+    fwd_low = np.where(valid, low[rows_t, pos], np.nan)
+
+    price = _column(cohort, "price_at_decision")
+    price = np.where(np.isnan(price), 0.0, price)
+    ok = (n_forward > 0) & (price > 0)
+    safe_price = np.where(ok, price, 1.0)
+
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for label, n in HORIZON_DAYS.items():
+            out[f"return_{label}"] = np.where(
+                ok & (n_forward > n), (fwd_close[:, n] - safe_price) / safe_price, np.nan
+            )
+        win4, win8 = HORIZON_DAYS["4w"] + 1, HORIZON_DAYS["8w"] + 1
+        enough = ok & (n_forward > 1)
+        out["max_roi_4w"] = np.where(
+            enough, (np.fmax.reduce(fwd_high[:, :win4], axis=1) - safe_price) / safe_price, np.nan
+        )
+        out["max_roi_8w"] = np.where(
+            enough, (np.fmax.reduce(fwd_high[:, :win8], axis=1) - safe_price) / safe_price, np.nan
+        )
+        out["max_drawdown_4w"] = np.where(
+            enough, (np.fmin.reduce(fwd_low[:, :win4], axis=1) - safe_price) / safe_price, np.nan
+        )
+
+        pre_drop = _pre_drop_prices(cohort, _column(cohort, "price_at_decision"))
+        hit = (fwd_high[:, :win8] >= pre_drop[:, None]) & (ok & (pre_drop > 0))[:, None]
+        recovered = hit.any(axis=1)
+        first_hit = np.argmax(hit, axis=1)
+        out["recovered"] = recovered
+        out["days_to_recover"] = np.where(recovered, first_hit, np.nan)
+
+        every = np.arange(n_rows)
+        recover_close = fwd_close[every, first_hit]
+        post_ok = recovered & (recover_close > 0)
+        safe_rc = np.where(post_ok, recover_close, 1.0)
+        for n_days in _POST_RECOVER_DAYS:
+            later = first_hit + n_days
+            out[f"post_recover_{n_days}d"] = np.where(
+                post_ok & (later < n_forward),
+                (fwd_close[every, np.minimum(later, _GATHER_BARS - 1)] - safe_rc) / safe_rc,
+                np.nan,
+            )
+
+        is_limit = (cohort["intent"] == "ENTER_LIMIT").to_numpy() if "intent" in cohort.columns \
+            else np.zeros(n_rows, dtype=bool)
+        lo, hi = _column(cohort, "entry_price_low"), _column(cohort, "entry_price_high")
+        can_fill = is_limit & ~np.isnan(lo) & ~np.isnan(hi) & (n_forward > 0) & has_high_low[ticker_idx]
+        touched = (fwd_low[:, :win4] <= hi[:, None]) & (fwd_high[:, :win4] >= lo[:, None])
+        filled = can_fill & touched.any(axis=1)
+        cost = np.where(filled, (lo + hi) / 2.0, np.nan)
+        out["limit_filled"] = filled
+        out["limit_cost_basis"] = cost
+        has_cost = filled & (cost != 0)
+        safe_cost = np.where(has_cost, cost, 1.0)
+        filled_present = {}
+        for label, n in HORIZON_DAYS.items():
+            filled_present[label] = has_cost & (n_forward > n)
+            out[f"return_filled_{label}"] = np.where(
+                filled_present[label], (fwd_close[:, n] - safe_cost) / safe_cost, np.nan
+            )
+
+    out["_ok"] = ok
+    out["_is_limit"] = is_limit
+    for label in HORIZON_DAYS:
+        out[f"_filled_{label}"] = filled_present[label]
+    out["_n_forward"] = n_forward
+    return out
+
+
+def _assemble(cohort: pd.DataFrame, arrays: dict) -> pd.DataFrame:
+    """Append the outcome columns from _outcome_arrays to cohort (row-aligned)."""
+    ok, is_limit = arrays["_ok"], arrays["_is_limit"]
+    out = {k: v for k, v in arrays.items() if not k.startswith("_")}
+
+    # Which optional keys each row-wise record would carry, in record order.
+    optional = [f"post_recover_{d}d" for d in _POST_RECOVER_DAYS] + ["limit_filled", "limit_cost_basis"] \
+        + [f"return_filled_{h}" for h in HORIZON_DAYS]
+    present = np.column_stack(
+        [ok] * len(_POST_RECOVER_DAYS) + [is_limit, is_limit] + [arrays[f"_filled_{h}"] for h in HORIZON_DAYS]
+    )
+    columns = _ordered_columns(optional, present)
+
+    # dtypes as pandas infers them from the row-wise records.
+    days = out["days_to_recover"]
+    if not np.isnan(days).any():
+        out["days_to_recover"] = days.astype(np.int64)
+    if not is_limit.all():
+        limit_filled = np.asarray(out["limit_filled"], dtype=bool).astype(object)
+        limit_filled[~is_limit] = np.nan
+        out["limit_filled"] = limit_filled
+
+    outcome_df = pd.DataFrame({c: out[c] for c in columns})
+    enriched = cohort.copy().reset_index(drop=True)
+    return pd.concat([enriched, outcome_df], axis=1)
+
+
+def _enrich_outcomes_rowwise(cohort: pd.DataFrame, bars_by_ticker: dict) -> pd.DataFrame:
+    """
+    Reference implementation of enrich_outcomes: one compute_outcome call per
+    row. Kept for the parity test and scripts/analysis/bench_outcomes.py.
     """
     if cohort.empty:
         return cohort.copy()
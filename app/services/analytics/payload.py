@@ -1,7 +1,7 @@
 """Build a single JSON-serializable payload describing cohort performance.
 
-Used by the offline HTML report generator. Pure function — no caching,
-no FastAPI dependency.
+Used by the offline HTML report generator. No FastAPI dependency; builds
+are cached and incremental (see analytics.dataset_cache).
 """
 from __future__ import annotations
 
@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from app.services.analytics import dataset_cache
 from app.services.analytics.aggregations import (
     equity_curve,
     time_to_recover_dist,
@@ -24,6 +25,7 @@ from app.services.analytics.intervals import mean_ci
 from app.services.analytics.outcomes import HORIZON_DAYS, enrich_outcomes
 from app.services.analytics.price_cache import get_bars, prefetch
 from app.services.analytics.stats import (
+    bootstrap_by_group,
     correlation,
     pairwise_welch,
     recovery_stats,
@@ -33,6 +35,10 @@ from app.services.analytics.stats import (
 
 logger = logging.getLogger(__name__)
 
+# Resample counts for the report's bootstrap CIs and permutation p-values.
+N_BOOTSTRAP = 2000
+N_PERMUTATIONS = 5000
+
 
 def _df_records(df: pd.DataFrame, columns: Optional[List[str]] = None) -> List[dict]:
     if df is None or df.empty:
@@ -368,7 +374,7 @@ def _stats_records(stats_df: pd.DataFrame) -> List[Dict[str, Any]]:
     return _df_records(stats_df)
 
 
-def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
+def compute_dataset(start_date: str = "2026-02-01", use_cache: bool = True) -> Dict[str, Any]:
     """Build everything: enriched cohort, raw bars, SPY bars, and the JSON payload.
 
     Returns a dict with keys:
@@ -378,7 +384,26 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
         - "payload": the JSON-serializable dict consumed by the HTML report.
 
     `build_payload` is a thin wrapper that returns just `payload` for back-compat.
+
+    With use_cache (the default) an unchanged DB and price store return the
+    last build for start_date as-is, and a rebuild only re-enriches
+    decisions that are new, edited or still inside their outcome window.
+    "bars" is then a read-through mapping over the price store.
+
+    payload["generated_at"] is always the time of this call; on a cache hit
+    payload["computed_at"] keeps the time the figures were actually built
+    (on a fresh build the two are equal).
     """
+    mark = dataset_cache.db_mark() if use_cache else None
+    if mark is not None:
+        cached = dataset_cache.lookup(start_date, mark)
+        if cached is not None:
+            served = dict(cached["payload"])
+            served.setdefault("computed_at", served.get("generated_at"))
+            served["generated_at"] = datetime.utcnow().isoformat() + "Z"
+            cached["payload"] = served
+            return cached
+
     df = load_cohort(start_date=start_date)
     if df.empty:
         empty_payload = {
@@ -409,7 +434,10 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
         start=df["decision_date"].min(),
         end=end + pd.Timedelta(days=2),
     )
-    enriched = enrich_outcomes(df, bars)
+    if mark is not None:
+        enriched = dataset_cache.enrich(df, bars, start_date)
+    else:
+        enriched = enrich_outcomes(df, bars)
 
     buys = enriched[enriched["intent"].isin(["ENTER_NOW", "ENTER_LIMIT"])]
     buys_4w = buys.dropna(subset=["return_4w"])
@@ -552,15 +580,26 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
     # the larger-n short-horizon ones.
     HORIZONS = ("1w", "2w", "4w")
     stats_intent_by_h = {
-        h: pairwise_welch(enriched, group_col="intent", value_col=f"return_{h}", min_n=5)
+        h: pairwise_welch(enriched, group_col="intent", value_col=f"return_{h}", min_n=5,
+                          n_permutations=N_PERMUTATIONS)
         for h in HORIZONS
     }
     stats_dr_verdict_by_h = {
         h: pairwise_welch(
             enriched, group_col="deep_research_verdict", value_col=f"return_{h}", min_n=3,
+            n_permutations=N_PERMUTATIONS,
         )
         for h in HORIZONS
     }
+    # Bootstrap CIs next to the t / Wilson ones, for the small skewed groups
+    bootstrap_intent_by_h = {
+        h: bootstrap_by_group(enriched, "intent", f"return_{h}", n_resamples=N_BOOTSTRAP)
+        for h in HORIZONS
+    }
+    bootstrap_dr_verdict_by_h = {
+        h: bootstrap_by_group(enriched, "deep_research_verdict", f"return_{h}", n_resamples=N_BOOTSTRAP)
+        for h in HORIZONS
+    }
     corr_pm_rr_by_h = {
         h: correlation(enriched, x_col="risk_reward_ratio", y_col=f"return_{h}")
         for h in HORIZONS
@@ -640,8 +679,10 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
     ]
     decisions = _df_records(enriched, columns=decision_cols)
 
+    generated_at = datetime.utcnow().isoformat() + "Z"
     payload = {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "generated_at": generated_at,
+        "computed_at": generated_at,
         "cohort_size": int(len(enriched)),
         "cohort_start": start_date,
         "headline": {
@@ -699,6 +740,8 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
                     "winrate_by_dr_rr": _stats_records(dr_rr_bucket_by_h.get(h, pd.DataFrame())),
                     "pairwise_intent": _stats_records(stats_intent_by_h[h]),
                     "pairwise_dr_verdict": _stats_records(stats_dr_verdict_by_h[h]),
+                    "bootstrap_by_intent": _stats_records(bootstrap_intent_by_h[h]),
+                    "bootstrap_by_dr_verdict": _stats_records(bootstrap_dr_verdict_by_h[h]),
                     "corr_pm_rr": corr_pm_rr_by_h[h],
                     "corr_dr_rr": corr_dr_rr_by_h[h],
                 }
@@ -707,12 +750,18 @@ def compute_dataset(start_date: str = "2026-02-01") -> Dict[str, Any]:
         },
         "decisions": decisions,
     }
-    return {
+    dataset = {
         "enriched": enriched,
         "bars": bars,
         "spy_bars": spy_bars,
         "payload": payload,
     }
+    if mark is not None:
+        try:
+            dataset_cache.save(start_date, dataset, mark, df["decision_date"].min())
+        except Exception as e:
+            logger.warning("Dataset cache write failed: %s", e)
+    return dataset
 
 
 def build_payload(start_date: str = "2026-02-01") -> Dict[str, Any]:
@@ -0,0 +1,315 @@
+"""Event-driven portfolio backtests: many scenarios, one pass over the trades.
+
+book() turns one exit rule's per-trade exits (exits.build_paths plus a
+rule such as exits.hold) into dated positions: entry and exit bar dates,
+the trade's return and SPY's return over the same window. simulate() then
+walks that decision stream once in time order. On each day it first
+closes the positions exiting that day, then opens the day's entries,
+highest R/R first. Every scenario advances at once: cash and open
+positions are vectors over scenarios, so a sweep costs one step per trade
+rather than one simulation per scenario.
+
+A scenario is one row of a parameter table (missing columns take
+DEFAULTS):
+
+  rr_min         enter only when R/R > rr_min (-inf: no R/R filter)
+  intents        collection of allowed intents, or None for all
+  min_price      enter only when price_at_decision >= min_price
+  investment     euros per position
+  cost_in        commission on entry, cost_out on exit
+  capital        starting cash (inf: unconstrained)
+  max_positions  cap on concurrent positions (inf: unconstrained)
+
+An entry a scenario wants is skipped when all its slots are taken, or when
+its cash cannot cover investment + cost_in. Without those limits every
+scenario reduces to independent fixed-euro trades. Pure NumPy/pandas; no I/O.
+"""
+from __future__ import annotations
+
+import itertools
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from app.services.analytics.exits import Exits, Paths
+
+DEFAULTS = {
+    "rr_min": -np.inf,
+    "intents": None,
+    "min_price": -np.inf,
+    "investment": 750.0,
+    "cost_in": 3.0,
+    "cost_out": 3.0,
+    "capital": np.inf,
+    "max_positions": np.inf,
+}
+
+
+@dataclass
+class Book:
+    """Dated positions of one exit rule, one row per simulable trade.
+
+    rows holds each trade's position in the frame passed to book();
+    spy_return is NaN where SPY's bars do not cover the trade's window.
+    """
+    rows: np.ndarray
+    entry_at: np.ndarray
+    exit_at: np.ndarray
+    exit_return: np.ndarray
+    spy_return: np.ndarray
+    rr: np.ndarray
+    intent: np.ndarray
+    price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+@dataclass
+class Run:
+    """Outcome of simulate(): taken is (trade × scenario), the rest per scenario."""
+    book: Book
+    scenarios: pd.DataFrame
+    taken: np.ndarray
+    skipped_slots: np.ndarray
+    skipped_cash: np.ndarray
+    peak_positions: np.ndarray
+
+
+def book(
+    trades: pd.DataFrame,
+    paths: Paths,
+    exits: Exits,
+    j: int = 0,
+    spy_bars: Optional[pd.DataFrame] = None,
+    rr_col: str = "risk_reward_ratio",
+    keep: Optional[np.ndarray] = None,
+) -> Book:
+    """Positions for parameter set j of exits, computed over paths.
+
+    keep optionally masks paths' trades (e.g. only complete windows).
+    Entries are at the close of the decision day's bar, exits at the
+    close of the exit day's bar; SPY is paired over the same two dates.
+    """
+    if paths.dates is None:
+        raise ValueError("paths carry no bar dates; build them with exits.build_paths")
+    sel = np.arange(len(paths)) if keep is None else np.flatnonzero(keep)
+    day = exits.exit_day[sel, j]
+    ret = exits.exit_return[sel, j].astype(float)
+    entry_at = paths.dates[sel, 0]
+    exit_at = paths.dates[sel, day]
+    ok = np.isfinite(ret) & ~np.isnat(exit_at)
+    sel, ret, entry_at, exit_at = sel[ok], ret[ok], entry_at[ok], exit_at[ok]
+
+    chosen = trades.iloc[paths.rows[sel]]
+    rr = (pd.to_numeric(chosen[rr_col], errors="coerce").to_numpy(dtype=float)
+          if rr_col in chosen.columns else np.full(len(sel), np.nan))
+    intent = (chosen["intent"].to_numpy(dtype=object)
+              if "intent" in chosen.columns else np.full(len(sel), None, dtype=object))
+    return Book(
+        rows=paths.rows[sel],
+        entry_at=entry_at,
+        exit_at=exit_at,
+        exit_return=ret,
+        spy_return=_spy_returns(spy_bars, entry_at, exit_at),
+        rr=rr,
+        intent=intent,
+        price=paths.entry[sel],
+    )
+
+
+def _spy_returns(spy_bars, entry_at: np.ndarray, exit_at: np.ndarray) -> np.ndarray:
+    """SPY close-to-close return from the first bar on/after entry_at to the
+    bar on exit_at (the last one on/before it); NaN when SPY's bars end
+    before exit_at."""
+    out = np.full(len(entry_at), np.nan)
+    if spy_bars is None or spy_bars.empty or not len(entry_at):
+        return out
+    spy = spy_bars.sort_index()
+    dates = pd.DatetimeIndex(spy.index).asi8
+    close = spy["Close"].to_numpy(dtype=float)
+    start = np.searchsorted(dates, entry_at.view(np.int64), side="left")
+    stop = np.searchsorted(dates, exit_at.view(np.int64), side="right") - 1
+    ok = (start < len(dates)) & (stop >= start) & (exit_at.view(np.int64) <= dates[-1])
+    start, stop = np.minimum(start, len(dates) - 1), np.maximum(stop, 0)
+    base = close[start]
+    ok &= base > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[ok] = (close[stop[ok]] - base[ok]) / base[ok]
+    return out
+
+
+def scenarios(table: Union[pd.DataFrame, Sequence[dict], None] = None, **axes: Sequence) -> pd.DataFrame:
+    """Scenario table from rows (a DataFrame or dicts) or, with axes, their
+    Cartesian product (first axis slowest); missing columns get DEFAULTS."""
+    if axes:
+        if table is not None:
+            raise ValueError("pass either a table or axes, not both")
+        names = list(axes)
+        table = pd.DataFrame(list(itertools.product(*(list(axes[k]) for k in names))),
+                             columns=names)
+    table = pd.DataFrame(table if table is not None else [{}]).reset_index(drop=True)
+    for name, default in DEFAULTS.items():
+        if name not in table.columns:
+            table[name] = [default] * len(table)
+    table["intents"] = [_intents(v) for v in table["intents"]]
+    for name in DEFAULTS:
+        if name != "intents":
+            table[name] = table[name].astype(float).fillna(DEFAULTS[name])
+    return table
+
+
+def _intents(value) -> Optional[tuple]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return tuple(sorted({value} if isinstance(value, str) else set(value)))
+
+
+def eligible(bk: Book, table: pd.DataFrame) -> np.ndarray:
+    """(trade × scenario) mask of the entries each scenario's filters want."""
+    rr_min = table["rr_min"].to_numpy(float)
+    with np.errstate(invalid="ignore"):
+        want = (bk.rr[:, None] > rr_min[None, :]) | np.isneginf(rr_min)[None, :]
+        want &= bk.price[:, None] >= table["min_price"].to_numpy(float)[None, :]
+    by_set: Dict[tuple, np.ndarray] = {}
+    for s, allowed in enumerate(table["intents"]):
+        if allowed is None:
+            continue
+        if allowed not in by_set:
+            by_set[allowed] = pd.Series(bk.intent).isin(allowed).to_numpy()
+        want[:, s] &= by_set[allowed]
+    return want
+
+
+def simulate(bk: Book, table, mask: Optional[np.ndarray] = None) -> Run:
+    """Walk bk's entries and exits once in time order for every scenario.
+
+    mask is an optional extra (trade × scenario) eligibility, ANDed with
+    the table's filters. Exits on a day settle before that day's entries;
+    entries on the same day go highest R/R first (NaN last), then in
+    trade order.
+    """
+    table = scenarios(table)
+    n, n_s = len(bk), len(table)
+    want = eligible(bk, table)
+    if mask is not None:
+        want &= np.asarray(mask, dtype=bool)
+    investment = table["investment"].to_numpy(float)
+    cost_in = table["cost_in"].to_numpy(float)
+    cost_out = table["cost_out"].to_numpy(float)
+    max_positions = table["max_positions"].to_numpy(float)
+    outlay = investment + cost_in
+
+    cash = table["capital"].to_numpy(float).copy()
+    held = np.zeros(n_s)
+    peak = np.zeros(n_s)
+    skipped_slots = np.zeros(n_s, dtype=np.int64)
+    skipped_cash = np.zeros(n_s, dtype=np.int64)
+    taken = np.zeros((n, n_s), dtype=bool)
+
+    entry_ns = bk.entry_at.view(np.int64)
+    priority = np.where(np.isnan(bk.rr), -np.inf, bk.rr)
+    entry_order = np.lexsort((np.arange(n), -priority, entry_ns))
+    exit_order = np.argsort(bk.exit_at.view(np.int64), kind="stable")
+    exit_ns = bk.exit_at.view(np.int64)[exit_order]
+    payout = 1.0 + bk.exit_return[exit_order]
+
+    settled = 0
+    for i in entry_order:
+        due = np.searchsorted(exit_ns, entry_ns[i], side="right")
+        if due > settled:
+            closing = taken[exit_order[settled:due]].astype(float)
+            cash += investment * (payout[settled:due] @ closing) - cost_out * closing.sum(axis=0)
+            held -= closing.sum(axis=0)
+            settled = due
+        wants = want[i]
+        if not wants.any():
+            continue
+        full = wants & (held >= max_positions)
+        short = wants & ~full & (cash < outlay)
+        go = wants & ~full & ~short
+        taken[i] = go
+        cash -= np.where(go, outlay, 0.0)
+        held += go
+        np.maximum(peak, held, out=peak)
+        skipped_slots += full
+        skipped_cash += short
+    return Run(bk, table, taken, skipped_slots, skipped_cash, peak)
+
+
+def summarize(run: Run) -> pd.DataFrame:
+    """One P&L row per scenario: the scenario columns, trade counts, net P&L
+    after commissions, and the paired SPY benchmark and alpha."""
+    table, taken = run.scenarios, run.taken
+    ret, spy = run.book.exit_return, run.book.spy_return
+    investment = table["investment"].to_numpy(float)
+    cost_total = table["cost_in"].to_numpy(float) + table["cost_out"].to_numpy(float)
+    capital = table["capital"].to_numpy(float)
+    weights = taken.astype(float)
+
+    n = taken.sum(axis=0)
+    invested = n * investment
+    gross = investment * (ret @ weights)
+    cost = n * cost_total
+    net = gross - cost
+    paired = weights * np.isfinite(spy)[:, None]
+    n_spy = paired.sum(axis=0).astype(np.int64)
+    spy0 = np.nan_to_num(spy)
+    spy_gross = investment * (spy0 @ paired)
+    spy_net = spy_gross - n_spy * cost_total
+    alpha = investment * ((ret - spy0) @ paired)
+
+    net_trade = investment[None, :] * ret[:, None] - cost_total[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(np.where(taken, ret[:, None], np.nan), axis=0) - cost_total / investment
+        out = table.copy()
+        out["n_trades"] = n
+        out["n_skipped_slots"] = run.skipped_slots
+        out["n_skipped_cash"] = run.skipped_cash
+        out["peak_positions"] = run.peak_positions.astype(np.int64)
+        out["total_invested_eur"] = invested
+        out["total_gross_pnl_eur"] = gross
+        out["total_cost_eur"] = cost
+        out["total_net_pnl_eur"] = net
+        out["final_value_eur"] = invested + net
+        out["roi"] = np.where(n > 0, net / invested, 0.0)
+        out["return_on_capital"] = np.where(np.isfinite(capital), net / capital, np.nan)
+        out["win_rate_gross"] = np.where(n > 0, ((ret > 0)[:, None] & taken).sum(axis=0) / n, 0.0)
+        out["win_rate_net"] = np.where(n > 0, ((net_trade > 0) & taken).sum(axis=0) / n, 0.0)
+        out["mean_net_return_pct"] = np.where(n > 0, net / invested, 0.0)
+        out["median_net_return_pct"] = np.where(n > 0, median, 0.0)
+        out["n_spy_paired"] = n_spy
+        out["total_spy_gross_pnl_eur"] = spy_gross
+        out["total_spy_net_pnl_eur"] = spy_net
+        out["spy_roi"] = np.where(n_spy > 0, spy_net / (n_spy * investment), 0.0)
+        out["total_alpha_eur"] = alpha
+        out["alpha_roi"] = np.where(n_spy > 0, alpha / (n_spy * investment), 0.0)
+    return out
+
+
+def ledger(trades: pd.DataFrame, run: Run, s: int) -> pd.DataFrame:
+    """Positions scenario s took, in entry order, with per-trade P&L."""
+    bk, row = run.book, run.scenarios.iloc[s]
+    took = np.flatnonzero(run.taken[:, s])
+    took = took[np.lexsort((took, bk.entry_at.view(np.int64)[took]))]
+    chosen = trades.iloc[bk.rows[took]]
+    investment, cost_total = float(row["investment"]), float(row["cost_in"] + row["cost_out"])
+    out = pd.DataFrame({
+        "symbol": chosen["symbol"].to_numpy(),
+        "decision_date": pd.to_datetime(chosen["decision_date"]).dt.strftime("%Y-%m-%d").to_numpy(),
+        "intent": bk.intent[took],
+        "rr": bk.rr[took],
+        "entry": bk.price[took],
+        "entry_at": bk.entry_at[took],
+        "exit_at": bk.exit_at[took],
+        "exit_return": bk.exit_return[took],
+        "spy_return": bk.spy_return[took],
+    })
+    out["net_pnl_eur"] = investment * out["exit_return"] - cost_total
+    out["spy_net_pnl_eur"] = investment * out["spy_return"] - cost_total
+    out["alpha_pnl_eur"] = out["net_pnl_eur"] - out["spy_net_pnl_eur"]
+    return out
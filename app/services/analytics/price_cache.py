@@ -1,23 +1,95 @@
-"""Cache yfinance daily OHLC bars to disk so re-runs don't re-hit the API."""
+"""Local store of daily OHLC bars shared by the app, reports and analysis scripts.
+
+One Parquet file per ticker under CACHE_DIR (PRICE_CACHE_DIR, default
+data/price_cache) holds the unadjusted Open/High/Low/Close, Adj Close and
+Volume columns as yfinance returns them. Each file also records the date
+range that has been *checked* against Yahoo (its coverage). Coverage can be
+wider than the bars themselves (weekends, holidays, pre-IPO dates), so
+asking for the same range twice never re-hits the API.
+
+- Delta fetches: a request outside the covered range downloads only the
+  missing head and/or tail, overlapping one cached bar. If the overlap bar's
+  Adj Close/Close ratio changed (a dividend or split since the last fetch
+  re-adjusted Yahoo's history), the ticker's whole range is re-downloaded.
+- Freshness: bars dated before the day they were fetched are final. A range
+  reaching today is served from cache for FRESH_SECONDS, then its tail is
+  checked again.
+- Negative cache: tickers Yahoo has nothing for (delisted, foreign, typos)
+  are recorded in _failed.json and skipped for FAILED_TTL_SECONDS. Only a
+  per-ticker "no data" answer from Yahoo counts; yf.download reports network
+  errors and rate limits as empty results too, and those leave the ticker
+  unmarked so the next call retries it.
+- Bulk prefetch: tickers missing the same range are downloaded together in
+  chunks of CHUNK_SIZE; files are written atomically (tmp + rename).
+- adjusted=True scales OHLC by Adj Close/Close, which is what
+  yf.download(auto_adjust=True) and Ticker.history() return.
+- Versioning: _version.json records when any file last gained or changed
+  bars (store_version()) and, per ticker, when bars it already held were
+  last replaced (rewritten_at()). Derived caches key on these; see
+  analytics.dataset_cache.
+
+get_bars() is the range query for one ticker, get_closes() returns close
+series for many, and prefetch() warms a set of tickers. missing() says
+which tickers prefetch() would have to download, without reading any bars.
+"""
 from __future__ import annotations
 
+import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
+try:
+    from yfinance import shared as _yf_shared
+except ImportError:  # pragma: no cover - every 0.2.x release has it
+    _yf_shared = None
+
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path(os.getenv("PRICE_CACHE_DIR", "data/price_cache"))
+FRESH_SECONDS = int(os.getenv("PRICE_CACHE_FRESH_SECONDS", str(6 * 3600)))
+FAILED_TTL_SECONDS = int(os.getenv("PRICE_CACHE_FAILED_TTL_SECONDS", str(24 * 3600)))
+CHUNK_SIZE = int(os.getenv("PRICE_CACHE_CHUNK_SIZE", "100"))
+THREADS = int(os.getenv("PRICE_CACHE_THREADS", "8"))
+
+_FAILED_FILE = "_failed.json"
+_VERSION_FILE = "_version.json"
+_DAY = pd.Timedelta(days=1)
+# yfinance's per-ticker error text when Yahoo answered with no bars, and the
+# "possibly delisted" prefix it shares with a missing timezone. The timezone
+# lookup also fails that way when Yahoo can't be reached, so that case only
+# counts when another ticker in the same call came back with bars.
+_NO_PRICES = "no price data found"
+_NO_TICKER = "possibly delisted"
+_ADJUSTED_COLUMNS = ("Open", "High", "Low", "Close")
+_lock = threading.Lock()
+_download_lock = threading.Lock()
 
 
 def _cache_path(ticker: str) -> Path:
     return CACHE_DIR / f"{ticker.upper()}.parquet"
 
 
+def _day(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
 def _read_cache(path: Path) -> Optional[pd.DataFrame]:
     if not path.exists():
         csv_path = path.with_suffix(".csv")
@@ -34,83 +106,518 @@ def _read_cache(path: Path) -> Optional[pd.DataFrame]:
         return None
 
 
-def _write_cache(path: Path, df: pd.DataFrame) -> None:
+def _write_cache(path: Path, df: pd.DataFrame, coverage: Optional[dict] = None) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    if coverage is not None:
+        df = df.copy()
+        df.attrs = {"coverage": {k: v.isoformat() for k, v in coverage.items()}}
+    # Write beside the target and rename, so readers (and a crash mid-write)
+    # never see a half-written file.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        df.to_parquet(path)
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
     except Exception as e:
         logger.warning("Parquet write failed (%s); writing CSV", e)
+        tmp.unlink(missing_ok=True)
         df.to_csv(path.with_suffix(".csv"))
 
 
-def get_bars(
-    ticker: str,
-    start: pd.Timestamp,
-    end: pd.Timestamp,
-    refresh: bool = False,
-) -> pd.DataFrame:
-    """
-    Return daily OHLC bars for ticker between start and end (inclusive).
-    Cached on disk; appends new bars to the cache when end exceeds cached range.
-    """
-    ticker = ticker.upper()
+def _load(ticker: str) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
+    """Cached bars and their coverage {start, end, fetched_at}, or (None, None)."""
     path = _cache_path(ticker)
-    cached = None if refresh else _read_cache(path)
+    cached = _read_cache(path)
+    if cached is None:
+        return None, None
+    stored = cached.attrs.get("coverage")
+    cached.attrs = {}  # pandas deep-copies attrs on every operation
+    cached.index = pd.to_datetime(cached.index)
+    if stored:
+        return cached, {k: pd.Timestamp(v) for k, v in stored.items()}
+    if cached.empty:
+        return cached, None
+    # Written before coverage was recorded (or the CSV fallback): trust the
+    # bar span, fetched when the file was last written.
+    fetched_at = pd.Timestamp.fromtimestamp(
+        (path if path.exists() else path.with_suffix(".csv")).stat().st_mtime
+    )
+    return cached, {"start": cached.index.min(), "end": cached.index.max(), "fetched_at": fetched_at}
+
+
+# ---------------------------------------------------------------------------
+# Negative cache
+# ---------------------------------------------------------------------------
+
+def _load_failed() -> Dict[str, str]:
+    try:
+        with open(CACHE_DIR / _FAILED_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_failed(failed: Dict[str, str]) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / (_FAILED_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(failed, f, indent=1, sort_keys=True)
+    os.replace(tmp, CACHE_DIR / _FAILED_FILE)
 
-    need_fetch_start = start
-    need_fetch_end = end
 
-    if cached is not None and not cached.empty:
-        cached.index = pd.to_datetime(cached.index)
-        cached_min, cached_max = cached.index.min(), cached.index.max()
-        if cached_min <= start and cached_max >= end:
-            return cached.loc[(cached.index >= start) & (cached.index <= end)]
-        need_fetch_start = min(start, cached_min)
-        need_fetch_end = max(end, cached_max)
+def _failed_recently(when: Optional[str], now: pd.Timestamp) -> bool:
+    return when is not None and (now - pd.Timestamp(when)).total_seconds() < FAILED_TTL_SECONDS
 
-    fetch_end_inclusive = need_fetch_end + pd.Timedelta(days=1)
+
+def _mark_failed(ticker: str, now: Optional[pd.Timestamp]) -> None:
+    """Record (now) or clear (None) a failed ticker."""
+    with _lock:
+        failed = _load_failed()
+        if now is None:
+            if failed.pop(ticker, None) is None:
+                return
+        else:
+            failed[ticker] = now.isoformat()
+        _save_failed(failed)
+
+
+# ---------------------------------------------------------------------------
+# Store version
+# ---------------------------------------------------------------------------
+
+def _load_version() -> dict:
     try:
-        downloaded = yf.download(
-            ticker,
-            start=need_fetch_start.strftime("%Y-%m-%d"),
-            end=fetch_end_inclusive.strftime("%Y-%m-%d"),
+        with open(CACHE_DIR / _VERSION_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _bump_version(ticker: str, rewritten: bool) -> None:
+    with _lock:
+        version = _load_version()
+        stamp = max(time.time_ns(), version.get("changed_at", 0) + 1)
+        version["changed_at"] = stamp
+        if rewritten:
+            version.setdefault("rewritten", {})[ticker] = stamp
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_DIR / (_VERSION_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(version, f, indent=1, sort_keys=True)
+        os.replace(tmp, CACHE_DIR / _VERSION_FILE)
+
+
+def _change(cached: Optional[pd.DataFrame], merged: pd.DataFrame) -> Optional[str]:
+    """How merged differs from the bars the file held before.
+
+    None: same bars. "append": only bars after the old last one were added
+    (the old last bar itself may change; it can be a live intraday bar).
+    "rewrite": anything else - a re-adjusted or refreshed history, or bars
+    inserted before the old end.
+    """
+    if cached is None or cached.empty:
+        return "append"
+    n = len(cached)
+    head = merged.iloc[:n]
+    if len(merged) < n or not head.index.equals(cached.index) or not set(cached.columns) <= set(merged.columns):
+        return "rewrite"
+    old = cached.to_numpy(dtype=float)
+    new = head[list(cached.columns)].to_numpy(dtype=float)
+    if not np.array_equal(old[:-1], new[:-1], equal_nan=True):
+        return "rewrite"
+    if len(merged) == n and np.array_equal(old[-1], new[-1], equal_nan=True):
+        return None
+    return "append"
+
+
+# ---------------------------------------------------------------------------
+# Fetching
+# ---------------------------------------------------------------------------
+
+def _download_many(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, Optional[pd.DataFrame]]:
+    """Unadjusted daily bars for start..end inclusive, one frame per ticker.
+
+    yf.download keeps per-call state in module globals (yfinance.shared), so
+    calls are serialized here; each call fetches its tickers concurrently on
+    yfinance's own worker threads. A ticker maps to an empty frame only when
+    Yahoo reported it has no data, and to None when its download failed for
+    any other reason (network, rate limit) or the outcome is unknown.
+    Raises on errors yf.download itself raises.
+    """
+    with _download_lock:
+        data = yf.download(
+            tickers,
+            start=start.strftime("%Y-%m-%d"),
+            end=(end + _DAY).strftime("%Y-%m-%d"),
             progress=False,
             auto_adjust=False,
-            threads=False,
+            group_by="ticker",
+            threads=min(THREADS, len(tickers)),
         )
-    except Exception as e:
-        logger.warning("yfinance download failed for %s: %s", ticker, e)
-        return cached if cached is not None else pd.DataFrame()
+        errors = dict(getattr(_yf_shared, "_ERRORS", None) or {})
+    frames = {}
+    empty = data is None or data.empty
+    multi = not empty and isinstance(data.columns, pd.MultiIndex)
+    for t in [] if empty else tickers:
+        if multi:
+            if t not in data.columns.get_level_values(0):
+                continue
+            df = data[t]
+        elif len(tickers) == 1:
+            df = data
+        else:
+            continue
+        df = df.dropna(how="all")  # rows that only exist for other tickers in the chunk
+        if df.empty:
+            continue
+        df = df.copy()
+        df.columns.name = None
+        df.index = pd.to_datetime(df.index).tz_localize(None).normalize()
+        frames[t] = df
+
+    out: Dict[str, Optional[pd.DataFrame]] = {}
+    for t in tickers:
+        if t in frames:
+            out[t] = frames[t]
+            continue
+        error = errors.get(t.upper(), "")
+        if _NO_PRICES in error or (_NO_TICKER in error and frames):
+            out[t] = pd.DataFrame()
+        else:
+            out[t] = None
+    return out
+
+
+def _download(ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> Optional[pd.DataFrame]:
+    """Unadjusted daily bars for one ticker; None if the download failed."""
+    return _download_many([ticker], start, end).get(ticker)
+
+
+def _missing(coverage: Optional[dict], start: pd.Timestamp, end: pd.Timestamp,
+             now: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Date ranges that must be fetched so coverage spans start..end.
+
+    Gaps are anchored on the covered range, so coverage stays contiguous.
+    """
+    if coverage is None:
+        return [(start, end)]
+    gaps = []
+    if start < coverage["start"]:
+        gaps.append((start, coverage["start"] - _DAY))
+    fresh = (now - coverage["fetched_at"]).total_seconds() < FRESH_SECONDS
+    covered_to = coverage["end"] if fresh else min(coverage["end"], coverage["fetched_at"].normalize() - _DAY)
+    if end > covered_to:
+        gaps.append((covered_to + _DAY, end))
+    return gaps
+
+
+def _readjusted(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """True if Yahoo's Adj Close/Close ratio moved on bars both frames hold."""
+    if "Adj Close" not in cached or "Adj Close" not in fresh:
+        return False
+    common = cached.index.intersection(fresh.index)
+    if not len(common):
+        return False
+    old = (cached.loc[common, "Adj Close"] / cached.loc[common, "Close"]).to_numpy(dtype=float)
+    new = (fresh.loc[common, "Adj Close"] / fresh.loc[common, "Close"]).to_numpy(dtype=float)
+    return not np.allclose(old, new, rtol=1e-4, equal_nan=True)
+
+
+def _adjust(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or "Adj Close" not in df:
+        return df
+    ratio = df["Adj Close"] / df["Close"]
+    out = df.drop(columns="Adj Close")
+    for col in _ADJUSTED_COLUMNS:
+        if col in out:
+            out[col] = out[col] * ratio
+    return out
+
+
+def _select(df: Optional[pd.DataFrame], start: pd.Timestamp, end: pd.Timestamp,
+            adjusted: bool) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame()
+    out = df.loc[(df.index >= start) & (df.index <= end)]
+    return _adjust(out) if adjusted else out
+
+
+@dataclass
+class _Plan:
+    """What one ticker needs from Yahoo to serve start..end."""
+    ticker: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    fetch_end: pd.Timestamp  # end capped at today
+    refresh: bool
+    skip: bool = False  # negative-cached
+    cached: Optional[pd.DataFrame] = None
+    coverage: Optional[dict] = None
+    gaps: List[Tuple[pd.Timestamp, pd.Timestamp]] = field(default_factory=list)
+    fetch: List[Tuple[pd.Timestamp, pd.Timestamp]] = field(default_factory=list)
 
-    if downloaded is None or downloaded.empty:
-        return cached if cached is not None else pd.DataFrame()
 
-    if isinstance(downloaded.columns, pd.MultiIndex):
-        downloaded.columns = downloaded.columns.get_level_values(0)
+def _plan(ticker: str, start: pd.Timestamp, end: pd.Timestamp, refresh: bool,
+          now: pd.Timestamp, failed: Dict[str, str]) -> _Plan:
+    plan = _Plan(ticker, start, end, min(end, now.normalize()), refresh)
+    if not refresh and _failed_recently(failed.get(ticker), now):
+        plan.skip = True
+        return plan
+    plan.cached, plan.coverage = _load(ticker)
+    if plan.fetch_end < start:
+        return plan  # entirely in the future
+    plan.gaps = [(start, plan.fetch_end)] if refresh else _missing(plan.coverage, start, plan.fetch_end, now)
+    cached = plan.cached
+    for lo, hi in plan.gaps:
+        if cached is not None and not cached.empty and not refresh:
+            # Overlap one cached bar so a re-adjusted history is noticed.
+            before = cached.index[cached.index < lo]
+            after = cached.index[cached.index > hi]
+            lo = before[-1] if len(before) else lo
+            hi = after[0] if len(after) else hi
+        plan.fetch.append((lo, hi))
+    return plan
 
-    downloaded.index = pd.to_datetime(downloaded.index).normalize()
 
-    if cached is not None and not cached.empty:
-        merged = pd.concat([cached, downloaded])
+def _apply(plan: _Plan, pieces: Optional[List[pd.DataFrame]], now: pd.Timestamp) -> Optional[pd.DataFrame]:
+    """Merge downloaded pieces into the ticker's file; returns all its bars.
+
+    pieces=None, or any None piece, means a download failed: the cache is
+    served unchanged and nothing is negative-cached.
+    """
+    ticker, cached, coverage, gaps = plan.ticker, plan.cached, plan.coverage, plan.gaps
+    have = cached is not None and not cached.empty
+    if pieces is None or any(p is None for p in pieces):
+        return cached
+    pieces = [p for p in pieces if not p.empty]
+    downloaded = pd.concat(pieces) if pieces else pd.DataFrame()
+
+    if downloaded.empty and not have:
+        if len(pd.bdate_range(plan.start, plan.fetch_end)) >= 3:
+            logger.info("[Price Cache] No data for %s; skipping it for %dh",
+                        ticker, FAILED_TTL_SECONDS // 3600)
+            _mark_failed(ticker, now)
+        return None
+
+    if have and not plan.refresh and _readjusted(cached, downloaded):
+        lo, hi = min(plan.start, coverage["start"]), max(plan.fetch_end, coverage["end"])
+        logger.info("[Price Cache] %s history was re-adjusted; re-downloading %s..%s",
+                    ticker, lo.date(), hi.date())
+        try:
+            downloaded = _download(ticker, lo, hi)
+        except Exception as e:
+            logger.warning("yfinance download failed for %s: %s", ticker, e)
+            return cached
+        if downloaded is None:
+            return cached
+        cached, coverage, have = None, None, False
+        gaps = [(lo, hi)]
+
+    if have:
+        if plan.refresh:
+            cached = cached.loc[(cached.index < plan.start) | (cached.index > plan.fetch_end)]
+        merged = pd.concat([cached, downloaded]) if not downloaded.empty else cached
         merged = merged[~merged.index.duplicated(keep="last")].sort_index()
     else:
         merged = downloaded
 
-    _write_cache(path, merged)
-    return merged.loc[(merged.index >= start) & (merged.index <= end)]
+    lo, hi = gaps[0][0], gaps[-1][1]
+    if coverage is None or lo > coverage["end"] + _DAY or hi < coverage["start"] - _DAY:
+        coverage = {"start": lo, "end": hi, "fetched_at": now}
+    else:
+        coverage = {
+            "start": min(coverage["start"], lo),
+            "end": max(coverage["end"], hi),
+            "fetched_at": now if hi >= coverage["end"] else coverage["fetched_at"],
+        }
+
+    if not merged.empty:
+        change = _change(plan.cached, merged)
+        _write_cache(_cache_path(ticker), merged, coverage)
+        if change is not None:
+            _bump_version(ticker, change == "rewrite")
+        if plan.refresh:
+            _mark_failed(ticker, None)
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def get_bars(
+    ticker: str,
+    start,
+    end,
+    refresh: bool = False,
+    adjusted: bool = False,
+) -> pd.DataFrame:
+    """
+    Return daily bars for ticker between start and end (inclusive).
+
+    Only the part of the range the store has not checked yet is downloaded.
+    refresh=True re-downloads the whole range and ignores the negative cache.
+    Returns an empty frame for unknown tickers.
+    """
+    ticker = ticker.upper()
+    now = pd.Timestamp.now()
+    start, end = _day(start), _day(end)
+    plan = _plan(ticker, start, end, refresh, now, _load_failed())
+    if plan.skip:
+        return pd.DataFrame()
+    bars = plan.cached
+    if plan.fetch:
+        try:
+            pieces = [_download(ticker, lo, hi) for lo, hi in plan.fetch]
+        except Exception as e:
+            logger.warning("yfinance download failed for %s: %s", ticker, e)
+            pieces = None
+        bars = _apply(plan, pieces, now)
+    return _select(bars, start, end, adjusted)
 
 
 def prefetch(
-    tickers: list,
-    start: pd.Timestamp,
-    end: pd.Timestamp,
+    tickers: Iterable,
+    start,
+    end,
+    refresh: bool = False,
+    adjusted: bool = False,
 ) -> dict:
-    """Bulk-fetch bars for many tickers; returns dict of ticker -> DataFrame."""
-    out = {}
-    for t in sorted({str(s).upper() for s in tickers if s}):
+    """Bulk-fetch bars for many tickers; returns dict of ticker -> DataFrame.
+
+    Tickers missing the same date range are downloaded together, CHUNK_SIZE
+    per request. A chunk that fails or comes back empty without a per-ticker
+    "no data" answer (throttling, network) leaves its tickers' caches and
+    negative-cache entries untouched, so the next call retries them. Cache reads and the per-ticker merges/writes run on a thread
+    pool, overlapping with the downloads still in flight.
+    """
+    names = sorted({str(s).upper() for s in tickers if s})
+    if not names:
+        return {}
+    now = pd.Timestamp.now()
+    start, end = _day(start), _day(end)
+    failed = _load_failed()
+    t0 = time.perf_counter()
+    requests = 0
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        plans = dict(zip(names, pool.map(lambda t: _plan(t, start, end, refresh, now, failed), names)))
+
+        groups: Dict[Tuple[pd.Timestamp, pd.Timestamp], List[str]] = {}
+        for t, plan in plans.items():
+            for rng in plan.fetch:
+                groups.setdefault(rng, []).append(t)
+        pieces: Dict[str, Optional[List[pd.DataFrame]]] = {t: [] for t, p in plans.items() if p.fetch}
+        pending = {t: len(plans[t].fetch) for t in pieces}
+        merges = {}
+
+        for (lo, hi), group in sorted(groups.items()):
+            for i in range(0, len(group), CHUNK_SIZE):
+                chunk = group[i:i + CHUNK_SIZE]
+                requests += 1
+                try:
+                    got = _download_many(chunk, lo, hi)
+                except Exception as e:
+                    logger.warning("yfinance download failed for %d tickers (%s..%s): %s",
+                                   len(chunk), lo.date(), hi.date(), e)
+                    got = None
+                for t in chunk:
+                    piece = None if got is None else got.get(t)
+                    if piece is None:
+                        pieces[t] = None
+                    elif pieces[t] is not None:
+                        pieces[t].append(piece)
+                    pending[t] -= 1
+                    if not pending[t]:
+                        merges[t] = pool.submit(_apply, plans[t], pieces[t], now)
+
+        out = {}
+        for t in names:
+            plan = plans[t]
+            bars = plan.cached
+            if plan.skip:
+                bars = None
+            elif t in merges:
+                try:
+                    bars = merges[t].result()
+                except Exception as e:
+                    logger.warning("prefetch failed for %s: %s", t, e)
+            out[t] = _select(bars, start, end, adjusted)
+
+    if requests:
+        logger.info("[Price Cache] %d tickers: %d fetched in %d requests, %d negative-cached (%.1fs)",
+                    len(names), len(merges), requests, sum(p.skip for p in plans.values()),
+                    time.perf_counter() - t0)
+    return out
+
+
+def _coverage(ticker: str) -> Optional[dict]:
+    """The ticker's coverage from the Parquet footer, without reading bars."""
+    path = _cache_path(ticker)
+    if path.exists():
         try:
-            out[t] = get_bars(t, start, end)
-        except Exception as e:
-            logger.warning("prefetch failed for %s: %s", t, e)
-            out[t] = pd.DataFrame()
+            import pyarrow.parquet as pq
+
+            meta = pq.read_schema(path).metadata or {}
+            stored = json.loads(meta[b"PANDAS_ATTRS"]).get("coverage")
+            if stored:
+                return {k: pd.Timestamp(v) for k, v in stored.items()}
+        except Exception:
+            pass
+    return _load(ticker)[1]
+
+
+def missing(tickers: Iterable, start, end) -> List[str]:
+    """Tickers that prefetch(tickers, start, end) would download.
+
+    Reads only file metadata, so it is cheap enough to call before deciding
+    whether anything built from the store is still current. Negative-cached
+    tickers are not missing.
+    """
+    now = pd.Timestamp.now()
+    start, end = _day(start), min(_day(end), now.normalize())
+    if end < start:
+        return []
+    failed = _load_failed()
+    out = []
+    for t in sorted({str(s).upper() for s in tickers if s}):
+        if _failed_recently(failed.get(t), now):
+            continue
+        if _missing(_coverage(t), start, end, now):
+            out.append(t)
+    return out
+
+
+def store_version() -> int:
+    """Changes whenever any ticker's file gains or changes bars (0 for an empty store)."""
+    return int(_load_version().get("changed_at", 0))
+
+
+def rewritten_at(tickers: Iterable) -> Dict[str, int]:
+    """Per ticker, when bars it already held were last replaced (0 = never)."""
+    rewritten = _load_version().get("rewritten", {})
+    return {str(t).upper(): int(rewritten.get(str(t).upper(), 0)) for t in tickers}
+
+
+def get_closes(
+    tickers: Iterable,
+    start,
+    end,
+    refresh: bool = False,
+    adjusted: bool = True,
+) -> Dict[str, pd.Series]:
+    """Daily closes for start..end as {ticker: Series}, keyed as passed in.
+
+    Adjusted by default, like yf.download(auto_adjust=True). Tickers with no
+    bars in the range are left out.
+    """
+    tickers = [str(t) for t in dict.fromkeys(tickers) if t]
+    frames = prefetch(tickers, start, end, refresh=refresh, adjusted=adjusted)
+    out = {}
+    for t in tickers:
+        df = frames.get(t.upper())
+        if df is None or df.empty or "Close" not in df:
+            continue
+        closes = df["Close"].dropna()
+        if len(closes):
+            out[t] = closes
     return out
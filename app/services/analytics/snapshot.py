@@ -0,0 +1,330 @@
+"""Incremental Arrow snapshot of decisions, tracking points and token usage.
+
+Analytics used to run `SELECT * FROM decision_points` and rebuild dtypes
+from scratch on every call. The snapshot keeps those tables as typed,
+uncompressed Arrow IPC files next to the DB (`<db>.snapshot/`, or
+ANALYTICS_SNAPSHOT_DIR). Readers memory-map the files and only materialize
+the columns they ask for.
+
+Each refresh appends one part file per table holding only the rows changed
+since that table's watermark:
+  - decision_points: rows whose change_seq (stamped by triggers, see
+    app.database._migrate_change_tracking) is above the watermark, plus
+    tombstones for deleted ids. Readers keep the newest version of each id.
+  - decision_tracking, agent_token_usage: append-only, watermark = max id.
+Once a table has more than MAX_PARTS parts it is compacted into one file.
+A manifest records the DB's db_uid; if the DB file is replaced, the
+snapshot is rebuilt from scratch.
+
+A refresh holds an exclusive lock on <snapshot>/refresh.lock (flock) from
+reading the manifest to writing it back and removing replaced parts, so
+concurrent refreshers (the web process and a script, or two threads) run
+one after the other instead of appending the same watermark range twice.
+Readers hold a shared lock on the same file while they load the manifest
+and map its parts, so a compaction can't remove a part between the two.
+
+pyarrow is required; callers such as load_cohort fall back to SQLite if it
+is missing or the DB predates change tracking.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.database import get_connection
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAX_PARTS = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_PARTS", "16"))
+
+# table -> watermark column
+TABLES = {
+    "decision_points": "change_seq",
+    "decision_tracking": "id",
+    "agent_token_usage": "id",
+}
+_DELETED = "__deleted"
+
+
+class SnapshotUnavailable(RuntimeError):
+    """The snapshot cannot be used for this DB (no pyarrow, or no change tracking)."""
+
+
+def _pa():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise SnapshotUnavailable("pyarrow is not installed") from e
+    return pa
+
+
+def _db_path() -> str:
+    return os.getenv("DB_PATH", "subscribers.db")
+
+
+def snapshot_dir(db_path: Optional[str] = None) -> Path:
+    override = os.getenv("ANALYTICS_SNAPSHOT_DIR")
+    if override:
+        return Path(override)
+    return Path(f"{db_path or _db_path()}.snapshot")
+
+
+# ---------------------------------------------------------------------------
+# Typing: declared SQLite column types -> Arrow types
+# ---------------------------------------------------------------------------
+
+def _arrow_type(pa, declared: str):
+    declared = (declared or "").upper()
+    if "INT" in declared or "BOOL" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB", "NUM")):
+        return pa.float64()
+    if "TIMESTAMP" in declared or "DATETIME" in declared:
+        return pa.timestamp("ns")
+    return pa.string()
+
+
+def _to_arrow(pa, df: pd.DataFrame, declared: Dict[str, str]):
+    """Convert a read_sql frame to Arrow using the declared column types.
+
+    SQLite is dynamically typed, so values are coerced: unparseable numbers
+    and timestamps become null, and an INTEGER column holding fractions is
+    widened to float64.
+    """
+    arrays, fields = [], []
+    for col in df.columns:
+        series = df[col]
+        typ = pa.bool_() if col == _DELETED else _arrow_type(pa, declared.get(col, ""))
+        if pa.types.is_integer(typ) or pa.types.is_floating(typ):
+            series = pd.to_numeric(series, errors="coerce")
+            if pa.types.is_integer(typ) and not (series.dropna() % 1 == 0).all():
+                typ = pa.float64()
+        elif pa.types.is_timestamp(typ):
+            series = pd.to_datetime(series, format="mixed", errors="coerce", utc=True).dt.tz_localize(None)
+        elif pa.types.is_string(typ):
+            series = series.map(lambda v: None if v is None or v != v else str(v))
+        arrays.append(pa.array(series, type=typ, from_pandas=True))
+        fields.append(pa.field(col, typ))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+# ---------------------------------------------------------------------------
+# Manifest + part files
+# ---------------------------------------------------------------------------
+
+def _load_manifest(root: Path) -> dict:
+    try:
+        with open(root / "manifest.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / "manifest.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, root / "manifest.json")
+
+
+_LOCAL_LOCK = threading.Lock()
+
+
+@contextmanager
+def _refresh_lock(root: Path, shared: bool = False):
+    """Lock on the snapshot directory, across processes and threads.
+
+    Refreshes take it exclusively; readers take it shared. Without fcntl
+    every holder is exclusive.
+    """
+    if fcntl is None:
+        with _LOCAL_LOCK:
+            yield
+        return
+    with open(root / "refresh.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_part(pa, root: Path, table: str, data) -> str:
+    name = f"{table}-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.arrow"
+    tmp = root / (name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, data.schema) as writer:
+            writer.write_table(data)
+    os.replace(tmp, root / name)
+    return name
+
+
+def _read_parts(pa, root: Path, parts: List[str], columns: Optional[List[str]] = None):
+    tables = []
+    for name in parts:
+        source = pa.memory_map(str(root / name), "r")
+        data = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            data = data.select([c for c in columns if c in data.column_names])
+        tables.append(data)
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def _latest_rows(pa, data):
+    """Collapse decision_points parts to the newest version of each id."""
+    import pyarrow.compute as pc
+
+    ids = data.column("id").to_numpy(zero_copy_only=False)
+    seqs = data.column("change_seq").to_numpy(zero_copy_only=False)
+    order = pd.DataFrame({"id": ids, "seq": seqs}).reset_index()
+    keep = order.sort_values(["id", "seq", "index"]).drop_duplicates("id", keep="last")["index"]
+    data = data.take(pa.array(keep.sort_values().to_numpy()))
+    if _DELETED in data.column_names:
+        data = data.filter(pc.invert(pc.fill_null(data.column(_DELETED), False)))
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def refresh(db_path: Optional[str] = None) -> Dict[str, int]:
+    """Append rows changed since each table's watermark. Returns rows written per table.
+
+    Raises SnapshotUnavailable when pyarrow is missing or the DB has no
+    change tracking (it was never migrated by app.database.init_db).
+    """
+    pa = _pa()
+    db_path = db_path or _db_path()
+    conn = get_connection(db_path)
+    try:
+        db_uid, seq = conn.execute("SELECT db_uid, seq FROM change_counter WHERE id = 1").fetchone()
+    except Exception as e:
+        raise SnapshotUnavailable(f"{db_path} has no change tracking: {e}") from e
+
+    root = snapshot_dir(db_path)
+    root.mkdir(parents=True, exist_ok=True)
+    with _refresh_lock(root):
+        # Re-read under the lock: a refresh we waited on may have moved the
+        # watermarks past the counter value seen above.
+        db_uid, seq = conn.execute("SELECT db_uid, seq FROM change_counter WHERE id = 1").fetchone()
+        manifest = _load_manifest(root)
+        stale: List[str] = []
+        if manifest.get("db_uid") != db_uid:
+            for state in manifest.get("tables", {}).values():
+                stale += state.get("parts", [])
+            manifest = {"db_uid": db_uid, "tables": {}}
+
+        start = time.perf_counter()
+        written: Dict[str, int] = {}
+        for table, key in TABLES.items():
+            state = manifest["tables"].setdefault(table, {"watermark": 0, "rows": 0, "parts": []})
+            declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not declared:
+                continue
+
+            if key == "change_seq" and state["watermark"] > seq:
+                # Counter went backwards (DB restored from an older copy).
+                stale += state["parts"]
+                state.update(watermark=0, rows=0, parts=[])
+            elif key == "id":
+                # Append-only tables: a delete below the watermark forces a rebuild.
+                below = conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE id <= ?", (state["watermark"],)
+                ).fetchone()[0]
+                if below != state["rows"]:
+                    stale += state["parts"]
+                    state.update(watermark=0, rows=0, parts=[])
+
+            df = pd.read_sql_query(
+                f"SELECT * FROM {table} WHERE {key} > ? ORDER BY {key}",
+                conn, params=(state["watermark"],),
+            )
+            if table == "decision_points":
+                deleted = pd.read_sql_query(
+                    "SELECT id, change_seq FROM decision_point_deletes WHERE change_seq > ?",
+                    conn, params=(state["watermark"],),
+                )
+                if not df.empty or not deleted.empty:
+                    df[_DELETED] = False
+                    deleted[_DELETED] = True
+                    df = pd.concat([df, deleted], ignore_index=True) if not deleted.empty else df
+            if df.empty:
+                written[table] = 0
+                continue
+
+            data = _to_arrow(pa, df, declared)
+            state["parts"].append(_write_part(pa, root, table, data))
+            state["watermark"] = int(df[key].max())
+            state["rows"] += len(df)
+            written[table] = len(df)
+
+            if len(state["parts"]) > MAX_PARTS:
+                merged = _read_parts(pa, root, state["parts"])
+                if table == "decision_points":
+                    merged = _latest_rows(pa, merged)
+                stale += state["parts"]
+                state["parts"] = [_write_part(pa, root, table, merged)]
+                if key == "id":
+                    state["rows"] = merged.num_rows
+
+        _save_manifest(root, manifest)
+        for name in stale:
+            try:
+                os.remove(root / name)
+            except OSError:
+                pass
+        if any(written.values()):
+            logger.info("[Snapshot] Appended %s in %.1f ms", written, (time.perf_counter() - start) * 1000)
+        return written
+
+
+def read_table(table: str, columns: Optional[List[str]] = None,
+               db_path: Optional[str] = None, refresh_first: bool = True) -> pd.DataFrame:
+    """Read one snapshot table as a DataFrame, materializing only `columns`.
+
+    Refreshes from SQLite first unless refresh_first=False.
+    """
+    if table not in TABLES:
+        raise ValueError(f"{table} is not in the analytics snapshot")
+    pa = _pa()
+    if refresh_first:
+        refresh(db_path)
+    root = snapshot_dir(db_path)
+    wanted = None
+    if columns is not None:
+        wanted = list(dict.fromkeys(columns))
+        if table == "decision_points":
+            wanted += [c for c in ("id", "change_seq", _DELETED) if c not in wanted]
+    data = None
+    if root.is_dir():
+        # Mapped parts stay readable once open, even if a later compaction
+        # removes the files; the lock only has to cover manifest -> open.
+        with _refresh_lock(root, shared=True):
+            parts = _load_manifest(root).get("tables", {}).get(table, {}).get("parts", [])
+            data = _read_parts(pa, root, parts, wanted)
+    if data is None:
+        return pd.DataFrame(columns=columns or [])
+    if table == "decision_points":
+        data = _latest_rows(pa, data)
+    df = data.to_pandas()
+    if columns is not None:
+        return df[[c for c in columns if c in df.columns]]
+    return df.drop(columns=[_DELETED], errors="ignore")
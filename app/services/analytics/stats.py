@@ -19,6 +19,7 @@ from app.services.analytics.intervals import (
     spearman_ci,
     wilson_ci,
 )
+from app.services.analytics.resampling import bootstrap, permutation_test
 
 
 def _bh_adjust(pvalues: List[float]) -> List[float]:
@@ -59,6 +60,8 @@ def pairwise_welch(
     group_col: str,
     value_col: str,
     min_n: int = 5,
+    n_permutations: int = 0,
+    seed: int = 42,
 ) -> pd.DataFrame:
     """All-pairs comparison of `value_col` distributions across `group_col`.
 
@@ -67,12 +70,19 @@ def pairwise_welch(
     Cohen's d effect size and BH-adjusted p-values across the family of
     comparisons.
 
+    With `n_permutations` > 0 each pair also gets a permutation test of
+    the difference in means (`perm_p`, BH-adjusted as `perm_p_fdr`), which
+    assumes nothing about the shape of skewed returns. It is reported
+    alongside, not folded into `significant`.
+
     Groups smaller than `min_n` are dropped; result is empty if fewer than
     two groups remain.
     """
     cols = ["group_a", "group_b", "n_a", "n_b", "mean_a", "mean_b",
             "diff", "cohen_d", "welch_p", "mwu_p", "welch_p_fdr", "mwu_p_fdr",
             "significant"]
+    if n_permutations > 0:
+        cols += ["perm_p", "perm_p_fdr"]
     if df.empty or group_col not in df.columns or value_col not in df.columns:
         return pd.DataFrame(columns=cols)
 
@@ -97,6 +107,11 @@ def pairwise_welch(
             mwu_p = float(u.pvalue)
         except Exception:
             mwu_p = float("nan")
+        if n_permutations > 0:
+            perm = permutation_test(xa, xb, "mean", n_resamples=n_permutations, seed=seed)
+            perm_p = {"perm_p": perm["p_value"]}
+        else:
+            perm_p = {}
         rows.append({
             "group_a": a,
             "group_b": b,
@@ -108,14 +123,57 @@ def pairwise_welch(
             "cohen_d": _cohens_d(xa, xb),
             "welch_p": welch_p,
             "mwu_p": mwu_p,
+            **perm_p,
         })
     out = pd.DataFrame(rows)
     out["welch_p_fdr"] = _bh_adjust(out["welch_p"].fillna(1.0).tolist())
     out["mwu_p_fdr"] = _bh_adjust(out["mwu_p"].fillna(1.0).tolist())
+    if n_permutations > 0:
+        out["perm_p_fdr"] = _bh_adjust(out["perm_p"].fillna(1.0).tolist())
     out["significant"] = (out["welch_p_fdr"] < 0.05) | (out["mwu_p_fdr"] < 0.05)
     return out[cols]
 
 
+def bootstrap_by_group(
+    df: pd.DataFrame,
+    group_col: str,
+    value_col: str,
+    min_n: int = 3,
+    n_resamples: int = 2000,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Per-group percentile-bootstrap 95% CIs of mean, median and win rate.
+
+    Complements the t / Wilson intervals in aggregations.winrate_by, which
+    lean on normality the small, skewed groups rarely have. Groups smaller
+    than `min_n` are dropped; sorted by n descending.
+    """
+    cols = ["group", "n",
+            "mean", "mean_ci_low", "mean_ci_high",
+            "median", "median_ci_low", "median_ci_high",
+            "win_rate", "win_rate_ci_low", "win_rate_ci_high"]
+    if df.empty or group_col not in df.columns or value_col not in df.columns:
+        return pd.DataFrame(columns=cols)
+
+    rows = []
+    sub = df.dropna(subset=[group_col, value_col])
+    for grp, frame in sub.groupby(group_col, dropna=False):
+        values = frame[value_col].astype(float).values
+        if len(values) < min_n:
+            continue
+        row: Dict[str, Any] = {"group": str(grp), "n": int(len(values))}
+        for name in ("mean", "median", "win_rate"):
+            ci = bootstrap(values, name, n_resamples=n_resamples, seed=seed)
+            row[name] = ci["estimate"]
+            row[f"{name}_ci_low"] = ci["ci_low"]
+            row[f"{name}_ci_high"] = ci["ci_high"]
+        rows.append(row)
+    if not rows:
+        return pd.DataFrame(columns=cols)
+    out = pd.DataFrame(rows, columns=cols)
+    return out.sort_values("n", ascending=False).reset_index(drop=True)
+
+
 def correlation(
     df: pd.DataFrame,
     x_col: str,
@@ -171,9 +171,6 @@ class DeepResearchService:
         self.current_task_name = None 
         self.cooldown_seconds = 60
         
-        # Change-detection for file sync (avoid redundant re-syncs)
-        self._last_synced_files = set()
-
         # Dedup: track (symbol, date) tuples currently queued or executing.
         # Cleared in _handle_completion / _process_individual_task finally.
         # Backfill sweeps and the live pipeline both consult this set.
@@ -267,54 +264,77 @@ class DeepResearchService:
         """
         Scans data/comparisons for result files and updates DB status/winner.
         Also marks stuck 'STARTED' batches > 24h old as FAILED/SKIPPED if no file found.
+
+        Only files that are new or whose (mtime, size) changed since the last
+        sync are parsed; the index lives in the batch_file_index table so it
+        survives restarts. Their winners are applied in a single transaction.
         """
         try:
-            import glob
-            from app.database import update_batch_status, mark_batch_winner
-            
+            from app.database import get_batch_file_index, apply_batch_file_sync, transaction
+
+            started = time.perf_counter()
             output_dir = "data/comparisons"
-            json_files = glob.glob(os.path.join(output_dir, "batch_comparison_*.json"))
-            
-            # Change-detection: skip if file set hasn't changed since last sync
-            current_files = set(os.path.basename(f) for f in json_files)
-            if current_files == self._last_synced_files:
-                logger.debug("[Deep Research Sync] No changes detected, skipping.")
+            current = {}
+            if os.path.isdir(output_dir):
+                with os.scandir(output_dir) as it:
+                    for entry in it:
+                        name = entry.name
+                        if name.startswith("batch_comparison_") and name.endswith(".json") and entry.is_file():
+                            st = entry.stat()
+                            current[name] = (st.st_mtime, st.st_size)
+
+            index = get_batch_file_index()
+            changed = [name for name, sig in current.items() if index.get(name) != tuple(sig)]
+            removed = [name for name in index if name not in current]
+
+            # Change-detection: skip if no file is new or modified since last sync
+            if not changed and not removed:
+                logger.debug(
+                    "[Deep Research Sync] No changes detected across %d files (%.1f ms), skipping.",
+                    len(current), (time.perf_counter() - started) * 1000,
+                )
                 return
-            self._last_synced_files = current_files
-            
-            synced_winners = []
-            
-            for filepath in json_files:
+
+            entries = []
+            for filename in sorted(changed):
+                filepath = os.path.join(output_dir, filename)
+                mtime, size = current[filename]
+                winner = None
                 try:
-                    filename = os.path.basename(filepath)
-                    
                     with open(filepath, 'r') as f:
-                         data = json.load(f)
-                         
+                        data = json.load(f)
                     winner = data.get('winner_symbol')
-                    parts = filename.replace("batch_comparison_", "").split("_")
-                    date_str = parts[0] # YYYY-MM-DD
-                    
-                    if winner:
-                        mark_batch_winner(winner, date_str)
-                        synced_winners.append(winner)
-                        
                 except Exception as e:
+                    # Still indexed: a malformed file is not re-parsed until it changes.
                     logger.error(f"[Deep Research Sync] Error processing file {filepath}: {e}")
-            
-            if synced_winners:
-                logger.info(f"[Deep Research Sync] Synced {len(synced_winners)} winners from batch files.")
-                    
+
+                parts = filename.replace("batch_comparison_", "").split("_")
+                entries.append({
+                    "filename": filename,
+                    "mtime": mtime,
+                    "size": size,
+                    "winner_symbol": winner,
+                    "batch_date": parts[0],  # YYYY-MM-DD
+                })
+
+            parsed_ms = (time.perf_counter() - started) * 1000
+            flagged = apply_batch_file_sync(entries, removed)
+            synced_winners = [e["winner_symbol"] for e in entries if e["winner_symbol"]]
+
+            logger.info(
+                "[Deep Research Sync] Synced %d winners from %d new/changed of %d batch files "
+                "(%d rows flagged, %d removed) in %.1f ms (parse %.1f ms).",
+                len(synced_winners), len(entries), len(current), flagged, len(removed),
+                (time.perf_counter() - started) * 1000, parsed_ms,
+            )
+
             # Cleanup Stuck Batches (Before Dec 22)
             # Query DB for STARTED batches before Dec 22
-            conn = sqlite3.connect(os.getenv("DB_PATH", "subscribers.db"))
-            cursor = conn.cursor()
-            cursor.execute("UPDATE batch_comparisons SET status = 'SKIPPED' WHERE status = 'STARTED' AND date < '2025-12-22'")
+            with transaction(os.getenv("DB_PATH", "subscribers.db")) as conn:
+                cursor = conn.execute("UPDATE batch_comparisons SET status = 'SKIPPED' WHERE status = 'STARTED' AND date < '2025-12-22'")
             if cursor.rowcount > 0:
                  logger.info(f"[Deep Research Sync] Cleaned up {cursor.rowcount} old stuck batches.")
-            conn.commit()
-            conn.close()
-            
+
         except Exception as e:
             logger.error(f"[Deep Research Sync] Error in sync loop: {e}")
 
@@ -330,7 +350,7 @@ class DeepResearchService:
             # 0. Recover Pending/Stuck Batches first
             self._recover_pending_batches()
             
-            from app.database import get_distinct_dates_with_unbatched_candidates, get_unbatched_candidates_by_date, log_batch_run
+            from app.database import get_distinct_dates_with_unbatched_candidates, get_unbatched_candidates_by_date, log_batch_run, transaction
             
             dates = get_distinct_dates_with_unbatched_candidates()
             for date_str in dates:
@@ -351,15 +371,12 @@ class DeepResearchService:
                     if batch_id:
                         # Link candidates to this batch_id
                         try:
-                            conn = sqlite3.connect(os.getenv("DB_PATH", "subscribers.db"))
-                            cursor = conn.cursor()
                             candidate_ids = [c['id'] for c in chunk]
                             ids_placeholders = ','.join(['?'] * len(candidate_ids))
-                            
+
                             query = f"UPDATE decision_points SET batch_id = ? WHERE id IN ({ids_placeholders})"
-                            cursor.execute(query, (batch_id, *candidate_ids))
-                            conn.commit()
-                            conn.close()
+                            with transaction(os.getenv("DB_PATH", "subscribers.db")) as conn:
+                                conn.execute(query, (batch_id, *candidate_ids))
                             
                             # Queue the task
                             self.queue_batch_comparison_task(chunk, batch_id)
@@ -376,10 +393,12 @@ class DeepResearchService:
         Finds batches that are 'PENDING' or 'STARTED' (but timed out/zombie) and re-queues them.
         """
         try:
-            conn = sqlite3.connect(os.getenv("DB_PATH", "subscribers.db"))
-            conn.row_factory = sqlite3.Row
+            from app.database import get_connection, transaction
+            db_path = os.getenv("DB_PATH", "subscribers.db")
+            conn = get_connection(db_path)
             cursor = conn.cursor()
-            
+            cursor.row_factory = sqlite3.Row
+
             # Find PENDING batches
             # AND STARTED batches that are > 30 mins old (Zombie check)
             # We use a combined query or separate. Let's start with PENDING.
@@ -407,6 +426,7 @@ class DeepResearchService:
                     # can apply the HARD RULE against AVOID/OVERRIDDEN verdicts.
                     candidates = []
                     cur2 = conn.cursor()
+                    cur2.row_factory = sqlite3.Row
                     for s in symbols:
                         cur2.execute(
                             """
@@ -437,14 +457,12 @@ class DeepResearchService:
                     self.queue_batch_comparison_task(candidates, batch_id)
                     
                     # Update DB to STARTED so we don't pick it up again immediately
-                    cursor.execute("UPDATE batch_comparisons SET status = 'STARTED', timestamp = CURRENT_TIMESTAMP WHERE id = ?", (batch_id,))
-                    conn.commit()
-                    
+                    with transaction(db_path) as tx:
+                        tx.execute("UPDATE batch_comparisons SET status = 'STARTED', timestamp = CURRENT_TIMESTAMP WHERE id = ?", (batch_id,))
+
                 except Exception as e:
                     logger.error(f"[Deep Research Recovery] Error recovering Batch {batch_id}: {e}")
 
-            conn.close()
-            
         except Exception as e:
             logger.error(f"[Deep Research Recovery] Error in recovery: {e}")
         
@@ -1013,12 +1031,9 @@ class DeepResearchService:
             values.append(decision_id)
             sql = f"UPDATE decision_points SET {', '.join(set_clauses)} WHERE id = ?"
 
-            db_path = os.getenv("DB_PATH", "subscribers.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute(sql, values)
-            conn.commit()
-            conn.close()
+            from app.database import transaction
+            with transaction(os.getenv("DB_PATH", "subscribers.db")) as conn:
+                conn.execute(sql, values)
 
             logger.info(f"[Deep Research] Overrode main trading levels for {symbol} (ID: {decision_id}): entry={entry_low}-{entry_high}")
             # Verdict emoji based on action
@@ -1176,107 +1191,16 @@ class DeepResearchService:
 
             # Also save as PDF
             filename_base = filename.replace(".json", "") # Strip extension
-            self._save_result_to_pdf(symbol, result, filename_base)
+            self._save_result_to_pdf(symbol, result, filename_base, date_str)
 
         except Exception as e:
             logger.error(f"[Deep Research] Error saving to file: {e}")
 
-    def _save_result_to_pdf(self, symbol, result, filename_base):
-        try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib import colors
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            
-            output_dir = "data/deep_research_reports"
-            filepath = os.path.join(output_dir, f"{filename_base}.pdf")
-            
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            
-            # Custom Style
-            title_style = styles['Title']
-            heading_style = styles['Heading2']
-            normal_style = styles['BodyText']
-            
-            story = []
-            
-            # Title
-            story.append(Paragraph(f"Deep Research Report: {symbol}", title_style))
-            story.append(Spacer(1, 12))
-            story.append(Paragraph(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}", normal_style))
-            story.append(Spacer(1, 12))
-            
-            # Verdict & Risk
-            verdict = result.get('verdict', 'UNKNOWN')
-            risk = result.get('risk_level', 'Unknown')
-            
-            # Color code verdict
-            v_color = "black"
-            if "BUY" in verdict: v_color = "green"
-            elif "AVOID" in verdict or "SELL" in verdict: v_color = "red"
-            
-            story.append(Paragraph(f"<b>VERDICT:</b> <font color='{v_color}'>{verdict}</font>", styles['Heading3']))
-            story.append(Paragraph(f"<b>RISK LEVEL:</b> {risk}", styles['Heading3']))
-            story.append(Spacer(1, 12))
-            
-            # Catalyst & Reasoning
-            story.append(Paragraph("Catalyst & Market Context", heading_style))
-            story.append(Paragraph(f"<b>Catalyst Type:</b> {result.get('catalyst_type', 'N/A')}", normal_style))
-            story.append(Spacer(1, 6))
-            story.append(Paragraph(f"<b>Global Context:</b> {result.get('global_market_analysis', 'N/A')}", normal_style))
-            story.append(Spacer(1, 6))
-            story.append(Paragraph(f"<b>Local/Sector Context:</b> {result.get('local_market_analysis', 'N/A')}", normal_style))
-            story.append(Spacer(1, 12))
-            
-            # Key Reasoning
-            story.append(Paragraph("Key Reasoning", heading_style))
-            for point in result.get('reasoning_bullet_points', []):
-                 story.append(Paragraph(f"• {point}", normal_style))
-                 story.append(Spacer(1, 4))
-            story.append(Spacer(1, 12))
-
-            # SWOT Analysis
-            swot = result.get('swot_analysis', {})
-            story.append(Paragraph("SWOT Analysis", heading_style))
-            
-            data = [
-                [Paragraph("<b>Strengths</b>", normal_style), Paragraph("<b>Weaknesses</b>", normal_style)],
-                [
-                    Paragraph("<br/>".join([f"- {s}" for s in swot.get('strengths', [])]), normal_style),
-                    Paragraph("<br/>".join([f"- {w}" for w in swot.get('weaknesses', [])]), normal_style)
-                ],
-                [Paragraph("<b>Opportunities</b>", normal_style), Paragraph("<b>Threats</b>", normal_style)],
-                [
-                    Paragraph("<br/>".join([f"- {o}" for o in swot.get('opportunities', [])]), normal_style),
-                    Paragraph("<br/>".join([f"- {t}" for t in swot.get('threats', [])]), normal_style)
-                ]
-            ]
-            
-            table = Table(data, colWidths=[230, 230])
-            table.setStyle(TableStyle([
-                ('GRID', (0,0), (-1,-1), 1, colors.grey),
-                ('BACKGROUND', (0,0), (1,0), colors.lightgrey),
-                ('BACKGROUND', (0,2), (1,2), colors.lightgrey),
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('PADDING', (0,0), (-1,-1), 6),
-            ]))
-            story.append(table)
-            story.append(Spacer(1, 12))
-            
-            # Build
-            doc.build(story)
-            logger.info(f"[Deep Research] Saved PDF to {filepath}")
-            
-        except ModuleNotFoundError as e:
-            logger.error(
-                "[deep-research] Individual PDF generation failed — missing dependency: %s. "
-                "Run `pip install -r requirements.txt` on the deploy target.", e
-            )
-            return None
-        except Exception as e:
-            logger.error("[deep-research] Individual PDF generation failed: %s", e, exc_info=True)
-            return None
+    def _save_result_to_pdf(self, symbol, result, filename_base, report_date=None):
+        """Queue the PDF render on the process pool; never blocks the DR worker."""
+        from app.services.pdf_render_service import pdf_render_service
+        filepath = os.path.join("data/deep_research_reports", f"{filename_base}.pdf")
+        return pdf_render_service.submit("deep_research", filepath, symbol, result, report_date)
 
     @staticmethod
     def _provider() -> str:
@@ -2580,55 +2504,13 @@ A JSON object:
 
 
     def _save_batch_pdf(self, symbols, result_text, filepath):
-        try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib import colors
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            
-            story = []
-            story.append(Paragraph(f"Batch Comparison: {', '.join(symbols)}", styles['Title']))
-            story.append(Spacer(1, 12))
+        """Queue the batch PDF render on the process pool; never blocks the DR worker.
 
-            try:
-                data = json.loads(result_text)
-                
-                winner = data.get('winner_symbol', 'UNKNOWN')
-                ranking = data.get('ranking', [])
-                rationale = data.get('rationale', 'No rationale provided.')
-                timeline = data.get('projected_timeline', 'N/A')
-                
-                story.append(Paragraph(f"<b>WINNER:</b> <font color='green'>{winner}</font>", styles['Heading2']))
-                story.append(Spacer(1, 12))
-                
-                story.append(Paragraph(f"<b>Ranking:</b> {', '.join(ranking)}", styles['BodyText']))
-                story.append(Spacer(1, 12))
-                
-                story.append(Paragraph("<b>Rationale:</b>", styles['Heading3']))
-                story.append(Paragraph(rationale, styles['BodyText']))
-                story.append(Spacer(1, 12))
-                
-                story.append(Paragraph(f"<b>Projected Timeline:</b> {timeline}", styles['BodyText']))
-                
-            except json.JSONDecodeError:
-                story.append(Paragraph("Raw Result (Parse Error):", styles['Heading2']))
-                story.append(Paragraph(result_text, styles['BodyText']))
-                
-            doc.build(story)
-            logger.info(f"[Deep Research] Saved Batch PDF to {filepath}")
-            
-        except ModuleNotFoundError as e:
-            logger.error(
-                "[deep-research] Batch PDF generation failed — missing dependency: %s. "
-                "Run `pip install -r requirements.txt` on the deploy target.", e
-            )
-            return None
-        except Exception as e:
-            logger.error("[deep-research] Batch PDF generation failed: %s", e, exc_info=True)
-            return None
+        Symbols are sorted to match the filename (and the on-demand API
+        route), so both paths hit the same content-hash cache entry.
+        """
+        from app.services.pdf_render_service import pdf_render_service
+        return pdf_render_service.submit("batch", filepath, sorted(symbols), result_text)
 
     def _summarize_report_context(self, report_json_str: str) -> str:
         """
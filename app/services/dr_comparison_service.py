@@ -211,17 +211,15 @@ class DRComparisonService:
     @staticmethod
     def _gemini_verdict_present(decision_id: int) -> bool:
         """True iff decision_points has a non-empty deep_research_review_verdict."""
-        from app.database import DB_NAME
+        from app.database import get_connection
         try:
-            conn = sqlite3.connect(DB_NAME)
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
+            cur.row_factory = sqlite3.Row
             cur.execute(
                 "SELECT deep_research_review_verdict FROM decision_points WHERE id = ?",
                 (decision_id,),
             )
             row = cur.fetchone()
-            conn.close()
             return bool(row is not None and row["deep_research_review_verdict"])
         except Exception as e:
             logger.warning(
@@ -243,13 +241,12 @@ class DRComparisonService:
         Returns {"finalized", "timed_out", "pending"} counts. Safe to call
         repeatedly; never raises (errors are logged and counted as pending).
         """
-        from app.database import DB_NAME, finalize_dr_comparison, set_dr_comparison_status
+        from app.database import finalize_dr_comparison, get_connection, set_dr_comparison_status
 
         stats = {"finalized": 0, "timed_out": 0, "pending": 0}
         try:
-            conn = sqlite3.connect(DB_NAME)
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+            cur = get_connection().cursor()
+            cur.row_factory = sqlite3.Row
             cur.execute(
                 """
                 SELECT c.id AS comparison_id,
@@ -262,7 +259,6 @@ class DRComparisonService:
                 (f"-{int(max_age_s)} seconds",),
             )
             rows = [dict(r) for r in cur.fetchall()]
-            conn.close()
         except Exception as e:
             logger.error("[Dual-Run] reconcile query failed: %s", e)
             return stats
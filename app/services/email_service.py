@@ -3,11 +3,12 @@ import os
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
-from fpdf import FPDF
 from datetime import datetime
 from app.database import get_all_subscribers
 from app.utils.ticker_paths import safe_ticker_path
 
+REPORTS_DIR = "data/reports"
+
 class EmailService:
     def __init__(self):
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -22,22 +23,26 @@ class EmailService:
         # If you intended to keep the subscriber logic, this section would need to be merged carefully.
         # For now, following the provided snippet's logic.
         
-        # Always generate PDF report first
-        try:
-            pdf_path = self._generate_pdf_report(symbol, report_data)
-            print(f"Generated PDF report: {pdf_path}")
-        except Exception as e:
-            print(f"Error generating PDF: {e}")
-            pdf_path = None
-
+        # The PDF report is always produced, but off-thread: when no email
+        # goes out we just queue it; when one does, we wait for it (usually
+        # a content-hash cache hit) so it can be attached.
         if not self.enabled:
+            self._generate_pdf_report(symbol, report_data, wait=False)
             print(f"Email notifications disabled. Skipping alert for {symbol}.")
             return
 
         if not self.sender_email or not self.sender_password or not self.recipient_email:
+            self._generate_pdf_report(symbol, report_data, wait=False)
             print(f"Mock Email Sent: Alert! {symbol} has dropped {percentage:.2f}% to ${price:.2f}")
             return
 
+        try:
+            pdf_path = self._generate_pdf_report(symbol, report_data)
+            print(f"Generated PDF report: {pdf_path}")
+        except Exception as e:
+            print(f"Error generating PDF: {e}")
+            pdf_path = None
+
         subject = f"Stock Alert: {symbol} dropped {percentage:.2f}%"
         
         # Format Market Context
@@ -153,76 +158,21 @@ class EmailService:
         except Exception as e:
             print(f"Failed to send daily summary: {e}")
 
-    def _generate_pdf_report(self, symbol: str, report_data: dict) -> str:
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Title
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, f"Deep Dive Research Report: {symbol}", 0, 1, 'C')
-        pdf.ln(10)
-        
-        # Recommendation
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, f"Recommendation: {report_data.get('recommendation', 'N/A')}", 0, 1)
-        pdf.ln(5)
-        
-        # Detailed Report
-        pdf.set_font("Arial", '', 11)
-        detailed_text = report_data.get("detailed_report", "No details provided.")
-        
-        # FPDF multi_cell handles text wrapping
-        # Encode to latin-1 to avoid unicode errors in standard FPDF, or replace chars
-        # For simplicity, we'll just replace common issues
-        safe_text = detailed_text.encode('latin-1', 'replace').decode('latin-1')
-        pdf.multi_cell(0, 10, safe_text)
-        
-        # --- Append Intermediate Reports ---
-        
-        # Technician's Report
-        if "technician_report" in report_data:
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', 14)
-            pdf.set_text_color(0, 0, 150) # Dark Blue
-            pdf.cell(0, 10, "Technician's Report (Momentum & Levels)", 0, 1)
-            pdf.set_text_color(0, 0, 0) # Reset
-            pdf.ln(5)
-            pdf.set_font("Arial", '', 10)
-            text = report_data["technician_report"].encode('latin-1', 'replace').decode('latin-1')
-            pdf.multi_cell(0, 6, text)
-
-        # Macro Context
-        if "macro_report" in report_data:
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', 14)
-            pdf.set_text_color(100, 100, 0) # Dark Yellow/Gold
-            pdf.cell(0, 10, "Macro Context (Sector & Factors)", 0, 1)
-            pdf.set_text_color(0, 0, 0) # Reset
-            pdf.ln(5)
-            pdf.set_font("Arial", '', 10)
-            text = report_data["macro_report"].encode('latin-1', 'replace').decode('latin-1')
-            pdf.multi_cell(0, 6, text)
-
-        # Bear's Pre-Mortem
-        if "bear_report" in report_data:
-            pdf.add_page()
-            pdf.set_font("Arial", 'B', 14)
-            pdf.set_text_color(150, 0, 0) # Dark Red
-            pdf.cell(0, 10, "The Bear's Pre-Mortem (Downside Risks)", 0, 1)
-            pdf.set_text_color(0, 0, 0) # Reset
-            pdf.ln(5)
-            pdf.set_font("Arial", '', 10)
-            text = report_data["bear_report"].encode('latin-1', 'replace').decode('latin-1')
-            pdf.multi_cell(0, 6, text)
-        
-        # Save to reports folder
-        reports_dir = "data/reports"
-        if not os.path.exists(reports_dir):
-            os.makedirs(reports_dir)
-            
+    def _generate_pdf_report(self, symbol: str, report_data: dict, wait: bool = True) -> str:
+        """Render the deep-dive PDF to REPORTS_DIR via the shared render pool.
+
+        With wait=False the render is queued and the target path returned
+        immediately; the file appears once the worker process finishes.
+        """
+        from app.services.pdf_render_service import pdf_render_service
+
         filename = f"report_{safe_ticker_path(symbol)}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        filepath = os.path.join(reports_dir, filename)
-        pdf.output(filepath)
+        filepath = os.path.join(REPORTS_DIR, filename)
+        if not wait:
+            pdf_render_service.submit("email_report", filepath, symbol, report_data)
+            return filepath
+        if pdf_render_service.render("email_report", filepath, symbol, report_data) is None:
+            raise RuntimeError(f"PDF render failed for {symbol}")
         print(f"Reports aggregated and saved to {filepath}")
         return filepath
 
@@ -8,6 +8,12 @@ Public entry points:
     load_ft_weekly(iso_week)                — pure read
     load_finimize_weekly(iso_week)          — pure read of scheduler-written file
     format_for_agent(agent, date, ticker, sector) — slice for prompt injection
+
+format_for_agent reads through a process-wide memo: each digest file is
+parsed once per (mtime, size), along with its ticker-mention index and the
+slices rendered from it, so the several agents asking about each candidate
+share one read of the day's files. Regenerated or edited files are picked up
+on the next call.
 """
 
 from __future__ import annotations
@@ -16,9 +22,12 @@ import json
 import logging
 import os
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app.services.news_digest_parser import (
     parse_finimize_daily,
@@ -459,18 +468,40 @@ def _themes_block(digest: dict, filt: str) -> str:
     return "\n".join(out)
 
 
-def _tickers_sector_block(digest: dict, ticker: str) -> str:
-    out: List[str] = []
+class _TickerIndex:
+    """tickers_mentioned by upper-cased symbol, plus the rows with
+    high/medium portfolio relevance that every ticker's block lists."""
+
+    def __init__(self, digest: dict):
+        self.rows: List[Tuple[str, dict, str]] = []
+        self.by_ticker: Dict[str, List[int]] = {}
+        self.peers: List[int] = []
+        for i, (tkr, meta) in enumerate((digest.get("tickers_mentioned") or {}).items()):
+            tkr_u = tkr.upper()
+            rel = meta.get("relevance_to_portfolio", "low")
+            self.rows.append((tkr_u, meta, rel))
+            self.by_ticker.setdefault(tkr_u, []).append(i)
+            if rel in ("high", "medium"):
+                self.peers.append(i)
+
+    def rows_for(self, ticker: str) -> List[int]:
+        """Row positions for ticker's block (direct mentions + peers), in digest order."""
+        direct = self.by_ticker.get((ticker or "").upper())
+        if not direct:
+            return self.peers
+        return sorted(set(self.peers).union(direct))
+
+
+def _tickers_sector_block(digest: dict, ticker: str, index: Optional[_TickerIndex] = None) -> str:
+    index = index or _TickerIndex(digest)
     target = (ticker or "").upper()
-    for tkr, meta in (digest.get("tickers_mentioned") or {}).items():
-        tkr_u = tkr.upper()
-        is_direct = tkr_u == target
-        rel = meta.get("relevance_to_portfolio", "low")
-        if is_direct or rel in ("high", "medium"):
-            tag = "direct" if is_direct else f"rel:{rel}"
-            out.append(
-                f"- **{tkr_u}** ({tag}): x{meta.get('count')}, sent:{meta.get('sentiment')}"
-            )
+    out: List[str] = []
+    for i in index.rows_for(ticker):
+        tkr_u, meta, rel = index.rows[i]
+        tag = "direct" if tkr_u == target else f"rel:{rel}"
+        out.append(
+            f"- **{tkr_u}** ({tag}): x{meta.get('count')}, sent:{meta.get('sentiment')}"
+        )
     return "\n".join(out)
 
 
@@ -504,12 +535,12 @@ def _sentiment_full_block(digest: dict) -> str:
     return "\n\n".join(parts)
 
 
-def _competitive_full_block(digest: dict, ticker: str) -> str:
+def _competitive_full_block(digest: dict, ticker: str, index: Optional[_TickerIndex] = None) -> str:
     parts: List[str] = []
     themes = _themes_block(digest, "all")
     if themes:
         parts.append("THEMES:\n" + themes)
-    tickers = _tickers_sector_block(digest, ticker)
+    tickers = _tickers_sector_block(digest, ticker, index)
     if tickers:
         parts.append("TICKERS (direct / sector-peer):\n" + tickers)
     risk_lines = [
@@ -536,7 +567,8 @@ def _bearish_bundle_block(digest: dict) -> str:
 
 
 def _daily_slice(
-    digest: Optional[dict], md: str, slice_name: str, ticker: str
+    digest: Optional[dict], md: str, slice_name: str, ticker: str,
+    index: Optional[_TickerIndex] = None,
 ) -> str:
     if digest is None or slice_name == "none":
         return ""
@@ -547,7 +579,7 @@ def _daily_slice(
     if slice_name == "sentiment_full":
         return _sentiment_full_block(digest)
     if slice_name == "competitive_full":
-        return _competitive_full_block(digest, ticker)
+        return _competitive_full_block(digest, ticker, index)
     if slice_name == "bearish_bundle":
         return _bearish_bundle_block(digest)
     if slice_name == "macro_risk":
@@ -571,6 +603,98 @@ def _weekly_slice(md: Optional[str], slice_name: str) -> str:
     return ""
 
 
+# ---------------------------------------------------------------------------
+# Memo of parsed digest files and rendered slices (see module docstring)
+# ---------------------------------------------------------------------------
+
+# Slices whose text depends on the candidate ticker; the rest are shared.
+_TICKER_SLICES = {"competitive_full"}
+# Roughly a week of daily + weekly files; least recently used go first.
+_MEMO_MAX_FILES = 64
+
+
+@dataclass
+class _MemoEntry:
+    stamp: Tuple[int, int]
+    value: Any
+    slices: Dict[Tuple[str, str], str] = field(default_factory=dict)
+
+
+_MEMO: "OrderedDict[Path, _MemoEntry]" = OrderedDict()
+_MEMO_LOCK = threading.Lock()
+
+
+def _read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+def _read_digest(path: Path) -> Optional[Tuple[dict, _TickerIndex]]:
+    try:
+        digest = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        logger.warning("Corrupt digest JSON at %s", path)
+        return None
+    return digest, _TickerIndex(digest)
+
+
+def _memo_file(path: Path, load: Callable[[Path], Any]) -> Optional[_MemoEntry]:
+    """The memo entry for path, re-loaded when its (mtime, size) changed; None if missing."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        with _MEMO_LOCK:
+            _MEMO.pop(path, None)
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _MEMO_LOCK:
+        entry = _MEMO.get(path)
+        if entry is not None and entry.stamp == stamp:
+            _MEMO.move_to_end(path)
+            return entry
+    entry = _MemoEntry(stamp, load(path))
+    with _MEMO_LOCK:
+        _MEMO[path] = entry
+        while len(_MEMO) > _MEMO_MAX_FILES:
+            _MEMO.popitem(last=False)
+    return entry
+
+
+def _memo_slice(entry: _MemoEntry, key: Tuple[str, str], render: Callable[[], str]) -> str:
+    text = entry.slices.get(key)
+    if text is None:
+        text = entry.slices[key] = render()
+    return text
+
+
+def clear_digest_memo() -> None:
+    """Drop every memoized file and slice (tests, or after bulk archive rewrites)."""
+    with _MEMO_LOCK:
+        _MEMO.clear()
+
+
+def _cached_daily_slice(source: str, date: str, slice_name: str, ticker: str) -> str:
+    if slice_name == "none":
+        return ""
+    entry = _memo_file(digest_json_path(source, date), _read_digest)
+    if entry is None or entry.value is None:
+        return ""
+    if slice_name == "full":
+        md = _memo_file(digest_md_path(source, date), _read_text)
+        return md.value if md is not None else ""
+    digest, index = entry.value
+    key = (slice_name, (ticker or "").upper() if slice_name in _TICKER_SLICES else "")
+    return _memo_slice(entry, key, lambda: _daily_slice(digest, "", slice_name, ticker, index))
+
+
+def _cached_weekly_slice(path: Path, slice_name: str) -> str:
+    if slice_name == "none":
+        return ""
+    entry = _memo_file(path, _read_text)
+    if entry is None:
+        return ""
+    return _memo_slice(entry, (slice_name, ""), lambda: _weekly_slice(entry.value, slice_name))
+
+
 def format_for_agent(
     agent_name: str, date: str, ticker: str, sector: Optional[str] = None
 ) -> str:
@@ -580,21 +704,11 @@ def format_for_agent(
 
     iso_week = _iso_week_for(date)
 
-    ft_daily = load_digest("ft", date)
-    ft_daily_md = _load_digest_md("ft", date)
-    fin_daily = load_digest("finimize", date)
-    fin_daily_md = _load_digest_md("finimize", date)
-    wsj_daily = load_digest("wsj", date)
-    wsj_daily_md = _load_digest_md("wsj", date)
-
-    ft_weekly_md = load_ft_weekly(iso_week)
-    fin_weekly_md = load_finimize_weekly(iso_week)
-
-    ft_block = _daily_slice(ft_daily, ft_daily_md, slices["ft_daily"], ticker)
-    fin_block = _daily_slice(fin_daily, fin_daily_md, slices["finimize_daily"], ticker)
-    wsj_block = _daily_slice(wsj_daily, wsj_daily_md, slices.get("wsj_daily", "none"), ticker)
-    ft_w_block = _weekly_slice(ft_weekly_md, slices["ft_weekly"])
-    fin_w_block = _weekly_slice(fin_weekly_md, slices["finimize_weekly"])
+    ft_block = _cached_daily_slice("ft", date, slices["ft_daily"], ticker)
+    fin_block = _cached_daily_slice("finimize", date, slices["finimize_daily"], ticker)
+    wsj_block = _cached_daily_slice("wsj", date, slices.get("wsj_daily", "none"), ticker)
+    ft_w_block = _cached_weekly_slice(ft_weekly_digest_md_path(iso_week), slices["ft_weekly"])
+    fin_w_block = _cached_weekly_slice(finimize_weekly_scheduler_path(iso_week), slices["finimize_weekly"])
 
     sections: List[str] = []
     if ft_block.strip():
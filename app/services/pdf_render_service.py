@@ -0,0 +1,356 @@
+# app/services/pdf_render_service.py
+"""
+Off-thread PDF rendering for Deep Research, batch-comparison and email reports.
+
+Rendering used to run inline in the single DR worker thread (and again per
+email notification). It now runs in a small spawn-context process pool so
+reportlab/fpdf CPU work never sits on the DR critical path. Every render is
+keyed by a SHA-256 of its kind + inputs and written once to
+``data/pdf_cache/<hash>.pdf``; requesting the same content again just copies
+the cached file to the requested target path.
+
+The renderers are module-level functions so they can be pickled into the
+worker processes. They take the output path first, then the content. They
+must be pure functions of their arguments (no wall-clock stamps), since a
+cache hit serves whatever the first render wrote; the reportlab documents
+are built with invariant=1 so equal inputs give byte-identical files.
+"""
+import concurrent.futures
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "data/pdf_cache"
+
+
+def render_deep_research_pdf(filepath: str, symbol: str, result: dict,
+                             report_date: Optional[str] = None) -> None:
+    """Individual Deep Research report (verdict, context, reasoning, SWOT).
+
+    report_date is the report's own date (the one in its file name); the
+    Date line is left out when it isn't known.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    doc = SimpleDocTemplate(filepath, pagesize=letter, invariant=1)
+    styles = getSampleStyleSheet()
+
+    title_style = styles['Title']
+    heading_style = styles['Heading2']
+    normal_style = styles['BodyText']
+
+    story = []
+
+    # Title
+    story.append(Paragraph(f"Deep Research Report: {symbol}", title_style))
+    story.append(Spacer(1, 12))
+    if report_date:
+        story.append(Paragraph(f"Date: {report_date}", normal_style))
+        story.append(Spacer(1, 12))
+
+    # Verdict & Risk
+    verdict = result.get('verdict', 'UNKNOWN')
+    risk = result.get('risk_level', 'Unknown')
+
+    # Color code verdict
+    v_color = "black"
+    if "BUY" in verdict: v_color = "green"
+    elif "AVOID" in verdict or "SELL" in verdict: v_color = "red"
+
+    story.append(Paragraph(f"<b>VERDICT:</b> <font color='{v_color}'>{verdict}</font>", styles['Heading3']))
+    story.append(Paragraph(f"<b>RISK LEVEL:</b> {risk}", styles['Heading3']))
+    story.append(Spacer(1, 12))
+
+    # Catalyst & Reasoning
+    story.append(Paragraph("Catalyst & Market Context", heading_style))
+    story.append(Paragraph(f"<b>Catalyst Type:</b> {result.get('catalyst_type', 'N/A')}", normal_style))
+    story.append(Spacer(1, 6))
+    story.append(Paragraph(f"<b>Global Context:</b> {result.get('global_market_analysis', 'N/A')}", normal_style))
+    story.append(Spacer(1, 6))
+    story.append(Paragraph(f"<b>Local/Sector Context:</b> {result.get('local_market_analysis', 'N/A')}", normal_style))
+    story.append(Spacer(1, 12))
+
+    # Key Reasoning
+    story.append(Paragraph("Key Reasoning", heading_style))
+    for point in result.get('reasoning_bullet_points', []):
+        story.append(Paragraph(f"• {point}", normal_style))
+        story.append(Spacer(1, 4))
+    story.append(Spacer(1, 12))
+
+    # SWOT Analysis
+    swot = result.get('swot_analysis', {})
+    story.append(Paragraph("SWOT Analysis", heading_style))
+
+    data = [
+        [Paragraph("<b>Strengths</b>", normal_style), Paragraph("<b>Weaknesses</b>", normal_style)],
+        [
+            Paragraph("<br/>".join([f"- {s}" for s in swot.get('strengths', [])]), normal_style),
+            Paragraph("<br/>".join([f"- {w}" for w in swot.get('weaknesses', [])]), normal_style)
+        ],
+        [Paragraph("<b>Opportunities</b>", normal_style), Paragraph("<b>Threats</b>", normal_style)],
+        [
+            Paragraph("<br/>".join([f"- {o}" for o in swot.get('opportunities', [])]), normal_style),
+            Paragraph("<br/>".join([f"- {t}" for t in swot.get('threats', [])]), normal_style)
+        ]
+    ]
+
+    table = Table(data, colWidths=[230, 230])
+    table.setStyle(TableStyle([
+        ('GRID', (0,0), (-1,-1), 1, colors.grey),
+        ('BACKGROUND', (0,0), (1,0), colors.lightgrey),
+        ('BACKGROUND', (0,2), (1,2), colors.lightgrey),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('PADDING', (0,0), (-1,-1), 6),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 12))
+
+    doc.build(story)
+
+
+def render_batch_pdf(filepath: str, symbols: list, result_text: str) -> None:
+    """Batch comparison report. Falls back to the raw text if it isn't JSON."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    doc = SimpleDocTemplate(filepath, pagesize=letter, invariant=1)
+    styles = getSampleStyleSheet()
+
+    story = []
+    story.append(Paragraph(f"Batch Comparison: {', '.join(symbols)}", styles['Title']))
+    story.append(Spacer(1, 12))
+
+    try:
+        data = json.loads(result_text)
+
+        winner = data.get('winner_symbol', 'UNKNOWN')
+        ranking = data.get('ranking', [])
+        rationale = data.get('rationale', 'No rationale provided.')
+        timeline = data.get('projected_timeline', 'N/A')
+
+        story.append(Paragraph(f"<b>WINNER:</b> <font color='green'>{winner}</font>", styles['Heading2']))
+        story.append(Spacer(1, 12))
+
+        story.append(Paragraph(f"<b>Ranking:</b> {', '.join(ranking)}", styles['BodyText']))
+        story.append(Spacer(1, 12))
+
+        story.append(Paragraph("<b>Rationale:</b>", styles['Heading3']))
+        story.append(Paragraph(rationale, styles['BodyText']))
+        story.append(Spacer(1, 12))
+
+        story.append(Paragraph(f"<b>Projected Timeline:</b> {timeline}", styles['BodyText']))
+
+    except json.JSONDecodeError:
+        story.append(Paragraph("Raw Result (Parse Error):", styles['Heading2']))
+        story.append(Paragraph(result_text, styles['BodyText']))
+
+    doc.build(story)
+
+
+def _latin1(text: str) -> str:
+    # Standard FPDF fonts are latin-1 only; replace anything else.
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def render_email_report_pdf(filepath: str, symbol: str, report_data: dict) -> None:
+    """Council deep-dive report attached to drop notifications."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # Title
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, f"Deep Dive Research Report: {symbol}", 0, 1, 'C')
+    pdf.ln(10)
+
+    # Recommendation
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 10, f"Recommendation: {report_data.get('recommendation', 'N/A')}", 0, 1)
+    pdf.ln(5)
+
+    # Detailed Report
+    pdf.set_font("Arial", '', 11)
+    detailed_text = report_data.get("detailed_report", "No details provided.")
+    pdf.multi_cell(0, 10, _latin1(detailed_text))
+
+    # --- Append Intermediate Reports ---
+    sections = [
+        ("technician_report", "Technician's Report (Momentum & Levels)", (0, 0, 150)),   # Dark Blue
+        ("macro_report", "Macro Context (Sector & Factors)", (100, 100, 0)),              # Dark Yellow/Gold
+        ("bear_report", "The Bear's Pre-Mortem (Downside Risks)", (150, 0, 0)),           # Dark Red
+    ]
+    for key, heading, rgb in sections:
+        if key not in report_data:
+            continue
+        pdf.add_page()
+        pdf.set_font("Arial", 'B', 14)
+        pdf.set_text_color(*rgb)
+        pdf.cell(0, 10, heading, 0, 1)
+        pdf.set_text_color(0, 0, 0) # Reset
+        pdf.ln(5)
+        pdf.set_font("Arial", '', 10)
+        pdf.multi_cell(0, 6, _latin1(report_data[key]))
+
+    pdf.output(filepath)
+
+
+RENDERERS = {
+    "deep_research": render_deep_research_pdf,
+    "batch": render_batch_pdf,
+    "email_report": render_email_report_pdf,
+}
+
+
+def content_key(kind: str, *args) -> str:
+    """Stable SHA-256 over the render kind and its inputs."""
+    blob = json.dumps([kind, *args], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _render_job(kind: str, cache_path: str, args: tuple) -> str:
+    """Runs inside the worker process. Writes to a temp name, then renames
+    so a crashed render never leaves a truncated PDF in the cache."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        RENDERERS[kind](tmp_path, *args)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return cache_path
+
+
+def _copy_atomic(src: str, dst: str) -> None:
+    """Copy via a uniquely named temp file, so concurrent deliveries of the
+    same PDF to the same target never share (or half-publish) a temp file."""
+    parent = os.path.dirname(dst)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=parent or ".", prefix=f".{os.path.basename(dst)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class PdfRenderService:
+    """Content-hashed PDF cache fronting a lazily-started process pool.
+
+    ``submit`` never blocks on rendering: it returns a Future that resolves
+    to the target path (or None on failure). ``render`` is the blocking
+    variant for callers that need the file right now (email attachment,
+    on-demand API route). Concurrent requests for the same content share
+    one in-flight render.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_workers: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers or int(os.getenv("PDF_RENDER_WORKERS", "1"))
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+
+    def cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        # Spawn, not fork: the parent is full of threads (DR worker, sensor
+        # pools, uvicorn) and forking a threaded process can deadlock.
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def submit(self, kind: str, target_path: str, *args) -> concurrent.futures.Future:
+        """Render ``kind`` with ``args`` to ``target_path`` in the background."""
+        result: concurrent.futures.Future = concurrent.futures.Future()
+        key = content_key(kind, *args)
+        cached = self.cache_path(key)
+
+        def _deliver(render_future: Optional[concurrent.futures.Future]) -> None:
+            try:
+                if render_future is not None:
+                    render_future.result()
+                _copy_atomic(cached, target_path)
+                result.set_result(target_path)
+            except ModuleNotFoundError as e:
+                logger.error(
+                    "[pdf-render] %s render failed — missing dependency: %s. "
+                    "Run `pip install -r requirements.txt` on the deploy target.", kind, e
+                )
+                result.set_result(None)
+            except Exception as e:
+                logger.error("[pdf-render] %s render to %s failed: %s", kind, target_path, e)
+                result.set_result(None)
+
+        if os.path.exists(cached):
+            logger.debug("[pdf-render] cache hit %s for %s", key[:12], target_path)
+            _deliver(None)
+            return result
+
+        started = False
+        with self._lock:
+            render_future = self._inflight.get(key)
+            if render_future is None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                try:
+                    render_future = self._get_pool().submit(_render_job, kind, cached, args)
+                except Exception as e:
+                    # Pool unavailable (broken, or interpreter shutting
+                    # down) — render inline rather than lose the report.
+                    logger.warning("[pdf-render] process pool unavailable (%s); rendering inline", e)
+                    self._pool = None
+                    render_future = concurrent.futures.Future()
+                    try:
+                        render_future.set_result(_render_job(kind, cached, args))
+                    except Exception as render_err:
+                        render_future.set_exception(render_err)
+                else:
+                    self._inflight[key] = render_future
+                    started = True
+
+        # Callbacks are attached outside the lock: a future that is already
+        # done runs them inline, and _forget takes the lock itself.
+        if started:
+            render_future.add_done_callback(lambda _f, k=key: self._forget(k))
+        render_future.add_done_callback(_deliver)
+        return result
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def render(self, kind: str, target_path: str, *args, timeout: float = 120) -> Optional[str]:
+        """Blocking variant of ``submit``. Returns the target path or None."""
+        try:
+            return self.submit(kind, target_path, *args).result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            logger.error("[pdf-render] %s render to %s timed out after %ss", kind, target_path, timeout)
+            return None
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+pdf_render_service = PdfRenderService()
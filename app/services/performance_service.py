@@ -1,9 +1,9 @@
 import logging
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
-import yfinance as yf
 import pandas as pd
 from app.database import get_decision_points
+from app.services.analytics import price_cache
 from app.services.tradingview_service import tradingview_service
 
 logger = logging.getLogger(__name__)
@@ -40,7 +40,9 @@ class PerformanceService:
         Fetches all recorded decisions and compares the decision price
         with the current market price to evaluate performance.
         """
-        decisions = get_decision_points()
+        decisions = get_decision_points(
+            ["id", "symbol", "price_at_decision", "recommendation", "timestamp", "reasoning"]
+        )
         if not decisions:
             logger.info("No decisions found to evaluate.")
             return []
@@ -147,10 +149,8 @@ class PerformanceService:
             if start_date > datetime.now():
                 return {"error": "Buy date cannot be in the future."}
                 
-            # 2. Fetch History using yfinance
-            # Fetch from buy_date to now
-            ticker = yf.Ticker(symbol)
-            history = ticker.history(start=buy_date, interval="1d")
+            # 2. Fetch adjusted daily history from buy_date to now (local price store)
+            history = price_cache.get_bars(symbol, start_date, datetime.now(), adjusted=True)
             
             if history.empty:
                  return {"error": f"No data found for {symbol} starting from {buy_date}."}
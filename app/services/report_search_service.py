@@ -0,0 +1,197 @@
+"""
+Ranked full-text search over decision reasoning, Deep Research text and
+saved council reports.
+
+Decision text is indexed in SQLite (decision_fts) by triggers in
+app.database, so it is always current. Council reports live as JSON files
+in data/council_reports; research_service indexes each one as it is saved,
+and sync_council_reports() picks up anything written before that (or by
+another process) using a (filename, mtime, size) index, so only new or
+changed files are parsed.
+"""
+import json
+import logging
+import os
+import re
+import time
+from typing import List, Optional
+
+import app.database as _db
+
+logger = logging.getLogger(__name__)
+
+COUNCIL_DIR = "data/council_reports"
+_COUNCIL_FILE_RE = re.compile(r"^(?P<symbol>.+)_(?P<date>\d{4}-\d{2}-\d{2})_council(?P<phase>[12])\.json$")
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query.
+
+    Every bare word and every "quoted phrase" becomes a quoted FTS5 string,
+    so user input can never hit FTS5 syntax errors; terms are ANDed.
+    """
+    terms = []
+    for token in _QUERY_TOKEN_RE.findall(text or ""):
+        token = token.strip('"').strip()
+        if token:
+            terms.append('"' + token.replace('"', '""') + '"')
+    return " ".join(terms)
+
+
+def _doc_body(value) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _index_reports(conn, symbol: str, report_date: str, reports: dict, source_file: str) -> int:
+    count = 0
+    for agent, value in reports.items():
+        body = _doc_body(value)
+        if not body.strip():
+            continue
+        conn.execute(
+            "INSERT INTO council_docs (symbol, report_date, agent, source_file) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(symbol, report_date, agent) DO UPDATE SET source_file = excluded.source_file",
+            (symbol, report_date, agent, source_file),
+        )
+        doc_id = conn.execute(
+            "SELECT id FROM council_docs WHERE symbol = ? AND report_date = ? AND agent = ?",
+            (symbol, report_date, agent),
+        ).fetchone()[0]
+        conn.execute("DELETE FROM council_fts WHERE rowid = ?", (doc_id,))
+        conn.execute("INSERT INTO council_fts (rowid, body) VALUES (?, ?)", (doc_id, body))
+        count += 1
+    return count
+
+
+def index_council_report(symbol: str, report_date: str, reports: dict, path: str = None) -> int:
+    """Index (or re-index) one council report just saved to ``path``. Never raises.
+
+    Recording the file in council_report_files means the next
+    sync_council_reports() pass will not parse it again.
+    """
+    try:
+        name = os.path.basename(path) if path else None
+        with _db.transaction() as conn:
+            count = _index_reports(conn, symbol, report_date, reports, name)
+            if path and os.path.exists(path):
+                st = os.stat(path)
+                conn.execute(
+                    "INSERT OR REPLACE INTO council_report_files (filename, mtime, size) VALUES (?, ?, ?)",
+                    (name, st.st_mtime, st.st_size),
+                )
+            return count
+    except Exception as e:
+        logger.warning("[Report Search] Failed to index council report %s %s: %s",
+                       symbol, report_date, e)
+        return 0
+
+
+def sync_council_reports(directory: str = COUNCIL_DIR) -> int:
+    """Index council report files that are new or changed since the last sync.
+
+    Returns the number of files (re)indexed.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    start = time.perf_counter()
+    cursor = _db.get_connection().execute("SELECT filename, mtime, size FROM council_report_files")
+    known = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    changed = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            match = _COUNCIL_FILE_RE.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            st = entry.stat()
+            if known.get(entry.name) != (st.st_mtime, st.st_size):
+                changed.append((entry.name, match, st))
+    if not changed:
+        return 0
+
+    # council1 sorts before council2, so the later phase wins for shared agents.
+    changed.sort(key=lambda item: item[0])
+    indexed = 0
+    with _db.transaction() as conn:
+        for name, match, st in changed:
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    reports = json.load(f)
+            except Exception as e:
+                logger.warning("[Report Search] Skipping unreadable %s: %s", name, e)
+                continue
+            if isinstance(reports, dict):
+                _index_reports(conn, match["symbol"], match["date"], reports, name)
+            conn.execute(
+                "INSERT OR REPLACE INTO council_report_files (filename, mtime, size) VALUES (?, ?, ?)",
+                (name, st.st_mtime, st.st_size),
+            )
+            indexed += 1
+    logger.info("[Report Search] Indexed %d council report files in %.2fs",
+                indexed, time.perf_counter() - start)
+    return indexed
+
+
+def search_reports(query: str, limit: int = 20, symbol: Optional[str] = None,
+                   include_council: bool = True) -> List[dict]:
+    """
+    Ranked (BM25) search over decisions and council reports.
+
+    Each hit carries kind ("decision" or "council"), decision_id / agent,
+    symbol, date, a highlighted snippet, its score (lower is better) and its
+    rank within its own kind. BM25 scores from decision_fts and council_fts
+    come from different corpus statistics and aren't comparable, so the two
+    ranked lists are interleaved by rank (decision #1, council #1, decision
+    #2, ...) rather than sorted by score together.
+    """
+    match = fts_query(query)
+    if not match:
+        return []
+    conn = _db.get_connection()
+    symbol_clause = " AND dp.symbol = ?" if symbol else ""
+    params = [match] + ([symbol] if symbol else []) + [limit]
+    hits = [
+        {"kind": "decision", "decision_id": row[0], "symbol": row[1], "date": row[2],
+         "recommendation": row[3], "snippet": row[4], "score": row[5]}
+        for row in conn.execute(
+            f"""
+            SELECT dp.id, dp.symbol, dp.decision_date, dp.recommendation,
+                   snippet(decision_fts, -1, '«', '»', '…', 16),
+                   bm25(decision_fts)
+            FROM decision_fts
+            JOIN decision_points dp ON dp.id = decision_fts.rowid
+            WHERE decision_fts MATCH ?{symbol_clause}
+            ORDER BY rank LIMIT ?
+            """,
+            params,
+        )
+    ]
+    if include_council:
+        symbol_clause = " AND d.symbol = ?" if symbol else ""
+        hits += [
+            {"kind": "council", "agent": row[0], "symbol": row[1], "date": row[2],
+             "snippet": row[3], "score": row[4]}
+            for row in conn.execute(
+                f"""
+                SELECT d.agent, d.symbol, d.report_date,
+                       snippet(council_fts, 0, '«', '»', '…', 16),
+                       bm25(council_fts)
+                FROM council_fts
+                JOIN council_docs d ON d.id = council_fts.rowid
+                WHERE council_fts MATCH ?{symbol_clause}
+                ORDER BY rank LIMIT ?
+                """,
+                params,
+            )
+        ]
+    by_kind = {}
+    for hit in hits:
+        ranked = by_kind.setdefault(hit["kind"], [])
+        hit["rank"] = len(ranked) + 1
+        ranked.append(hit)
+    # Stable sort on rank keeps decisions ahead of council hits on ties.
+    hits.sort(key=lambda h: h["rank"])
+    return hits[:limit]
@@ -25,6 +25,7 @@ from app.utils.ticker_paths import safe_ticker_path
 from app.utils.agent_call_counter import counter as agent_call_counter
 from app.utils.earnings_consistency import check_narrative_consistency, downgrade_action
 from app.utils.json_repair import repair_json_via_flash
+from app.services.report_search_service import index_council_report
 
 # Citation strip — Gemini grounding injects footnote markers that corrupt JSON
 # AND mid-sentence text. Two known shapes:
@@ -735,6 +736,7 @@ class ResearchService:
 
             with open(council_file, "w") as f:
                 json.dump(state.reports, f, indent=4)
+            index_council_report(state.ticker, state.date, state.reports, council_file)
 
             print(f"  > [System] AI Council 1 Reports saved to {council_file}")
         except Exception as e:
@@ -774,6 +776,7 @@ class ResearchService:
 
             with open(council2_file, "w") as f:
                 json.dump(state.reports, f, indent=4)
+            index_council_report(state.ticker, state.date, state.reports, council2_file)
 
             print(f"  > [System] AI Council 2 Reports (Phase 1+2) saved to {council2_file}")
         except Exception as e:
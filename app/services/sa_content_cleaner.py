@@ -0,0 +1,277 @@
+"""Deterministic cleaning of Seeking Alpha article HTML into agent-ready text.
+
+clean_html() is the whole pipeline, no model calls:
+
+  1. Parse with BeautifulSoup (html.parser) and drop non-content elements:
+     scripts/styles, media (figure/picture/img/svg), page chrome and ad slots.
+  2. Flatten to text. Block elements end a paragraph; list items, table rows
+     and <br> end a line; table cells are space-separated, so each table row
+     becomes one line.
+  3. Normalize whitespace (NBSP and zero-width characters, runs of spaces,
+     blank lines).
+  4. Drop boilerplate paragraphs: author and SA disclosures, editor's notes,
+     follow/subscribe prompts, forward-looking-statement legalese, IR
+     contacts, and, for news items, a trailing "More on X" heading followed
+     only by a list of short link lines.
+  5. Collapse financial-statement dumps (strip_financial_tables).
+
+CleanCache keeps results keyed by a SHA-256 of (PIPELINE_VERSION, cache kind,
+raw content) in memory and as gzip'd text files under CACHE_DIR
+(SA_CLEAN_CACHE_DIR, default data/sa_clean_cache), so an article is cleaned
+once however often it is refetched. Bump PIPELINE_VERSION when the pipeline
+changes.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_VERSION = 2
+CACHE_DIR = Path(os.getenv("SA_CLEAN_CACHE_DIR", "data/sa_clean_cache"))
+
+# ---------------------------------------------------------------------------
+# Financial tables
+# ---------------------------------------------------------------------------
+
+_TABLE_NUM_RE = re.compile(r"\(?\$?\d{1,3}(?:,\d{3})+(?:\.\d+)?\)?|\(?\$?\d{3,}(?:\.\d+)?\)?")
+
+
+def _is_financial_table_line(line: str) -> bool:
+    """A balance-sheet/income-statement row: >=2 large number tokens and at
+    most a short label of words ('Operating lease right-of-use assets 1,033
+    1,019'). Prose sentences with a couple of figures don't match."""
+    s = line.strip()
+    if not s:
+        return False
+    if len(_TABLE_NUM_RE.findall(s)) < 2:
+        return False
+    words = [w for w in _TABLE_NUM_RE.sub(" ", s).split() if any(c.isalpha() for c in w)]
+    return len(words) <= 8
+
+
+def strip_financial_tables(text: str, min_run: int = 5) -> str:
+    """Collapse runs of raw financial-statement rows (the balance-sheet dumps
+    in SA press releases) into a single placeholder. Article prose passes
+    through untouched."""
+    if not text:
+        return text
+    lines = text.split("\n")
+    out, i, n = [], 0, len(lines)
+    while i < n:
+        if _is_financial_table_line(lines[i]):
+            j, count, last_table = i, 0, i
+            while j < n and (_is_financial_table_line(lines[j]) or not lines[j].strip()):
+                if _is_financial_table_line(lines[j]):
+                    count, last_table = count + 1, j
+                j += 1
+            if count >= min_run:
+                out.append("[financial statement table omitted]")
+                i = last_table + 1
+                continue
+        out.append(lines[i])
+        i += 1
+    return "\n".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+_DROP_TAGS = [
+    "script", "style", "noscript", "iframe", "header", "footer", "nav", "aside",
+    "figure", "picture", "img", "svg", "video", "audio", "form", "button",
+]
+_AD_CLASS_RE = re.compile(r"ad-container|advertisement|inline_ad|ad_placeholder")
+_PARAGRAPH_TAGS = [
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "div", "article", "section",
+    "blockquote", "ul", "ol", "table", "pre",
+]
+_LINE_TAGS = ["li", "tr"]
+_CELL_TAGS = ["td", "th"]
+
+_A = "['’]?"  # optional straight or curly apostrophe
+_BOILERPLATE_RES = [re.compile(p, re.IGNORECASE) for p in (
+    rf"^(analyst{_A}s|seeking alpha{_A}s|additional)\s+disclosure\b",
+    r"^disclosure\s*:",
+    rf"^editor{_A}s note\b",
+    r"^(if you (enjoyed|liked|found)\b|click (the )?follow\b|follow me\b|subscribe (to|now)\b|sign up (for|to)\b)",
+    r"^(investor|media|press)( relations)? contacts?\b",
+    r"^source\s*:",
+    r"^(forward[- ]looking statements|safe harbor|cautionary (note|statement))\b",
+    rf"^seeking alpha{_A}s quant rating\b",
+    r"^advertisement$",
+)]
+_LEGALESE_RE = re.compile(r"forward[- ]looking statements", re.IGNORECASE)
+_LEGALESE_HINT_RE = re.compile(r"risks and uncertainties|no obligation to update|securities litigation reform act",
+                               re.IGNORECASE)
+_RELATED_LINKS_RE = re.compile(r"^more on [^\n]{1,80}$", re.IGNORECASE)
+# Related-article headlines: short, and not a sentence.
+_LINK_LINE_MAX = 120
+_INVISIBLE = {"\u00a0": " ", "\u200b": "", "\u200c": "", "\u200d": "", "\ufeff": ""}
+_INVISIBLE_RE = re.compile("|".join(_INVISIBLE))
+
+
+def _html_to_text(content: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+    for tag in soup(_DROP_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(class_=lambda c: bool(c) and bool(_AD_CLASS_RE.search(" ".join(c) if isinstance(c, list) else c))):
+        tag.decompose()
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    for tag in soup.find_all(_CELL_TAGS):
+        tag.insert_after(" ")
+    for tag in soup.find_all(_LINE_TAGS):
+        tag.insert_after("\n")
+    for tag in soup.find_all(_PARAGRAPH_TAGS):
+        tag.insert_after("\n\n")
+    return soup.get_text()
+
+
+def _paragraphs(text: str) -> list:
+    """Whitespace-normalized paragraphs; lines inside a paragraph are kept."""
+    text = _INVISIBLE_RE.sub(lambda m: _INVISIBLE[m.group(0)], text)
+    out = []
+    for block in re.split(r"\n\s*\n", text):
+        lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in block.split("\n")]
+        lines = [line for line in lines if line]
+        if lines:
+            out.append("\n".join(lines))
+    return out
+
+
+def is_boilerplate(paragraph: str) -> bool:
+    """Disclosures, prompts, legalese and contact blocks (see module docstring)."""
+    if any(rx.search(paragraph) for rx in _BOILERPLATE_RES):
+        return True
+    return bool(_LEGALESE_RE.search(paragraph) and _LEGALESE_HINT_RE.search(paragraph))
+
+
+def _is_link_list(lines: list) -> bool:
+    return all(len(line) <= _LINK_LINE_MAX and not line.endswith((".", ":")) for line in lines)
+
+
+def strip_boilerplate(paragraphs: list, kind: str = "article") -> list:
+    out = []
+    for i, para in enumerate(paragraphs):
+        head, _, rest = para.partition("\n")
+        if kind == "news" and _RELATED_LINKS_RE.match(head):
+            tail = rest.split("\n") if rest else []
+            for later in paragraphs[i + 1:]:
+                tail.extend(later.split("\n"))
+            if _is_link_list(tail):
+                break  # "More on X" and the related-article links after it
+        if not is_boilerplate(para):
+            out.append(para)
+    return out
+
+
+def clean_html(content: str, kind: str = "article") -> str:
+    """Run the full local pipeline on one article body (HTML or plain text).
+
+    kind is "news" for news items (enables the related-links cut); anything
+    else is treated as an article.
+    """
+    if not content:
+        return ""
+    paragraphs = strip_boilerplate(_paragraphs(_html_to_text(content)), kind)
+    text = strip_financial_tables("\n\n".join(paragraphs))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+_RESIDUAL_MARKUP_RE = re.compile(r"<[a-zA-Z/][^>]{0,200}>|&(?:[a-z]+|#\d+);")
+
+
+def looks_unclean(text: str) -> bool:
+    """Whether locally cleaned text still carries markup (the LLM fallback's trigger)."""
+    return bool(text) and bool(_RESIDUAL_MARKUP_RE.search(text))
+
+
+# ---------------------------------------------------------------------------
+# Content-hash cache
+# ---------------------------------------------------------------------------
+
+def content_key(kind: str, content: str) -> str:
+    """SHA-256 of the pipeline version, the cleaning kind and the raw content."""
+    h = hashlib.sha256(f"{PIPELINE_VERSION}\0{kind}\0".encode("utf-8"))
+    h.update(content.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class CleanCache:
+    """Cleaned text by content_key: a bounded in-memory LRU over gzip'd files."""
+
+    def __init__(self, root: Optional[Path] = None, memory_items: int = 2048):
+        self.root = Path(root) if root is not None else CACHE_DIR
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt.gz"
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning(f"[SA Clean] Unreadable cache entry {key[:12]}: {e}")
+            return None
+        self._remember(key, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{key[:12]}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                    f.write(text.encode("utf-8"))
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        except OSError as e:  # the memory copy still serves this process
+            logger.warning(f"[SA Clean] Could not persist cache entry {key[:12]}: {e}")
+
+    def get_or_compute(self, kind: str, content: str, compute: Callable[[], Optional[str]]) -> Optional[str]:
+        """Cached result for (kind, content), computing and storing it on a miss.
+
+        A compute that raises or returns None stores nothing, so a failed
+        clean is retried next time rather than cached.
+        """
+        key = content_key(kind, content)
+        text = self.get(key)
+        if text is None:
+            text = compute()
+            if text is not None:
+                self.put(key, text)
+        return text
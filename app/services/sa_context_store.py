@@ -0,0 +1,156 @@
+"""Per-ticker store for fetched Seeking Alpha context.
+
+SeekingAlphaService used to keep every ticker's news/analysis/press-release
+items in one experiment_data/agent_context.json, re-reading the whole file
+on every lookup and rewriting it on every fetch, with nothing stopping two
+writers from dropping each other's tickers. Here each ticker is its own
+gzip'd JSON file under ROOT (SA_CONTEXT_DIR, default
+experiment_data/sa_context), so a lookup reads one small file and a write
+replaces one file atomically (unique tmp name + os.replace). Concurrent
+writers of the same ticker can only race on that ticker; last write wins
+and readers never see a partial file.
+
+The Wall Street Breakfast items the legacy file also carried live in
+_wall_street_breakfast.json.gz.
+
+Migration: on first use the legacy file (LEGACY_PATH) is split into shards.
+Tickers already in the store are left alone (they are newer), and
+_migrated.json records the legacy file's (mtime, size) so it is only
+re-imported if something regenerates it. The legacy file itself is never
+modified.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(os.getenv("SA_CONTEXT_DIR", "experiment_data/sa_context"))
+LEGACY_PATH = Path("experiment_data/agent_context.json")
+
+_WSB_KEY = "_wall_street_breakfast"
+_MIGRATED_FILE = "_migrated.json"
+
+
+def _safe_name(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(key))
+
+
+class SAContextStore:
+    """Keyed, file-per-ticker store; see the module docstring."""
+
+    def __init__(self, root: Optional[Path] = None, legacy_path: Optional[Path] = LEGACY_PATH):
+        self.root = Path(root) if root is not None else ROOT
+        self.legacy_path = Path(legacy_path) if legacy_path is not None else None
+        self._migrated = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{_safe_name(key)}.json.gz"
+
+    def _read(self, key: str) -> Optional[Any]:
+        self._ensure_migrated()
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"[SA Store] Unreadable entry {key}: {e}")
+            return None
+
+    def _write(self, key: str, value: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f".{_safe_name(key)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, ticker: str) -> Optional[Dict[str, List[Dict]]]:
+        """The ticker's stored {'news', 'analysis', 'press_releases'} items, or None."""
+        return self._read(ticker)
+
+    def put(self, ticker: str, data: Dict[str, List[Dict]]) -> None:
+        """Replace the ticker's stored items."""
+        self._ensure_migrated()
+        self._write(ticker, data)
+
+    def get_wsb(self) -> List[Dict]:
+        return self._read(_WSB_KEY) or []
+
+    def put_wsb(self, items: List[Dict]) -> None:
+        self._ensure_migrated()
+        self._write(_WSB_KEY, items)
+
+    def tickers(self) -> List[str]:
+        """Names of the stored ticker files (sanitized keys)."""
+        self._ensure_migrated()
+        if not self.root.exists():
+            return []
+        names = (p.name[: -len(".json.gz")] for p in self.root.glob("*.json.gz"))
+        return sorted(n for n in names if n != _WSB_KEY)
+
+    # ------------------------------------------------------------------
+    # Migration from agent_context.json
+    # ------------------------------------------------------------------
+
+    def _ensure_migrated(self) -> None:
+        if self._migrated:
+            return
+        with self._lock:
+            if not self._migrated:
+                try:
+                    self.migrate()
+                except Exception as e:  # a bad legacy file must not block lookups
+                    logger.error(f"[SA Store] Migration from {self.legacy_path} failed: {e}")
+                self._migrated = True
+
+    def migrate(self) -> int:
+        """Import the legacy agent_context.json; returns the number of tickers written."""
+        legacy = self.legacy_path
+        if legacy is None or not legacy.exists():
+            return 0
+        st = legacy.stat()
+        stamp = {"mtime": st.st_mtime, "size": st.st_size}
+        marker = self.root / _MIGRATED_FILE
+        try:
+            with open(marker) as f:
+                if json.load(f) == stamp:
+                    return 0
+        except (OSError, ValueError):
+            pass
+
+        with open(legacy, "r") as f:
+            context = json.load(f)
+        written = 0
+        for ticker, data in (context.get("stocks") or {}).items():
+            if not self._path(ticker).exists():
+                self._write(ticker, data)
+                written += 1
+        if context.get("wall_street_breakfast") and not self._path(_WSB_KEY).exists():
+            self._write(_WSB_KEY, context["wall_street_breakfast"])
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = marker.with_name(marker.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(stamp, f)
+        os.replace(tmp, marker)
+        logger.info(f"[SA Store] Migrated {written} tickers from {legacy} into {self.root}")
+        return written
@@ -2,55 +2,44 @@ import os
 import json
 import logging
 import google.generativeai as genai
+import random
 import requests
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 
+from requests.adapters import HTTPAdapter
+
+from app.services.sa_content_cleaner import (  # noqa: F401  (strip_financial_tables re-exported)
+    CleanCache, clean_html, looks_unclean, strip_financial_tables,
+)
+from app.services.sa_context_store import SAContextStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-import re as _re
-
-_TABLE_NUM_RE = _re.compile(r"\(?\$?\d{1,3}(?:,\d{3})+(?:\.\d+)?\)?|\(?\$?\d{3,}(?:\.\d+)?\)?")
-
-
-def _is_financial_table_line(line: str) -> bool:
-    """A balance-sheet/income-statement row: >=2 large number tokens and at
-    most a short label of words ('Operating lease right-of-use assets 1,033
-    1,019'). Prose sentences with a couple of figures don't match."""
-    s = line.strip()
-    if not s:
-        return False
-    if len(_TABLE_NUM_RE.findall(s)) < 2:
-        return False
-    words = [w for w in _TABLE_NUM_RE.sub(" ", s).split() if any(c.isalpha() for c in w)]
-    return len(words) <= 8
-
-
-def strip_financial_tables(text: str, min_run: int = 5) -> str:
-    """Collapse runs of raw financial-statement rows (the balance-sheet dumps
-    in SA press releases) into a single placeholder. Article prose passes
-    through untouched."""
-    if not text:
-        return text
-    lines = text.split("\n")
-    out, i, n = [], 0, len(lines)
-    while i < n:
-        if _is_financial_table_line(lines[i]):
-            j, count, last_table = i, 0, i
-            while j < n and (_is_financial_table_line(lines[j]) or not lines[j].strip()):
-                if _is_financial_table_line(lines[j]):
-                    count, last_table = count + 1, j
-                j += 1
-            if count >= min_run:
-                out.append("[financial statement table omitted]")
-                i = last_table + 1
-                continue
-        out.append(lines[i])
-        i += 1
-    return "\n".join(out)
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across all threads."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
 class SeekingAlphaService:
@@ -71,6 +60,16 @@ class SeekingAlphaService:
             logger.warning("RAPIDAPI_KEY_SEEKING_ALPHA not found. Dynamic fetching disabled.")
 
         self.wsb_cache_dir = "data/wall_street_breakfast"
+        # Per-ticker store of fetched items (replaces experiment_data/agent_context.json).
+        self.context_store = SAContextStore()
+        # Cleaned article text by content hash, so each body is cleaned once.
+        self.clean_cache = CleanCache()
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._rate_limiter = _RateLimiter(self._RATE_LIMIT_PER_SEC)
+        self._latency: Dict[str, Dict[str, Any]] = {}
+        self._latency_lock = threading.Lock()
 
     def _get_or_fetch_wsb(self) -> List[Dict]:
         """
@@ -112,7 +111,7 @@ class SeekingAlphaService:
     # _call_endpoint resilience policy (May 2026):
     #   - Always set a wall-clock timeout so a stalled RapidAPI edge can't
     #     hang the whole agent.
-    #   - Retry once with a 2s backoff on transient classes only:
+    #   - Retry once with a ~2s backoff (plus jitter, below) on transient classes only:
     #       * requests.Timeout / ConnectionError
     #       * HTTP 429 (rate limit — short backoff often clears it)
     #       * HTTP 5xx (server-side blip)
@@ -122,9 +121,74 @@ class SeekingAlphaService:
     #     recover from a backoff).
     #   - Log the cause distinctly so we can see in the dashboard whether
     #     RapidAPI is rate-limiting us or genuinely returning nothing.
+    #
+    # Connection reuse and concurrency (Oct 2026):
+    #   - One requests.Session per service whose adapter pools up to
+    #     _DETAIL_WORKERS connections to the RapidAPI host, so a cold ticker's
+    #     ~15 calls reuse TLS connections instead of handshaking each time.
+    #   - fetch_data_for_ticker runs the three list calls, then every detail
+    #     call, on a pool of _DETAIL_WORKERS threads.
+    #   - Every request, from any thread, first waits for a slot from a shared
+    #     limiter (_RATE_LIMIT_PER_SEC, the RapidAPI plan's rate). That
+    #     replaces the old fixed 0.2s sleep between detail calls.
+    #   - The retry backoff adds up to _RETRY_JITTER_SEC of random jitter so
+    #     parallel calls that hit the same 429 don't retry in lockstep.
+    #   - latency_stats() reports per-endpoint call counts, failures and
+    #     p50/p95/max latency over the last _LATENCY_WINDOW attempts.
     _ENDPOINT_TIMEOUT_SEC = 10
     _RETRY_BACKOFF_SEC = 2
+    _RETRY_JITTER_SEC = 1.0
     _TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+    _RATE_LIMIT_PER_SEC = float(os.getenv("SA_RATE_LIMIT_PER_SEC", "5"))
+    _DETAIL_WORKERS = int(os.getenv("SA_DETAIL_WORKERS", "4"))
+    _LATENCY_WINDOW = 200
+    # The LLM cleanup pass is an opt-in fallback for bodies the local
+    # pipeline leaves with markup in them; off by default.
+    _LLM_CLEANING = os.getenv("SA_LLM_CLEANING", "").lower() in ("1", "true", "yes")
+
+    def _get_session(self) -> requests.Session:
+        """The service's pooled HTTP session, created on first use."""
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, self._DETAIL_WORKERS))
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "x-rapidapi-key": self.rapidapi_key,
+                    "x-rapidapi-host": self.rapidapi_host,
+                })
+                self._session = session
+            return self._session
+
+    def _backoff(self) -> float:
+        return self._RETRY_BACKOFF_SEC + random.uniform(0, self._RETRY_JITTER_SEC)
+
+    def _record_latency(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._latency_lock:
+            entry = self._latency.setdefault(
+                endpoint, {"calls": 0, "failures": 0, "samples": deque(maxlen=self._LATENCY_WINDOW)}
+            )
+            entry["calls"] += 1
+            entry["failures"] += 0 if ok else 1
+            entry["samples"].append(seconds)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per endpoint: HTTP attempts, failed attempts and p50/p95/max latency (ms)."""
+        out = {}
+        with self._latency_lock:
+            for endpoint, entry in self._latency.items():
+                samples = sorted(entry["samples"])
+                if not samples:
+                    continue
+                pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+                out[endpoint] = {
+                    "calls": entry["calls"],
+                    "failures": entry["failures"],
+                    "p50_ms": round(pick(0.5), 1),
+                    "p95_ms": round(pick(0.95), 1),
+                    "max_ms": round(samples[-1] * 1000, 1),
+                }
+        return out
 
     def _call_endpoint(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         """Helper to call RapidAPI endpoint, with one transient-error retry."""
@@ -132,32 +196,35 @@ class SeekingAlphaService:
             return None
 
         url = f"https://{self.rapidapi_host}/{endpoint}"
-        headers = {
-            "x-rapidapi-key": self.rapidapi_key,
-            "x-rapidapi-host": self.rapidapi_host,
-        }
+        session = self._get_session()
 
         last_exc = None
         for attempt in (1, 2):
+            self._rate_limiter.wait()
+            started = time.perf_counter()
             try:
-                response = requests.get(
-                    url, headers=headers, params=params,
+                response = session.get(
+                    url, params=params,
                     timeout=self._ENDPOINT_TIMEOUT_SEC,
                 )
             except (requests.Timeout, requests.ConnectionError) as e:
+                self._record_latency(endpoint, time.perf_counter() - started, ok=False)
                 last_exc = e
                 if attempt == 1:
-                    logger.info(f"[SA] {endpoint} {type(e).__name__} on attempt 1; retrying in {self._RETRY_BACKOFF_SEC}s")
-                    time.sleep(self._RETRY_BACKOFF_SEC)
+                    backoff = self._backoff()
+                    logger.info(f"[SA] {endpoint} {type(e).__name__} on attempt 1; retrying in {backoff:.1f}s")
+                    time.sleep(backoff)
                     continue
                 logger.error(f"[SA] {endpoint} failed both attempts: {e}")
                 return None
 
             status = response.status_code
+            self._record_latency(endpoint, time.perf_counter() - started, ok=status < 400)
             if status in self._TRANSIENT_STATUS:
                 if attempt == 1:
-                    logger.info(f"[SA] {endpoint} HTTP {status} on attempt 1; retrying in {self._RETRY_BACKOFF_SEC}s")
-                    time.sleep(self._RETRY_BACKOFF_SEC)
+                    backoff = self._backoff()
+                    logger.info(f"[SA] {endpoint} HTTP {status} on attempt 1; retrying in {backoff:.1f}s")
+                    time.sleep(backoff)
                     continue
                 logger.error(f"[SA] {endpoint} HTTP {status} on attempt 2; giving up")
                 return None
@@ -220,23 +287,33 @@ class SeekingAlphaService:
             "press_releases": []
         }
         
-        # Helper to fetch list -> fetch details
-        def fetch_category(list_endpoint, detail_endpoint, category):
-            params = {"id": ticker, "size": 4}
-            # PR list uses 'id' but sometimes we used numeric ID. Lets stick to ticker first.
-            if category == "press_releases":
-                 # PR endpoint might be sensitive, try ticker first
-                 pass
-            
-            list_resp = self._call_endpoint(list_endpoint, params)
-            if not list_resp or 'data' not in list_resp:
-                return
-            
-            items = list_resp['data'][:4]
-            for item in items:
-                item_id = item.get('id')
-                # Detail fetch
-                details = self._call_endpoint(detail_endpoint, {"id": item_id})
+        categories = [
+            # (category, list endpoint, detail endpoint)
+            ("analysis", "analysis/v2/list", "analysis/v2/get-details"),
+            ("news", "news/v2/list-by-symbol", "news/get-details"),
+            ("press_releases", "press-releases/v2/list", "press-releases/get-details"),
+        ]
+        started = time.perf_counter()
+
+        # List calls first, then every detail call, on one bounded pool; the
+        # shared rate limiter keeps the whole fan-out under the provider's limit.
+        with ThreadPoolExecutor(max_workers=max(1, self._DETAIL_WORKERS)) as pool:
+            lists = list(pool.map(
+                lambda c: self._call_endpoint(c[1], {"id": ticker, "size": 4}), categories
+            ))
+            detail_jobs = []
+            for (category, _, detail_endpoint), list_resp in zip(categories, lists):
+                if not list_resp or 'data' not in list_resp:
+                    continue
+                for item in list_resp['data'][:4]:
+                    detail_jobs.append((
+                        category,
+                        pool.submit(self._call_endpoint, detail_endpoint, {"id": item.get('id')}),
+                    ))
+
+            # Collected in submission order, so each category keeps the list's order.
+            for category, job in detail_jobs:
+                details = job.result()
                 if details:
                     # Extract useful fields immediately
                     attrs = details.get('data', {}).get('attributes', {})
@@ -245,17 +322,9 @@ class SeekingAlphaService:
                         "publishOn": attrs.get('publishOn'),
                         "content": attrs.get('content')
                     })
-                time.sleep(0.2) # Soft rate limit protection
 
-        # 1. Analysis
-        fetch_category("analysis/v2/list", "analysis/v2/get-details", "analysis")
-        
-        # 2. News
-        fetch_category("news/v2/list-by-symbol", "news/get-details", "news")
-        
-        # 3. Press Releases
-        fetch_category("press-releases/v2/list", "press-releases/get-details", "press_releases")
-        
+        print(f"  > [Seeking Alpha Service] {ticker}: {len(categories) + len(detail_jobs)} calls "
+              f"in {time.perf_counter() - started:.1f}s")
         return fetched_data
 
     def fetch_wall_street_breakfast(self) -> List[Dict]:
@@ -296,24 +365,12 @@ class SeekingAlphaService:
         return fetched_items
 
     def _save_fetched_data(self, ticker: Optional[str], data: Any, type: str = "stock"):
-        """Updates the local JSON cache with new data."""
+        """Stores newly fetched data in the per-ticker context store."""
         try:
-            path = "experiment_data/agent_context.json"
-            
-            if os.path.exists(path):
-                with open(path, "r") as f:
-                    context = json.load(f)
-            else:
-                context = {"stocks": {}, "wall_street_breakfast": []}
-                
             if type == "stock" and ticker:
-                context["stocks"][ticker] = data
+                self.context_store.put(ticker, data)
             elif type == "wsb":
-                context["wall_street_breakfast"] = data
-            
-            with open(path, "w") as f:
-                json.dump(context, f, indent=2)
-                
+                self.context_store.put_wsb(data)
         except Exception as e:
             logger.error(f"Failed to save fetched data: {e}")
 
@@ -323,18 +380,8 @@ class SeekingAlphaService:
         If data is missing/stale, it fetches it dynamically.
         """
         try:
-            # 1. Attempt to load existing data
-            sa_path = "experiment_data/agent_context.json"
-            
-            # Helper to load context
-            def load_context():
-                if os.path.exists(sa_path):
-                    with open(sa_path, "r") as f:
-                        return json.load(f)
-                return {"stocks": {}, "wall_street_breakfast": []}
-
-            data = load_context()
-            stock_data = data.get("stocks", {}).get(ticker)
+            # 1. Attempt to load existing data (one small per-ticker read)
+            stock_data = self.context_store.get(ticker)
 
             # 2. If missing, FETCH dynamically (Stock Data)
             if not stock_data:
@@ -343,12 +390,11 @@ class SeekingAlphaService:
                     stock_data = self.fetch_data_for_ticker(ticker)
                     if stock_data: 
                         self._save_fetched_data(ticker, stock_data, type="stock")
-                        data = load_context() 
                 else:
                     msg = "Seeking Alpha Data: Not Available (Missing API Key)"
                     # We continue to check WSB even if stock data failed, though unlikely if key is missing.
                     # But returning early is safer for clarity.
-                    if not data.get("wall_street_breakfast"): # If both missing
+                    if not self.context_store.get_wsb(): # If both missing
                          return msg
 
             # 3. Get WSB via daily cache (fetches from API at most once/day)
@@ -430,7 +476,7 @@ class SeekingAlphaService:
                     raw_content = item.get('content', '')
                     
                     # AI Cleaning (even for news, often contains HTML)
-                    cleaned_content = self._clean_content_with_ai(raw_content, context=f"News: {title}")
+                    cleaned_content = self._clean_content_with_ai(raw_content, context=f"News: {title}", kind="news")
                     
                     evidence += f"- **{title}** ({date})\n"
                     evidence += f"  {cleaned_content}\n\n"
@@ -491,18 +537,7 @@ class SeekingAlphaService:
         Triggers fetch if data is missing.
         """
         try:
-            # Same path logic
-            sa_path = "experiment_data/agent_context.json"
-            
-            # Helper to load
-            def load_context():
-                if os.path.exists(sa_path):
-                    with open(sa_path, "r") as f:
-                        return json.load(f)
-                return {"stocks": {}, "wall_street_breakfast": []}
-
-            data = load_context()
-            stock_data = data.get("stocks", {}).get(ticker, {})
+            stock_data = self.context_store.get(ticker) or {}
             
             # Dynamic Fetch Trigger
             if not stock_data:
@@ -512,8 +547,6 @@ class SeekingAlphaService:
                      stock_data = self.fetch_data_for_ticker(ticker)
                      if stock_data:
                          self._save_fetched_data(ticker, stock_data)
-                         data = load_context() # Reload
-                         stock_data = data.get("stocks", {}).get(ticker, {})
             
             analysis_count = len(stock_data.get("analysis", []))
             news_count = len(stock_data.get("news", []))
@@ -602,70 +635,51 @@ class SeekingAlphaService:
     def _clean_html(self, content: str) -> str:
         """
         Cleans HTML/Ads from text using standard parsing (No AI).
-        Preserves content length/integrity but removes tags and noise.
+        See app/services/sa_content_cleaner.py for the pipeline.
         """
         if not content:
             return ""
-            
         try:
-            # 1. Regex Clean for common junk
-            import re
-            
-            # Remove scripts and styles
-            content = re.sub(r'<(script|style).*?</\1>', '', content, flags=re.DOTALL)
-            
-            # Remove attributes but keep some tags? No, easier to just strip all tags for raw text
-            # Or use a simple heuristic to preserve structure.
-            
-            # 2. BeautifulSoup Text Extraction (Smart Structure)
-            from bs4 import BeautifulSoup
-            # Use 'lxml' if available, else 'html.parser'
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Remove script/style/ads
-            for tag in soup(["script", "style", "noscript", "iframe", "header", "footer", "nav", "aside"]):
-                tag.decompose()
-                
-            # Remove ad containers
-            for div in soup.find_all("div", class_=lambda x: x and ('ad-container' in x or 'advertisement' in x)):
-                div.decompose()
-
-            # Strategy: Inject newlines after block elements, then use get_text with space separator
-            block_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'li', 'article', 'section', 'blockquote']
-            for tag in soup.find_all(block_tags):
-                tag.insert_after('\n')
-                
-            # Handle <br> explicitly
-            for br in soup.find_all('br'):
-                br.replace_with('\n')
-
-            # Get text with space separator (handles inline tags like <span>, <a>, <b>)
-            text = soup.get_text(separator=' ')
-            
-            # Post-processing cleanup
-            import re
-            # 1. Collapse multiple spaces into one
-            text = re.sub(r'[ \t]+', ' ', text)
-            # 2. Fix spaces before punctuation (artifact of tag stripping)
-            # text = re.sub(r'\s+([.,])', r'\1', text) # Risky if code points exist
-            
-            # 3. Collapse multiple newlines (created by block injection) into max 2
-            text = re.sub(r'\n\s*\n', '\n\n', text)
-
-            # 4. Drop raw financial-statement dumps (balance sheets, cash-flow
-            # tables in press releases) — pure token noise for the agents.
-            text = strip_financial_tables(text)
-
-            return text.strip()
-            
+            return clean_html(content)
         except Exception as e:
             logger.error(f"Error cleaning content: {e}")
             return content
 
-    def _clean_content_with_ai(self, content: str, context: str = "") -> str:
+    def _clean_content_with_ai(self, content: str, context: str = "", kind: str = "article") -> str:
         """
-        Legacy name adapter to _clean_html to avoid breaking callsites.
+        Cleans an article body with the local pipeline, cached by content hash.
+        The LLM pass only runs when SA_LLM_CLEANING is set and the local
+        output still carries markup. Failed cleans are never cached.
         """
-        return self._clean_html(content)
+        if not content:
+            return ""
+        try:
+            cleaned = self.clean_cache.get_or_compute(
+                f"local:{kind}", content, lambda: clean_html(content, kind)
+            )
+        except Exception as e:
+            logger.error(f"Error cleaning content ({context}): {e}")
+            return content
+        if self._LLM_CLEANING and self.flash_model and looks_unclean(cleaned):
+            llm_cleaned = self.clean_cache.get_or_compute(
+                f"llm:{kind}", content, lambda: self._clean_with_llm(cleaned, context)
+            )
+            return llm_cleaned or cleaned
+        return cleaned
+
+    def _clean_with_llm(self, text: str, context: str = "") -> Optional[str]:
+        """One flash-model cleanup call; None on failure (the caller keeps the local text)."""
+        prompt = (
+            "Remove any leftover HTML tags, entities, ads and navigation text from the "
+            "article below. Do not summarize, shorten or reword the article itself; "
+            "return only the cleaned text.\n\n"
+            f"Article ({context}):\n{text}"
+        )
+        try:
+            response = self.flash_model.generate_content(prompt)
+            return (response.text or "").strip() or None
+        except Exception as e:
+            logger.error(f"LLM cleaning failed for {context}: {e}")
+            return None
 
 seeking_alpha_service = SeekingAlphaService()
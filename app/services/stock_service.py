@@ -79,7 +79,7 @@ MIN_AVG_VOLUME = 100_000
 # the backfill net skipped them, so they never got a verdict.
 # `?` binds the date string (YYYY-MM-DD).
 MISSING_DR_WHERE = """
-    date(timestamp) = ?
+    decision_date = ?
     AND (recommendation IN ('BUY', 'BUY_LIMIT')
          OR (pre_gate_action IN ('BUY', 'BUY_LIMIT')
              AND gates_fired IS NOT NULL AND gates_fired != ''))
@@ -855,9 +855,9 @@ class StockService:
         """
         print("\n[Backfill] Checking for outstanding Deep Research candidates...")
         try:
-            conn = sqlite3.connect(os.getenv("DB_PATH", "subscribers.db"))
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            from app.database import get_connection
+            cursor = get_connection(os.getenv("DB_PATH", "subscribers.db")).cursor()
+            cursor.row_factory = sqlite3.Row
 
             # Candidates: same date, any buy-side verdict still missing a DR
             # verdict. The WHERE clause mirrors _should_trigger_deep_research
@@ -867,7 +867,6 @@ class StockService:
                 (date_str,),
             )
             rows = cursor.fetchall()
-            conn.close()
 
             candidates = [dict(row) for row in rows]
 
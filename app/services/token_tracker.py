@@ -1,27 +1,183 @@
 # app/services/token_tracker.py
 """
-Persists one row per Gemini API call to `agent_token_usage` and rolls
-up per-decision totals onto `decision_points`.
+Persists one row per Gemini API call to `agent_token_usage` and keeps
+per-decision totals on `decision_points` up to date.
 
-Thread-safety: every call opens its own short-lived sqlite3 connection
-and closes it after a single INSERT (or UPDATE for the rollup). WAL
-mode (enabled in init_db) serializes writes via the WAL file rather
-than locking the whole DB, so concurrent calls from the 5-sensor and
-3-debate ThreadPoolExecutors land cleanly.
+Writes are buffered: `record_llm_call` only appends to an in-memory queue,
+and a background thread drains it every TOKEN_USAGE_FLUSH_INTERVAL_S (or
+as soon as TOKEN_USAGE_MAX_BATCH rows are pending) in one transaction per
+DB: an `executemany` INSERT plus one incremental UPDATE of the total_*
+columns per decision touched. The 5-sensor and 3-debate pools therefore
+never wait on SQLite. `flush()` drains synchronously; it runs on decision
+finalization (`rollup_decision_totals`, which also recomputes that
+decision's totals from scratch), on app shutdown and at exit.
+
+A batch that fails to write (e.g. the DB is locked) goes back on the queue
+and is retried on the next drain, up to TOKEN_USAGE_MAX_ATTEMPTS tries per
+row; at most TOKEN_USAGE_MAX_RETRY_ROWS rows are held for retry, oldest
+dropped first. Dropped rows are logged as errors.
 
 Note on DB_NAME lookup: we deliberately reference `app.database.DB_NAME`
 via the module (not `from app.database import DB_NAME`) so that test
 fixtures can `monkeypatch.setattr(app.database, "DB_NAME", tmp_path)`
-without needing a module reload.
+without needing a module reload. The path is captured when the call is
+recorded, so a queued row always lands in the DB it was recorded against.
 """
+import atexit
 import logging
-import sqlite3
+import os
+import threading
+from collections import defaultdict
 
 import app.database as _db
 from app.services.token_pricing import compute_cost
 
 logger = logging.getLogger(__name__)
 
+FLUSH_INTERVAL_S = float(os.getenv("TOKEN_USAGE_FLUSH_INTERVAL_S", "2.0"))
+MAX_BATCH = int(os.getenv("TOKEN_USAGE_MAX_BATCH", "200"))
+MAX_ATTEMPTS = int(os.getenv("TOKEN_USAGE_MAX_ATTEMPTS", "3"))
+MAX_RETRY_ROWS = int(os.getenv("TOKEN_USAGE_MAX_RETRY_ROWS", "5000"))
+
+
+def _write_batch(db_path: str, rows: list) -> None:
+    """Insert usage rows and add their sums to the decision totals, atomically."""
+    # decision_id -> [tokens_in, tokens_out, cost or None, calls]
+    deltas = defaultdict(lambda: [0, 0, None, 0])
+    for row in rows:
+        d = deltas[row[0]]
+        d[0] += row[6] or 0
+        d[1] += row[7] or 0
+        if row[8] is not None:
+            d[2] = (d[2] or 0.0) + row[8]
+        d[3] += 1
+
+    with _db.transaction(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO agent_token_usage
+              (decision_id, ticker, run_date, stage, agent_name,
+               model, tokens_in, tokens_out, cost_usd)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        # Mirrors SUM() semantics of a full re-aggregation: NULL costs are
+        # skipped, and total_cost_usd stays NULL until a priced call lands.
+        conn.executemany(
+            """
+            UPDATE decision_points
+            SET total_tokens_in  = COALESCE(total_tokens_in, 0) + ?,
+                total_tokens_out = COALESCE(total_tokens_out, 0) + ?,
+                total_cost_usd   = CASE WHEN ? IS NULL THEN total_cost_usd
+                                        ELSE COALESCE(total_cost_usd, 0) + ? END,
+                total_llm_calls  = COALESCE(total_llm_calls, 0) + ?
+            WHERE id = ?
+            """,
+            [(d[0], d[1], d[2], d[2], d[3], decision_id) for decision_id, d in deltas.items()],
+        )
+
+
+class _UsageWriter:
+    """Background batcher for agent_token_usage rows."""
+
+    def __init__(self, interval_s: float = FLUSH_INTERVAL_S, max_batch: int = MAX_BATCH):
+        self.interval_s = interval_s
+        self.max_batch = max_batch
+        self._pending = []  # (db_path, row, failed attempts)
+        self._fresh = 0  # rows put since the last drain; retries don't count
+        self._cond = threading.Condition()
+        self._drain_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+    def put(self, db_path: str, row: tuple) -> None:
+        with self._cond:
+            self._pending.append((db_path, row, 0))
+            self._fresh += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="token-usage-writer", daemon=True
+                )
+                self._thread.start()
+            if self._fresh >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or self._fresh >= self.max_batch,
+                    timeout=self.interval_s,
+                )
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of rows written."""
+        with self._drain_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                self._fresh = 0
+            if not batch:
+                return 0
+            by_db = defaultdict(list)
+            for db_path, row, attempts in batch:
+                by_db[db_path].append((row, attempts))
+            written = 0
+            retry = []
+            for db_path, entries in by_db.items():
+                if not os.path.exists(db_path):
+                    logger.warning("token usage: DB %s is gone, dropping %d rows",
+                                   db_path, len(entries))
+                    continue
+                try:
+                    _write_batch(db_path, [row for row, _ in entries])
+                    written += len(entries)
+                except Exception as e:
+                    again = [(db_path, row, n + 1) for row, n in entries if n + 1 < MAX_ATTEMPTS]
+                    logger.warning("token usage flush failed for %d rows (%s): %s; %d re-queued",
+                                   len(entries), db_path, e, len(again))
+                    if len(again) < len(entries):
+                        logger.error("token usage: dropping %d rows for %s after %d attempts",
+                                     len(entries) - len(again), db_path, MAX_ATTEMPTS)
+                    retry += again
+            if retry:
+                self._requeue(retry)
+            return written
+
+    def _requeue(self, rows: list) -> None:
+        """Put failed rows back ahead of newer ones, keeping at most MAX_RETRY_ROWS."""
+        if len(rows) > MAX_RETRY_ROWS:
+            logger.error("token usage: retry queue full, dropping %d oldest rows",
+                         len(rows) - MAX_RETRY_ROWS)
+            rows = rows[-MAX_RETRY_ROWS:]
+        with self._cond:
+            self._pending[:0] = rows
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+        left = self.pending()
+        if left:
+            logger.error("token usage: %d rows still unwritten at shutdown", left)
+
+
+_writer = _UsageWriter()
+atexit.register(_writer.shutdown)
+
 
 def record_llm_call(
     *,
@@ -34,26 +190,16 @@ def record_llm_call(
     tokens_in: int,
     tokens_out: int,
 ) -> None:
-    """Insert one row into agent_token_usage. Failures are logged, not raised —
+    """Queue one agent_token_usage row. Failures are logged, not raised —
     cost tracking must never break the live pipeline.
     """
     try:
         cost = compute_cost(model, tokens_in, tokens_out)
-        conn = sqlite3.connect(_db.DB_NAME)
-        try:
-            conn.execute(
-                """
-                INSERT INTO agent_token_usage
-                  (decision_id, ticker, run_date, stage, agent_name,
-                   model, tokens_in, tokens_out, cost_usd)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (decision_id, ticker, run_date, stage, agent_name,
-                 model, tokens_in, tokens_out, cost),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        _writer.put(
+            _db.DB_NAME,
+            (decision_id, ticker, run_date, stage, agent_name,
+             model, tokens_in, tokens_out, cost),
+        )
     except Exception as e:
         logger.warning(
             "record_llm_call failed for %s/%s (%s): %s",
@@ -61,13 +207,28 @@ def record_llm_call(
         )
 
 
+def flush() -> int:
+    """Synchronously write all queued usage rows (and their totals)."""
+    return _writer.flush()
+
+
+def shutdown() -> None:
+    """Stop the background writer after a final flush."""
+    _writer.shutdown()
+
+
 def rollup_decision_totals(decision_id: int) -> None:
-    """Recompute the four denormalized total_* columns on decision_points
-    from agent_token_usage. Idempotent — safe to re-run.
+    """Make the total_* columns on decision_points current for decision_id.
+
+    Flushes the queue, then recomputes the four totals for this one
+    decision from agent_token_usage. The incremental updates keep them
+    current between rollups; the recompute heals any drift (and rows
+    inserted before totals were maintained incrementally) once the
+    decision is finalized. Idempotent — safe to re-run.
     """
     try:
-        conn = sqlite3.connect(_db.DB_NAME)
-        try:
+        _writer.flush()
+        with _db.transaction(_db.DB_NAME) as conn:
             conn.execute(
                 """
                 UPDATE decision_points
@@ -83,9 +244,6 @@ def rollup_decision_totals(decision_id: int) -> None:
                 """,
                 (decision_id, decision_id, decision_id, decision_id, decision_id),
             )
-            conn.commit()
-        finally:
-            conn.close()
     except Exception as e:
         logger.warning("rollup_decision_totals failed for decision_id=%s: %s",
                        decision_id, e)
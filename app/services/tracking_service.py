@@ -10,7 +10,7 @@ class TrackingService:
         """
         Fetches all recorded decisions and adds a new price point to the tracking history.
         """
-        decisions = get_decision_points()
+        decisions = get_decision_points(["id", "symbol"])
         if not decisions:
             logger.info("No decisions found to track.")
             return
@@ -7,26 +7,28 @@ Output 1 (tables) reuses scripts/analysis/verdict_performance.py verbatim.
 Output 2 (charts) plots equal-weight cumulative-basket returns vs an SPY
 buy-and-hold reference, entering each position at its DB price_at_decision.
 
-Downloaded Yahoo prices are cached to ``data/price_cache.pkl`` (gitignored) and
-reused within the same calendar day, so repeated runs don't re-download. Pass
-``refresh=True`` (CLI: ``--refresh-prices``) to force a fresh download.
+Prices come from the local price store (app.services.analytics.price_cache,
+``data/price_cache/``, gitignored): repeated runs only download bars the store
+has not seen yet. Pass ``refresh=True`` (CLI: ``--refresh-prices``) to force a
+fresh download.
 """
 
 from __future__ import annotations
 
-import os
-import pickle
 import re
 import warnings
-from datetime import date, datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 # yfinance on pandas 2.3+ emits a Timestamp.utcnow deprecation warning once per
 # downloaded ticker — hundreds of lines of noise in this console report. Silence it.
 warnings.filterwarnings("ignore", message=r".*Timestamp\.utcnow is deprecated.*")
 
+from app.services.analytics import price_cache
 from scripts.analysis.verdict_performance import (
     BENCHMARK,
     INTENT_LABEL,
@@ -36,89 +38,24 @@ from scripts.analysis.verdict_performance import (
     fetch_prices,
     load_decisions,
     render_console,
+    window_returns,
 )
 
 WINDOWS: List[int] = [2, 4, 12]
 MIN_N: int = 3  # match verdict_performance.py default
 
-_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-CACHE_PATH = os.path.join(_ROOT, "data", "price_cache.pkl")
-
-
-def _load_cache() -> Optional[dict]:
-    """Load the on-disk price cache, or None if absent/unreadable."""
-    if not os.path.exists(CACHE_PATH):
-        return None
-    try:
-        with open(CACHE_PATH, "rb") as fh:
-            return pickle.load(fh)
-    except Exception:  # noqa: BLE001 — a corrupt cache should never crash the report
-        return None
-
-
-def _save_cache(as_of: str, start_iso: str, prices: Dict[str, pd.Series],
-                failed: set) -> None:
-    """Persist the merged price set atomically (tmp file + os.replace)."""
-    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
-    obj = {
-        "as_of": as_of,
-        "start": start_iso,
-        "prices": pd.DataFrame(prices),  # aligns Series on the union of dates
-        "failed": sorted(failed),
-    }
-    tmp = CACHE_PATH + ".tmp"
-    with open(tmp, "wb") as fh:
-        pickle.dump(obj, fh)
-    os.replace(tmp, CACHE_PATH)
-
 
 def fetch_prices_cached(symbols, start, end, refresh: bool = False) -> Dict[str, pd.Series]:
-    """`fetch_prices` with a same-day disk cache keyed on the download date.
-
-    The cache (``data/price_cache.pkl``) is reused as long as it was written today
-    and covers the requested start date. Symbols already present are served from
-    cache; only genuinely new tickers are downloaded and merged in. Tickers that
-    failed to download today are remembered (negative cache) so the ~500 delisted/
-    foreign symbols aren't retried every run. A new day, a wider date range, or
-    ``refresh=True`` triggers a full re-download.
-    """
-    needed = sorted(set(symbols) | {BENCHMARK})
-    today = date.today().isoformat()
-    start_norm = pd.Timestamp(start).normalize()
-
-    cache = None if refresh else _load_cache()
-    cache_ok = (
-        cache is not None
-        and cache.get("as_of") == today
-        and pd.Timestamp(cache.get("start")) <= start_norm
-    )
-
-    if cache_ok:
-        prices = {c: cache["prices"][c].dropna() for c in cache["prices"].columns}
-        failed = set(cache.get("failed", []))
-        have = set(prices)
-        new = [s for s in needed if s not in have and s not in failed]
-        if not new:
-            print(f"Using today's cached prices — {len(have)} symbols, no download needed "
-                  f"({CACHE_PATH}).")
-            return {s: prices[s] for s in needed if s in prices}
-        print(f"Price cache is fresh; downloading {len(new)} new symbol(s)...")
-        # cache["start"] is an ISO string; fetch_prices needs a datetime-like.
-        fetched = fetch_prices(new, pd.Timestamp(cache["start"]), end)
-        prices.update(fetched)
-        failed |= set(new) - set(fetched)
-        _save_cache(today, cache["start"], prices, failed)
-        return {s: prices[s] for s in needed if s in prices}
+    """`fetch_prices` backed by the local price store.
 
+    Each symbol's bars are kept on disk with the date range already checked,
+    so a repeat run downloads only new bars and new symbols. Symbols Yahoo
+    has nothing for are negative-cached so the ~500 delisted/foreign tickers
+    aren't retried every run. ``refresh=True`` re-downloads everything.
+    """
     if refresh:
-        print("Refreshing price cache (full re-download)...")
-    elif cache is not None:
-        print("Price cache is stale (new day or wider range) — re-downloading...")
-    fetched = fetch_prices(needed, start, end)
-    failed = set(needed) - set(fetched)
-    _save_cache(today, start_norm.isoformat(), fetched, failed)
-    print(f"Cached {len(fetched)} symbols to {CACHE_PATH}.")
-    return {s: fetched[s] for s in needed if s in fetched}
+        print("Refreshing price store (full re-download)...")
+    return fetch_prices(symbols, pd.Timestamp(start), pd.Timestamp(end), refresh=refresh)
 
 
 def parse_since(spec: str) -> datetime:
@@ -149,8 +86,42 @@ def parse_since(spec: str) -> datetime:
         ) from exc
 
 
+@dataclass
+class PriceGrid:
+    """Every symbol's closes on the benchmark's trading days, forward-filled once.
+
+    close[i, d] is symbols[i]'s last close on or before axis[d] (NaN before
+    its first bar) and seen[i, d] the axis position that close came from
+    (-1 before the first bar), so a later start date can drop values carried
+    in from before it.
+    """
+
+    axis: pd.DatetimeIndex
+    row: Dict[str, int]
+    close: np.ndarray
+    seen: np.ndarray
+
+
+def price_grid(prices: Dict[str, pd.Series], spy: pd.Series) -> PriceGrid:
+    """Align and forward-fill all of `prices` onto spy's index in one go."""
+    axis = spy.index
+    symbols = list(prices)
+    raw = np.full((len(symbols), len(axis)), np.nan)
+    for i, sym in enumerate(symbols):
+        raw[i] = prices[sym].reindex(axis).to_numpy(dtype=float)
+    seen = np.where(np.isnan(raw), -1, np.arange(len(axis)))
+    seen = np.maximum.accumulate(seen, axis=1) if len(axis) else seen
+    close = np.take_along_axis(raw, np.maximum(seen, 0), axis=1)
+    close[seen < 0] = np.nan
+    return PriceGrid(axis, {sym: i for i, sym in enumerate(symbols)}, close, seen)
+
+
 def build_basket_curves(
-    df: pd.DataFrame, prices: Dict[str, pd.Series], spy: pd.Series, intent_col: str
+    df: pd.DataFrame,
+    prices: Dict[str, pd.Series],
+    spy: pd.Series,
+    intent_col: str,
+    grid: Optional[PriceGrid] = None,
 ) -> dict:
     """Equal-weight cumulative-basket return per intent bucket over calendar time.
 
@@ -158,60 +129,53 @@ def build_basket_curves(
     clip(close_t / entry_price, 1±ROI_CLIP); plotted as (value-1)*100. entry_price
     is the row's price_at_decision; close_t is the yfinance close as-of t. The SPY
     reference is buy-and-hold normalized at the chart's start date.
-    """
-    axis = spy.index  # trading days we have benchmark prices for
-    bucket_positions: Dict[str, list] = {}
-    earliest = None
 
-    for intent in INTENT_ORDER:
-        sub = df[df[intent_col] == intent]
-        positions = []
-        for _, r in sub.iterrows():
-            s = prices.get(r["symbol"])
-            try:
-                entry_price = float(r["price_at_decision"])
-            except (TypeError, ValueError):
-                entry_price = float("nan")
-            if s is None or not (entry_price > 0):
-                continue
-            entry_ts = pd.Timestamp(r["date"]).normalize()
-            positions.append((entry_ts, entry_price, s))
-            if earliest is None or entry_ts < earliest:
-                earliest = entry_ts
-        if positions:
-            bucket_positions[intent] = positions
-
-    if not bucket_positions or earliest is None:
+    All positions are computed at once from `grid` (built from prices/spy when
+    not passed in, so callers charting several slices can share one).
+    """
+    if grid is None:
+        grid = price_grid(prices, spy)
+    entry_price = pd.to_numeric(df["price_at_decision"], errors="coerce").to_numpy(dtype=float)
+    rows = df["symbol"].map(grid.row)
+    keep = (
+        df[intent_col].isin(INTENT_ORDER).to_numpy()
+        & rows.notna().to_numpy()
+        & (entry_price > 0)
+    )
+    if not keep.any():
         return {"curves": {}, "spy_dates": [], "spy_vals": []}
 
-    axis = axis[axis >= earliest]
+    entry_ts = pd.DatetimeIndex(pd.to_datetime(df["date"])[keep]).normalize()
+    entry_price = entry_price[keep]
+    rows = rows[keep].to_numpy(dtype=int)
+    intents = df[intent_col].to_numpy()[keep]
+
+    start = int(grid.axis.searchsorted(entry_ts.min(), side="left"))
+    axis = grid.axis[start:]
+    entered = axis.searchsorted(entry_ts, side="left")  # first chart day each position is held
+
+    ratio = np.clip(grid.close[rows, start:] / entry_price[:, None], 1.0 - ROI_CLIP, 1.0 + ROI_CLIP)
+    held = (grid.seen[rows, start:] >= start) & (np.arange(len(axis)) >= entered[:, None])
+    ratio[~held] = np.nan
 
     curves: Dict[str, dict] = {}
-    for intent, positions in bucket_positions.items():
-        cols = {}
-        for i, (entry_ts, entry_price, s) in enumerate(positions):
-            reindexed = s.reindex(axis).ffill()
-            ratio = (reindexed / entry_price).clip(
-                lower=1.0 - ROI_CLIP, upper=1.0 + ROI_CLIP
-            )
-            ratio[axis < entry_ts] = float("nan")  # not entered yet
-            cols[i] = ratio
-        mat = pd.DataFrame(cols, index=axis)
-        counts = mat.count(axis=1)
-        basket = mat.mean(axis=1)
+    for intent in INTENT_ORDER:
+        in_bucket = intents == intent
+        if not in_bucket.any():
+            continue
+        counts = (~np.isnan(ratio[in_bucket])).sum(axis=0)
         mask = counts > 0
-        dates = list(axis[mask])
-        if not dates:
+        if not mask.any():
             continue
-        vals = list(((basket[mask] - 1.0) * 100.0).values)
+        basket = np.nansum(ratio[in_bucket][:, mask], axis=0) / counts[mask]
         curves[intent] = {
-            "dates": dates,
-            "vals": vals,
-            "final_n": int(counts[mask].iloc[-1]),
+            "dates": list(axis[mask]),
+            "vals": list((basket - 1.0) * 100.0),
+            "final_n": int(counts[mask][-1]),
         }
 
     spy_axis = spy.reindex(axis).ffill()
-    spy_start = float(spy_axis.iloc[0])
+    spy_start = float(spy_axis.iloc[0]) if len(spy_axis) else float("nan")
     spy_dates = list(axis)
     if not (spy_start > 0):
         spy_vals = [float("nan")] * len(spy_axis)
@@ -292,8 +256,10 @@ def run_visualization(since: Optional[str] = None, refresh_prices: bool = False)
     print(f"Have prices for {len(prices) - 1} / {df['symbol'].nunique()} symbols.\n")
 
     # ---- OUTPUT 1: alpha-vs-SPY tables (reuse verdict_performance) ----
-    council_tbl = build_table(df, prices, spy, WINDOWS, "council_intent")
-    dr_tbl = build_table(df, prices, spy, WINDOWS, "dr_intent")
+    # One pass over the price history serves all windows and both verdict columns.
+    returns = window_returns(df, prices, spy, WINDOWS)
+    council_tbl = build_table(df, prices, spy, WINDOWS, "council_intent", returns)
+    dr_tbl = build_table(df, prices, spy, WINDOWS, "dr_intent", returns)
     render_console(
         "COUNCIL / PM verdict — alpha vs SPY (market-on-decision entry)",
         council_tbl, WINDOWS, MIN_N,
@@ -306,11 +272,12 @@ def run_visualization(since: Optional[str] = None, refresh_prices: bool = False)
     print()
 
     # ---- OUTPUT 2: cumulative-return line charts ----
-    pm_payload = build_basket_curves(df, prices, spy, "council_intent")
+    grid = price_grid(prices, spy)
+    pm_payload = build_basket_curves(df, prices, spy, "council_intent", grid)
     render_basket_chart("Council / PM verdict — cumulative return vs SPY", pm_payload)
 
     dr_df = df[df["dr_intent"] != ""].copy()
-    dr_payload = build_basket_curves(dr_df, prices, spy, "dr_intent")
+    dr_payload = build_basket_curves(dr_df, prices, spy, "dr_intent", grid)
     render_basket_chart("Deep Research verdict — cumulative return vs SPY", dr_payload)
 
     print("\nFootnotes:")
@@ -319,4 +286,5 @@ def run_visualization(since: Optional[str] = None, refresh_prices: bool = False)
     print("  * SPY line = buy & hold from each chart's start date.")
     print("  * The pre-Apr 9 2026 stretch comes from the legacy DB (data/subscribers.db),")
     print("    an earlier regime of the tool.")
-    print(f"  * Prices cached at {CACHE_PATH} (reused same-day; --refresh-prices to refetch).")
+    print(f"  * Prices cached in {price_cache.CACHE_DIR} (only new bars are downloaded; "
+          "--refresh-prices to refetch).")
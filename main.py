@@ -124,6 +124,13 @@ async def startup_event_handler():
     if run_for_minutes:
         asyncio.create_task(run_shutdown_timer(run_for_minutes))
 
+@app.on_event("shutdown")
+async def shutdown_event_handler():
+    from app.services.pdf_render_service import pdf_render_service
+    from app.services import token_tracker
+    pdf_render_service.shutdown(wait=True)
+    token_tracker.shutdown()
+
 async def _interruptible_sleep(seconds: float) -> bool:
     """Sleep for up to `seconds`, returning True if shutdown was requested."""
     try:
@@ -171,7 +178,8 @@ async def run_periodic_check():
 
 async def run_trade_report_update():
     """
-    Updates the trade_report_full.csv every 60 minutes.
+    Updates the trade_report_full.csv every 60 minutes. Each run recomputes only
+    new, edited and still-open rows of the materialized trade_report table.
     """
     from scripts.core import generate_trade_report
     while not shutdown_event.is_set():
@@ -258,7 +266,7 @@ if __name__ == "__main__":
                              "cutoff — a window like 4w/30d/3m/1y or a date like 2026-04-09")
     parser.add_argument("--refresh-prices", action="store_true",
                         help="With --visualization: force a fresh price download, ignoring "
-                             "the same-day cache at data/price_cache.pkl")
+                             "the local price store in data/price_cache/")
     args = parser.parse_args()
 
     if args.enable_email:
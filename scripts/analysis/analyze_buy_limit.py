@@ -1,11 +1,15 @@
 import sqlite3
 import pandas as pd
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
+
 DB_NAME = os.getenv("DB_PATH", "data/subscribers.db")
 
 def get_limit_decisions():
@@ -30,10 +34,7 @@ def analyze_limit_performance(symbol, start_date_str, original_price, entry_pric
     """Iterate through the price history to find the exact trigger date and calculate ROIs."""
     try:
         start_date = datetime.strptime(start_date_str, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
-        end_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(start=start_date, end=end_date)
+        history = price_cache.get_bars(symbol, start_date, datetime.now(), adjusted=True)
         
         if history.empty:
             return None
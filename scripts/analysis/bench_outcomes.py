@@ -0,0 +1,98 @@
+"""Benchmark the vectorized outcome engine against the row-wise loop.
+
+Runs enrich_outcomes (ticker x bar matrix + searchsorted gathers) and the
+old per-decision compute_outcome loop on the same cohort, checks that the
+frames are identical, and prints timings.
+
+By default it uses the full live cohort (load_cohort(start_date=None)) and
+whatever bars are already in data/price_cache; tickers without cached bars
+are skipped rather than fetched. --synthetic N benchmarks N generated
+decisions over 400 tickers instead.
+
+Usage:
+    python -m scripts.analysis.bench_outcomes
+    python -m scripts.analysis.bench_outcomes --synthetic 20000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
+from app.services.analytics.cohort import load_cohort  # noqa: E402
+from app.services.analytics.outcomes import _enrich_outcomes_rowwise, enrich_outcomes  # noqa: E402
+
+
+def _synthetic(n, n_tickers=400, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2025-06-02", periods=260)
+    bars = {}
+    for i in range(n_tickers):
+        close = 50 * np.cumprod(1 + rng.normal(0, 0.025, len(idx)))
+        bars[f"T{i}"] = pd.DataFrame(
+            {"Open": close, "High": close * 1.015, "Low": close * 0.985, "Close": close}, index=idx
+        )
+    price = rng.uniform(20, 80, n)
+    lo = price * rng.uniform(0.9, 1.0, n)
+    cohort = pd.DataFrame({
+        "id": np.arange(n),
+        "symbol": [f"T{i}" for i in rng.integers(0, n_tickers, n)],
+        "price_at_decision": price,
+        "decision_date": idx[rng.integers(0, len(idx), n)],
+        "drop_percent": rng.uniform(-20, -5, n),
+        "intent": rng.choice(["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"], n),
+        "entry_price_low": lo,
+        "entry_price_high": lo * 1.03,
+    })
+    return cohort, bars
+
+
+def _live():
+    cohort = load_cohort(start_date=None)
+    bars = {}
+    for ticker in cohort["symbol"].astype(str).str.upper().unique():
+        cached = price_cache._read_cache(price_cache._cache_path(ticker))
+        if cached is not None and not cached.empty:
+            cached.index = pd.to_datetime(cached.index)
+            bars[ticker] = cached
+    return cohort, bars
+
+
+def _time(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="benchmark N generated decisions instead of the live cohort")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cohort, bars = _synthetic(args.synthetic) if args.synthetic else _live()
+    print(f"Cohort: {len(cohort)} decisions, {len(bars)} tickers with bars")
+    if cohort.empty:
+        return
+
+    loop_s, expected = _time(lambda: _enrich_outcomes_rowwise(cohort, bars), args.repeat)
+    vec_s, actual = _time(lambda: enrich_outcomes(cohort, bars), args.repeat)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    print("Outputs identical.")
+    print(f"  row-wise loop : {loop_s * 1000:9.1f} ms")
+    print(f"  vectorized    : {vec_s * 1000:9.1f} ms")
+    if vec_s > 0:
+        print(f"  speed-up      : {loop_s / vec_s:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
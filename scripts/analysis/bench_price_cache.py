@@ -0,0 +1,126 @@
+"""Benchmark bulk price_cache.prefetch against a per-ticker get_bars loop.
+
+Each scenario runs against a fresh temporary store:
+  cold     empty store, one year of bars for every ticker
+  partial  store already holds the year up to 10 days ago; only the tail
+           (and nothing for negative-cached tickers) should be fetched
+  warm     everything already on disk; no requests at all
+
+By default the cohort is the distinct symbols in decision_points (capped at
+--tickers) and downloads go to Yahoo. --synthetic replaces yf.download with
+a stand-in that sleeps --latency seconds per ticker (`threads` at a time, as
+yfinance does) and returns no data for 5% of tickers, so the numbers are
+reproducible offline.
+
+Usage:
+    python -m scripts.analysis.bench_price_cache --tickers 600
+    python -m scripts.analysis.bench_price_cache --synthetic --tickers 600 --latency 0.05
+"""
+import argparse
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
+
+
+def _fake_download(latency):
+    def download(tickers, start, end, threads=1, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        time.sleep(latency * math.ceil(len(tickers) / max(1, int(threads or 1))))
+        idx = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        frames = {}
+        for t in tickers:
+            if int(t[1:]) % 20 == 19:  # ~5% unknown to Yahoo
+                frames[t] = pd.DataFrame(np.nan, index=idx, columns=["Close"])
+                continue
+            rng = np.random.default_rng(int(t[1:]))
+            close = 50 * np.cumprod(1 + rng.normal(0, 0.02, len(idx)))
+            frames[t] = pd.DataFrame({
+                "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                "Adj Close": close, "Volume": 1000.0,
+            }, index=idx)
+        return pd.concat(frames, axis=1, names=["Ticker", "Price"])
+    return download
+
+
+def _cohort(n):
+    from app.services.analytics.cohort import load_cohort
+
+    symbols = load_cohort(start_date=None)["symbol"].astype(str).str.upper().unique()
+    return sorted(symbols)[:n]
+
+
+def _run(label, fn, workdir):
+    price_cache.CACHE_DIR = Path(workdir)
+    start = time.perf_counter()
+    fn()
+    return label, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=600)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="simulate Yahoo instead of downloading")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds per ticker request in --synthetic mode")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        price_cache.yf.download = _fake_download(args.latency)
+        tickers = [f"S{i}" for i in range(args.tickers)]
+    else:
+        tickers = _cohort(args.tickers)
+    end = pd.Timestamp.now().normalize()
+    start = end - pd.Timedelta(days=365)
+    earlier = end - pd.Timedelta(days=10)
+    print(f"Cohort: {len(tickers)} tickers, {start.date()} -> {end.date()} "
+          f"(chunk {price_cache.CHUNK_SIZE}, {price_cache.THREADS} threads)")
+
+    def loop(lo=start, hi=end):
+        for t in tickers:
+            price_cache.get_bars(t, lo, hi)
+
+    def bulk(lo=start, hi=end):
+        price_cache.prefetch(tickers, lo, hi)
+
+    root = tempfile.mkdtemp(prefix="bench_prices_")
+    results = []
+    try:
+        for name, fn in (("loop", loop), ("bulk", bulk)):
+            cold = os.path.join(root, f"{name}-cold")
+            results.append(_run(f"cold    {name}", fn, cold))
+            results.append(_run(f"warm    {name}", fn, cold))
+
+            partial = os.path.join(root, f"{name}-partial")
+            _run("", lambda: bulk(start, earlier), partial)
+            # Make the earlier fetch look old enough that its tail is re-checked.
+            for path in Path(partial).glob("*.parquet"):
+                df = pd.read_parquet(path)
+                df.attrs["coverage"]["fetched_at"] = earlier.isoformat()
+                df.to_parquet(path)
+            results.append(_run(f"partial {name}", fn, partial))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    timings = dict(results)
+    for label, seconds in sorted(results, key=lambda r: (r[0].split()[0], r[0])):
+        print(f"  {label:<14}: {seconds * 1000:10.1f} ms")
+    for scenario in ("cold", "partial", "warm"):
+        loop_s, bulk_s = timings[f"{scenario:<7} loop"], timings[f"{scenario:<7} bulk"]
+        if bulk_s > 0:
+            print(f"  {scenario} speed-up: {loop_s / bulk_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark FTS5 report search against the old scan-and-filter approach.
+
+The baseline is what we used to do by hand: load reasoning + DR text into
+pandas and str.contains() it, then json.load every file in
+data/council_reports and substring-match the agent reports.
+
+Usage:
+    python -m scripts.analysis.bench_report_search "guidance cut" tariff
+    python -m scripts.analysis.bench_report_search --synthetic 5000 "guidance cut"
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import app.database as _db  # noqa: E402
+from app.services import report_search_service  # noqa: E402
+
+_WORDS = (
+    "revenue margin guidance cut raised tariff exposure demand inventory channel "
+    "buyback dilution downgrade upgrade recall lawsuit churn backlog pricing "
+    "competition outlook consensus miss beat restructuring layoffs capex"
+).split()
+
+
+def _scan(query_terms, council_dir):
+    """The pre-FTS approach: full table into pandas + json.load every council file."""
+    conn = _db.connect()
+    try:
+        df = pd.read_sql_query(
+            "SELECT dp.id, dp.symbol, dp.reasoning, dp.deep_research_reason, t.* "
+            "FROM decision_points dp LEFT JOIN decision_texts t ON t.decision_id = dp.id",
+            conn,
+        )
+    finally:
+        conn.close()
+    text = df.drop(columns=["id", "symbol"]).fillna("").astype(str).agg(" ".join, axis=1).str.lower()
+    mask = pd.Series(True, index=df.index)
+    for term in query_terms:
+        mask &= text.str.contains(term.lower(), regex=False)
+    hits = int(mask.sum())
+
+    for path in glob.glob(os.path.join(council_dir, "*_council*.json")):
+        with open(path) as f:
+            reports = json.load(f)
+        for value in reports.values():
+            body = (value if isinstance(value, str) else json.dumps(value)).lower()
+            if all(term.lower() in body for term in query_terms):
+                hits += 1
+    return hits
+
+
+def _make_synthetic(n, workdir):
+    rng = random.Random(7)
+    _db.DB_NAME = os.path.join(workdir, "bench.db")
+    _db.init_db()
+    council_dir = os.path.join(workdir, "council_reports")
+    os.makedirs(council_dir)
+
+    def prose(k):
+        return " ".join(rng.choice(_WORDS) for _ in range(k))
+
+    with _db.transaction() as conn:
+        for i in range(n):
+            cur = conn.execute(
+                "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, "
+                "recommendation, reasoning, status, timestamp) VALUES (?, 1, -6, 'BUY', ?, 'Owned', ?)",
+                (f"S{i % 800}", prose(400), f"2026-01-{1 + i % 28:02d} 10:00:00"),
+            )
+            conn.execute(
+                "INSERT INTO decision_texts (decision_id, deep_research_swot, deep_research_global_analysis) "
+                "VALUES (?, ?, ?)",
+                (cur.lastrowid, prose(150), prose(300)),
+            )
+    for i in range(n // 2):
+        reports = {agent: prose(500) for agent in ("news", "technical", "bull", "bear", "risk")}
+        with open(os.path.join(council_dir, f"S{i}_2026-01-{1 + i % 28:02d}_council2.json"), "w") as f:
+            json.dump(reports, f)
+    return council_dir
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("terms", nargs="+", help='search terms; quote phrases, e.g. "guidance cut"')
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="benchmark on N generated decisions (+N/2 council files) instead of the live DB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    council_dir = report_search_service.COUNCIL_DIR
+    workdir = None
+    if args.synthetic:
+        workdir = tempfile.mkdtemp(prefix="bench_search_")
+        print(f"Generating {args.synthetic} synthetic decisions in {workdir} ...")
+        council_dir = _make_synthetic(args.synthetic, workdir)
+    else:
+        _db.init_db()
+
+    start = time.perf_counter()
+    indexed = report_search_service.sync_council_reports(council_dir)
+    print(f"Council index sync: {indexed} files in {time.perf_counter() - start:.2f}s (one-off)")
+
+    query = " ".join(f'"{t}"' if " " in t else t for t in args.terms)
+    scan_s, scan_hits = _time(lambda: _scan(args.terms, council_dir), args.repeat)
+    fts_s, fts_hits = _time(
+        lambda: report_search_service.search_reports(query, limit=50), args.repeat
+    )
+    print(f"\nQuery: {query}")
+    print(f"  scan + filter : {scan_s * 1000:9.1f} ms  ({scan_hits} matching documents)")
+    print(f"  FTS5 top-50   : {fts_s * 1000:9.1f} ms  ({len(fts_hits)} ranked hits with snippets)")
+    if fts_s > 0:
+        print(f"  speed-up      : {scan_s / fts_s:9.1f}x")
+    for hit in fts_hits[:5]:
+        print(f"    [{hit['kind']}] {hit['symbol']} {hit['date']}: {hit['snippet'][:100]!r}")
+
+
+if __name__ == "__main__":
+    main()
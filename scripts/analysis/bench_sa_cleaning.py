@@ -0,0 +1,112 @@
+"""Benchmark local Seeking Alpha content cleaning against the LLM cleanup path.
+
+Runs every article through the local pipeline cold (no cache), then again
+through a fresh CleanCache twice (first pass fills it, second is the
+refetch case), and optionally through one flash-model cleanup call per
+article. Articles come from tests/fixtures/seeking_alpha/*.html, or from the
+per-ticker SA context store with --store.
+
+Usage:
+    python -m scripts.analysis.bench_sa_cleaning
+    python -m scripts.analysis.bench_sa_cleaning --store --limit 200
+    python -m scripts.analysis.bench_sa_cleaning --llm   # needs GEMINI_API_KEY
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.sa_content_cleaner import CleanCache, clean_html  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "tests", "fixtures", "seeking_alpha")
+
+
+def _fixture_articles():
+    out = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        with open(path) as f:
+            name = os.path.basename(path)
+            out.append((name, "news" if name.startswith("news_") else "article", f.read()))
+    return out
+
+
+def _stored_articles(limit):
+    from app.services.sa_context_store import SAContextStore
+
+    store = SAContextStore()
+    out = []
+    for ticker in store.tickers():
+        for kind, items in (store.get(ticker) or {}).items():
+            for item in items or []:
+                if item.get("content"):
+                    out.append((f"{ticker}/{kind}/{item.get('id', len(out))}",
+                                "news" if kind == "news" else "article", item["content"]))
+                if len(out) >= limit:
+                    return out
+    return out
+
+
+def _time(fn, articles):
+    start = time.perf_counter()
+    results = [fn(content, kind) for _, kind, content in articles]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", action="store_true", help="use stored SA items instead of the fixtures")
+    parser.add_argument("--limit", type=int, default=500, help="max stored items with --store")
+    parser.add_argument("--llm", action="store_true", help="also time one flash-model cleanup call per article")
+    args = parser.parse_args()
+
+    articles = _stored_articles(args.limit) if args.store else _fixture_articles()
+    if not articles:
+        print("No articles to benchmark.")
+        return
+    raw_chars = sum(len(c) for _, _, c in articles)
+    n = len(articles)
+
+    cold_s, cleaned = _time(clean_html, articles)
+    with tempfile.TemporaryDirectory(prefix="bench_sa_clean_") as root:
+        cache = CleanCache(root)
+
+        def cached(c, kind):
+            return cache.get_or_compute(f"local:{kind}", c, lambda: clean_html(c, kind))
+
+        fill_s, _ = _time(cached, articles)
+        warm_s, _ = _time(cached, articles)
+    clean_chars = sum(len(c) for c in cleaned)
+
+    print(f"{n} articles, {raw_chars:,} raw chars -> {clean_chars:,} cleaned "
+          f"({100 * (1 - clean_chars / raw_chars):.0f}% removed)")
+    print(f"  local, no cache   : {cold_s * 1000 / n:9.2f} ms/article")
+    print(f"  local, cache fill : {fill_s * 1000 / n:9.2f} ms/article")
+    print(f"  local, cache hit  : {warm_s * 1000 / n:9.2f} ms/article")
+
+    if not args.llm:
+        print(f"  LLM cleanup       : skipped (--llm); {n} model calls avoided")
+        return
+    if not os.getenv("GEMINI_API_KEY"):
+        print("  LLM cleanup       : skipped, GEMINI_API_KEY not set")
+        return
+
+    from app.services.seeking_alpha_service import SeekingAlphaService
+
+    svc = SeekingAlphaService()
+    pairs = list(zip(articles, cleaned))
+    start = time.perf_counter()
+    llm_out = [svc._clean_with_llm(text, context=name) or text for (name, _, _), text in pairs]
+    llm_s = time.perf_counter() - start
+    llm_chars = sum(len(t) for t in llm_out)
+    print(f"  LLM cleanup       : {llm_s * 1000 / n:9.2f} ms/article on top of local "
+          f"({llm_chars:,} chars out, {llm_chars - clean_chars:+,} vs local)")
+    if warm_s > 0:
+        print(f"  cache hit vs LLM  : {llm_s / warm_s:9.0f}x faster")
+
+
+if __name__ == "__main__":
+    main()
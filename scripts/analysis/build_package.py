@@ -7,26 +7,37 @@ Layout (under docs/performance/<date>-package/):
   charts/          — static PNGs for every figure in REPORT.md
   data/            — CSVs / JSONs of every aggregation + the enriched cohort
 
+Charts are rendered on a process pool; each is keyed by a hash of its
+inputs and the renderer's style, and unchanged ones are copied from
+CHART_CACHE_DIR (ANALYTICS_CHART_CACHE_DIR, default
+data/analytics_cache/charts) instead of redrawn.
+
 Usage:
   ./venv/bin/python scripts/analysis/build_package.py [--start 2026-02-01]
                                                        [--out PATH]
+                                                       [--workers N] [--no-chart-cache]
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
+import os
 import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import pandas as pd
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(REPO_ROOT))
 
+from app.services.analytics import charts as charts_module  # noqa: E402
 from app.services.analytics.charts import (  # noqa: E402
     DR_COLORS,
     INTENT_COLORS,
@@ -42,7 +53,7 @@ from app.services.analytics.charts import (  # noqa: E402
     win_loss_split_grid,
     winrate_bar,
 )
-from app.services.analytics.payload import compute_dataset  # noqa: E402
+from app.services.analytics.payload import N_PERMUTATIONS, compute_dataset  # noqa: E402
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("build_package")
@@ -87,27 +98,142 @@ def _md_table(df: pd.DataFrame, float_cols: Optional[List[str]] = None) -> str:
         return "\n".join([header, sep, *rows])
 
 
-def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir: Path) -> Dict[str, Path]:
-    """Render every static figure used in REPORT.md. Returns {key -> path}."""
+# Rendered PNGs keyed by a hash of each chart's inputs and style.
+CHART_CACHE_DIR = Path(os.getenv("ANALYTICS_CHART_CACHE_DIR", "data/analytics_cache/charts"))
+
+
+@dataclass
+class _ChartJob:
+    """One chart: fn(*args, **kwargs) writes the PNG at the Path among args/kwargs."""
+    key: str
+    fn: Callable[..., Path]
+    args: tuple
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def path(self) -> Path:
+        return next(v for v in (*self.args, *self.kwargs.values()) if isinstance(v, Path))
+
+
+def _columns(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """The columns of df a chart reads, so its hash ignores the rest of the cohort."""
+    return df[[c for c in cols if c in df.columns]]
+
+
+def _feed(h, obj) -> None:
+    """Feed a canonical encoding of a chart argument into hash h."""
+    if isinstance(obj, Path):
+        h.update(b"<path>")  # where a chart is written does not change it
+    elif isinstance(obj, pd.DataFrame):
+        h.update(json.dumps([list(map(str, obj.columns)), list(map(str, obj.dtypes))]).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        except TypeError:  # unhashable cells (lists, dicts)
+            h.update(obj.to_json(orient="split", date_format="iso", default_handler=str).encode())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=str):
+            _feed(h, str(k))
+            _feed(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for v in obj:
+            _feed(h, v)
+        h.update(b"]")
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+
+def _chart_hash(job: _ChartJob, style: str) -> str:
+    h = hashlib.sha256(style.encode())
+    h.update(f"{job.fn.__module__}.{job.fn.__qualname__}".encode())
+    _feed(h, job.args)
+    _feed(h, job.kwargs)
+    return h.hexdigest()
+
+
+def _chart_style() -> str:
+    """Renderer source + matplotlib version: editing a chart's look re-renders it."""
+    source = Path(charts_module.__file__).read_bytes()
+    return f"{hashlib.sha256(source).hexdigest()}:{charts_module.matplotlib.__version__}"
+
+
+def _render_one(job: _ChartJob) -> Path:
+    return job.fn(*job.args, **job.kwargs)
+
+
+def _render_charts(
+    jobs: List[_ChartJob],
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = CHART_CACHE_DIR,
+) -> Dict[str, Path]:
+    """Copy cached charts into place and render the rest on a process pool."""
+    style = _chart_style()
+    hashes = {job.key: _chart_hash(job, style) for job in jobs}
+    todo = []
+    for job in jobs:
+        cached = cache_dir / f"{hashes[job.key]}.png" if cache_dir is not None else None
+        if cached is not None and cached.exists():
+            job.path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached, job.path)
+        else:
+            todo.append(job)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            list(pool.map(_render_one, todo))
+    else:
+        for job in todo:
+            _render_one(job)
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for job in todo:
+            if job.path.exists():
+                tmp = cache_dir / f"{hashes[job.key]}.png.tmp"
+                shutil.copyfile(job.path, tmp)
+                os.replace(tmp, cache_dir / f"{hashes[job.key]}.png")
+    logger.info("Charts: %d rendered, %d from cache", len(todo), len(jobs) - len(todo))
+    return {job.key: job.path for job in jobs}
+
+
+def _generate_charts(
+    payload: Dict[str, Any],
+    enriched: pd.DataFrame,
+    charts_dir: Path,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = CHART_CACHE_DIR,
+) -> Dict[str, Path]:
+    """Render every static figure used in REPORT.md. Returns {key -> path}.
+
+    Charts are collected as jobs first, then rendered by _render_charts:
+    unchanged ones are copied from cache_dir, the rest drawn on a process
+    pool of `workers` (None: one per CPU; cache_dir None: no cache).
+    """
     charts_dir.mkdir(parents=True, exist_ok=True)
-    out: Dict[str, Path] = {}
+    jobs: List[_ChartJob] = []
+
+    def add(key: str, fn: Callable[..., Path], *args, **kwargs) -> None:
+        jobs.append(_ChartJob(key, fn, args, kwargs))
 
     eq = pd.DataFrame(payload.get("equity_curve") or [])
     if not eq.empty:
         eq["decision_date"] = pd.to_datetime(eq["decision_date"])
-    out["equity"] = equity_line(
+    add("equity", equity_line,
         eq,
         "Equity curve — equal-weight BUY/BUY_LIMIT decisions, 4w returns",
         charts_dir / "01_equity_curve.png",
     )
 
     intent_df = _df_from_records(payload.get("winrate_by_intent") or [])
-    out["wr_intent"] = winrate_bar(
+    add("wr_intent", winrate_bar,
         intent_df, "intent",
         "Win rate by AI council intent (4w)",
         charts_dir / "02_winrate_by_intent.png",
     )
-    out["ar_intent"] = avg_return_bar(
+    add("ar_intent", avg_return_bar,
         intent_df, "intent",
         "Average 4w return by AI council intent",
         charts_dir / "03_avgreturn_by_intent.png",
@@ -120,43 +246,43 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
         "deep_research_verdict" if "deep_research_verdict" in dr_df.columns
         else "deep_research_action"
     )
-    out["wr_dr"] = winrate_bar(
+    add("wr_dr", winrate_bar,
         dr_df, dr_label,
         "Win rate by Deep Research verdict (4w)",
         charts_dir / "04_winrate_by_dr_verdict.png",
     )
-    out["ar_dr"] = avg_return_bar(
+    add("ar_dr", avg_return_bar,
         dr_df, dr_label,
         "Average 4w return by Deep Research verdict",
         charts_dir / "05_avgreturn_by_dr_verdict.png",
     )
 
     pmrr_df = _df_from_records(payload.get("winrate_by_pm_rr") or [])
-    out["wr_pmrr"] = winrate_bar(
+    add("wr_pmrr", winrate_bar,
         pmrr_df, "bucket",
         "Win rate by AI council R/R bucket (4w)",
         charts_dir / "06_winrate_by_pm_rr.png",
     )
-    out["ar_pmrr"] = avg_return_bar(
+    add("ar_pmrr", avg_return_bar,
         pmrr_df, "bucket",
         "Average 4w return by AI council R/R bucket",
         charts_dir / "07_avgreturn_by_pm_rr.png",
     )
 
     drrr_df = _df_from_records(payload.get("winrate_by_dr_rr") or [])
-    out["wr_drrr"] = winrate_bar(
+    add("wr_drrr", winrate_bar,
         drrr_df, "bucket",
         "Win rate by Deep Research R/R bucket (4w)",
         charts_dir / "08_winrate_by_dr_rr.png",
     )
-    out["ar_drrr"] = avg_return_bar(
+    add("ar_drrr", avg_return_bar,
         drrr_df, "bucket",
         "Average 4w return by Deep Research R/R bucket",
         charts_dir / "09_avgreturn_by_dr_rr.png",
     )
 
     drop_df = _df_from_records(payload.get("winrate_by_drop_bucket") or [])
-    out["wr_drop"] = winrate_bar(
+    add("wr_drop", winrate_bar,
         drop_df, "bucket",
         "Win rate by drop-size bucket (4w)",
         charts_dir / "10_winrate_by_drop_size.png",
@@ -165,7 +291,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     ts = payload.get("time_series") or {}
     spy_overlay = ts.get("spy_overlay") or None
 
-    out["ts_intent"] = time_series_lines(
+    add("ts_intent", time_series_lines,
         ts.get("by_intent") or {},
         "Median return path by AI council intent — IQR band, with S&P 500 overlay",
         charts_dir / "11_timeseries_by_intent.png",
@@ -173,7 +299,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
         spy_overlay=spy_overlay,
         use="median",
     )
-    out["ts_intent_mean"] = time_series_lines(
+    add("ts_intent_mean", time_series_lines,
         ts.get("by_intent") or {},
         "Mean return path by AI council intent — 95% CI band, with S&P 500 overlay",
         charts_dir / "11b_timeseries_mean_ci_by_intent.png",
@@ -181,7 +307,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
         spy_overlay=spy_overlay,
         use="mean",
     )
-    out["ts_dr"] = time_series_lines(
+    add("ts_dr", time_series_lines,
         ts.get("by_dr_verdict") or {},
         "Median return path by Deep Research verdict — IQR band, with S&P 500 overlay",
         charts_dir / "12_timeseries_by_dr_verdict.png",
@@ -209,7 +335,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
                 "median": alpha,
                 "n_paths": grp_data.get("n_paths", 0),
             }
-    out["ts_alpha"] = time_series_lines(
+    add("ts_alpha", time_series_lines,
         alpha_groups,
         "Excess return vs S&P 500 — by AI council intent",
         charts_dir / "13_timeseries_alpha_by_intent.png",
@@ -226,7 +352,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     medians_for_spaghetti = {
         g: by_intent[g] for g in ("ENTER_NOW", "ENTER_LIMIT") if g in by_intent
     }
-    out["ts_spaghetti"] = spaghetti_plot(
+    add("ts_spaghetti", spaghetti_plot,
         individuals,
         medians_for_spaghetti,
         "BUY-signal trajectories — every ENTER_NOW + ENTER_LIMIT decision",
@@ -236,7 +362,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
 
     # Correlation scatter
     corr_pm = (payload.get("stats") or {}).get("corr_pm_rr") or {}
-    out["corr_pm"] = scatter_with_regression(
+    add("corr_pm", scatter_with_regression,
         corr_pm.get("points") or [],
         corr_pm.get("regression_slope"),
         corr_pm.get("regression_intercept"),
@@ -249,7 +375,7 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
         spearman_ci=(corr_pm.get("spearman_ci_low"), corr_pm.get("spearman_ci_high")),
     )
     corr_dr = (payload.get("stats") or {}).get("corr_dr_rr") or {}
-    out["corr_dr"] = scatter_with_regression(
+    add("corr_dr", scatter_with_regression,
         corr_dr.get("points") or [],
         corr_dr.get("regression_slope"),
         corr_dr.get("regression_intercept"),
@@ -263,22 +389,22 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     )
 
     # Recovery histogram by intent
-    out["recovery_hist"] = recovery_histogram_by_group(
-        enriched, "intent",
+    add("recovery_hist", recovery_histogram_by_group,
+        _columns(enriched, ["intent", "days_to_recover"]), "intent",
         "Trading days to recovery — by AI council intent",
         charts_dir / "17_recovery_days_by_intent.png",
         palette=INTENT_COLORS,
     )
 
     # Win/loss split per intent and per DR verdict
-    out["winloss_intent"] = win_loss_split_grid(
+    add("winloss_intent", win_loss_split_grid,
         ts.get("winloss_by_intent") or {},
         "Winner vs loser trajectories — by AI council intent (split at day-20 sign)",
         charts_dir / "18_winloss_by_intent.png",
         palette=INTENT_COLORS,
         group_order=["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"],
     )
-    out["winloss_dr"] = win_loss_split_grid(
+    add("winloss_dr", win_loss_split_grid,
         ts.get("winloss_by_dr_verdict") or {},
         "Winner vs loser trajectories — by Deep Research verdict",
         charts_dir / "19_winloss_by_dr_verdict.png",
@@ -287,13 +413,13 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     )
 
     # Cumulative dollar P&L over actual calendar time, per group
-    out["cum_pnl_intent"] = cum_pnl_calendar(
+    add("cum_pnl_intent", cum_pnl_calendar,
         ts.get("cum_pnl_by_intent") or {},
         "Cumulative mark-to-market P&L by AI council intent\n($1 per signal, summed across all open positions)",
         charts_dir / "20_cum_pnl_calendar_by_intent.png",
         palette=INTENT_COLORS,
     )
-    out["cum_pnl_dr"] = cum_pnl_calendar(
+    add("cum_pnl_dr", cum_pnl_calendar,
         ts.get("cum_pnl_by_dr_verdict") or {},
         "Cumulative mark-to-market P&L by Deep Research verdict\n($1 per signal, summed across all open positions)",
         charts_dir / "21_cum_pnl_calendar_by_dr_verdict.png",
@@ -301,16 +427,17 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     )
 
     # R/R distribution by verdict (verdict ↔ R/R correlation)
-    out["rr_box_pm"] = rr_boxplot_by_group(
-        enriched, "intent", "risk_reward_ratio",
+    add("rr_box_pm", rr_boxplot_by_group,
+        _columns(enriched, ["intent", "risk_reward_ratio"]), "intent", "risk_reward_ratio",
         "PM R/R distribution by AI council intent",
         charts_dir / "22_rr_box_pm_by_intent.png",
         palette=INTENT_COLORS,
         group_order=["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"],
         annotation=_omnibus_annotation((payload.get("stats") or {}).get("pm_rr_by_intent") or {}),
     )
-    out["rr_box_dr"] = rr_boxplot_by_group(
-        enriched, "deep_research_verdict", "deep_research_rr_ratio",
+    add("rr_box_dr", rr_boxplot_by_group,
+        _columns(enriched, ["deep_research_verdict", "deep_research_rr_ratio"]),
+        "deep_research_verdict", "deep_research_rr_ratio",
         "DR R/R distribution by Deep Research verdict",
         charts_dir / "23_rr_box_dr_by_verdict.png",
         palette=DR_COLORS,
@@ -324,38 +451,38 @@ def _generate_charts(payload: Dict[str, Any], enriched: pd.DataFrame, charts_dir
     def _to_dfs(key):
         return {h: pd.DataFrame(by_h.get(h, {}).get(key) or []) for h in ("1w", "2w", "4w")}
 
-    out["wr_intent_multi"] = multi_horizon_grouped_bar(
+    add("wr_intent_multi", multi_horizon_grouped_bar,
         _to_dfs("winrate_by_intent"), "intent", "win_rate",
         "Win rate by intent — 1w vs 2w vs 4w",
         charts_dir / "24_winrate_by_intent_multi.png",
         group_order=["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"],
     )
-    out["ar_intent_multi"] = multi_horizon_grouped_bar(
+    add("ar_intent_multi", multi_horizon_grouped_bar,
         _to_dfs("winrate_by_intent"), "intent", "avg_return",
         "Average return by intent — 1w vs 2w vs 4w",
         charts_dir / "25_avgreturn_by_intent_multi.png",
         group_order=["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"],
     )
-    out["wr_drop_multi"] = multi_horizon_grouped_bar(
+    add("wr_drop_multi", multi_horizon_grouped_bar,
         _to_dfs("winrate_by_drop_bucket"), "bucket", "win_rate",
         "Win rate by drop-size bucket — 1w vs 2w vs 4w",
         charts_dir / "26_winrate_by_drop_multi.png",
         group_order=["<= -15%", "-15 to -8", "-8 to -5", "> -5%"],
     )
-    out["wr_pmrr_multi"] = multi_horizon_grouped_bar(
+    add("wr_pmrr_multi", multi_horizon_grouped_bar,
         _to_dfs("winrate_by_pm_rr"), "bucket", "win_rate",
         "Win rate by PM R/R bucket — 1w vs 2w vs 4w",
         charts_dir / "27_winrate_by_pm_rr_multi.png",
         group_order=["<1", "1-2", "2-3", ">=3"],
     )
-    out["wr_drrr_multi"] = multi_horizon_grouped_bar(
+    add("wr_drrr_multi", multi_horizon_grouped_bar,
         _to_dfs("winrate_by_dr_rr"), "bucket", "win_rate",
         "Win rate by DR R/R bucket — 1w vs 2w vs 4w",
         charts_dir / "28_winrate_by_dr_rr_multi.png",
         group_order=["<1", "1-2", "2-3", ">=3"],
     )
 
-    return out
+    return _render_charts(jobs, workers=workers, cache_dir=cache_dir)
 
 
 def _export_data(payload: Dict[str, Any], enriched: pd.DataFrame,
@@ -558,10 +685,16 @@ def _format_corr_horizon_table(by_horizon: Dict[str, Any], corr_key: str) -> str
 def _format_multi_horizon_winrate(by_horizon: Dict[str, Any], group_col: str) -> str:
     """Compact 1w/2w/4w side-by-side win-rate / avg-return table per group."""
     rows = []
+    suffix = "dr_verdict" if group_col == "deep_research_verdict" else group_col
     for h in ("1w", "2w", "4w"):
         agg = (by_horizon.get(h) or {}).get("winrate_by_intent" if group_col == "intent"
                                             else f"winrate_by_{group_col}") or []
+        boot = {
+            r.get("group"): r
+            for r in (by_horizon.get(h) or {}).get(f"bootstrap_by_{suffix}") or []
+        }
         for r in agg:
+            b = boot.get(str(r.get(group_col))) or {}
             rows.append({
                 "group": r.get(group_col),
                 "horizon": h,
@@ -572,6 +705,8 @@ def _format_multi_horizon_winrate(by_horizon: Dict[str, Any], group_col: str) ->
                 "avg_return": r.get("avg_return"),
                 "avg_return_ci_low": r.get("avg_return_ci_low"),
                 "avg_return_ci_high": r.get("avg_return_ci_high"),
+                "avg_return_boot_low": b.get("mean_ci_low"),
+                "avg_return_boot_high": b.get("mean_ci_high"),
             })
     if not rows:
         return "_no data_"
@@ -598,6 +733,11 @@ def _format_multi_horizon_winrate(by_horizon: Dict[str, Any], group_col: str) ->
             for l, h in zip(df["avg_return_ci_low"], df["avg_return_ci_high"])
         ],
     })
+    if df["avg_return_boot_low"].notna().any():
+        df_disp["AR bootstrap CI"] = [
+            f"[{fmt_signed(l)}, {fmt_signed(h)}]" if l is not None and not pd.isna(l) else ""
+            for l, h in zip(df["avg_return_boot_low"], df["avg_return_boot_high"])
+        ]
     # Sort by group and then horizon (1w, 2w, 4w)
     horizon_order = {"1w": 1, "2w": 2, "4w": 3}
     df_disp = df_disp.assign(_h=df_disp["horizon"].map(horizon_order)).sort_values(
@@ -614,19 +754,23 @@ def _format_pairwise_table(rows: List[Dict[str, Any]]) -> str:
         return "_no significance data_"
     df = pd.DataFrame(rows)
     keep = ["group_a", "group_b", "n_a", "n_b",
-            "diff", "cohen_d", "welch_p", "welch_p_fdr", "mwu_p", "mwu_p_fdr", "significant"]
+            "diff", "cohen_d", "welch_p", "welch_p_fdr", "mwu_p", "mwu_p_fdr",
+            "perm_p", "perm_p_fdr", "significant"]
     df = df[[c for c in keep if c in df.columns]].copy()
     df["diff"] = df["diff"].apply(lambda v: "" if pd.isna(v) else f"{v*100:+.2f}%")
     for c in ("cohen_d",):
         df[c] = df[c].apply(lambda v: "" if pd.isna(v) else f"{v:+.2f}")
-    for c in ("welch_p", "welch_p_fdr", "mwu_p", "mwu_p_fdr"):
+    for c in ("welch_p", "welch_p_fdr", "mwu_p", "mwu_p_fdr", "perm_p", "perm_p_fdr"):
         if c in df.columns:
             df[c] = df[c].apply(lambda v: "" if pd.isna(v) else (
                 "<0.001" if v < 0.001 else f"{v:.3f}"))
     df["significant"] = df["significant"].map({True: "✅", False: "—"})
-    df.columns = ["A", "B", "n_A", "n_B", "Δ mean",
-                  "Cohen d", "Welch p", "Welch p (FDR)",
-                  "MWU p", "MWU p (FDR)", "Sig?"]
+    df = df.rename(columns={
+        "group_a": "A", "group_b": "B", "n_a": "n_A", "n_b": "n_B", "diff": "Δ mean",
+        "cohen_d": "Cohen d", "welch_p": "Welch p", "welch_p_fdr": "Welch p (FDR)",
+        "mwu_p": "MWU p", "mwu_p_fdr": "MWU p (FDR)",
+        "perm_p": "Perm p", "perm_p_fdr": "Perm p (FDR)", "significant": "Sig?",
+    })
     try:
         return df.to_markdown(index=False)
     except ImportError:
@@ -978,7 +1122,9 @@ def _build_report(
         "",
         "**Interpretation.** Welch's t-test compares group means under the (relaxed) "
         "assumption that variances may differ. Mann-Whitney U is rank-based and works "
-        "even when returns are skewed. Both p-values are FDR-adjusted "
+        "even when returns are skewed. The permutation p-value shuffles the group "
+        f"labels ({N_PERMUTATIONS:,} times) and asks how often a mean gap this large "
+        "arises by chance, with no distributional assumption. All p-values are FDR-adjusted "
         "(Benjamini-Hochberg) to control the false-discovery rate across the family of "
         "comparisons.",
         "",
@@ -1106,7 +1252,8 @@ def _build_report(
         "subsequent significance tests and bucket aggregations are now computed "
         "at every horizon; the bars below show win rate (top) and average return "
         "(bottom) side-by-side per intent. Wilson + t-CI error bars come along "
-        "for the ride.",
+        "for the ride; the table adds a percentile-bootstrap CI for the average "
+        "return, which does not assume normal returns.",
         "",
         img("wr_intent_multi"),
         img("ar_intent_multi"),
@@ -1319,6 +1466,10 @@ def main():
                         help="Package output directory")
     parser.add_argument("--html-source", default=None,
                         help="Existing deep-dive HTML to copy (default: regenerate via deep_dive_html.py)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Chart-rendering processes (default: one per CPU)")
+    parser.add_argument("--no-chart-cache", action="store_true",
+                        help="Redraw every chart instead of reusing unchanged ones")
     args = parser.parse_args()
 
     package_dir = Path(args.out)
@@ -1338,8 +1489,11 @@ def main():
         sys.exit(1)
     logger.info("Cohort size: %d", payload["cohort_size"])
 
-    logger.info("Rendering %d static charts -> %s", 17, charts_dir)
-    chart_paths = _generate_charts(payload, enriched, charts_dir)
+    logger.info("Rendering static charts -> %s", charts_dir)
+    chart_paths = _generate_charts(
+        payload, enriched, charts_dir, workers=args.workers,
+        cache_dir=None if args.no_chart_cache else CHART_CACHE_DIR,
+    )
 
     logger.info("Exporting data -> %s", data_dir)
     data_paths = _export_data(payload, enriched, spy_bars, data_dir)
@@ -14,22 +14,24 @@ def main():
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
-    # Check if columns exist (simple check by selecting one)
+    # Check if the text side table exists (simple check by selecting one)
     try:
-        cursor.execute("SELECT deep_research_swot FROM decision_points LIMIT 1")
+        cursor.execute("SELECT deep_research_swot FROM decision_texts LIMIT 1")
     except sqlite3.OperationalError:
-        print("Columns 'deep_research_swot' etc. NOT FOUND. Running migration by importing database.py...")
+        print("Table 'decision_texts' NOT FOUND. Running migration by importing database.py...")
         from app.database import init_db
         init_db()
         print("Migration triggered.")
 
+    # SWOT / market analyses live in decision_texts (keyed by decision id).
     cursor.execute("""
-        SELECT symbol, timestamp, deep_research_verdict, deep_research_score, 
-               deep_research_swot, deep_research_global_analysis, deep_research_local_analysis,
-               deep_research_risk, deep_research_catalyst
-        FROM decision_points 
-        WHERE deep_research_verdict IS NOT NULL 
-        ORDER BY timestamp DESC 
+        SELECT dp.symbol, dp.timestamp, dp.deep_research_verdict, dp.deep_research_score,
+               t.deep_research_swot, t.deep_research_global_analysis, t.deep_research_local_analysis,
+               dp.deep_research_risk, dp.deep_research_catalyst
+        FROM decision_points dp
+        LEFT JOIN decision_texts t ON t.decision_id = dp.id
+        WHERE dp.deep_research_verdict IS NOT NULL
+        ORDER BY dp.timestamp DESC
         LIMIT 10
     """)
     
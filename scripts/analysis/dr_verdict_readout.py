@@ -1,18 +1,22 @@
 """Focused performance readout: Deep Research verdicts and their outcomes.
 
 Combines data/subscribers.db (Dec 2025 - March 2026) and subscribers.db
-(April 2026), filters to decisions that actually got a DR verdict, fetches
-live prices via yfinance, and reports cohort performance + a clean chart.
+(April 2026), filters to decisions that actually got a DR verdict, reads
+daily bars from the local price store, and reports cohort performance + a clean chart.
 """
 
 import os
 import sqlite3
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
-import yfinance as yf
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
 
 DBS = ["data/subscribers.db", "subscribers.db"]
 START_DATE = "2026-01-15"
@@ -49,8 +53,7 @@ def load_dr_decisions():
 def fetch_perf(symbol, ts, original_price, sp500_history, entry_price_high=None):
     try:
         start = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
-        end = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        h = yf.Ticker(symbol).history(start=start, end=end)
+        h = price_cache.get_bars(symbol, start, datetime.now(), adjusted=True)
         if h.empty:
             return None
 
@@ -101,7 +104,7 @@ def main():
     print(f"  verdict counts:\n{df['deep_research_verdict'].value_counts()}")
 
     print("Fetching SPY baseline...")
-    sp = yf.Ticker("^GSPC").history(start=START_DATE)
+    sp = price_cache.get_bars("^GSPC", START_DATE, datetime.now(), adjusted=True)
 
     print("Fetching per-ticker history...")
     rows = []
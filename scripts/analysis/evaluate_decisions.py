@@ -17,36 +17,18 @@ DB_PATH = os.getenv("DB_PATH", "subscribers.db")
 
 
 def _evaluate_with_yfinance(decisions, limit=None):
-    """Fast path: batch-fetch prices via yfinance instead of per-symbol TradingView."""
-    import yfinance as yf
-    import pandas as pd
-    from dateutil import parser
+    """Fast path: latest closes from the local price store instead of per-symbol TradingView."""
+    from datetime import datetime, timedelta
+    from app.services.analytics import price_cache as bars
 
     unique_symbols = list(set(d.get("symbol") for d in decisions if d.get("symbol") and d.get("symbol") not in ("MOCK_TEST", "TEST", "EXAMPLE")))
     if not unique_symbols:
         return []
 
-    # Batch download latest prices
-    data = yf.download(unique_symbols, period="5d", progress=False, threads=True, group_by="ticker", auto_adjust=True)
-    price_cache = {}
-    if not data.empty:
-        for sym in unique_symbols:
-            try:
-                if len(unique_symbols) == 1:
-                    col = data["Close"] if "Close" in data.columns else data.iloc[:, 0]
-                else:
-                    tickers = data.columns.get_level_values(0).unique() if isinstance(data.columns, pd.MultiIndex) else []
-                    if sym in list(tickers):
-                        sub = data[sym] if isinstance(data.columns, pd.MultiIndex) else data
-                        col = sub["Close"] if "Close" in sub.columns else sub.iloc[:, 0]
-                    else:
-                        col = None
-                if col is not None:
-                    valid = col.dropna()
-                    if len(valid) > 0:
-                        price_cache[sym] = float(valid.iloc[-1])
-            except Exception:
-                pass
+    # Latest close over the past week (covers weekends/holidays)
+    now = datetime.now()
+    closes = bars.get_closes(unique_symbols, now - timedelta(days=7), now)
+    price_cache = {sym: float(series.iloc[-1]) for sym, series in closes.items()}
 
     results = []
     for d in decisions:
@@ -22,6 +22,12 @@ Strategies tested
 For each strategy that has parameters we sweep over a small grid and report
 the parameter set that maximizes total net P&L.
 
+The sim_* functions below spell out each rule as a per-trade day loop. They
+are the reference; main() runs the same rules through the vectorized
+kernel in app.services.analytics.exits, which evaluates every parameter
+set of a sweep over one (trade × day) tensor (see tests/test_analytics_exits.py
+for the parity checks).
+
 Defaults
 --------
   • Filter: PM R/R > 1.5 AND intent in (ENTER_NOW, ENTER_LIMIT)
@@ -44,6 +50,7 @@ import pandas as pd
 REPO_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(REPO_ROOT))
 
+from app.services.analytics import exits as ex  # noqa: E402
 from app.services.analytics.payload import compute_dataset  # noqa: E402
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -252,55 +259,39 @@ def sim_oracle(entry, decision_date, bars, max_days=5):
 # -----------------------------------------------------------------------------
 
 def run_strategy(
-    name: str,
-    sim_fn,
+    names: List[str],
+    exits: ex.Exits,
     trades: pd.DataFrame,
-    bars_by_ticker: Dict,
+    paths: ex.Paths,
     investment: float,
     cost_total: float,
-    max_days: int,
-) -> Dict:
-    rows = []
-    for _, row in trades.iterrows():
-        sym = str(row["symbol"]).upper()
-        bars = bars_by_ticker.get(sym)
-        out = sim_fn(float(row["price_at_decision"]), row["decision_date"],
-                     bars, max_days=max_days)
-        if out is None:
-            continue
-        gross = investment * out["exit_return"]
-        net = gross - cost_total
-        rows.append({
-            "symbol": row["symbol"],
-            "decision_date": row["decision_date"].strftime("%Y-%m-%d"),
-            "intent": row["intent"],
-            "rr": float(row["risk_reward_ratio"]),
-            "entry": float(row["price_at_decision"]),
-            "exit_reason": out["exit_reason"],
-            "exit_day": out["exit_day"],
-            "exit_return": out["exit_return"],
-            "gross_eur": gross,
-            "net_eur": net,
+    reasons: Optional[List[str]] = None,
+) -> List[Dict]:
+    """One result dict (totals + per-trade `detail`) per parameter set in `exits`.
+
+    `reasons` overrides the ledger's exit_reason per parameter set.
+    """
+    summary = ex.summarize(exits, investment, cost_total)
+    results = []
+    for j, name in enumerate(names):
+        s = summary.iloc[j]
+        detail = ex.ledger(trades, paths, exits, j, investment, cost_total)
+        if reasons is not None:
+            detail["exit_reason"] = reasons[j]
+        results.append({
+            "name": name,
+            "n": int(s["n"]),
+            "total_invested_eur": float(s["total_invested_eur"]),
+            "total_net_eur": float(s["total_net_eur"]),
+            "roi": float(s["roi"]),
+            "win_rate": float(s["win_rate"]),
+            "mean_return": float(s["mean_return"]),
+            "median_return": float(s["median_return"]),
+            "min_return": float(s["min_return"]),
+            "max_return": float(s["max_return"]),
+            "detail": detail,
         })
-    detail = pd.DataFrame(rows)
-    n = len(detail)
-    if n == 0:
-        return {"name": name, "n": 0, "total_net_eur": 0, "roi": 0,
-                "win_rate": 0, "mean_return": 0, "median_return": 0, "detail": detail}
-    total_net = float(detail["net_eur"].sum())
-    return {
-        "name": name,
-        "n": n,
-        "total_invested_eur": n * investment,
-        "total_net_eur": total_net,
-        "roi": total_net / (n * investment),
-        "win_rate": float((detail["net_eur"] > 0).mean()),
-        "mean_return": float(detail["exit_return"].mean()),
-        "median_return": float(detail["exit_return"].median()),
-        "min_return": float(detail["exit_return"].min()),
-        "max_return": float(detail["exit_return"].max()),
-        "detail": detail,
-    }
+    return results
 
 
 def _print_strategy_table(rows: List[Dict]) -> None:
@@ -353,32 +344,26 @@ def main():
     print(f"  Cohort: n={n_trades}")
     print("=" * 110)
 
+    paths = ex.build_paths(trades, bars_by_ticker, horizon_days)
     results: List[Dict] = []
 
+    def run(names, exits, reasons=None):
+        return run_strategy(names, exits, trades, paths, inv, cost_total, reasons)
+
     # 1. BASELINE
-    results.append(run_strategy(
-        "BASELINE — no TP/SL, exit day-5 close",
-        lambda e, dd, b, max_days: sim_baseline(e, dd, b, max_days),
-        trades, bars_by_ticker, inv, cost_total, horizon_days,
-    ))
+    results += run(["BASELINE — no TP/SL, exit day-5 close"], ex.hold(paths, horizon_days))
 
     # 2. HARD TP/SL — best from prior optimizer (TP=21%, SL=9.5%)
-    results.append(run_strategy(
-        "HARD TP=21% SL=9.5% (prior optimum)",
-        lambda e, dd, b, max_days: sim_hard_tp_sl(e, dd, b, 0.21, 0.095, max_days),
-        trades, bars_by_ticker, inv, cost_total, horizon_days,
-    ))
+    results += run(["HARD TP=21% SL=9.5% (prior optimum)"],
+                   ex.hard_tp_sl(paths, tp=0.21, sl=0.095, max_days=horizon_days))
 
     # 3. TRAILING STOP — sweep trail %
     print("\n  --- TRAILING STOP (initial SL=9.5%) ---")
-    trail_sweep = []
-    for trail_pct in [0.02, 0.03, 0.04, 0.05, 0.06, 0.08, 0.10]:
-        r = run_strategy(
-            f"  trail={trail_pct:.1%}",
-            lambda e, dd, b, max_days, tp=trail_pct: sim_trailing_stop(e, dd, b, tp, 0.095, max_days),
-            trades, bars_by_ticker, inv, cost_total, horizon_days,
-        )
-        trail_sweep.append(r)
+    trails = [0.02, 0.03, 0.04, 0.05, 0.06, 0.08, 0.10]
+    trail_sweep = run(
+        [f"  trail={t:.1%}" for t in trails],
+        ex.trailing_stop(paths, trail=trails, initial_sl=0.095, max_days=horizon_days),
+    )
     trail_best = max(trail_sweep, key=lambda r: r["total_net_eur"])
     _print_strategy_table(trail_sweep)
     print(f"  → best trailing stop: {trail_best['name']}  net=€{trail_best['total_net_eur']:+.2f}")
@@ -387,15 +372,11 @@ def main():
 
     # 4. BREAKEVEN-TRAIL — sweep trigger %
     print("\n  --- BREAKEVEN-TRAIL (initial SL=9.5%, trail=3% after trigger) ---")
-    be_sweep = []
-    for trigger_pct in [0.02, 0.03, 0.05, 0.08, 0.10, 0.15]:
-        r = run_strategy(
-            f"  trigger={trigger_pct:.1%}",
-            lambda e, dd, b, max_days, tg=trigger_pct: sim_breakeven_trail(
-                e, dd, b, tg, trail_pct=0.03, initial_sl_pct=0.095, max_days=max_days),
-            trades, bars_by_ticker, inv, cost_total, horizon_days,
-        )
-        be_sweep.append(r)
+    triggers = [0.02, 0.03, 0.05, 0.08, 0.10, 0.15]
+    be_sweep = run(
+        [f"  trigger={t:.1%}" for t in triggers],
+        ex.breakeven_trail(paths, trigger=triggers, trail=0.03, initial_sl=0.095, max_days=horizon_days),
+    )
     be_best = max(be_sweep, key=lambda r: r["total_net_eur"])
     _print_strategy_table(be_sweep)
     print(f"  → best breakeven-trail: {be_best['name']}  net=€{be_best['total_net_eur']:+.2f}")
@@ -404,16 +385,11 @@ def main():
 
     # 5. TIME-DECAY — sweep check_day × min_progress
     print("\n  --- TIME-DECAY (exit on day N if return < threshold) ---")
-    td_sweep = []
-    for check_day in (2, 3):
-        for min_progress in (-0.02, 0.0, 0.01, 0.02, 0.03):
-            r = run_strategy(
-                f"  day={check_day} threshold={min_progress:+.1%}",
-                lambda e, dd, b, max_days, cd=check_day, mp=min_progress: sim_time_decay(
-                    e, dd, b, cd, mp, max_days),
-                trades, bars_by_ticker, inv, cost_total, horizon_days,
-            )
-            td_sweep.append(r)
+    td_grid = ex.grid(check_day=(2, 3), min_progress=(-0.02, 0.0, 0.01, 0.02, 0.03))
+    td_sweep = run(
+        [f"  day={cd} threshold={mp:+.1%}" for cd, mp in zip(td_grid["check_day"], td_grid["min_progress"])],
+        ex.time_decay(paths, **td_grid, max_days=horizon_days),
+    )
     td_best = max(td_sweep, key=lambda r: r["total_net_eur"])
     _print_strategy_table(td_sweep)
     print(f"  → best time-decay: {td_best['name']}  net=€{td_best['total_net_eur']:+.2f}")
@@ -422,15 +398,12 @@ def main():
 
     # 6. MULTI-TIER TP — sweep TP1 levels with TP2=21%, SL=9.5%
     print("\n  --- MULTI-TIER TP (TP2=21%, SL=9.5%, 50/50 partial) ---")
-    mt_sweep = []
-    for tp1 in (0.03, 0.04, 0.05, 0.07, 0.10):
-        r = run_strategy(
-            f"  TP1={tp1:.1%}",
-            lambda e, dd, b, max_days, t1=tp1: sim_multi_tier_tp(
-                e, dd, b, t1, tp2_pct=0.21, sl_pct=0.095, partial_pct=0.5, max_days=max_days),
-            trades, bars_by_ticker, inv, cost_total, horizon_days,
-        )
-        mt_sweep.append(r)
+    tp1s = [0.03, 0.04, 0.05, 0.07, 0.10]
+    mt_sweep = run(
+        [f"  TP1={t:.1%}" for t in tp1s],
+        ex.multi_tier_tp(paths, tp1=tp1s, tp2=0.21, sl=0.095, partial=0.5, max_days=horizon_days),
+        reasons=[f"TP1={t:.0%}|TP2={0.21:.0%}" for t in tp1s],
+    )
     mt_best = max(mt_sweep, key=lambda r: r["total_net_eur"])
     _print_strategy_table(mt_sweep)
     print(f"  → best multi-tier: {mt_best['name']}  net=€{mt_best['total_net_eur']:+.2f}")
@@ -438,11 +411,7 @@ def main():
     results.append(mt_best)
 
     # 7. ORACLE upper bound
-    results.append(run_strategy(
-        "ORACLE (hindsight: exit at max close)",
-        lambda e, dd, b, max_days: sim_oracle(e, dd, b, max_days),
-        trades, bars_by_ticker, inv, cost_total, horizon_days,
-    ))
+    results += run(["ORACLE (hindsight: exit at max close)"], ex.oracle(paths, horizon_days))
 
     # =========== Final summary ===========
     print()
@@ -1,12 +1,16 @@
 import sqlite3
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pytz
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
+
 DB_NAME = os.getenv("DB_PATH", "subscribers.db")
 
 def get_buy_decisions():
@@ -29,11 +33,7 @@ def fetch_14_day_history(symbol, start_date_str):
     start_dt = datetime.strptime(start_date_str, "%Y-%m-%d %H:%M:%S")
     end_dt = start_dt + timedelta(days=15)
     
-    start_str = start_dt.strftime("%Y-%m-%d")
-    end_str = end_dt.strftime("%Y-%m-%d")
-    
-    ticker = yf.Ticker(symbol)
-    history = ticker.history(start=start_str, end=end_str)
+    history = price_cache.get_bars(symbol, start_dt, end_dt, adjusted=True)
     
     if history.empty:
         return None
@@ -1,12 +1,16 @@
 import sqlite3
 import pandas as pd
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import sys
 import seaborn as sns
 import matplotlib.pyplot as plt
 import pytz
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.services.analytics import price_cache  # noqa: E402
+
 DB_NAME = os.getenv("DB_PATH", "data/subscribers.db")
 
 def get_post_jan15_decisions():
@@ -27,13 +31,10 @@ def get_post_jan15_decisions():
     return df
 
 def fetch_historical_performance(symbol, start_date_str, original_price, sp500_history, entry_price_high=None):
-    """Fetch yfinance data to calculate max ROI, current ROI, and drawdown for the stock and SP500."""
+    """Fetch daily bars to calculate max ROI, current ROI, and drawdown for the stock and SP500."""
     try:
         start_date = datetime.strptime(start_date_str, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
-        end_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(start=start_date, end=end_date)
+        history = price_cache.get_bars(symbol, start_date, datetime.now(), adjusted=True)
         
         if history.empty:
             return None
@@ -54,7 +55,7 @@ def fetch_historical_performance(symbol, start_date_str, original_price, sp500_h
         if not sp500_history.empty:
             # S&P 500 indices are timezone-aware usually, localize our start/end if needed,
             # or simply slice by string datetime index.
-            # yfinance returns tz-aware index.
+            # Price-store bars are tz-naive; older yfinance frames were tz-aware.
             try:
                 # Get the S&P 500 data from the start date onwards
                 tz = sp500_history.index.tzinfo
@@ -129,7 +130,7 @@ def generate_readout():
     
     # Pre-fetch S&P 500 history for 2026 onwards to avoid fetching it for every symbol
     print("Fetching S&P 500 baseline data...")
-    sp500_history = yf.Ticker("^GSPC").history(start="2026-01-15")
+    sp500_history = price_cache.get_bars("^GSPC", "2026-01-15", datetime.now(), adjusted=True)
     
     results = []
     
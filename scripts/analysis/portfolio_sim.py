@@ -5,10 +5,16 @@ Now includes:
   • R/R cutoff sweep — find the threshold that maximizes net P&L / ROI / alpha.
   • Investment-size sweep — show how per-trade capital changes the picture.
 
+The sweeps run on the event-driven engine in app.services.analytics.portfolio:
+positions are built once and each sweep advances all of its scenarios in a
+single pass over the decision stream. --capital / --max-positions make
+them capital-constrained (entries are skipped when cash or slots run out).
+
 Usage:
     ./venv/bin/python scripts/analysis/portfolio_sim.py
     ./venv/bin/python scripts/analysis/portfolio_sim.py --rr-min 2.0 --horizon 2w
     ./venv/bin/python scripts/analysis/portfolio_sim.py --no-sweep    # skip optimization
+    ./venv/bin/python scripts/analysis/portfolio_sim.py --capital 10000 --max-positions 10
 
 Defaults match the user-requested simulation (PM R/R > 1.5, 1-week hold,
 €750/trade, €6 round-trip cost).
@@ -28,6 +34,8 @@ import pandas as pd
 REPO_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(REPO_ROOT))
 
+from app.services.analytics import exits as ex  # noqa: E402
+from app.services.analytics import portfolio  # noqa: E402
 from app.services.analytics.payload import compute_dataset  # noqa: E402
 from app.services.analytics.price_cache import get_bars  # noqa: E402
 
@@ -210,171 +218,100 @@ def _print_simulation(label: str, df: pd.DataFrame, agg: Dict,
           f"{agg['median_net_return_pct']:+.2%}")
 
 
+_INTENTS = ("ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL")
+_BUY = ("ENTER_NOW", "ENTER_LIMIT")
+_SWEEP_COLUMNS = {
+    "total_net_pnl_eur": "strategy_net_eur",
+    "total_spy_net_pnl_eur": "spy_net_eur",
+    "total_alpha_eur": "alpha_eur",
+}
+
+
+def build_book(
+    df: pd.DataFrame, bars: Dict[str, pd.DataFrame], spy_bars: Optional[pd.DataFrame],
+    rr_col: str, horizon: str,
+) -> portfolio.Book:
+    """Positions held for `horizon`, entered at the decision close — the same
+    trades run_simulation prices from return_<horizon> — with SPY paired."""
+    days = HORIZON_DAYS[horizon]
+    paths = ex.build_paths(df, bars, days)
+    return portfolio.book(df, paths, ex.hold(paths, days), spy_bars=spy_bars,
+                          rr_col=rr_col, keep=paths.last >= days)
+
+
+def _sweep(book: portfolio.Book, table: pd.DataFrame, mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Every scenario of table in one pass of the portfolio engine."""
+    out = portfolio.summarize(portfolio.simulate(book, table, mask))
+    out["n_skipped"] = out["n_skipped_slots"] + out["n_skipped_cash"]
+    return out.rename(columns=_SWEEP_COLUMNS)
+
+
 def sweep_rr_cutoff(
-    df: pd.DataFrame, rr_col: str, horizon: str,
+    book: portfolio.Book, thresholds: List[float],
     investment: float, cost_in: float, cost_out: float,
-    spy_returns: Dict, thresholds: List[float],
+    intents: Optional[Tuple[str, ...]] = None, **limits,
 ) -> pd.DataFrame:
-    rows = []
-    for t in thresholds:
-        _, agg = run_simulation(
-            df, rr_col=rr_col, rr_min=t, horizon=horizon,
-            investment=investment, cost_in=cost_in, cost_out=cost_out,
-            spy_returns=spy_returns,
-        )
-        rows.append({
-            "rr_threshold": t,
-            "n_trades": agg["n_trades"],
-            "total_invested_eur": agg["total_invested_eur"],
-            "strategy_net_eur": agg["total_net_pnl_eur"],
-            "spy_net_eur": agg["total_spy_net_pnl_eur"],
-            "alpha_eur": agg["total_alpha_eur"],
-            "roi": agg["roi"],
-            "spy_roi": agg["spy_roi"],
-            "alpha_roi": agg["alpha_roi"],
-            "win_rate_net": agg["win_rate_net"],
-        })
-    return pd.DataFrame(rows)
+    table = portfolio.scenarios(rr_min=thresholds).assign(
+        intents=[intents] * len(thresholds), investment=investment,
+        cost_in=cost_in, cost_out=cost_out, **limits,
+    )
+    out = _sweep(book, table).rename(columns={"rr_min": "rr_threshold"})
+    return out[["rr_threshold", "n_trades", "n_skipped", "total_invested_eur",
+                "strategy_net_eur", "spy_net_eur", "alpha_eur", "roi", "spy_roi",
+                "alpha_roi", "win_rate_net"]]
 
 
 def per_verdict_breakdown(
-    df: pd.DataFrame, rr_col: str, rr_min: float, horizon: str,
-    investment: float, cost_in: float, cost_out: float,
-    spy_returns: Dict,
+    book: portfolio.Book, rr_min: float,
+    investment: float, cost_in: float, cost_out: float, **limits,
 ) -> pd.DataFrame:
     """Decompose the strategy's P&L by intent within the chosen R/R band."""
-    rows = []
-    for intent in ("ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"):
-        sub = df[df["intent"] == intent]
-        _, agg = run_simulation(
-            sub, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-            investment=investment, cost_in=cost_in, cost_out=cost_out,
-            spy_returns=spy_returns,
-        )
-        rows.append({
-            "intent": intent,
-            "n_trades": agg["n_trades"],
-            "total_invested_eur": agg["total_invested_eur"],
-            "strategy_net_eur": agg["total_net_pnl_eur"],
-            "spy_net_eur": agg["total_spy_net_pnl_eur"],
-            "alpha_eur": agg["total_alpha_eur"],
-            "roi": agg["roi"],
-            "alpha_roi": agg["alpha_roi"],
-            "win_rate_net": agg["win_rate_net"],
-        })
-    # Append a TOTAL row
-    _, total_agg = run_simulation(
-        df, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-        investment=investment, cost_in=cost_in, cost_out=cost_out,
-        spy_returns=spy_returns,
-    )
-    rows.append({
-        "intent": "TOTAL",
-        "n_trades": total_agg["n_trades"],
-        "total_invested_eur": total_agg["total_invested_eur"],
-        "strategy_net_eur": total_agg["total_net_pnl_eur"],
-        "spy_net_eur": total_agg["total_spy_net_pnl_eur"],
-        "alpha_eur": total_agg["total_alpha_eur"],
-        "roi": total_agg["roi"],
-        "alpha_roi": total_agg["alpha_roi"],
-        "win_rate_net": total_agg["win_rate_net"],
-    })
-    return pd.DataFrame(rows)
+    table = portfolio.scenarios(
+        [{"intents": (intent,)} for intent in _INTENTS] + [{"intents": None}]
+    ).assign(rr_min=rr_min, investment=investment, cost_in=cost_in,
+             cost_out=cost_out, **limits)
+    out = _sweep(book, table)
+    out.insert(0, "intent", list(_INTENTS) + ["TOTAL"])
+    return out[["intent", "n_trades", "n_skipped", "total_invested_eur",
+                "strategy_net_eur", "spy_net_eur", "alpha_eur", "roi",
+                "alpha_roi", "win_rate_net"]]
 
 
 def sweep_drop_one_verdict(
-    df: pd.DataFrame, rr_col: str, rr_min: float, horizon: str,
-    investment: float, cost_in: float, cost_out: float,
-    spy_returns: Dict,
+    book: portfolio.Book, rr_min: float,
+    investment: float, cost_in: float, cost_out: float, **limits,
 ) -> pd.DataFrame:
     """For each verdict G, run the strategy without G; compare to baseline + BUY-only."""
-    intents = ("ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL")
-    _, base_agg = run_simulation(
-        df, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-        investment=investment, cost_in=cost_in, cost_out=cost_out,
-        spy_returns=spy_returns,
+    configs = ["ALL (baseline)"] + [f"Drop {drop}" for drop in _INTENTS] + ["Keep BUY only"]
+    mask = np.column_stack(
+        [np.ones(len(book), dtype=bool)]
+        + [book.intent != drop for drop in _INTENTS]
+        + [np.isin(book.intent.astype(str), _BUY)]
     )
-    base_alpha = base_agg["total_alpha_eur"]
-    base_alpha_roi = base_agg["alpha_roi"]
-
-    rows = [{
-        "config": "ALL (baseline)",
-        "n_trades": base_agg["n_trades"],
-        "total_invested_eur": base_agg["total_invested_eur"],
-        "strategy_net_eur": base_agg["total_net_pnl_eur"],
-        "spy_net_eur": base_agg["total_spy_net_pnl_eur"],
-        "alpha_eur": base_agg["total_alpha_eur"],
-        "roi": base_agg["roi"],
-        "alpha_roi": base_agg["alpha_roi"],
-        "delta_alpha_eur": 0.0,
-        "delta_alpha_pct": 0.0,
-    }]
-    for drop in intents:
-        kept = df[df["intent"] != drop]
-        _, agg = run_simulation(
-            kept, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-            investment=investment, cost_in=cost_in, cost_out=cost_out,
-            spy_returns=spy_returns,
-        )
-        rows.append({
-            "config": f"Drop {drop}",
-            "n_trades": agg["n_trades"],
-            "total_invested_eur": agg["total_invested_eur"],
-            "strategy_net_eur": agg["total_net_pnl_eur"],
-            "spy_net_eur": agg["total_spy_net_pnl_eur"],
-            "alpha_eur": agg["total_alpha_eur"],
-            "roi": agg["roi"],
-            "alpha_roi": agg["alpha_roi"],
-            "delta_alpha_eur": agg["total_alpha_eur"] - base_alpha,
-            "delta_alpha_pct": agg["alpha_roi"] - base_alpha_roi,
-        })
-    # BUY-only
-    buys = df[df["intent"].isin(["ENTER_NOW", "ENTER_LIMIT"])]
-    _, agg = run_simulation(
-        buys, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-        investment=investment, cost_in=cost_in, cost_out=cost_out,
-        spy_returns=spy_returns,
+    table = portfolio.scenarios([{}] * len(configs)).assign(
+        rr_min=rr_min, investment=investment, cost_in=cost_in, cost_out=cost_out, **limits,
     )
-    rows.append({
-        "config": "Keep BUY only",
-        "n_trades": agg["n_trades"],
-        "total_invested_eur": agg["total_invested_eur"],
-        "strategy_net_eur": agg["total_net_pnl_eur"],
-        "spy_net_eur": agg["total_spy_net_pnl_eur"],
-        "alpha_eur": agg["total_alpha_eur"],
-        "roi": agg["roi"],
-        "alpha_roi": agg["alpha_roi"],
-        "delta_alpha_eur": agg["total_alpha_eur"] - base_alpha,
-        "delta_alpha_pct": agg["alpha_roi"] - base_alpha_roi,
-    })
-    return pd.DataFrame(rows)
+    out = _sweep(book, table, mask)
+    out.insert(0, "config", configs)
+    out["delta_alpha_eur"] = out["alpha_eur"] - out["alpha_eur"].iloc[0]
+    out["delta_alpha_pct"] = out["alpha_roi"] - out["alpha_roi"].iloc[0]
+    return out[["config", "n_trades", "n_skipped", "total_invested_eur",
+                "strategy_net_eur", "spy_net_eur", "alpha_eur", "roi", "alpha_roi",
+                "delta_alpha_eur", "delta_alpha_pct"]]
 
 
 def sweep_investment(
-    df: pd.DataFrame, rr_col: str, rr_min: float, horizon: str,
-    cost_in: float, cost_out: float, spy_returns: Dict,
-    investments: List[float],
+    book: portfolio.Book, rr_min: float,
+    cost_in: float, cost_out: float, investments: List[float], **limits,
 ) -> pd.DataFrame:
-    rows = []
-    for inv in investments:
-        _, agg = run_simulation(
-            df, rr_col=rr_col, rr_min=rr_min, horizon=horizon,
-            investment=inv, cost_in=cost_in, cost_out=cost_out,
-            spy_returns=spy_returns,
-        )
-        rows.append({
-            "per_trade_eur": inv,
-            "n_trades": agg["n_trades"],
-            "total_invested_eur": agg["total_invested_eur"],
-            "strategy_net_eur": agg["total_net_pnl_eur"],
-            "spy_net_eur": agg["total_spy_net_pnl_eur"],
-            "alpha_eur": agg["total_alpha_eur"],
-            "roi": agg["roi"],
-            "spy_roi": agg["spy_roi"],
-            "alpha_roi": agg["alpha_roi"],
-            "cost_drag_pct": (cost_in + cost_out) / inv,
-        })
-    return pd.DataFrame(rows)
+    table = portfolio.scenarios(investment=investments).assign(
+        rr_min=rr_min, cost_in=cost_in, cost_out=cost_out, **limits,
+    )
+    out = _sweep(book, table).rename(columns={"investment": "per_trade_eur"})
+    out["cost_drag_pct"] = (cost_in + cost_out) / out["per_trade_eur"]
+    return out[["per_trade_eur", "n_trades", "n_skipped", "total_invested_eur",
+                "strategy_net_eur", "spy_net_eur", "alpha_eur", "roi", "spy_roi",
+                "alpha_roi", "cost_drag_pct"]]
 
 
 def _print_rr_sweep(df: pd.DataFrame, label: str) -> None:
@@ -467,6 +404,10 @@ def main():
     parser.add_argument("--cost-out", type=float, default=3.0)
     parser.add_argument("--intent-only", action="store_true")
     parser.add_argument("--no-penny", action="store_true")
+    parser.add_argument("--capital", type=float, default=None,
+                        help="Starting cash for the sweeps (default: unlimited)")
+    parser.add_argument("--max-positions", type=int, default=None,
+                        help="Max concurrent positions in the sweeps (default: unlimited)")
     parser.add_argument("--no-sweep", action="store_true",
                         help="Skip the R/R + investment sweeps")
     parser.add_argument("--out", default=None)
@@ -515,12 +456,20 @@ def main():
     if args.no_sweep:
         return
 
+    # Every sweep below is one pass of the portfolio engine over the same
+    # positions, with all of its scenarios advanced together.
+    book = build_book(df, ds["bars"], ds["spy_bars"], args.rr_col, args.horizon)
+    limits = {k: v for k, v in (("capital", args.capital), ("max_positions", args.max_positions))
+              if v is not None}
+    if limits:
+        print("\nSweeps limited to " + ", ".join(f"{k}={v:g}" for k, v in limits.items()))
+
     # --- Per-verdict contribution at the chosen R/R cutoff ---
     print()
     pv_df = per_verdict_breakdown(
-        df, rr_col=args.rr_col, rr_min=args.rr_min, horizon=args.horizon,
+        book, rr_min=args.rr_min,
         investment=args.investment, cost_in=args.cost_in, cost_out=args.cost_out,
-        spy_returns=spy_returns,
+        **limits,
     )
     _print_per_verdict(
         pv_df,
@@ -534,9 +483,9 @@ def main():
     # --- Drop-one-verdict sensitivity ---
     print()
     drop_df = sweep_drop_one_verdict(
-        df, rr_col=args.rr_col, rr_min=args.rr_min, horizon=args.horizon,
+        book, rr_min=args.rr_min,
         investment=args.investment, cost_in=args.cost_in, cost_out=args.cost_out,
-        spy_returns=spy_returns,
+        **limits,
     )
     _print_drop_one(
         drop_df,
@@ -551,10 +500,8 @@ def main():
     print()
     rr_grid = [round(0.5 + 0.25 * i, 2) for i in range(0, 19)]   # 0.50 ... 5.00
     rr_sweep = sweep_rr_cutoff(
-        df, rr_col=args.rr_col, horizon=args.horizon,
-        investment=args.investment,
-        cost_in=args.cost_in, cost_out=args.cost_out,
-        spy_returns=spy_returns, thresholds=rr_grid,
+        book, thresholds=rr_grid, investment=args.investment,
+        cost_in=args.cost_in, cost_out=args.cost_out, **limits,
     )
     _print_rr_sweep(
         rr_sweep,
@@ -567,12 +514,9 @@ def main():
 
     # Same R/R sweep but restricted to BUY verdicts (ENTER_NOW + ENTER_LIMIT)
     print()
-    buys_only = df[df["intent"].isin(["ENTER_NOW", "ENTER_LIMIT"])]
     rr_sweep_buy = sweep_rr_cutoff(
-        buys_only, rr_col=args.rr_col, horizon=args.horizon,
-        investment=args.investment,
-        cost_in=args.cost_in, cost_out=args.cost_out,
-        spy_returns=spy_returns, thresholds=rr_grid,
+        book, thresholds=rr_grid, investment=args.investment,
+        cost_in=args.cost_in, cost_out=args.cost_out, intents=_BUY, **limits,
     )
     _print_rr_sweep(
         rr_sweep_buy,
@@ -587,9 +531,8 @@ def main():
     print()
     inv_grid = [100, 250, 500, 750, 1000, 2500, 5000, 10000]
     inv_sweep = sweep_investment(
-        df, rr_col=args.rr_col, rr_min=args.rr_min, horizon=args.horizon,
-        cost_in=args.cost_in, cost_out=args.cost_out,
-        spy_returns=spy_returns, investments=inv_grid,
+        book, rr_min=args.rr_min, cost_in=args.cost_in, cost_out=args.cost_out,
+        investments=inv_grid, **limits,
     )
     _print_investment_sweep(
         inv_sweep,
@@ -1,4 +1,3 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import random
@@ -11,6 +10,8 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
+from app.services.analytics import price_cache  # noqa: E402
+
 def simulate_portfolio():
     print("--- Portfolio Performance Simulation ---")
     
@@ -33,15 +34,19 @@ def simulate_portfolio():
     # 2. Batch Fetch Data
     # We need history for at least 1 year (365 days) + max horizon (365 days) = 2 years approx
     print("Fetching 2 years of historical data...")
-    try:
-        data = yf.download(tickers, period="2y", interval="1d", progress=True, group_by='ticker')
-    except Exception as e:
-        print(f"Error fetching data: {e}")
+    today = datetime.now()
+    one_year_ago = today - timedelta(days=365)
+
+    # dict[ticker] -> DataFrame with 'Close' (adjusted, from the local price store)
+    clean_data = {
+        ticker: df
+        for ticker, df in price_cache.prefetch(tickers, today - timedelta(days=730), today, adjusted=True).items()
+        if not df.empty
+    }
+    if not clean_data:
+        print("Error fetching data: no bars returned.")
         return
 
-    # Check if multi-level columns or single
-    # yfinance structure varies by version. Usually MultiIndex (Ticker, PriceType)
-    
     # 3. Simulate 100 Trades
     print("\nSimulating 100 random trades...")
     
@@ -49,28 +54,6 @@ def simulate_portfolio():
     horizons = [1, 3, 7, 14, 31, 180, 365]
     categories = ["Strong Buy", "Buy", "Hold", "Sell", "Strong Sell"]
     
-    today = datetime.now()
-    one_year_ago = today - timedelta(days=365)
-    
-    # Pre-process data into a more accessible dictionary
-    # dict[ticker] -> DataFrame with 'Close'
-    clean_data = {}
-    
-    if isinstance(data.columns, pd.MultiIndex):
-        # Format: (PriceType, Ticker) or (Ticker, PriceType) depending on version/group_by
-        # With group_by='ticker': top level is Ticker
-        for ticker in tickers:
-            try:
-                # Extract close data
-                df = data[ticker]
-                clean_data[ticker] = df
-            except KeyError:
-                continue
-    else:
-        # Fallback if structure is different
-        print("Data structure unexpected.")
-        return
-
     for i in range(100):
         symbol = random.choice(tickers)
         
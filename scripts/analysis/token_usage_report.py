@@ -28,7 +28,7 @@ GROUP_COLS = {
 
 
 def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(_db.DB_NAME)
+    conn = _db.connect()
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -19,26 +19,38 @@ For each trading day from day 1 .. day 5 (after the decision day):
                                       a bar — worst-case assumption)
   - If neither fires by end of day 5 → exit at close on day 5 (timeout)
 
+simulate_one() is that rule written out for one trade. The grid sweep runs
+the same rule through app.services.analytics.exits.hard_tp_sl: each
+trade's forward bars are loaded once into (trade × day) arrays, the first
+day High reaches each TP level and Low reaches each SL level are found
+with cumulative masks, and every (TP, SL) cell is then a comparison of two
+first-hit days (SL wins ties, i.e. SL day <= TP day). Fine grids and
+several holding periods (--also-hold) take seconds.
+
 Outputs
 -------
   • Top 10 (TP, SL) combos by total net P&L.
   • The break-even TP grid: smallest TP at each SL where total net >= €0.
   • Heatmap PNG of total net P&L over the (TP × SL) grid.
   • CSV of every (TP, SL) combo: sweep_tp_sl_<filter>.csv
+  • With --also-hold: best combo per holding period, and
+    sweep_tp_sl_<filter>_holds.csv with a max_days column.
 
 Usage
 -----
   ./venv/bin/python scripts/analysis/tp_sl_optimizer.py
   ./venv/bin/python scripts/analysis/tp_sl_optimizer.py --rr-min 2.0
+  ./venv/bin/python scripts/analysis/tp_sl_optimizer.py --tp-step 0.001 --sl-step 0.001 --also-hold 3 10 20
 """
 from __future__ import annotations
 
 import argparse
 import logging
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 
 import matplotlib
 
@@ -50,6 +62,7 @@ import pandas as pd  # noqa: E402
 REPO_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(REPO_ROOT))
 
+from app.services.analytics import exits as ex  # noqa: E402
 from app.services.analytics.payload import compute_dataset  # noqa: E402
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -134,6 +147,11 @@ def aggregate(
     cost_total: float,
     max_days: int,
 ) -> Dict:
+    """Totals for one (TP, SL) by looping simulate_one over the trades.
+
+    The reference for sweep()/sweep_paths(), which compute the same totals
+    for a whole grid at once.
+    """
     n_tp = n_sl = n_timeout = 0
     wins = 0
     total_net = 0.0
@@ -172,6 +190,40 @@ def aggregate(
     }
 
 
+def sweep_paths(
+    paths: ex.Paths,
+    tp_grid: Sequence[float],
+    sl_grid: Sequence[float],
+    investment: float,
+    cost_total: float,
+    holding_days: Sequence[int],
+) -> pd.DataFrame:
+    """aggregate() for every (holding period, TP, SL) over precomputed paths.
+
+    Holding periods must not exceed the max_days the paths were built with.
+    Rows are ordered by holding period, then TP, then SL, with a max_days
+    column.
+    """
+    params = ex.grid(tp=tp_grid, sl=sl_grid)
+    frames = []
+    for hold in holding_days:
+        s = ex.sweep(ex.hard_tp_sl, paths, params, investment, cost_total, max_days=hold)
+        frames.append(pd.DataFrame({
+            "max_days": hold,
+            "tp_pct": s["tp"],
+            "sl_pct": s["sl"],
+            "n": s["n"],
+            "n_tp": s["n_tp"],
+            "n_sl": s["n_sl"] + s["n_sl_first"],
+            "n_timeout": s["n_timeout"],
+            "total_gross_eur": s["total_gross_eur"],
+            "total_net_eur": s["total_net_eur"],
+            "roi": s["roi"],
+            "win_rate": s["win_rate"],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
 def sweep(
     trades: pd.DataFrame,
     bars_by_ticker: Dict[str, pd.DataFrame],
@@ -181,12 +233,10 @@ def sweep(
     cost_total: float,
     max_days: int,
 ) -> pd.DataFrame:
-    rows = []
-    for tp in tp_grid:
-        for sl in sl_grid:
-            rows.append(aggregate(trades, bars_by_ticker, tp, sl,
-                                  investment, cost_total, max_days))
-    return pd.DataFrame(rows)
+    """aggregate() for every (TP, SL) in the grid, TP-major like the nested loop."""
+    paths = ex.build_paths(trades, bars_by_ticker, max_days)
+    out = sweep_paths(paths, tp_grid, sl_grid, investment, cost_total, [max_days])
+    return out.drop(columns="max_days")
 
 
 def per_trade_at(
@@ -199,32 +249,12 @@ def per_trade_at(
     max_days: int,
 ) -> pd.DataFrame:
     """Per-trade outcome at one specific (TP, SL) pair, for inspection."""
-    rows = []
-    for _, row in trades.iterrows():
-        sym = str(row["symbol"]).upper()
-        bars = bars_by_ticker.get(sym)
-        out = simulate_one(
-            float(row["price_at_decision"]),
-            row["decision_date"],
-            bars, tp_pct, sl_pct, max_days=max_days,
-        )
-        if out is None:
-            continue
-        gross = investment * out["exit_return"]
-        net = gross - cost_total
-        rows.append({
-            "symbol": row["symbol"],
-            "decision_date": row["decision_date"].strftime("%Y-%m-%d"),
-            "intent": row["intent"],
-            "rr": float(row["risk_reward_ratio"]),
-            "entry": float(row["price_at_decision"]),
-            "exit_reason": out["exit_reason"],
-            "exit_day": out["exit_day"],
-            "exit_return": out["exit_return"],
-            "gross_eur": gross,
-            "net_eur": net,
-        })
-    return pd.DataFrame(rows).sort_values("net_eur", ascending=False).reset_index(drop=True)
+    paths = ex.build_paths(trades, bars_by_ticker, max_days)
+    if not len(paths):
+        return pd.DataFrame()
+    exits = ex.hard_tp_sl(paths, tp=tp_pct, sl=sl_pct, max_days=max_days)
+    detail = ex.ledger(trades, paths, exits, 0, investment, cost_total)
+    return detail.sort_values("net_eur", ascending=False).reset_index(drop=True)
 
 
 def render_heatmap(
@@ -278,6 +308,8 @@ def main():
     parser.add_argument("--sl-min", type=float, default=0.01)
     parser.add_argument("--sl-max", type=float, default=0.15)
     parser.add_argument("--sl-step", type=float, default=0.005)
+    parser.add_argument("--also-hold", type=int, nargs="*", default=[],
+                        help="extra holding periods (trading days) to sweep on the same trades")
     parser.add_argument("--out-dir", default=None)
     args = parser.parse_args()
 
@@ -300,16 +332,15 @@ def main():
 
     cost_total = args.cost_in + args.cost_out
 
-    # 1) Baseline (no TP/SL — just hold for max_days and exit at close)
-    baseline = aggregate(
-        trades, bars_by_ticker, tp_pct=10.0, sl_pct=10.0,  # huge TP/SL = effectively no exit
-        investment=args.investment, cost_total=cost_total, max_days=horizon_days,
-    )
-    # use absurdly high TP/SL to ensure no early exit
-    baseline = aggregate(
-        trades, bars_by_ticker, tp_pct=1000.0, sl_pct=1000.0,
-        investment=args.investment, cost_total=cost_total, max_days=horizon_days,
-    )
+    holds = sorted({horizon_days, *args.also_hold})
+    paths = ex.build_paths(trades, bars_by_ticker, max(holds))
+
+    # 1) Baseline (no TP/SL — just hold for max_days and exit at close);
+    # absurdly high TP/SL ensure no early exit
+    baseline = sweep_paths(
+        paths, [1000.0], [1000.0],
+        investment=args.investment, cost_total=cost_total, holding_days=[horizon_days],
+    ).iloc[0]
 
     print("=" * 100)
     print(f"  TP/SL optimizer — {args.rr_col} > {args.rr_min}, BUY-only "
@@ -325,12 +356,15 @@ def main():
     # 2) Grid sweep
     tp_grid = np.round(np.arange(args.tp_min, args.tp_max + 1e-9, args.tp_step), 4).tolist()
     sl_grid = np.round(np.arange(args.sl_min, args.sl_max + 1e-9, args.sl_step), 4).tolist()
-    logger.info("Sweeping TP grid (%d) × SL grid (%d) = %d combinations...",
-                len(tp_grid), len(sl_grid), len(tp_grid) * len(sl_grid))
-    sweep_df = sweep(
-        trades, bars_by_ticker, tp_grid, sl_grid,
-        investment=args.investment, cost_total=cost_total, max_days=horizon_days,
+    logger.info("Sweeping TP grid (%d) × SL grid (%d) = %d combinations × %d holding period(s)...",
+                len(tp_grid), len(sl_grid), len(tp_grid) * len(sl_grid), len(holds))
+    t0 = time.perf_counter()
+    all_holds = sweep_paths(
+        paths, tp_grid, sl_grid,
+        investment=args.investment, cost_total=cost_total, holding_days=holds,
     )
+    logger.info("Swept %d cells in %.2fs", len(all_holds), time.perf_counter() - t0)
+    sweep_df = all_holds[all_holds["max_days"] == horizon_days].drop(columns="max_days").reset_index(drop=True)
 
     # Top 10 by net P&L
     print("=" * 100)
@@ -363,6 +397,22 @@ def main():
                   f"€{r['total_net_eur']:>+19,.2f}  {int(r['n_tp']):>5d} "
                   f"{int(r['n_sl']):>5d} {int(r['n_timeout']):>10d}")
 
+    if len(holds) > 1:
+        print()
+        print("=" * 100)
+        print("  BEST (TP, SL) PER HOLDING PERIOD")
+        print("=" * 100)
+        print(f"  {'days':>5s} {'TP':>6s} {'SL':>6s} {'n':>3s} "
+              f"{'TP fired':>9s} {'SL fired':>9s} {'timeout':>9s} "
+              f"{'net €':>11s} {'ROI':>8s} {'win%':>6s}")
+        for hold in holds:
+            sub = all_holds[all_holds["max_days"] == hold]
+            r = sub.loc[sub["total_net_eur"].idxmax()]
+            print(f"  {hold:>5d} {r['tp_pct']:>5.1%} {r['sl_pct']:>5.1%} "
+                  f"{int(r['n']):>3d} {int(r['n_tp']):>9d} {int(r['n_sl']):>9d} "
+                  f"{int(r['n_timeout']):>9d} €{r['total_net_eur']:>+10,.2f} "
+                  f"{r['roi']:>+7.2%} {r['win_rate']:>5.1%}")
+
     # 4) Per-trade detail at the best combination
     best = sweep_df.loc[sweep_df["total_net_eur"].idxmax()]
     print()
@@ -398,6 +448,10 @@ def main():
     sweep_df.to_csv(sweep_path, index=False)
     detail_path = out_dir / f"tp_sl_optimum_trades_{args.rr_col}_above_{args.rr_min}_{args.horizon}.csv"
     detail.to_csv(detail_path, index=False)
+    if len(holds) > 1:
+        holds_path = out_dir / f"sweep_tp_sl_{args.rr_col}_above_{args.rr_min}_{args.horizon}_holds.csv"
+        all_holds.to_csv(holds_path, index=False)
+        print(f"Saved per-holding-period sweep to {holds_path}")
 
     print()
     print(f"Saved sweep CSV to {sweep_path}")
@@ -33,8 +33,8 @@ import sys
 import warnings
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -44,6 +44,10 @@ warnings.filterwarnings("ignore", category=UserWarning)
 # ---------------------------------------------------------------------------
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from app.services.analytics import price_cache  # noqa: E402
+
 DBS = [os.path.join(ROOT, "subscribers.db"), os.path.join(ROOT, "data", "subscribers.db")]
 BENCHMARK = "SPY"
 ROI_CLIP = 3.0  # cap |return| at 300% to kill corporate-action / split artifacts
@@ -152,30 +156,14 @@ def load_decisions() -> pd.DataFrame:
 # Price reconstruction
 # ---------------------------------------------------------------------------
 
-def fetch_prices(symbols, start, end) -> dict:
-    """Batch-download daily adjusted closes. Returns {symbol: pd.Series indexed by date}."""
+def fetch_prices(symbols, start, end, refresh: bool = False) -> dict:
+    """Daily adjusted closes from the local price store. Returns {symbol: pd.Series indexed by date}.
+
+    Only ranges the store has not seen yet are downloaded; `refresh` re-downloads.
+    """
     symbols = sorted(set(symbols) | {BENCHMARK})
     print(f"Fetching prices for {len(symbols)} symbols ({start.date()} -> {end.date()})...")
-    data = yf.download(
-        symbols, start=start.strftime("%Y-%m-%d"),
-        end=(end + timedelta(days=2)).strftime("%Y-%m-%d"),
-        progress=False, threads=True, group_by="ticker", auto_adjust=True,
-    )
-    out = {}
-    for sym in symbols:
-        try:
-            if isinstance(data.columns, pd.MultiIndex):
-                if sym not in data.columns.get_level_values(0):
-                    continue
-                s = data[sym]["Close"].dropna()
-            else:
-                s = data["Close"].dropna()
-            if len(s):
-                s.index = pd.to_datetime(s.index).tz_localize(None)
-                out[sym] = s
-        except Exception:
-            continue
-    return out
+    return price_cache.get_closes(symbols, start, end + timedelta(days=1), refresh=refresh)
 
 
 def price_on_or_after(series: pd.Series, target: datetime):
@@ -207,6 +195,52 @@ def window_alpha(prices, spy, symbol, decision_date, weeks):
     return raw, raw - bench
 
 
+def _on_or_after(series, targets):
+    """Vectorized price_on_or_after: first close on/after each target, NaN if none."""
+    out = np.full(len(targets), np.nan)
+    if series is None or series.empty:
+        return out
+    pos = np.searchsorted(series.index.values, targets, side="left")
+    hit = pos < len(series)
+    out[hit] = series.to_numpy(dtype=float)[pos[hit]]
+    return out
+
+
+def window_returns(df, prices, spy, windows, now=None):
+    """window_alpha for every row of df and every window, in one pass.
+
+    Entry prices are looked up once per ticker and shared by all windows.
+    Returns {week: DataFrame(raw, alpha)} indexed like df, keeping only the
+    rows window_alpha would not return None for, in df order.
+    """
+    now = pd.Timestamp(now if now is not None else datetime.now())
+    dates = pd.to_datetime(df["date"]).to_numpy()
+    days = pd.DatetimeIndex(dates).normalize().to_numpy()
+    symbols = df["symbol"].to_numpy()
+    targets = [days] + [days + np.timedelta64(7 * w, "D") for w in windows]
+
+    # Row j of each matrix: entry (0) and the exit of windows[j - 1].
+    stock = np.full((len(targets), len(df)), np.nan)
+    for sym in pd.unique(symbols):
+        rows = np.flatnonzero(symbols == sym)
+        s = prices.get(sym)
+        for j, t in enumerate(targets):
+            stock[j, rows] = _on_or_after(s, t[rows])
+    bench = np.vstack([_on_or_after(spy, t) for t in targets])
+
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for j, w in enumerate(windows, start=1):
+            matured = dates + np.timedelta64(7 * w, "D") <= now.to_datetime64()
+            # Missing (NaN) and zero prices both fail window_alpha's truthiness check.
+            found = np.nan_to_num(np.vstack([stock[[0, j]], bench[[0, j]]])) != 0
+            ok = matured & found.all(axis=0)
+            raw = np.clip(stock[j, ok] / stock[0, ok] - 1.0, -ROI_CLIP, ROI_CLIP)
+            alpha = raw - (bench[j, ok] / bench[0, ok] - 1.0)
+            out[w] = pd.DataFrame({"raw": raw, "alpha": alpha}, index=df.index[ok])
+    return out
+
+
 # ---------------------------------------------------------------------------
 # Aggregation
 # ---------------------------------------------------------------------------
@@ -228,24 +262,28 @@ def cohort_stats(values):
     }
 
 
-def build_table(df, prices, spy, windows, intent_col):
-    """Return {intent: {week: stats}} for the given intent column."""
+def _cohort(returns, sub):
+    """cohort_stats over the rows of `sub` present in one window's returns frame."""
+    r = returns[returns.index.isin(sub.index)]
+    return cohort_stats(list(zip(r["raw"].tolist(), r["alpha"].tolist())))
+
+
+def build_table(df, prices, spy, windows, intent_col, returns=None):
+    """Return {intent: {week: stats}} for the given intent column.
+
+    `returns` is window_returns(df, ...) when the caller already has it (it
+    only depends on df, not on the intent column).
+    """
+    if returns is None:
+        returns = window_returns(df, prices, spy, windows)
     table = {}
     for intent in INTENT_ORDER:
         sub = df[df[intent_col] == intent]
-        row = {}
-        for w in windows:
-            vals = []
-            for _, r in sub.iterrows():
-                res = window_alpha(prices, spy, r["symbol"], r["date"], w)
-                if res:
-                    vals.append(res)
-            row[w] = cohort_stats(vals)
-        table[intent] = row
+        table[intent] = {w: _cohort(returns[w], sub) for w in windows}
     return table
 
 
-def build_override_stats(df, prices, spy, windows):
+def build_override_stats(df, prices, spy, windows, returns=None):
     """Compare DR vs Council where they DISAGREE.
 
     Three groups:
@@ -264,18 +302,9 @@ def build_override_stats(df, prices, spy, windows):
         "DR downgraded from BUY": has_dr[(has_dr["council_intent"].apply(is_buy)) & (~has_dr["dr_intent"].apply(is_buy))],
         "Both agreed BUY": has_dr[(has_dr["council_intent"].apply(is_buy)) & (has_dr["dr_intent"].apply(is_buy))],
     }
-    out = {}
-    for name, sub in groups.items():
-        row = {}
-        for w in windows:
-            vals = []
-            for _, r in sub.iterrows():
-                res = window_alpha(prices, spy, r["symbol"], r["date"], w)
-                if res:
-                    vals.append(res)
-            row[w] = cohort_stats(vals)
-        out[name] = row
-    return out
+    if returns is None:
+        returns = window_returns(df, prices, spy, windows)
+    return {name: {w: _cohort(returns[w], sub) for w in windows} for name, sub in groups.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -374,9 +403,10 @@ def main():
         sys.exit("Could not fetch SPY benchmark — aborting.")
     print(f"Got prices for {len(prices)-1} / {df['symbol'].nunique()} symbols.\n")
 
-    council_tbl = build_table(df, prices, spy, windows, "council_intent")
-    dr_tbl = build_table(df, prices, spy, windows, "dr_intent")
-    override_tbl = build_override_stats(df, prices, spy, windows)
+    returns = window_returns(df, prices, spy, windows)
+    council_tbl = build_table(df, prices, spy, windows, "council_intent", returns)
+    dr_tbl = build_table(df, prices, spy, windows, "dr_intent", returns)
+    override_tbl = build_override_stats(df, prices, spy, windows, returns)
 
     render_console("COUNCIL / PM verdict — alpha vs SPY (market-on-decision entry)", council_tbl, windows, args.min_n)
     print()
@@ -1,3 +1,10 @@
+"""Summarize stored Seeking Alpha context with an LLM into agent_context_cleaned.json.
+
+Reads every ticker (and the Wall Street Breakfast items) from the per-ticker
+SAContextStore, which replaced experiment_data/agent_context.json as the
+place fetched items land; the legacy file is imported into the store on
+first use.
+"""
 import os
 import json
 import time
@@ -60,7 +67,6 @@ MODEL_NAME = 'gemini-1.5-flash' #'gemini-3-flash-preview' - reverting to 1.5 fla
 MODEL_NAME = 'gemini-3-flash-preview' # User requested gemini-3-flash
 
 EXPERIMENT_ROOT = "experiment_data"
-INPUT_FILE = os.path.join(EXPERIMENT_ROOT, "agent_context.json")
 OUTPUT_FILE = os.path.join(EXPERIMENT_ROOT, "agent_context_cleaned.json")
 
 def clean_content(text, title, published_on, previous_titles):
@@ -98,21 +104,30 @@ def clean_content(text, title, published_on, previous_titles):
         print(f"  Error processing content for {title}: {e}")
         return text # Return original on error
 
+def load_context():
+    """The stored context in the old agent_context.json shape."""
+    from app.services.sa_context_store import SAContextStore
+
+    store = SAContextStore()
+    return {
+        "stocks": {t: store.get(t) or {} for t in store.tickers()},
+        "wall_street_breakfast": store.get_wsb(),
+    }, store.root
+
+
 def main():
-    if not os.path.exists(INPUT_FILE):
-        print(f"Input file not found: {INPUT_FILE}")
+    data, store_root = load_context()
+    if not data["stocks"] and not data["wall_street_breakfast"]:
+        print(f"No stored context found in {store_root}")
         return
 
-    with open(INPUT_FILE, 'r') as f:
-        data = json.load(f)
-
     cleaned_data = {
         "generated_at": datetime.now().isoformat(),
         "stocks": {},
         "wall_street_breakfast": []
     }
 
-    print(f"Loaded context from {data.get('generated_at')}")
+    print(f"Loaded {len(data['stocks'])} tickers from {store_root}")
     print(f"Using model: {MODEL_NAME}")
     
     global model
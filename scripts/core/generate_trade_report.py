@@ -1,17 +1,21 @@
 import os
 import sys
-import time
+import json
 import math
 import logging
 import warnings
 import sqlite3
 import pandas as pd
-import yfinance as yf
 import argparse
 from datetime import datetime, timedelta
 from dateutil import parser
 import pytz
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app import database  # noqa: E402
+from app.services.analytics import price_cache  # noqa: E402
+
 # Suppress yfinance's verbose error logging (failed tickers, etc.)
 logging.getLogger('yfinance').setLevel(logging.CRITICAL)
 # Suppress FutureWarning from pandas/yfinance internals
@@ -53,12 +57,34 @@ def _resolve_horizon_price(decision_dt, target_dt, now, exact_lookup, latest_pri
     return price if price is not None else latest_price()
 
 
+# Only the columns the report reads; decision_points is ~120 columns wide.
+REPORT_COLUMNS = [
+    "id", "symbol", "timestamp", "price_at_decision", "recommendation", "region", "sa_rank",
+    "deep_research_verdict", "batch_id", "batch_winner", "data_depth",
+    "entry_price_low", "entry_price_high", "risk_reward_ratio", "conviction", "drop_type",
+]
+
+BENCHMARKS = [('^GSPC', 'SP500'), ('^DJI', 'Dow'), ('^GDAXI', 'DAX')]
+# Days after the decision a bar may land on and still count as "the close at
+# the target date" (weekends/holidays).
+LOOKUP_SLACK_DAYS = 3
+
+
 def get_decision_points():
+    """Report columns of every decision, newest first.
+
+    Includes change_seq when the DB has change tracking, so the incremental
+    update can tell edited decisions apart.
+    """
     try:
         conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM decision_points ORDER BY timestamp DESC")
+        cursor.execute("PRAGMA table_info(decision_points)")
+        columns = list(REPORT_COLUMNS)
+        if "change_seq" in {info[1] for info in cursor.fetchall()}:
+            columns.append("change_seq")
+        cursor.execute(f"SELECT {', '.join(columns)} FROM decision_points ORDER BY timestamp DESC")
         rows = cursor.fetchall()
         conn.close()
         return [dict(row) for row in rows]
@@ -66,359 +92,378 @@ def get_decision_points():
         print(f"Error fetching decision points: {e}")
         return []
 
-def main():
-    parser_arg = argparse.ArgumentParser(description="Generate Trade Decision Report")
-    parser_arg.add_argument("--window", type=int, default=7, help="Performance tracking window in days (default: 7)")
-    
-    # Process args safely, ignoring uvicorn or pytest arguments if called programmatically
-    clean_args = [a for a in sys.argv[1:] if not a.startswith('main:app') and a != '--reload' and not a.startswith('--enable-email')]
-    args, unknown = parser_arg.parse_known_args(clean_args)
-    
-    window_days = args.window
-    
-    print(f"Generating Trade Decision Report ({window_days}-day window)...")
-    decisions = get_decision_points()
-    
-    if not decisions:
-        print("No trade decisions found.")
-        return
 
-    print(f"Found {len(decisions)} decisions. Identifying symbols...")
-    
-    unique_symbols = list(set([d['symbol'] for d in decisions if d.get('symbol')]))
-    
-    # Add Benchmarks
-    benchmarks = ['^GSPC', '^DJI', '^GDAXI']
-    all_symbols = unique_symbols + benchmarks
-    
-    # Cache Configuration
-    CACHE_FILE = os.path.join("data", "yfinance_cache.pkl")
-    CACHE_DURATION = 6 * 3600  # 6 hours
-
-    all_history = pd.DataFrame()
-    cache_valid = False
-
-    if os.path.exists(CACHE_FILE):
-        # Check file age
-        file_age = time.time() - os.path.getmtime(CACHE_FILE)
-        if file_age < CACHE_DURATION:
-            print(f"Loading data from cache ({file_age/3600:.1f}h old)...")
-            try:
-                all_history = pd.read_pickle(CACHE_FILE)
-                if not all_history.empty:
-                    cache_valid = True
-            except Exception as e:
-                print(f"Error loading cache: {e}")
-    
-    if not cache_valid:
-        # 1. Batch Download History (1 Year should cover recent decisions)
-        chunk_size = 100
-        num_chunks = math.ceil(len(all_symbols) / chunk_size)
-        print(f"[Trade Report] Downloading {len(all_symbols)} symbols in {num_chunks} chunks...")
-        
-        for i in range(0, len(all_symbols), chunk_size):
-            chunk = all_symbols[i:i+chunk_size]
-            try:
-                data = yf.download(chunk, period="1y", progress=False, threads=True, group_by='ticker')
-                if not data.empty:
-                    if len(chunk) == 1:
-                         if isinstance(data.columns, pd.Index) and not isinstance(data.columns, pd.MultiIndex):
-                             iterables = [[chunk[0]], data.columns]
-                             data.columns = pd.MultiIndex.from_product(iterables, names=['Ticker', 'Price'])
-                    
-                    if all_history.empty:
-                        all_history = data
-                    else:
-                        all_history = pd.concat([all_history, data], axis=1)
-            except Exception as e:
-                print(f"[Trade Report] Error downloading chunk: {e}")
-
-        # Summarize download results
-        if not all_history.empty:
-            downloaded = set(all_history.columns.get_level_values(0).unique())
-            failed_count = len(all_symbols) - len(downloaded)
-            if failed_count > 0:
-                print(f"[Trade Report] {failed_count} of {len(all_symbols)} symbols failed (delisted/not found).")
-        
-        # Save to cache
-        if not all_history.empty:
-             try:
-                 all_history.to_pickle(CACHE_FILE)
-                 print("[Trade Report] Data cached successfully.")
-             except Exception as e:
-                 print(f"[Trade Report] Error caching data: {e}")
-
-    report_data = []
-    
-    # Helper to clean/access data
-    def get_price_from_history(ticker, date_obj):
-        try:
-            if ticker not in all_history.columns.levels[0]:
-                return None
-            ts_data = all_history[ticker]
-            
-            # ts_data should have 'Close'
-            if 'Close' not in ts_data:
-                return None
-                
-            ts_date_str = date_obj.strftime('%Y-%m-%d')
-            
-            # Direct lookup string. A present-but-empty bar yields NaN (not a
-            # KeyError), so treat NaN as a miss and fall through to the next
-            # valid trading day rather than returning nan.
-            try:
-                price = _finite_or_none(ts_data['Close'].loc[ts_date_str])
-                if price is not None:
-                    return price
-            except KeyError:
-                pass
-            # Try next 3 days (forward-fill to the next valid bar)
-            for i in range(1, 4):
-                next_d = (date_obj + timedelta(days=i)).strftime('%Y-%m-%d')
-                try:
-                    price = _finite_or_none(ts_data['Close'].loc[next_d])
-                    if price is not None:
-                        return price
-                except KeyError:
-                    pass
-            return None
-        except Exception:
-            return None
+class PriceLookup:
+    """Close lookups over per-ticker bars from the price store.
 
-    # Helper for Current Price (Latest available in DF)
-    def get_latest_price(ticker):
-        try:
-            if ticker not in all_history.columns.levels[0]:
-                return None
-            ts_data = all_history[ticker]
-            
-            # Get last valid index (last_valid_index already skips NaN, but
-            # guard defensively in case the Close itself is NaN).
-            last_valid = ts_data['Close'].last_valid_index()
-            if last_valid is not None:
-                return _finite_or_none(ts_data['Close'].loc[last_valid])
-            return None
-        except:
+    Each ticker's closes are kept as a sorted, NaN-free array, so the close
+    on or just after a date is one binary search instead of probing
+    date strings one day at a time.
+    """
+
+    def __init__(self, frames):
+        self._closes = {}
+        for ticker, df in frames.items():
+            if df is None or df.empty or 'Close' not in df:
+                continue
+            closes = df['Close'].dropna()
+            if len(closes):
+                self._closes[ticker.upper()] = (closes.index.values, closes.to_numpy(dtype=float))
+
+    def at(self, ticker, date_obj):
+        """Close on date_obj's day, else on the next bar within LOOKUP_SLACK_DAYS."""
+        found = self._closes.get(str(ticker).upper()) if ticker else None
+        if found is None:
             return None
+        dates, closes = found
+        day = pd.Timestamp(date_obj.date()).to_datetime64()
+        pos = dates.searchsorted(day, side="left")
+        if pos < len(dates) and dates[pos] <= day + pd.Timedelta(days=LOOKUP_SLACK_DAYS).to_timedelta64():
+            return _finite_or_none(closes[pos])
+        return None
 
-    print("Processing decisions...")
-    
-    for d in decisions:
-        symbol = d.get('symbol')
-        timestamp_str = d.get('timestamp')
-        
-        try:
-            decision_dt = parser.parse(timestamp_str)
-        except:
+    def latest(self, ticker):
+        """Most recent close."""
+        found = self._closes.get(str(ticker).upper()) if ticker else None
+        return _finite_or_none(found[1][-1]) if found is not None else None
+
+
+def _format_evidence(data_depth_raw):
+    """Evidence barometer cell from the data_depth JSON."""
+    if not data_depth_raw:
+        return "-"
+    try:
+        dd = json.loads(data_depth_raw)
+
+        # News
+        news = dd.get('news', {})
+        n_count = news.get('total_count', 0)
+        providers = news.get('providers', {})
+        # Top 2 providers for brevity
+        top_provs = sorted(providers.items(), key=lambda x: x[1], reverse=True)[:2]
+        prov_str = ",".join([f"{k[:4]}:{v}" for k, v in top_provs])  # Abbreviate names
+
+        # Transcript
+        fund = dd.get('fundamentals', {})
+        trans_avail = "Yes" if fund.get('transcript_available') else "No"
+        trans_len_k = int(fund.get('transcript_length', 0) / 1000)
+
+        # Agents
+        agents = dd.get('agents', {})
+        total_k = int(sum(agents.values()) / 1000)
+
+        return f"N:{n_count}[{prov_str}] T:{trans_avail}({trans_len_k}k) A:{total_k}k"
+    except Exception:
+        return "Error"
+
+
+def build_row(d, window_days, now, prices):
+    """Render one decision's report row.
+
+    Returns (row, settled), or None when the timestamp doesn't parse.
+    settled means every horizon window has closed and each price came from
+    a bar at its target date, so the row won't change as new bars arrive.
+    """
+    symbol = d.get('symbol')
+    timestamp_str = d.get('timestamp')
+
+    try:
+        decision_dt = parser.parse(timestamp_str)
+    except Exception:
+        return None
+
+    price_at_decision = _finite_or_none(d.get('price_at_decision'))
+    recommendation = d.get('recommendation')
+    region = d.get('region')  # Get the region/market
+
+    target_dt = decision_dt + timedelta(days=window_days)
+    is_future = target_dt > now
+    same_day = decision_dt.date() == now.date()
+    used_latest = []
+
+    def latest(ticker):
+        used_latest.append(ticker)
+        return prices.latest(ticker)
+
+    # Fall back to the close on the decision day
+    if not price_at_decision:
+        price_at_decision = prices.at(symbol, decision_dt)
+
+    def _horizon_price(t_dt):
+        return _resolve_horizon_price(
+            decision_dt, t_dt, now,
+            exact_lookup=lambda dt: prices.at(symbol, dt),
+            latest_price=lambda: latest(symbol),
+        )
+
+    target_price = _horizon_price(target_dt)
+    status = f"Pending (<{window_days}d)" if is_future else "Completed"
+
+    # Calculate Drop/Gain
+    perf_pct = 0.0
+    if price_at_decision and target_price:
+        perf_pct = ((target_price - price_at_decision) / price_at_decision) * 100
+
+    # --- 2W (14-day) horizon ---
+    target_dt_2w = decision_dt + timedelta(days=14)
+    price_2w = _horizon_price(target_dt_2w)
+    perf_2w_pct = ((price_2w - price_at_decision) / price_at_decision * 100) if price_at_decision and price_2w else 0.0
+
+    # --- 4W (28-day) horizon ---
+    target_dt_4w = decision_dt + timedelta(days=28)
+    price_4w = _horizon_price(target_dt_4w)
+    perf_4w_pct = ((price_4w - price_at_decision) / price_at_decision * 100) if price_at_decision and price_4w else 0.0
+
+    # Benchmark Calculations
+    bench_data = {}
+    sp500_perf_num = None
+    for bench_ticker, bench_name in BENCHMARKS:
+        bench_label = f"{bench_name} {window_days}d"
+        # Same-day rows show "-" across the board (matching the horizon
+        # columns) instead of a meaningless +0.00%.
+        if same_day:
+            bench_data[bench_label] = "-"
             continue
-            
-        price_at_decision = _finite_or_none(d.get('price_at_decision'))
-        recommendation = d.get('recommendation')
-        region = d.get('region') # Get the region/market
-        
-        target_dt = decision_dt + timedelta(days=window_days)
-        now = datetime.now()
-        is_future = target_dt > now
-        same_day = decision_dt.date() == now.date()
-
-        # Get Prices from Batch Data
-        if not price_at_decision:
-             price_at_decision = get_price_from_history(symbol, decision_dt)
-
-        def _horizon_price(t_dt):
-            return _resolve_horizon_price(
-                decision_dt, t_dt, now,
-                exact_lookup=lambda dt: get_price_from_history(symbol, dt),
-                latest_price=lambda: get_latest_price(symbol),
-            )
-
-        target_price = _horizon_price(target_dt)
-        status = f"Pending (<{window_days}d)" if is_future else "Completed"
-
-        # Calculate Drop/Gain
-        perf_pct = 0.0
-        if price_at_decision and target_price:
-            perf_pct = ((target_price - price_at_decision) / price_at_decision) * 100
-
-        # --- 2W (14-day) horizon ---
-        target_dt_2w = decision_dt + timedelta(days=14)
-        price_2w = _horizon_price(target_dt_2w)
-        perf_2w_pct = ((price_2w - price_at_decision) / price_at_decision * 100) if price_at_decision and price_2w else 0.0
-        status_2w = "Pending" if target_dt_2w > now else "Done"
-
-        # --- 4W (28-day) horizon ---
-        target_dt_4w = decision_dt + timedelta(days=28)
-        price_4w = _horizon_price(target_dt_4w)
-        perf_4w_pct = ((price_4w - price_at_decision) / price_at_decision * 100) if price_at_decision and price_4w else 0.0
-        status_4w = "Pending" if target_dt_4w > now else "Done"
-
-        # Benchmark Calculations
-        bench_data = {}
-        sp500_perf_num = None
-        for bench_ticker, bench_name in [('^GSPC', 'SP500'), ('^DJI', 'Dow'), ('^GDAXI', 'DAX')]:
-            bench_label = f"{bench_name} {window_days}d"
-            # Same-day rows show "-" across the board (matching the horizon
-            # columns) instead of a meaningless +0.00%.
-            if same_day:
-                bench_data[bench_label] = "-"
-                continue
 
-            bench_start = get_price_from_history(bench_ticker, decision_dt)
-
-            # Determine end date for benchmark
-            if is_future:
-                 bench_end = get_latest_price(bench_ticker)
-            else:
-                 bench_end = get_price_from_history(bench_ticker, target_dt)
-                 # Fallback if no data on exact target date (e.g. holiday), try latest
-                 if bench_end is None:
-                      bench_end = get_latest_price(bench_ticker)
-
-            if bench_start and bench_end:
-                bench_perf = ((bench_end - bench_start) / bench_start) * 100
-                bench_data[bench_label] = f"{bench_perf:+.2f}%"
-                if bench_name == 'SP500':
-                    sp500_perf_num = bench_perf
-            else:
-                bench_data[bench_label] = "-"
-
-        # Alpha vs S&P 500 over the same window (Performance - SP500 perf)
-        if price_at_decision and target_price and sp500_perf_num is not None:
-            alpha_vs_sp500 = perf_pct - sp500_perf_num
-            alpha_str = f"{alpha_vs_sp500:+.2f}%"
+        bench_start = prices.at(bench_ticker, decision_dt)
+
+        # Determine end date for benchmark
+        if is_future:
+            bench_end = latest(bench_ticker)
         else:
-            alpha_str = "-"
-
-        # Seeking Alpha quant rank (lower = better)
-        sa_rank_val = d.get('sa_rank')
-        if sa_rank_val is not None:
-            try:
-                sa_rank_str = f"#{int(sa_rank_val)}"
-            except (TypeError, ValueError):
-                sa_rank_str = "-"
+            bench_end = prices.at(bench_ticker, target_dt)
+            # Fallback if no data on exact target date (e.g. holiday), try latest
+            if bench_end is None:
+                bench_end = latest(bench_ticker)
+
+        if bench_start and bench_end:
+            bench_perf = ((bench_end - bench_start) / bench_start) * 100
+            bench_data[bench_label] = f"{bench_perf:+.2f}%"
+            if bench_name == 'SP500':
+                sp500_perf_num = bench_perf
         else:
+            bench_data[bench_label] = "-"
+
+    # Alpha vs S&P 500 over the same window (Performance - SP500 perf)
+    if price_at_decision and target_price and sp500_perf_num is not None:
+        alpha_vs_sp500 = perf_pct - sp500_perf_num
+        alpha_str = f"{alpha_vs_sp500:+.2f}%"
+    else:
+        alpha_str = "-"
+
+    # Seeking Alpha quant rank (lower = better)
+    sa_rank_val = d.get('sa_rank')
+    if sa_rank_val is not None:
+        try:
+            sa_rank_str = f"#{int(sa_rank_val)}"
+        except (TypeError, ValueError):
             sa_rank_str = "-"
-
-        deep_research_verdict = d.get('deep_research_verdict')
-        batch_id = d.get('batch_id')
-        batch_winner = d.get('batch_winner')
-        
-        batch_status = "-"
-        if batch_winner:
-            batch_status = "🏆 WINNER"
-        elif batch_id:
-            batch_status = "Compared"
-
-        # Evidence Barometer Formatting
-        evidence_str = "-"
-        data_depth_raw = d.get('data_depth')
-        if data_depth_raw:
-            try:
-                import json
-                dd = json.loads(data_depth_raw)
-                
-                # News
-                news = dd.get('news', {})
-                n_count = news.get('total_count', 0)
-                providers = news.get('providers', {})
-                # Top 2 providers for brevity
-                top_provs = sorted(providers.items(), key=lambda x: x[1], reverse=True)[:2]
-                prov_str = ",".join([f"{k[:4]}:{v}" for k,v in top_provs]) # Abbreviate names
-                
-                # Transcript
-                fund = dd.get('fundamentals', {})
-                trans_avail = "Yes" if fund.get('transcript_available') else "No"
-                trans_len_k = int(fund.get('transcript_length', 0) / 1000)
-                
-                # Agents
-                agents = dd.get('agents', {})
-                total_k = int(sum(agents.values()) / 1000)
-                
-                evidence_str = f"N:{n_count}[{prov_str}] T:{trans_avail}({trans_len_k}k) A:{total_k}k"
-            except Exception as e:
-                evidence_str = "Error"
-
-        # Build Limit price string for BUY_LIMIT recommendations
-        entry_low = d.get('entry_price_low')
-        entry_high = d.get('entry_price_high')
-        if recommendation == "BUY_LIMIT" and (entry_low or entry_high):
-            if entry_low and entry_high:
-                limit_str = f"{float(entry_low):.2f}-{float(entry_high):.2f}"
-            elif entry_low:
-                limit_str = f"{float(entry_low):.2f}"
-            else:
-                limit_str = f"{float(entry_high):.2f}"
-        else:
-            limit_str = "-"
-
-        # Risk/Reward ratio at decision time (PM's planned R/R)
-        rr_val = d.get('risk_reward_ratio')
-        if rr_val is not None:
-            try:
-                rr_str = f"{float(rr_val):.2f}x"
-            except (TypeError, ValueError):
-                rr_str = "-"
+    else:
+        sa_rank_str = "-"
+
+    deep_research_verdict = d.get('deep_research_verdict')
+    batch_id = d.get('batch_id')
+    batch_winner = d.get('batch_winner')
+
+    batch_status = "-"
+    if batch_winner:
+        batch_status = "🏆 WINNER"
+    elif batch_id:
+        batch_status = "Compared"
+
+    # Build Limit price string for BUY_LIMIT recommendations
+    entry_low = d.get('entry_price_low')
+    entry_high = d.get('entry_price_high')
+    if recommendation == "BUY_LIMIT" and (entry_low or entry_high):
+        if entry_low and entry_high:
+            limit_str = f"{float(entry_low):.2f}-{float(entry_high):.2f}"
+        elif entry_low:
+            limit_str = f"{float(entry_low):.2f}"
         else:
+            limit_str = f"{float(entry_high):.2f}"
+    else:
+        limit_str = "-"
+
+    # Risk/Reward ratio at decision time (PM's planned R/R)
+    rr_val = d.get('risk_reward_ratio')
+    if rr_val is not None:
+        try:
+            rr_str = f"{float(rr_val):.2f}x"
+        except (TypeError, ValueError):
             rr_str = "-"
+    else:
+        rr_str = "-"
+
+    row = {
+        "Date": decision_dt.strftime("%Y-%m-%d"),
+        "Symbol": symbol,
+        "Market": region if region else "Unknown",
+        "Rec": recommendation,
+        "R/R": rr_str,
+        "Conv": d.get('conviction') or "-",
+        "Drop Type": (d.get('drop_type') or "-")[:14],
+        "Limit": limit_str,
+        "Price @ Dec": f"{price_at_decision:.2f}" if price_at_decision else "-",
+        f"Price +{window_days}d": f"{target_price:.2f}" if target_price else "-",
+        "Performance": f"{perf_pct:+.2f}%" if price_at_decision and target_price else "-",
+        f"Alpha vs SP500 {window_days}d": alpha_str,
+        f"Price +14d": f"{price_2w:.2f}" if price_2w else "-",
+        "Perf 2W": f"{perf_2w_pct:+.2f}%" if price_at_decision and price_2w else "-",
+        f"Price +28d": f"{price_4w:.2f}" if price_4w else "-",
+        "Perf 4W": f"{perf_4w_pct:+.2f}%" if price_at_decision and price_4w else "-",
+        "Verdict": deep_research_verdict if deep_research_verdict else "-",
+        "SA Rank": sa_rank_str,
+        "Batch": batch_status,
+        "Status": status,
+        "Evidence": _format_evidence(d.get('data_depth')),
+    }
+    # Add benchmark data
+    row.update(bench_data)
+
+    # Settled only once every bar a target lookup could have used (the target
+    # day plus LOOKUP_SLACK_DAYS) is dated before today: today's bar may be a
+    # live intraday one, and the store counts its later update as an append,
+    # not a rewrite, so a row frozen on it would never be recomputed.
+    last_bar_day = (max(target_dt, target_dt_2w, target_dt_4w) + timedelta(days=LOOKUP_SLACK_DAYS)).date()
+    settled = (
+        not same_day
+        and last_bar_day < now.date()
+        and not used_latest
+    )
+    return row, settled
+
+
+def update_report(decisions, window_days, full=False):
+    """Bring the materialized trade report up to date; returns the report rows, newest first.
+
+    Rows are reused from the trade_report table when the decision is
+    unchanged (same change_seq), the row is settled, and none of its
+    tickers' bars were rewritten in the price store since. Only the
+    remaining rows are recomputed, and only their symbols (plus the
+    benchmarks) are loaded from the store, which itself downloads just the
+    bars it hasn't seen yet. ``full`` recomputes every row.
+    """
+    stored = None if full else database.get_trade_report_rows(window_days, DB_PATH)
+    if stored is not None and any(d.get('change_seq') is None for d in decisions):
+        stored = None  # no change tracking: can't tell edited decisions apart
+    stored = stored or {}
+
+    bench_tickers = [t for t, _ in BENCHMARKS]
+    stamps = price_cache.rewritten_at([d['symbol'] for d in decisions if d.get('symbol')] + bench_tickers)
+    bench_stamp = max(stamps[t.upper()] for t in bench_tickers)
+
+    def price_stamp(d):
+        return max(stamps.get(str(d.get('symbol')).upper(), 0), bench_stamp)
+
+    def reusable(d):
+        known = stored.get(d.get('id'))
+        return (
+            known is not None and known[2]
+            and known[0] == d.get('change_seq') and known[1] == price_stamp(d)
+        )
+
+    todo = [d for d in decisions if not reusable(d)]
+    print(f"[Trade Report] Recomputing {len(todo)} of {len(decisions)} rows "
+          f"({len(decisions) - len(todo)} settled rows reused).")
+
+    computed = {}
+    if todo:
+        # 1. Daily history (1 year covers recent decisions) from the local
+        # price store, for the symbols being recomputed only.
+        all_symbols = list({d['symbol'] for d in todo if d.get('symbol')}) + bench_tickers
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=365)
+        frames = price_cache.prefetch(all_symbols, start_date, end_date, adjusted=True)
+        frames = {t: df for t, df in frames.items() if not df.empty}
+
+        failed_count = len(set(s.upper() for s in all_symbols)) - len(frames)
+        if failed_count > 0:
+            print(f"[Trade Report] {failed_count} of {len(all_symbols)} symbols failed (delisted/not found).")
+
+        print("Processing decisions...")
+        prices = PriceLookup(frames)
+        now = datetime.now()
+        for d in todo:
+            built = build_row(d, window_days, now, prices)
+            if built is not None:
+                computed[d.get('id')] = (d, built)
 
-        row = {
-            "Date": decision_dt.strftime("%Y-%m-%d"),
-            "Symbol": symbol,
-            "Market": region if region else "Unknown",
-            "Rec": recommendation,
-            "R/R": rr_str,
-            "Conv": d.get('conviction') or "-",
-            "Drop Type": (d.get('drop_type') or "-")[:14],
-            "Limit": limit_str,
-            "Price @ Dec": f"{price_at_decision:.2f}" if price_at_decision else "-",
-            f"Price +{window_days}d": f"{target_price:.2f}" if target_price else "-",
-            "Performance": f"{perf_pct:+.2f}%" if price_at_decision and target_price else "-",
-            f"Alpha vs SP500 {window_days}d": alpha_str,
-            f"Price +14d": f"{price_2w:.2f}" if price_2w else "-",
-            "Perf 2W": f"{perf_2w_pct:+.2f}%" if price_at_decision and price_2w else "-",
-            f"Price +28d": f"{price_4w:.2f}" if price_4w else "-",
-            "Perf 4W": f"{perf_4w_pct:+.2f}%" if price_at_decision and price_4w else "-",
-            "Verdict": deep_research_verdict if deep_research_verdict else "-",
-            "SA Rank": sa_rank_str,
-            "Batch": batch_status,
-            "Status": status,
-            "Evidence": evidence_str
-        }
-        # Add benchmark data
-        row.update(bench_data)
-        
-        report_data.append(row)
+    # Rows of deleted decisions, and of edited ones that no longer render, go.
+    keep = {d.get('id') for d in decisions} - ({d.get('id') for d in todo} - set(computed))
+    try:
+        database.apply_trade_report_update(
+            window_days,
+            [
+                {"decision_id": i, "change_seq": d.get('change_seq'), "price_stamp": price_stamp(d),
+                 "settled": settled, "decided_at": d.get('timestamp'), "row": row}
+                for i, (d, (row, settled)) in computed.items() if i is not None
+            ],
+            removed=[i for i in stored if i not in keep],
+            db_path=DB_PATH,
+        )
+        report_data = database.export_trade_report_rows(window_days, DB_PATH)
+    except Exception as e:
+        print(f"[Trade Report] Could not update the trade_report table ({e}); using this run's rows.")
+        report_data = []
+        for d in decisions:
+            if d.get('id') in computed:
+                report_data.append(computed[d.get('id')][1][0])
+            elif d.get('id') in stored:
+                report_data.append(stored[d.get('id')][3])
 
     report_data.sort(key=lambda x: x['Date'], reverse=True)
-    
-    # Save Full CSV
+    return report_data
+
+
+def main():
+    parser_arg = argparse.ArgumentParser(description="Generate Trade Decision Report")
+    parser_arg.add_argument("--window", type=int, default=7, help="Performance tracking window in days (default: 7)")
+    parser_arg.add_argument("--full", action="store_true",
+                            help="Recompute every row instead of only new, edited and still-open ones")
+
+    # Process args safely, ignoring uvicorn or pytest arguments if called programmatically
+    clean_args = [a for a in sys.argv[1:] if not a.startswith('main:app') and a != '--reload' and not a.startswith('--enable-email')]
+    args, unknown = parser_arg.parse_known_args(clean_args)
+
+    window_days = args.window
+
+    print(f"Generating Trade Decision Report ({window_days}-day window)...")
+    decisions = get_decision_points()
+
+    if not decisions:
+        print("No trade decisions found.")
+        return
+
+    report_data = update_report(decisions, window_days, full=args.full)
+
+    # Export the materialized table as CSV
     csv_file = os.path.join("data", f"trade_report_full_{window_days}d.csv")
     pd.DataFrame(report_data).to_csv(csv_file, index=False)
     print(f"Full CSV report saved to {csv_file}")
-    
+
     # Generate Truncated Markdown Table (Top 100)
     LIMIT = 100
     shown_data = report_data[:LIMIT]
-    
+
     headers = ["Date", "Symbol", "Market", "Rec", "R/R", "Conv", "Drop Type", "Limit", "Price @ Dec", f"Price +{window_days}d", "Performance", f"Alpha vs SP500 {window_days}d", "Price +14d", "Perf 2W", "Price +28d", "Perf 4W", f"SP500 {window_days}d", f"Dow {window_days}d", f"DAX {window_days}d", "Verdict", "SA Rank", "Batch", "Status", "Evidence"]
     widths = {h: len(h) for h in headers}
     for row in shown_data:
         for h in headers:
             val = str(row.get(h, '-'))
             widths[h] = max(widths[h], len(val))
-            
+
     fmt = "| " + " | ".join([f"{{:<{widths[h]}}}" for h in headers]) + " |"
-    
+
     print(f"\n# Trade Decision Report (Latest {LIMIT})")
     print(f"\n> [!TIP]\n> This table shows the latest {LIMIT} decisions. For the full history, please see the [CSV Report](file://{os.getcwd()}/{csv_file}).\n")
     print(fmt.format(*headers))
     print("| " + " | ".join(["-" * widths[h] for h in headers]) + " |")
-    
+
     count = 0
     for row in shown_data:
         print(fmt.format(*[str(row.get(h, '-')) for h in headers]))
         count += 1
-        
+
     print(f"\nTotal Decisions: {len(report_data)} (Showing {count})")
 
 if __name__ == "__main__":
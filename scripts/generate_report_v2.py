@@ -1,6 +1,5 @@
 import sqlite3
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import os
 import sys
@@ -28,6 +27,7 @@ def fetch_data():
     return df
 
 from app.services.yahoo_ticker_resolver import YahooTickerResolver
+from app.services.analytics import price_cache
 import contextlib
 import io
 
@@ -63,14 +63,11 @@ def fetch_yfinance_data(symbols, indices_tickers=['^GSPC', '^DJI', '^GDAXI']):
     
     print(f"Fetching data for {len(all_tickers)} unique tickers...")
     
-    # Download data
+    # Adjusted closes for the last 3 months from the local price store
     # Suppress YFinance noise
+    now = datetime.now()
     with suppress_output():
-        data = yf.download(all_tickers, period="3mo", interval="1d", progress=False)['Close']
-    
-    # If single ticker result, it's a Series, convert to DF
-    if isinstance(data, pd.Series):
-        data = data.to_frame()
+        data = pd.DataFrame(price_cache.get_closes(all_tickers, now - timedelta(days=92), now))
         
     # Map back? The DataFrame columns will be the RESOLVED tickers.
     # When we query, we need to query by resolved ticker.
@@ -66,3 +66,14 @@ def _no_production_db(monkeypatch, tmp_path):
     elif os.getenv("DB_PATH", "subscribers.db") == "subscribers.db":
         # Module redirected DB_NAME but not the env var — align them.
         monkeypatch.setenv("DB_PATH", str(db.DB_NAME))
+
+
+@pytest.fixture(autouse=True)
+def _no_report_files(monkeypatch, tmp_path):
+    """Keep rendered PDFs out of the working tree: the shared render cache
+    (data/pdf_cache) and the email report dir (data/reports) point at the
+    test's tmp_path. Email tests reach both through send_notification."""
+    from app.services import email_service, pdf_render_service
+
+    monkeypatch.setattr(pdf_render_service.pdf_render_service, "cache_dir", str(tmp_path / "pdf_cache"))
+    monkeypatch.setattr(email_service, "REPORTS_DIR", str(tmp_path / "reports"))
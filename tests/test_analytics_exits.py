@@ -0,0 +1,138 @@
+"""Vectorized exit rules match the per-trade day loops in exit_strategy_comparison."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analytics import exits as ex
+from scripts.analysis import exit_strategy_comparison as esc
+
+MAX_DAYS = 5
+
+
+@pytest.fixture(scope="module")
+def cohort():
+    rng = np.random.default_rng(11)
+    idx = pd.bdate_range("2026-01-05", periods=40)
+    bars = {}
+    for i in range(6):
+        close = 20 * np.cumprod(1 + rng.normal(0, 0.03, len(idx)))
+        # Cent-rounded, wide bars: levels are often touched exactly and a
+        # single bar often crosses both an upper and a lower exit.
+        bars[f"T{i}"] = pd.DataFrame({
+            "Open": close,
+            "High": np.round(close * rng.uniform(1.0, 1.08, len(idx)), 2),
+            "Low": np.round(close * rng.uniform(0.92, 1.0, len(idx)), 2),
+            "Close": np.round(close, 2),
+        }, index=idx)
+    bars["T5"].iloc[7, bars["T5"].columns.get_loc("High")] = np.nan
+    symbols = [f"T{i}" for i in rng.integers(0, 6, 80)] + ["T0", "T1", "NONE"]
+    dates = list(idx[rng.integers(0, len(idx), 80)]) + [idx[-1], idx[-3], idx[0]]
+    trades = pd.DataFrame({
+        "symbol": symbols,
+        "decision_date": dates,
+        "price_at_decision": [float(bars[s]["Close"].loc[d]) if s in bars else 10.0
+                              for s, d in zip(symbols, dates)],
+        "intent": "ENTER_NOW",
+        "risk_reward_ratio": 2.0,
+    })
+    return trades, bars, ex.build_paths(trades, bars, MAX_DAYS)
+
+
+def _expected(trades, bars, sim):
+    rows = []
+    for _, row in trades.iterrows():
+        out = sim(float(row["price_at_decision"]), row["decision_date"], bars.get(row["symbol"]))
+        if out is not None:
+            rows.append((out["exit_reason"], out["exit_day"], out["exit_return"]))
+    return rows
+
+
+def _check(cohort, exits, sims, reason_map=None):
+    trades, bars, paths = cohort
+    assert exits.exit_return.shape == (len(paths), len(sims))
+    for j, sim in enumerate(sims):
+        expected = _expected(trades, bars, sim)
+        got = exits.column(j)
+        assert len(got) == len(expected)
+        reasons = got["exit_reason"].map(reason_map or {}).fillna(got["exit_reason"])
+        assert list(reasons) == [r for r, _, _ in expected]
+        assert list(got["exit_day"]) == [d for _, d, _ in expected]
+        np.testing.assert_array_equal(got["exit_return"].to_numpy(), [r for _, _, r in expected])
+
+
+def test_hold_and_oracle(cohort):
+    paths = cohort[2]
+    _check(cohort, ex.hold(paths, MAX_DAYS), [lambda e, d, b: esc.sim_baseline(e, d, b, MAX_DAYS)])
+    _check(cohort, ex.oracle(paths, MAX_DAYS), [lambda e, d, b: esc.sim_oracle(e, d, b, MAX_DAYS)])
+
+
+def test_hard_tp_sl(cohort):
+    params = ex.grid(tp=[0.01, 0.03, 0.06], sl=[0.01, 0.04])
+    exits = ex.hard_tp_sl(cohort[2], **params, max_days=MAX_DAYS)
+    sims = [lambda e, d, b, tp=tp, sl=sl: esc.sim_hard_tp_sl(e, d, b, tp, sl, MAX_DAYS)
+            for tp, sl in zip(params["tp"], params["sl"])]
+    _check(cohort, exits, sims, {"SL_FIRST": "SL"})
+    assert (exits.reason == ex.SL_FIRST).any()
+
+
+def test_trailing_stop(cohort):
+    params = ex.grid(trail=[0.01, 0.02, 0.05], initial_sl=[0.03, 0.095])
+    exits = ex.trailing_stop(cohort[2], **params, max_days=MAX_DAYS)
+    sims = [lambda e, d, b, t=t, s=s: esc.sim_trailing_stop(e, d, b, t, s, MAX_DAYS)
+            for t, s in zip(params["trail"], params["initial_sl"])]
+    _check(cohort, exits, sims)
+    assert {ex.TRAIL_SL, ex.INITIAL_SL} <= set(np.unique(exits.reason))
+
+
+def test_breakeven_trail(cohort):
+    params = ex.grid(trigger=[0.01, 0.03, 0.08], trail=[0.01, 0.03], initial_sl=[0.04])
+    exits = ex.breakeven_trail(cohort[2], **params, max_days=MAX_DAYS)
+    sims = [lambda e, d, b, g=g, t=t, s=s: esc.sim_breakeven_trail(e, d, b, g, t, s, MAX_DAYS)
+            for g, t, s in zip(params["trigger"], params["trail"], params["initial_sl"])]
+    _check(cohort, exits, sims)
+    assert {ex.BE_TRAIL, ex.INITIAL_SL} <= set(np.unique(exits.reason))
+
+
+def test_time_decay(cohort):
+    params = ex.grid(check_day=[1, 2, 3, 5], min_progress=[-0.02, 0.0, 0.02])
+    exits = ex.time_decay(cohort[2], **params, max_days=MAX_DAYS)
+    sims = [lambda e, d, b, c=c, m=m: esc.sim_time_decay(e, d, b, c, m, MAX_DAYS)
+            for c, m in zip(params["check_day"], params["min_progress"])]
+    _check(cohort, exits, sims)
+
+
+def test_multi_tier_tp(cohort):
+    params = ex.grid(tp1=[0.01, 0.03, 0.05], tp2=[0.02, 0.06], sl=[0.02, 0.05], partial=[0.5, 0.3])
+    exits = ex.multi_tier_tp(cohort[2], **params, max_days=MAX_DAYS)
+    sims = [lambda e, d, b, a=a, c=c, s=s, p=p: esc.sim_multi_tier_tp(e, d, b, a, c, s, p, MAX_DAYS)
+            for a, c, s, p in zip(params["tp1"], params["tp2"], params["sl"], params["partial"])]
+    labels = {j: f"TP1={a:.0%}|TP2={c:.0%}" for j, (a, c) in enumerate(zip(params["tp1"], params["tp2"]))}
+    trades, bars, paths = cohort
+    for j, sim in enumerate(sims):
+        expected = _expected(trades, bars, sim)
+        got = exits.column(j)
+        assert {r for r, _, _ in expected} <= {labels[j]}
+        assert list(got["exit_day"]) == [d for _, d, _ in expected]
+        np.testing.assert_array_equal(got["exit_return"].to_numpy(), [r for _, _, r in expected])
+
+
+def test_sweep_blocks_match_one_shot(cohort, monkeypatch):
+    paths = cohort[2]
+    params = ex.grid(trail=np.arange(0.01, 0.1, 0.01), initial_sl=[0.03, 0.095])
+    whole = ex.summarize(ex.trailing_stop(paths, **params, max_days=MAX_DAYS), 750.0, 6.0)
+    monkeypatch.setattr(ex, "BLOCK_CELLS", len(paths) * MAX_DAYS * 4)
+    pd.testing.assert_frame_equal(ex.sweep(ex.trailing_stop, paths, params, 750.0, 6.0, MAX_DAYS), whole)
+    assert whole["n"].eq(len(paths)).all()
+    assert (whole["n_trail_sl"] + whole["n_initial_sl"] + whole["n_timeout"]).eq(len(paths)).all()
+
+
+def test_run_strategy_totals(cohort):
+    trades, bars, paths = cohort
+    exits = ex.hard_tp_sl(paths, tp=[0.03, 0.21], sl=0.095, max_days=MAX_DAYS)
+    results = esc.run_strategy(["a", "b"], exits, trades, paths, 750.0, 6.0)
+    for res, tp in zip(results, (0.03, 0.21)):
+        expected = [r for _, _, r in _expected(
+            trades, bars, lambda e, d, b: esc.sim_hard_tp_sl(e, d, b, tp, 0.095, MAX_DAYS))]
+        assert res["n"] == len(expected) == len(res["detail"])
+        assert res["total_net_eur"] == pytest.approx(sum(750.0 * r - 6.0 for r in expected))
+        assert res["median_return"] == pytest.approx(float(np.median(expected)))
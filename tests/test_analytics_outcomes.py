@@ -78,3 +78,62 @@ def test_enrich_outcomes_with_cohort():
     assert "return_1w" in enriched.columns
     assert "max_roi_4w" in enriched.columns
     assert enriched.iloc[0]["return_1w"] == pytest.approx(0.05, abs=1e-3)
+
+
+def _random_cohort(seed, n_rows=300, intents=("ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL")):
+    rng = np.random.default_rng(seed)
+    bars = {}
+    for i, ticker in enumerate(["AAA", "BBB", "CCC", "DDD", "EEE"]):
+        n = int(rng.integers(1, 90))
+        idx = pd.bdate_range("2026-01-05", periods=n) if i % 2 else pd.bdate_range("2026-01-20", periods=n)
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.03, n))
+        frame = pd.DataFrame(
+            {"Open": close, "High": close * 1.02, "Low": close * 0.98, "Close": close}, index=idx
+        )
+        frame.iloc[rng.integers(0, n, 2)] = np.nan  # yfinance gaps
+        if ticker == "DDD":
+            frame = frame[["Close"]]  # no High/Low -> close fallback, no limit fills
+        bars[ticker] = frame.sample(frac=1, random_state=seed)  # unsorted on purpose
+    dates = pd.to_datetime("2026-01-01") + pd.to_timedelta(rng.integers(0, 140, n_rows), unit="D")
+    price = rng.uniform(60, 140, n_rows)
+    price[rng.random(n_rows) < 0.05] = np.nan
+    price[rng.random(n_rows) < 0.03] = 0.0
+    drop = rng.choice([-5.0, -8.0, -12.0, 0.0, -100.0, np.nan], n_rows)
+    lo = rng.uniform(85, 110, n_rows)
+    cohort = pd.DataFrame({
+        "id": np.arange(n_rows),
+        "symbol": rng.choice(["aaa", "BBB", "CCC", "DDD", "EEE", "ZZZ"], n_rows),
+        "price_at_decision": price,
+        "decision_date": dates,
+        "drop_percent": drop,
+        "pre_drop_price": np.where(rng.random(n_rows) < 0.3, price * 1.1, np.nan),
+        "intent": rng.choice(list(intents), n_rows),
+        "entry_price_low": np.where(rng.random(n_rows) < 0.8, lo, np.nan),
+        "entry_price_high": lo + rng.uniform(0, 10, n_rows),
+    })
+    cohort.loc[rng.random(n_rows) < 0.02, "decision_date"] = pd.NaT
+    return cohort, bars
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("intents", [
+    ("ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL"), ("ENTER_LIMIT",), ("ENTER_NOW",),
+])
+def test_vectorized_enrich_matches_rowwise(seed, intents):
+    from app.services.analytics.outcomes import _enrich_outcomes_rowwise
+
+    cohort, bars = _random_cohort(seed, intents=intents)
+    expected = _enrich_outcomes_rowwise(cohort, bars)
+    actual = enrich_outcomes(cohort, bars)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+
+def test_vectorized_enrich_matches_rowwise_edge_frames():
+    from app.services.analytics.outcomes import _enrich_outcomes_rowwise
+
+    cohort, bars = _random_cohort(0, n_rows=40)
+    for frame in (cohort.drop(columns=["pre_drop_price", "intent"]), cohort.iloc[:1], cohort.iloc[5:9]):
+        pd.testing.assert_frame_equal(
+            enrich_outcomes(frame, bars), _enrich_outcomes_rowwise(frame, bars), check_exact=True
+        )
+    assert enrich_outcomes(cohort.iloc[:0], bars).empty
@@ -0,0 +1,158 @@
+"""Event-driven portfolio engine: parity with portfolio_sim and a per-scenario loop."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analytics import portfolio
+from scripts.analysis import portfolio_sim as ps
+
+HORIZON = 5
+INTENTS = ["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL", None]
+
+
+@pytest.fixture(scope="module")
+def cohort():
+    rng = np.random.default_rng(5)
+    idx = pd.bdate_range("2026-01-05", periods=50)
+    bars = {}
+    for name in [f"T{i}" for i in range(8)] + ["SPY"]:
+        close = 20 * np.cumprod(1 + rng.normal(0, 0.03, len(idx)))
+        bars[name] = pd.DataFrame({"High": close * 1.02, "Low": close * 0.98, "Close": close}, index=idx)
+    n = 120
+    symbols = [f"T{i}" for i in rng.integers(0, 8, n)] + ["NONE"]
+    dates = list(idx[rng.integers(0, len(idx), n)]) + [idx[0]]
+    df = pd.DataFrame({
+        "symbol": symbols,
+        "decision_date": dates,
+        "price_at_decision": [float(bars[s]["Close"].loc[d]) if s in bars else 10.0
+                              for s, d in zip(symbols, dates)],
+        "intent": [INTENTS[i] for i in rng.integers(0, len(INTENTS), n + 1)],
+        "recommendation": "BUY",
+        "risk_reward_ratio": np.round(rng.uniform(0.2, 4.0, n + 1), 1),
+    })
+    df.loc[::9, "risk_reward_ratio"] = np.nan
+    returns = []
+    for s, d, p in zip(df["symbol"], df["decision_date"], df["price_at_decision"]):
+        fwd = bars[s].loc[d:, "Close"] if s in bars else pd.Series(dtype=float)
+        returns.append((fwd.iloc[HORIZON] - p) / p if len(fwd) > HORIZON else np.nan)
+    df["return_1w"] = returns
+    spy = bars.pop("SPY")
+    return df, bars, spy
+
+
+@pytest.fixture(scope="module")
+def book(cohort):
+    df, bars, spy = cohort
+    return ps.build_book(df, bars, spy, "risk_reward_ratio", "1w")
+
+
+@pytest.fixture(scope="module")
+def reference(cohort, monkeypatch_module):
+    df, _, spy = cohort
+    monkeypatch_module.setattr(ps, "get_bars", lambda *a, **k: spy)
+    spy_returns = ps._spy_returns_by_date(df["decision_date"], HORIZON)
+
+    def run(sub, rr_min, investment=750.0):
+        return ps.run_simulation(sub, "risk_reward_ratio", rr_min, "1w", investment,
+                                 3.0, 3.0, spy_returns=spy_returns)[1]
+    return run
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    mp = pytest.MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+_AGG = {"strategy_net_eur": "total_net_pnl_eur", "spy_net_eur": "total_spy_net_pnl_eur",
+        "alpha_eur": "total_alpha_eur"}
+
+
+def _same(row, agg):
+    for col in ("n_trades", "total_invested_eur", "strategy_net_eur", "spy_net_eur",
+                "alpha_eur", "roi", "alpha_roi"):
+        assert row[col] == pytest.approx(agg[_AGG.get(col, col)], rel=1e-9, abs=1e-9), col
+
+
+def test_unconstrained_sweeps_match_run_simulation(cohort, book, reference):
+    df, _, _ = cohort
+    thresholds = [0.5, 1.0, 1.5, 2.5, 3.5, 10.0]
+    rr = ps.sweep_rr_cutoff(book, thresholds, 750.0, 3.0, 3.0)
+    for (_, row), t in zip(rr.iterrows(), thresholds):
+        agg = reference(df, t)
+        _same(row, agg)
+        assert row["win_rate_net"] == pytest.approx(agg["win_rate_net"])
+        assert row["spy_roi"] == pytest.approx(agg["spy_roi"])
+    assert (rr["n_skipped"] == 0).all()
+
+    buy = ps.sweep_rr_cutoff(book, thresholds, 750.0, 3.0, 3.0, intents=ps._BUY)
+    for (_, row), t in zip(buy.iterrows(), thresholds):
+        _same(row, reference(df[df["intent"].isin(ps._BUY)], t))
+
+    pv = ps.per_verdict_breakdown(book, 1.5, 750.0, 3.0, 3.0)
+    for _, row in pv.iterrows():
+        sub = df if row["intent"] == "TOTAL" else df[df["intent"] == row["intent"]]
+        _same(row, reference(sub, 1.5))
+
+    drop = ps.sweep_drop_one_verdict(book, 1.5, 750.0, 3.0, 3.0)
+    subsets = [df] + [df[df["intent"] != d] for d in ps._INTENTS] + [df[df["intent"].isin(ps._BUY)]]
+    for (_, row), sub in zip(drop.iterrows(), subsets):
+        _same(row, reference(sub, 1.5))
+
+    inv = ps.sweep_investment(book, 1.5, 3.0, 3.0, [100.0, 750.0, 5000.0])
+    for _, row in inv.iterrows():
+        _same(row, reference(df, 1.5, row["per_trade_eur"]))
+
+
+def _loop(book, rr_min, investment, cost_in, cost_out, capital, max_positions):
+    """One scenario, one position at a time: settle exits, then enter."""
+    order = sorted(range(len(book)), key=lambda i: (
+        book.entry_at[i], -(book.rr[i] if not np.isnan(book.rr[i]) else -np.inf), i))
+    cash, open_, taken = capital, [], set()
+    for i in order:
+        for j in [j for j in open_ if book.exit_at[j] <= book.entry_at[i]]:
+            cash += investment * (1 + book.exit_return[j]) - cost_out
+            open_.remove(j)
+        if not book.rr[i] > rr_min:
+            continue
+        if len(open_) < max_positions and cash >= investment + cost_in:
+            cash -= investment + cost_in
+            open_.append(i)
+            taken.add(i)
+    return taken
+
+
+@pytest.mark.parametrize("capital,max_positions", [(3000.0, np.inf), (np.inf, 3), (2000.0, 2), (10_000.0, 6)])
+def test_capital_and_slot_limits_match_loop(book, capital, max_positions):
+    table = portfolio.scenarios(rr_min=[0.5, 1.5, 3.0], investment=[500.0, 1000.0]).assign(
+        capital=capital, max_positions=max_positions, cost_in=2.0, cost_out=4.0,
+    )
+    run = portfolio.simulate(book, table)
+    summary = portfolio.summarize(run)
+    for s, row in table.iterrows():
+        expected = _loop(book, row["rr_min"], row["investment"], 2.0, 4.0, capital, max_positions)
+        assert set(np.flatnonzero(run.taken[:, s])) == expected
+        wanted = int((book.rr > row["rr_min"]).sum())
+        assert summary.loc[s, "n_trades"] + summary.loc[s, "n_skipped_slots"] + \
+            summary.loc[s, "n_skipped_cash"] == wanted
+        assert summary.loc[s, "peak_positions"] <= max_positions
+    assert (summary["n_skipped_slots"] + summary["n_skipped_cash"]).sum() > 0
+
+
+def test_ledger_and_scenario_defaults(cohort, book):
+    df, _, _ = cohort
+    table = portfolio.scenarios([{"rr_min": 2.0, "intents": "ENTER_NOW"}, {"max_positions": 1}])
+    assert table.loc[0, "intents"] == ("ENTER_NOW",) and table.loc[1, "intents"] is None
+    assert np.isneginf(table.loc[1, "rr_min"]) and table.loc[1, "investment"] == 750.0
+
+    run = portfolio.simulate(book, table)
+    summary = portfolio.summarize(run)
+    led = portfolio.ledger(df, run, 0)
+    assert len(led) == summary.loc[0, "n_trades"]
+    assert set(led["intent"]) == {"ENTER_NOW"} and (led["rr"] > 2.0).all()
+    assert led["net_pnl_eur"].sum() == pytest.approx(summary.loc[0, "total_net_pnl_eur"])
+    assert (led["exit_at"] > led["entry_at"]).all()
+    # One slot: positions never overlap.
+    one = portfolio.ledger(df, run, 1)
+    assert (one["entry_at"].to_numpy()[1:] >= one["exit_at"].to_numpy()[:-1]).all()
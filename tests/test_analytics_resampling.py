@@ -0,0 +1,66 @@
+"""Vectorized bootstrap / permutation resampling."""
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.services.analytics import resampling
+
+
+@pytest.fixture
+def skewed():
+    return np.random.default_rng(0).lognormal(0, 0.6, 120) - 1
+
+
+def test_bootstrap_matches_a_resampling_loop(skewed, monkeypatch):
+    monkeypatch.setattr(resampling, "BLOCK_CELLS", 120 * 7)  # several chunks, uneven tail
+    dist = resampling.bootstrap_distribution(skewed, "median", n_resamples=50, seed=3)
+    expected = []
+    for child in np.random.SeedSequence(3).spawn(8):
+        rng = np.random.default_rng(child)
+        rows = rng.integers(0, len(skewed), size=(min(7, 50 - len(expected)), len(skewed)))
+        expected.extend(np.median(skewed[r]) for r in rows)
+    np.testing.assert_allclose(dist, expected)
+
+
+def test_bootstrap_ci_is_deterministic_and_worker_independent(skewed, monkeypatch):
+    monkeypatch.setattr(resampling, "BLOCK_CELLS", 120 * 100)
+    one = resampling.bootstrap(skewed, "mean", n_resamples=3000, seed=7)
+    many = resampling.bootstrap(skewed, "mean", n_resamples=3000, seed=7, workers=4)
+    assert one == many
+    assert one["n"] == 120 and one["estimate"] == pytest.approx(skewed.mean())
+    assert one["ci_low"] < one["estimate"] < one["ci_high"]
+    # Close to the t-interval on a sample this size.
+    half = stats.t.ppf(0.975, 119) * skewed.std(ddof=1) / np.sqrt(120)
+    assert one["ci_high"] - one["ci_low"] == pytest.approx(2 * half, rel=0.15)
+    assert one["se"] == pytest.approx(skewed.std(ddof=1) / np.sqrt(120), rel=0.1)
+
+
+def test_bootstrap_small_and_custom_statistic():
+    assert resampling.bootstrap([np.nan, 0.2])["ci_low"] is None
+    assert resampling.bootstrap([])["estimate"] is None
+    out = resampling.bootstrap([0.1, -0.2, 0.3, 0.05], lambda x: x.max(axis=1) - x.min(axis=1))
+    assert out["estimate"] == pytest.approx(0.5) and out["ci_high"] <= 0.5 + 1e-12
+    with pytest.raises(ValueError):
+        resampling.bootstrap([1.0, 2.0], "mode")
+
+
+def test_permutation_test_agrees_with_scipy(skewed):
+    a, b = skewed[:40], skewed[40:] + 0.15
+    ours = resampling.permutation_test(a, b, n_resamples=20000, seed=1)
+    ref = stats.permutation_test(
+        (a, b), lambda x, y, axis: x.mean(axis) - y.mean(axis),
+        n_resamples=20000, vectorized=True, random_state=1,
+    )
+    assert ours["diff"] == pytest.approx(a.mean() - b.mean())
+    assert ours["p_value"] == pytest.approx(ref.pvalue, abs=0.02)
+    less = resampling.permutation_test(a, b, alternative="less", n_resamples=20000, seed=1)
+    assert less["p_value"] == pytest.approx(ours["p_value"] / 2, abs=0.02)
+
+
+def test_permutation_ties_and_empty_groups():
+    same = resampling.permutation_test([0.1] * 5, [0.1] * 6, n_resamples=200)
+    assert same["p_value"] == 1.0
+    assert resampling.permutation_test([], [0.1])["p_value"] is None
+    # Three values can only split one way into 1 vs 2 up to labels.
+    p = resampling.permutation_test([10.0], [0.0, 0.0], alternative="greater", n_resamples=3000)["p_value"]
+    assert p == pytest.approx(1 / 3, abs=0.03)
@@ -0,0 +1,159 @@
+"""Incremental Arrow snapshot of decisions / tracking / token usage."""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import app.database as db
+from app.services.analytics import snapshot
+from app.services.analytics.cohort import load_cohort
+
+
+@pytest.fixture
+def snap_db(temp_db, tmp_path, monkeypatch):
+    db_path, decision_id = temp_db
+    monkeypatch.setenv("DB_PATH", db_path)
+    monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    return db_path, decision_id
+
+
+def _parts(table):
+    return snapshot._load_manifest(snapshot.snapshot_dir())["tables"][table]["parts"]
+
+
+def test_refresh_appends_only_changed_rows(snap_db):
+    _, decision_id = snap_db
+    assert snapshot.refresh()["decision_points"] == 1
+    assert snapshot.refresh() == {"decision_points": 0, "decision_tracking": 0, "agent_token_usage": 0}
+
+    db.add_decision_point("ACME", 12.5, -7.0, "BUY", "cheap")
+    db.update_decision_point(decision_id, "AVOID", "changed my mind", "Ignored")
+    assert snapshot.refresh()["decision_points"] == 2
+    assert len(_parts("decision_points")) == 2
+
+    df = snapshot.read_table("decision_points", refresh_first=False).set_index("symbol")
+    assert df.loc["TEST", "recommendation"] == "AVOID"
+    assert df.loc["ACME", "price_at_decision"] == 12.5
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+
+
+def test_deletes_are_tombstoned(snap_db):
+    _, decision_id = snap_db
+    snapshot.refresh()
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM decision_points WHERE id = ?", (decision_id,))
+    assert snapshot.read_table("decision_points").empty
+
+
+def test_column_pruning(snap_db):
+    df = snapshot.read_table("decision_points", columns=["symbol", "drop_percent"])
+    assert list(df.columns) == ["symbol", "drop_percent"]
+    assert df.iloc[0].tolist() == ["TEST", -6.0]
+
+
+def test_parts_are_compacted(snap_db, monkeypatch):
+    monkeypatch.setattr(snapshot, "MAX_PARTS", 2)
+    for i in range(4):
+        db.add_decision_point(f"S{i}", 1.0, -6.0, "BUY", "r")
+        snapshot.refresh()
+    assert len(_parts("decision_points")) <= 2
+    assert sorted(snapshot.read_table("decision_points")["symbol"]) == ["S0", "S1", "S2", "S3", "TEST"]
+    files = {p.name for p in snapshot.snapshot_dir().glob("*.arrow")}
+    assert files == set(_parts("decision_points"))
+
+
+def test_append_only_table_rebuilds_after_delete(snap_db):
+    _, decision_id = snap_db
+    for price in (1.0, 2.0, 3.0):
+        db.add_tracking_point(decision_id, price)
+    assert snapshot.refresh()["decision_tracking"] == 3
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM decision_tracking WHERE price = 2.0")
+    snapshot.refresh()
+    assert sorted(snapshot.read_table("decision_tracking")["price"]) == [1.0, 3.0]
+
+
+def test_replaced_db_rebuilds(snap_db, tmp_path, monkeypatch):
+    snapshot.refresh()
+    other = str(tmp_path / "other.db")
+    monkeypatch.setattr(db, "DB_NAME", other)
+    db.init_db()
+    db.add_decision_point("NEWDB", 1.0, -6.0, "BUY", "r")
+    assert list(snapshot.read_table("decision_points", db_path=other)["symbol"]) == ["NEWDB"]
+
+
+def test_load_cohort_matches_sqlite(snap_db):
+    db_path, _ = snap_db
+    db.add_decision_point("ACME", 10.0, -8.0, "BUY_LIMIT", "r")
+    db.add_decision_point("MSFT", 300.0, -5.0, "AVOID", "r")
+    from_snapshot = load_cohort(start_date=None)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE change_counter")  # forces the SQLite fallback
+    conn.commit()
+    conn.close()
+    from_sqlite = load_cohort(start_date=None)
+
+    cols = ["id", "symbol", "price_at_decision", "intent", "decision_date"]
+    pd.testing.assert_frame_equal(
+        from_snapshot[cols].sort_values("id").reset_index(drop=True),
+        from_sqlite[cols].sort_values("id").reset_index(drop=True),
+    )
+    pruned = load_cohort(start_date=None, columns=["price_at_decision"])
+    assert set(pruned.columns) == {"symbol", "recommendation", "timestamp",
+                                   "price_at_decision", "decision_date", "intent"}
+
+
+def test_concurrent_refreshes_do_not_append_twice(snap_db, monkeypatch):
+    import threading
+    import time
+
+    write_part = snapshot._write_part
+
+    def slow_write_part(*args):
+        time.sleep(0.05)  # widen the read-manifest -> write-manifest window
+        return write_part(*args)
+
+    monkeypatch.setattr(snapshot, "_write_part", slow_write_part)
+    for i in range(3):
+        db.add_decision_point(f"T{i}", 10.0 + i, -6.0, "BUY", "r")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(snapshot.refresh())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(r["decision_points"] for r in results) == 4
+    assert len(_parts("decision_points")) == 1
+    state = snapshot._load_manifest(snapshot.snapshot_dir())["tables"]["decision_points"]
+    assert state["rows"] == 4
+
+
+def test_compaction_waits_for_readers(snap_db, monkeypatch):
+    import threading
+
+    monkeypatch.setattr(snapshot, "MAX_PARTS", 1)
+    snapshot.refresh()
+    db.add_decision_point("ACME", 1.0, -6.0, "BUY", "r")
+    load_manifest = snapshot._load_manifest
+    compactor = threading.Thread(target=snapshot.refresh)
+
+    def load_then_compact(root):
+        manifest = load_manifest(root)
+        if compactor.ident is None:
+            # A second refresh appends ACME's part, compacts, and removes the
+            # part this reader just listed - unless it waits for the reader.
+            compactor.start()
+            compactor.join(timeout=0.5)
+        return manifest
+
+    monkeypatch.setattr(snapshot, "_load_manifest", load_then_compact)
+    df = snapshot.read_table("decision_points", refresh_first=False)
+    compactor.join()
+    assert df["symbol"].tolist() == ["TEST"]
+    monkeypatch.setattr(snapshot, "_load_manifest", load_manifest)
+    assert len(_parts("decision_points")) == 1
+    assert sorted(snapshot.read_table("decision_points", refresh_first=False)["symbol"]) == ["ACME", "TEST"]
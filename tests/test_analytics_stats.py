@@ -3,6 +3,7 @@ import pandas as pd
 import pytest
 
 from app.services.analytics.stats import (
+    bootstrap_by_group,
     correlation,
     pairwise_welch,
     recovery_stats,
@@ -163,3 +164,36 @@ def test_recovery_stats_counts_and_percentiles():
     assert avoid["n_total"] == 3
     assert avoid["n_recovered"] == 2
     assert avoid["recovery_rate"] == pytest.approx(2 / 3)
+
+
+def test_pairwise_welch_permutation_p():
+    rng = np.random.default_rng(seed=0)
+    df = pd.DataFrame({
+        "intent": ["BUY"] * 30 + ["AVOID"] * 30 + ["NEUTRAL"] * 30,
+        "return_4w": np.concatenate([
+            rng.normal(0.10, 0.05, 30), rng.normal(-0.05, 0.05, 30), rng.normal(-0.05, 0.05, 30),
+        ]),
+    })
+    plain = pairwise_welch(df, group_col="intent", value_col="return_4w")
+    assert "perm_p" not in plain.columns
+    out = pairwise_welch(df, group_col="intent", value_col="return_4w", n_permutations=2000)
+    assert list(out.columns[-2:]) == ["perm_p", "perm_p_fdr"]
+    by_pair = {frozenset((r.group_a, r.group_b)): r for r in out.itertuples()}
+    assert by_pair[frozenset(("BUY", "AVOID"))].perm_p == pytest.approx(1 / 2001)
+    assert by_pair[frozenset(("AVOID", "NEUTRAL"))].perm_p > 0.05
+    assert (out["perm_p_fdr"] >= out["perm_p"] - 1e-12).all()
+
+
+def test_bootstrap_by_group():
+    rng = np.random.default_rng(seed=4)
+    df = pd.DataFrame({
+        "intent": ["BUY"] * 40 + ["AVOID"] * 10 + ["TINY"] * 2,
+        "return_1w": np.concatenate([rng.normal(0.05, 0.1, 40), rng.normal(-0.02, 0.1, 10), [0.1, 0.2]]),
+    })
+    out = bootstrap_by_group(df, "intent", "return_1w", n_resamples=1000)
+    assert list(out["group"]) == ["BUY", "AVOID"]
+    for r in out.itertuples():
+        assert r.mean_ci_low < r.mean < r.mean_ci_high
+        assert r.median_ci_low <= r.median <= r.median_ci_high
+        assert 0.0 <= r.win_rate_ci_low <= r.win_rate <= r.win_rate_ci_high <= 1.0
+    assert bootstrap_by_group(df, "missing", "return_1w").empty
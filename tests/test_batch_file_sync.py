@@ -0,0 +1,102 @@
+"""_sync_batches_from_files only parses new/changed comparison files.
+
+The (filename, mtime, size) index is persisted in batch_file_index, so a
+winner cleared in the DB (e.g. by backfill_clear_overridden_winners) is not
+re-flagged on the next five-minute sync.
+"""
+import json
+import os
+import sqlite3
+
+from app.services.deep_research_service import DeepResearchService
+
+
+def _svc():
+    # Avoid __init__, which spins up worker threads.
+    return DeepResearchService.__new__(DeepResearchService)
+
+
+def _write(dirpath, date_str, symbols, winner):
+    path = dirpath / f"batch_comparison_{date_str}_{'_'.join(symbols)}.json"
+    path.write_text(json.dumps({"winner_symbol": winner, "ranking": symbols}))
+    return path
+
+
+def _winner_flag(db_path, decision_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT batch_winner FROM decision_points WHERE id = ?", (decision_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_only_new_files_are_parsed(temp_db, tmp_path, monkeypatch):
+    db_path, decision_id = temp_db
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DB_PATH", db_path)
+    comparisons = tmp_path / "data" / "comparisons"
+    comparisons.mkdir(parents=True)
+
+    conn = sqlite3.connect(db_path)
+    today = conn.execute("SELECT date(timestamp) FROM decision_points WHERE id = ?",
+                         (decision_id,)).fetchone()[0]
+    conn.close()
+    _write(comparisons, today, ["TEST", "OTHER"], "TEST")
+
+    opened = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        if str(path).endswith(".json"):
+            opened.append(os.path.basename(str(path)))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    svc = _svc()
+
+    svc._sync_batches_from_files()
+    assert len(opened) == 1
+    assert _winner_flag(db_path, decision_id) == 1
+
+    # Winner cleared out-of-band; an unchanged file must not re-flag it.
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE decision_points SET batch_winner = 0")
+    conn.commit()
+    conn.close()
+
+    svc._sync_batches_from_files()
+    assert len(opened) == 1
+    assert _winner_flag(db_path, decision_id) == 0
+
+    # A new file is parsed on its own; the old one is left alone.
+    _write(comparisons, "2020-01-01", ["AAA", "BBB"], "AAA")
+    svc._sync_batches_from_files()
+    assert opened[1:] == ["batch_comparison_2020-01-01_AAA_BBB.json"]
+
+
+def test_changed_file_is_reparsed_and_removed_file_unindexed(temp_db, tmp_path, monkeypatch):
+    db_path, _ = temp_db
+    monkeypatch.chdir(tmp_path)
+    comparisons = tmp_path / "data" / "comparisons"
+    comparisons.mkdir(parents=True)
+    path = _write(comparisons, "2020-01-01", ["AAA", "BBB"], "AAA")
+
+    svc = _svc()
+    svc._sync_batches_from_files()
+
+    path.write_text(json.dumps({"winner_symbol": "BBB", "ranking": ["BBB", "AAA"]}))
+    os.utime(path, (1, 1))
+    svc._sync_batches_from_files()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT filename, winner_symbol FROM batch_file_index").fetchall()
+    conn.close()
+    assert rows == [("batch_comparison_2020-01-01_AAA_BBB.json", "BBB")]
+
+    path.unlink()
+    svc._sync_batches_from_files()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM batch_file_index").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,72 @@
+"""build_package chart rendering: process pool plus content-hashed cache."""
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from scripts.analysis import build_package as bp
+
+
+def _payload(win_rate=0.6):
+    rows = [
+        {"intent": "ENTER_NOW", "count": 12, "win_rate": win_rate, "avg_return": 0.03},
+        {"intent": "AVOID", "count": 9, "win_rate": 0.4, "avg_return": -0.01},
+    ]
+    return {"winrate_by_intent": rows, "equity_curve": [], "stats": {}, "time_series": {}}
+
+
+def _enriched():
+    return pd.DataFrame({
+        "intent": ["ENTER_NOW", "AVOID", "ENTER_NOW"],
+        "days_to_recover": [3.0, None, 7.0],
+        "risk_reward_ratio": [1.5, 0.8, 2.2],
+        "deep_research_verdict": ["BUY", "AVOID", None],
+        "deep_research_rr_ratio": [2.0, 0.5, None],
+        "return_1w": [0.01, -0.02, 0.05],
+    })
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    calls = []
+    render = bp._render_one
+
+    def _spy(job):
+        calls.append(job.key)
+        return render(job)
+
+    monkeypatch.setattr(bp, "_render_one", _spy)
+    return calls
+
+
+def test_unchanged_charts_come_from_cache(tmp_path, rendered):
+    cache = tmp_path / "cache"
+    first = bp._generate_charts(_payload(), _enriched(), tmp_path / "a", workers=1, cache_dir=cache)
+    assert len(rendered) == len(first) > 20
+    assert all(p.exists() and p.parent == tmp_path / "a" for p in first.values())
+    assert len(list(cache.glob("*.png"))) == len(first)
+
+    rendered.clear()
+    second = bp._generate_charts(_payload(), _enriched(), tmp_path / "b", workers=1, cache_dir=cache)
+    assert rendered == []
+    assert second["wr_intent"].read_bytes() == first["wr_intent"].read_bytes()
+
+    # Only the charts fed by the changed records are redrawn; columns a
+    # chart does not read do not count.
+    enriched = _enriched().assign(return_1w=[0.5, 0.5, 0.5])
+    bp._generate_charts(_payload(win_rate=0.7), enriched, tmp_path / "c", workers=1, cache_dir=cache)
+    assert sorted(rendered) == ["ar_intent", "wr_intent"]
+
+
+def test_style_change_invalidates(tmp_path, rendered, monkeypatch):
+    cache = tmp_path / "cache"
+    bp._generate_charts(_payload(), _enriched(), tmp_path / "a", workers=1, cache_dir=cache)
+    rendered.clear()
+    monkeypatch.setattr(bp, "_chart_style", lambda: "edited")
+    out = bp._generate_charts(_payload(), _enriched(), tmp_path / "b", workers=1, cache_dir=cache)
+    assert len(rendered) == len(out)
+
+
+def test_process_pool_renders_everything(tmp_path):
+    out = bp._generate_charts(_payload(), _enriched(), tmp_path / "charts", workers=3, cache_dir=None)
+    assert all(p.exists() and p.stat().st_size > 0 for p in out.values())
@@ -0,0 +1,108 @@
+"""Cached, incremental compute_dataset: hits, partial re-enrichment and parity."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import app.database as db
+from app.services.analytics import dataset_cache, outcomes, payload
+from app.services.analytics import price_cache as pc
+
+_IDX = pd.bdate_range("2025-01-01", pd.Timestamp.now().normalize())
+
+
+def _bars(seed):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.cumprod(1 + rng.normal(0, 0.02, len(_IDX)))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.02, "Low": close * 0.98, "Close": close,
+        "Adj Close": close, "Volume": 1000.0,
+    }, index=_IDX)
+
+
+@pytest.fixture
+def env(temp_db, tmp_path, monkeypatch):
+    db_path, _ = temp_db
+    monkeypatch.setenv("DB_PATH", db_path)
+    monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setattr(pc, "CACHE_DIR", tmp_path / "prices")
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", tmp_path / "datasets")
+    universe = {"AAA": _bars(1), "BBB": _bars(2), "SPY": _bars(3)}
+
+    def _download_many(tickers, start, end):
+        return {t: universe[t].loc[start:end].copy() if t in universe else pd.DataFrame() for t in tickers}
+
+    monkeypatch.setattr(pc, "_download_many", _download_many)
+
+    computed = []
+    arrays = outcomes._outcome_arrays
+
+    def _spy(cohort, bars):
+        computed.append(sorted(cohort["id"]))
+        return arrays(cohort, bars)
+
+    monkeypatch.setattr(dataset_cache, "_outcome_arrays", _spy)
+    return computed
+
+
+def _decision(symbol, date, recommendation="BUY"):
+    decision_id = db.add_decision_point(symbol, 50.0, -8.0, recommendation, "r")
+    with db.transaction() as conn:
+        conn.execute("UPDATE decision_points SET timestamp = ? WHERE id = ?", (f"{date} 15:00:00", decision_id))
+    return decision_id
+
+
+def _assert_same(cached, fresh):
+    pd.testing.assert_frame_equal(cached["enriched"], fresh["enriched"])
+    pd.testing.assert_frame_equal(cached["spy_bars"], fresh["spy_bars"])
+    strip = lambda p: {k: v for k, v in p.items() if k not in ("generated_at", "computed_at")}  # noqa: E731
+    assert strip(cached["payload"]) == strip(fresh["payload"])
+
+
+def test_unchanged_inputs_serve_last_build(env):
+    computed = env
+    for i, day in enumerate(["2025-03-03", "2025-04-01", "2025-05-05", "2025-06-02"]):
+        _decision("AAA" if i % 2 else "BBB", day, "BUY_LIMIT" if i == 2 else "BUY")
+
+    first = payload.compute_dataset(start_date="2025-01-01")
+    assert len(computed) == 1
+    second = payload.compute_dataset(start_date="2025-01-01")
+    assert len(computed) == 1  # nothing re-enriched or re-aggregated
+    _assert_same(second, first)
+    # A hit is stamped with its own generation time; computed_at keeps the build's.
+    assert second["payload"]["computed_at"] == first["payload"]["generated_at"]
+    assert second["payload"]["generated_at"] >= first["payload"]["generated_at"]
+    assert set(second["bars"]) == {"AAA", "BBB"}
+    pd.testing.assert_frame_equal(second["bars"]["AAA"], first["bars"]["AAA"], check_freq=False)
+
+
+def test_only_new_and_open_decisions_are_enriched(env):
+    computed = env
+    old = [_decision("AAA", "2025-03-03"), _decision("BBB", "2025-04-01")]
+    recent = pd.Timestamp.now().normalize() - pd.tseries.offsets.BDay(5)
+    open_id = _decision("AAA", recent.strftime("%Y-%m-%d"))
+    payload.compute_dataset(start_date="2025-01-01")
+
+    new_id = _decision("BBB", "2025-05-05")
+    built = payload.compute_dataset(start_date="2025-01-01")
+    assert computed[-1] == sorted([open_id, new_id])
+    _assert_same(built, payload.compute_dataset(start_date="2025-01-01", use_cache=False))
+
+    # Editing a decision, or rewriting its ticker's history, re-enriches it.
+    db.update_decision_point(old[0], "BUY_LIMIT", "changed", "Ignored")
+    payload.compute_dataset(start_date="2025-01-01")
+    assert computed[-1] == sorted([old[0], open_id])
+    pc._bump_version("BBB", rewritten=True)
+    payload.compute_dataset(start_date="2025-01-01")
+    assert computed[-1] == sorted([old[1], open_id, new_id])
+
+
+def test_without_change_tracking_builds_from_scratch(env, monkeypatch):
+    computed = env
+    _decision("AAA", "2025-03-03")
+    monkeypatch.setattr(dataset_cache, "db_mark", lambda db_path=None: None)
+    payload.compute_dataset(start_date="2025-01-01")
+    payload.compute_dataset(start_date="2025-01-01")
+    assert computed == []  # plain enrich_outcomes, nothing persisted
+    assert not (dataset_cache.CACHE_DIR).exists()
@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import app.database as db
+
+
+def test_connection_is_reused_within_a_thread(temp_db):
+    assert db.get_connection() is db.get_connection()
+
+
+def test_threads_get_their_own_connection(temp_db):
+    main_conn = db.get_connection()
+    seen = []
+
+    def worker():
+        seen.append(db.get_connection())
+        db.close_thread_connections()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen and seen[0] is not main_conn
+
+
+def test_pragmas_are_applied(temp_db):
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_monkeypatched_db_name_switches_database(temp_db, tmp_path, monkeypatch):
+    first = db.get_connection()
+    other = str(tmp_path / "other.db")
+    monkeypatch.setattr(db, "DB_NAME", other)
+    db.init_db()
+    assert db.get_connection() is not first
+    assert db.get_connection().execute("SELECT COUNT(*) FROM decision_points").fetchone()[0] == 0
+
+
+def test_transaction_rolls_back_on_error(temp_db):
+    _, decision_id = temp_db
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("UPDATE decision_points SET symbol = 'ZZZ' WHERE id = ?", (decision_id,))
+            raise RuntimeError("boom")
+
+    assert not db.get_connection().in_transaction
+    row = db.get_connection().execute(
+        "SELECT symbol FROM decision_points WHERE id = ?", (decision_id,)
+    ).fetchone()
+    assert row[0] != "ZZZ"
+
+
+def test_nested_transaction_joins_outer(temp_db):
+    _, decision_id = temp_db
+    with pytest.raises(RuntimeError):
+        with db.transaction() as outer:
+            with db.transaction() as inner:
+                assert inner is outer
+                inner.execute("UPDATE decision_points SET symbol = 'ZZZ' WHERE id = ?", (decision_id,))
+            raise RuntimeError("boom")
+
+    row = db.get_connection().execute(
+        "SELECT symbol FROM decision_points WHERE id = ?", (decision_id,)
+    ).fetchone()
+    assert row[0] != "ZZZ"
+
+
+def test_reconnects_after_db_file_is_replaced(temp_db):
+    db_path, _ = temp_db
+    stale = db.get_connection()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    db.init_db()
+
+    fresh = db.get_connection()
+    assert fresh is not stale
+    assert fresh.execute("SELECT COUNT(*) FROM decision_points").fetchone()[0] == 0
+
+
+def test_writes_are_visible_to_other_connections(temp_db):
+    db_path, decision_id = temp_db
+    with db.transaction() as conn:
+        conn.execute("UPDATE decision_points SET symbol = 'NEW' WHERE id = ?", (decision_id,))
+
+    other = sqlite3.connect(db_path)
+    try:
+        assert other.execute(
+            "SELECT symbol FROM decision_points WHERE id = ?", (decision_id,)
+        ).fetchone()[0] == "NEW"
+    finally:
+        other.close()
@@ -0,0 +1,81 @@
+"""decision_points.decision_date is stored, backfilled and indexed, and the
+per-day dedup/batch queries filter on it instead of date(timestamp)."""
+import sqlite3
+
+import app.database as db
+
+
+def _plan(sql, params=()):
+    rows = db.get_connection().execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " ".join(r[-1] for r in rows)
+
+
+def test_insert_sets_decision_date(temp_db):
+    db_path, decision_id = temp_db
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT decision_date, date(timestamp) FROM decision_points WHERE id = ?",
+        (decision_id,),
+    ).fetchone()
+    conn.close()
+    assert row[0] is not None and row[0] == row[1]
+
+
+def test_timestamp_update_moves_decision_date(temp_db):
+    db_path, decision_id = temp_db
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE decision_points SET timestamp = '2020-03-04 10:00:00' WHERE id = ?",
+        (decision_id,),
+    )
+    conn.commit()
+    conn.close()
+    db.mark_batch_winner("TEST", "2020-03-04")
+    cursor = db.get_connection().execute(
+        "SELECT decision_date, batch_winner FROM decision_points WHERE id = ?",
+        (decision_id,),
+    )
+    assert cursor.fetchone() == ("2020-03-04", 1)
+
+
+def test_legacy_rows_are_backfilled(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE decision_points (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "symbol TEXT NOT NULL, price_at_decision REAL NOT NULL, drop_percent REAL NOT NULL, "
+        "recommendation TEXT NOT NULL, reasoning TEXT, status TEXT DEFAULT 'Ignored', "
+        "timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute(
+        "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, "
+        "status, timestamp) VALUES ('OLD', 1, -5, 'BUY', 'Owned', '2025-11-02 15:30:00')"
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_NAME", path)
+    db.init_db()
+    row = db.get_connection().execute(
+        "SELECT decision_date FROM decision_points WHERE symbol = 'OLD'"
+    ).fetchone()
+    assert row[0] == "2025-11-02"
+    assert db.get_analyzed_companies_since("2025-11-01") == []
+
+
+def test_hot_queries_use_indexes(temp_db):
+    assert "idx_dp_date_status" in _plan(
+        "SELECT symbol FROM decision_points WHERE decision_date = date('now') AND status != 'Pending'"
+    )
+    assert "idx_dp_symbol_date" in _plan(
+        "UPDATE decision_points SET batch_winner = 1 WHERE symbol = ? AND decision_date = ?",
+        ("AAA", "2026-01-01"),
+    )
+    assert "idx_dp_batch_id" in _plan("SELECT id FROM decision_points WHERE batch_id = ?", (1,))
+
+
+def test_today_symbols_excludes_pending(temp_db):
+    db.add_decision_point("DONE", 10.0, -7.0, "BUY", "ok", status="Owned")
+    symbols = db.get_today_decision_symbols()
+    assert "DONE" in symbols
+    assert "TEST" not in symbols  # the fixture row is still Pending
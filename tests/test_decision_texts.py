@@ -0,0 +1,95 @@
+"""Heavy text blobs live in decision_texts; list queries use narrow projections."""
+import sqlite3
+
+import app.database as db
+
+
+def _inline(db_path, decision_id, column):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            f"SELECT {column} FROM decision_points WHERE id = ?", (decision_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_dr_blobs_are_written_to_side_table(temp_db):
+    db_path, decision_id = temp_db
+    assert db.update_deep_research_data(
+        decision_id, "BUY", "Low", "Earnings", "False", 80,
+        swot='{"strengths": ["moat"]}', global_analysis="G" * 5000, local_analysis="L",
+        verification="V", blindspots='["b"]', action="BUY",
+    )
+
+    assert _inline(db_path, decision_id, "deep_research_swot") is None
+    assert _inline(db_path, decision_id, "deep_research_action") == "BUY"
+
+    decision = db.get_decision_point(decision_id)
+    assert decision["deep_research_swot"] == '{"strengths": ["moat"]}'
+    assert decision["deep_research_global_analysis"] == "G" * 5000
+    assert decision["deep_research_verification"] == "V"
+    assert decision["deep_research_blindspots"] == '["b"]'
+
+
+def test_reassess_reasoning_goes_to_side_table(temp_db):
+    db_path, decision_id = temp_db
+    db.update_decision_point(
+        decision_id, "BUY", "council text", "Owned",
+        reassess_reasoning="thesis intact", reassess_sell_action="HOLD",
+    )
+    assert _inline(db_path, decision_id, "reassess_reasoning") is None
+    decision = db.get_decision_point(decision_id)
+    assert decision["reassess_reasoning"] == "thesis intact"
+    assert decision["reassess_sell_action"] == "HOLD"
+    assert decision["reasoning"] == "council text"
+
+
+def test_init_db_moves_inline_blobs(temp_db):
+    db_path, decision_id = temp_db
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE decision_points SET deep_research_swot = 'legacy swot' WHERE id = ?",
+        (decision_id,),
+    )
+    # Pretend the DB predates the decision_texts migration.
+    conn.execute("DELETE FROM schema_version WHERE version >= 3")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    assert _inline(db_path, decision_id, "deep_research_swot") is None
+    assert db.get_decision_point(decision_id)["deep_research_swot"] == "legacy swot"
+
+
+def test_narrow_projection_returns_only_requested_columns(temp_db):
+    rows = db.get_decision_points(["id", "symbol"])
+    assert rows and set(rows[0]) == {"id", "symbol"}
+
+    with_texts = db.get_decision_points(["symbol"], include_texts=True)
+    assert set(db.DECISION_TEXT_COLUMNS) <= set(with_texts[0])
+
+
+def test_projection_rejects_non_identifiers(temp_db):
+    assert db.get_decision_points(["symbol; DROP TABLE decision_points"]) == []
+    assert db.get_decision_points(["symbol"])
+
+
+def test_texts_are_fetched_only_for_requested_ids(temp_db, monkeypatch):
+    db_path, decision_id = temp_db
+    ids = [decision_id] + [db.add_decision_point(f"S{i}", 1.0, -6.0, "BUY", "r") for i in range(4)]
+    for i in ids:
+        db.update_decision_point(i, "BUY", "r", "Owned", reassess_reasoning=f"why {i}")
+    monkeypatch.setattr(db, "_TEXT_ID_CHUNK", 2)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    statements = []
+    conn.set_trace_callback(statements.append)
+    rows = [{"id": i} for i in ids[1:4]]
+    db._attach_decision_texts(conn.cursor(), rows)
+    conn.close()
+
+    assert [r["reassess_reasoning"] for r in rows] == [f"why {i}" for i in ids[1:4]]
+    selects = [s for s in statements if "decision_texts" in s]
+    assert len(selects) == 2 and all("WHERE decision_id IN" in s for s in selects)
@@ -0,0 +1,114 @@
+"""Keyset-paginated decision list (database.get_decisions_page + /api/decisions)."""
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.database as db
+from app.services.performance_service import normalize_to_intent
+
+
+def _seed(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM decision_points")
+    conn.executemany(
+        "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, "
+        "reasoning, status, timestamp, sector, gatekeeper_tier, deep_research_action) "
+        "VALUES (?, 10.0, -6.0, ?, 'r', 'Owned', ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def seeded(temp_db):
+    db_path, _ = temp_db
+    _seed(db_path, [
+        ("A", "BUY", "2026-03-01 10:00:00", "Tech", "T1", "BUY"),
+        ("B", "BUY_LIMIT", "2026-03-01 10:00:00", "Tech", "T2", None),
+        ("C", "AVOID", "2026-03-02 09:00:00", "Energy", "T1", "AVOID"),
+        ("D", "WATCH", "2026-03-03 09:00:00", "Energy", "T2", None),
+        ("E", "SPECULATIVE BUY", "2026-03-04 09:00:00", "Tech", "T1", "BUY_LIMIT"),
+        ("F", "strong buy", "2026-03-05 09:00:00", "Health", "T1", None),
+        ("G", "ACCUMULATE_BUY", "2026-03-06 09:00:00", "Health", "T2", None),
+    ])
+    return db_path
+
+
+def _walk(limit, **filters):
+    symbols, after = [], None
+    while True:
+        rows, after = db.get_decisions_page(limit, after=after, columns=["symbol"], **filters)
+        symbols += [r["symbol"] for r in rows]
+        if after is None:
+            return symbols
+
+
+def test_pages_cover_every_row_once_newest_first(seeded):
+    # A and B share a timestamp; the id tiebreak keeps them on distinct pages.
+    assert _walk(2) == ["G", "F", "E", "D", "C", "B", "A"]
+    assert _walk(100) == _walk(1)
+
+
+def test_filters(seeded):
+    assert _walk(2, sector="Tech") == ["E", "B", "A"]
+    assert _walk(2, gatekeeper_tier="T2") == ["G", "D", "B"]
+    assert _walk(2, dr_action="BUY_LIMIT") == ["E"]
+    assert _walk(2, start_date="2026-03-02", end_date="2026-03-04") == ["E", "D", "C"]
+
+
+@pytest.mark.parametrize("intent", list(db.INTENT_SQL))
+def test_intent_sql_matches_normalize_to_intent(seeded, intent):
+    conn = sqlite3.connect(seeded)
+    recs = dict(conn.execute("SELECT symbol, recommendation FROM decision_points").fetchall())
+    conn.close()
+    expected = {s for s, rec in recs.items() if normalize_to_intent(rec) == intent}
+    assert set(_walk(3, intent=intent)) == expected
+
+
+def test_filtered_pages_use_an_index(seeded):
+    plan = " ".join(
+        r[-1] for r in db.get_connection().execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM decision_points WHERE sector = ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT 51", ("Tech",)
+        )
+    )
+    assert "idx_dp_sector_ts" in plan
+
+
+@pytest.fixture
+def client(seeded):
+    from app.routers import api, views
+    app = FastAPI()
+    app.include_router(views.router)
+    app.include_router(api.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_api_walks_pages_and_renders_rows(client):
+    first = client.get("/api/decisions", params={"limit": 4, "view": "dashboard"}).json()
+    assert [r["symbol"] for r in first["items"]] == ["G", "F", "E", "D"]
+    assert first["html"].count("<tr") == 4
+    second = client.get(
+        "/api/decisions", params={"limit": 4, "view": "dashboard", "cursor": first["next_cursor"]}
+    ).json()
+    assert [r["symbol"] for r in second["items"]] == ["C", "B", "A"]
+    assert second["next_cursor"] is None
+
+
+def test_api_rejects_bad_input(client):
+    assert client.get("/api/decisions", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/decisions", params={"intent": "MAYBE"}).status_code == 400
+    assert client.get("/api/decisions", params={"view": "nope"}).status_code == 400
+
+
+def test_decisions_page_renders_first_page_only(client, monkeypatch):
+    from app.routers import views
+    monkeypatch.setattr(views, "PAGE_SIZE", 3)
+    html = client.get("/decisions", params={"sector": "Tech"}).text
+    assert html.count('title="Reasoning"') == 3
+    assert 'data-cursor=""' in html  # Tech has exactly three rows
+    html = client.get("/").text
+    assert "decision-pager" in html and 'data-cursor=""' not in html
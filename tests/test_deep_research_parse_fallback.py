@@ -195,6 +195,7 @@ def _seed_decision_points(db_path: str, rows):
             reasoning TEXT,
             status TEXT,
             timestamp TIMESTAMP,
+            decision_date TEXT,
             conviction TEXT,
             risk_reward_ratio REAL,
             deep_research_verdict TEXT,
@@ -227,6 +228,8 @@ def _seed_decision_points(db_path: str, rows):
                 r.get("batch_id"),
             ),
         )
+    # init_db's triggers maintain this in the real schema.
+    cur.execute("UPDATE decision_points SET decision_date = date(timestamp)")
     conn.commit()
     conn.close()
 
@@ -14,7 +14,7 @@ def test_deep_research_records_when_usage_present(temp_db):
         "status": "completed",
         "usageMetadata": {"promptTokenCount": 9000, "candidatesTokenCount": 4000},
     }
-    from app.services.token_tracker import record_llm_call
+    from app.services.token_tracker import flush, record_llm_call
     from datetime import datetime
     um = poll_data.get("usageMetadata") or {}
     record_llm_call(
@@ -24,6 +24,7 @@ def test_deep_research_records_when_usage_present(temp_db):
         model="deep-research-pro",
         tokens_in=int(um["promptTokenCount"]), tokens_out=int(um["candidatesTokenCount"]),
     )
+    flush()
     conn = sqlite3.connect(path)
     row = conn.execute(
         "SELECT stage, agent_name, model, tokens_in, tokens_out "
@@ -42,6 +42,8 @@ def test_grounded_model_records_token_row(temp_db):
         "prompt", model_name="gemini-3-flash-preview", agent_context="News Agent",
         tracker_context=tracker_context,
     )
+    from app.services.token_tracker import flush
+    flush()
     conn = sqlite3.connect(path)
     row = conn.execute(
         "SELECT agent_name, model, tokens_in, tokens_out FROM agent_token_usage"
@@ -94,6 +96,8 @@ def test_function_call_retry_does_not_double_record(temp_db):
         tracker_context=tracker_context,
     )
 
+    from app.services.token_tracker import flush
+    flush()
     import sqlite3
     conn = sqlite3.connect(path)
     count = conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0]
@@ -125,6 +129,8 @@ def test_tracker_context_none_does_not_record(temp_db):
     # The call still succeeds and returns some output...
     assert result is not None
     # ...but no row was written to agent_token_usage.
+    from app.services.token_tracker import flush
+    flush()
     import sqlite3
     conn = sqlite3.connect(path)
     count = conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0]
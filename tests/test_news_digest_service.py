@@ -426,3 +426,48 @@ def test_format_for_agent_includes_finimize_weekly_when_mapped(archive_tree, mon
         assert "Accumulating AI thesis" in block
     finally:
         monkeypatch.setitem(sch.AGENT_SLICE_MAP["pm"], "finimize_weekly", original)
+
+
+# --- format_for_agent memo --------------------------------------------------
+
+
+def test_format_for_agent_reads_each_file_once_until_it_changes(archive_tree, monkeypatch):
+    _seed_all_three_daily_digests(archive_tree)
+    reads = []
+    real = nds._read_digest
+    monkeypatch.setattr(nds, "_read_digest", lambda path: reads.append(path.name) or real(path))
+
+    first = {a: nds.format_for_agent(a, "2026-04-22", "NVDA") for a in ("news", "pm", "bear", "competitive")}
+    for agent, block in first.items():
+        assert nds.format_for_agent(agent, "2026-04-22", "NVDA") == block
+    assert len(reads) == 3  # ft, finimize and wsj JSON, parsed once each
+
+    path = archive_tree / "FT Archive" / "digests" / "2026-04-22.json"
+    digest = json.loads(path.read_text())
+    digest["one_liner"] = "Edited after the fact."
+    path.write_text(json.dumps(digest, indent=2))
+    assert "Edited after the fact." in nds.format_for_agent("pm", "2026-04-22", "NVDA")
+    assert len(reads) == 4
+
+
+def _scan_tickers_block(digest, ticker):
+    """The pre-index scan over tickers_mentioned, kept as the reference."""
+    out = []
+    for tkr, meta in (digest.get("tickers_mentioned") or {}).items():
+        is_direct = tkr.upper() == ticker.upper()
+        rel = meta.get("relevance_to_portfolio", "low")
+        if is_direct or rel in ("high", "medium"):
+            tag = "direct" if is_direct else f"rel:{rel}"
+            out.append(f"- **{tkr.upper()}** ({tag}): x{meta.get('count')}, sent:{meta.get('sentiment')}")
+    return "\n".join(out)
+
+
+def test_ticker_index_matches_scan():
+    rels = ["low", "medium", "high", "low", "high", "low"]
+    digest = {"tickers_mentioned": {
+        t: {"count": i, "sentiment": "mixed", "relevance_to_portfolio": rel}
+        for i, (t, rel) in enumerate(zip(["aapl", "MSFT", "NVDA", "TSM", "amd", "INTC"], rels))
+    }}
+    index = nds._TickerIndex(digest)
+    for ticker in ["AAPL", "msft", "NVDA", "TSM", "AMD", "INTC", "ZZZ", ""]:
+        assert nds._tickers_sector_block(digest, ticker, index) == _scan_tickers_block(digest, ticker)
@@ -31,6 +31,8 @@ def test_nongrounded_path_records_tokens(temp_db, monkeypatch):
 
     state = MarketState(ticker="AAPL", date="2026-05-23", decision_id=decision_id)
     rs._call_agent("prompt", "Fund Manager", state=state)
+    from app.services.token_tracker import flush
+    flush()
 
     conn = sqlite3.connect(path)
     row = conn.execute(
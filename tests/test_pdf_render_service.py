@@ -0,0 +1,101 @@
+import concurrent.futures
+import os
+
+import pytest
+
+from app.services import pdf_render_service as prs
+from app.services.pdf_render_service import PdfRenderService, content_key
+
+
+@pytest.fixture
+def svc(tmp_path, monkeypatch):
+    """Render service whose pool is an in-process thread pool (no spawn in
+    tests) and whose renderer just counts calls and writes a stub file."""
+    calls = []
+
+    def fake_render(filepath, symbol, result):
+        calls.append((symbol, result))
+        with open(filepath, "wb") as f:
+            f.write(b"%PDF-stub " + symbol.encode())
+
+    monkeypatch.setitem(prs.RENDERERS, "deep_research", fake_render)
+    s = PdfRenderService(cache_dir=str(tmp_path / "cache"))
+    s._pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    s.calls = calls
+    yield s
+    s.shutdown()
+
+
+def test_content_key_is_order_independent_for_dict_keys():
+    a = content_key("deep_research", "AAPL", {"verdict": "BUY", "risk_level": "Low"})
+    b = content_key("deep_research", "AAPL", {"risk_level": "Low", "verdict": "BUY"})
+    assert a == b
+    assert a != content_key("deep_research", "AAPL", {"verdict": "AVOID", "risk_level": "Low"})
+    assert a != content_key("batch", "AAPL", {"verdict": "BUY", "risk_level": "Low"})
+
+
+def test_same_content_is_rendered_once(svc, tmp_path):
+    result = {"verdict": "BUY"}
+    first = svc.render("deep_research", str(tmp_path / "out" / "a.pdf"), "AAPL", result)
+    second = svc.render("deep_research", str(tmp_path / "out" / "b.pdf"), "AAPL", result)
+
+    assert first and second
+    assert len(svc.calls) == 1
+    assert open(first, "rb").read() == open(second, "rb").read()
+
+
+def test_changed_content_rerenders(svc, tmp_path):
+    svc.render("deep_research", str(tmp_path / "a.pdf"), "AAPL", {"verdict": "BUY"})
+    svc.render("deep_research", str(tmp_path / "a.pdf"), "AAPL", {"verdict": "AVOID"})
+    assert len(svc.calls) == 2
+
+
+def test_submit_returns_before_render_finishes(svc, tmp_path, monkeypatch):
+    import threading
+    gate = threading.Event()
+    original = prs.RENDERERS["deep_research"]
+
+    def slow_render(filepath, symbol, result):
+        gate.wait(5)
+        original(filepath, symbol, result)
+
+    monkeypatch.setitem(prs.RENDERERS, "deep_research", slow_render)
+    fut = svc.submit("deep_research", str(tmp_path / "slow.pdf"), "MSFT", {"verdict": "BUY"})
+    assert not fut.done()
+    gate.set()
+    assert fut.result(timeout=5) == str(tmp_path / "slow.pdf")
+
+
+def test_render_failure_returns_none_and_caches_nothing(svc, tmp_path, monkeypatch):
+    def boom(filepath, symbol, result):
+        raise ValueError("bad markup")
+
+    monkeypatch.setitem(prs.RENDERERS, "deep_research", boom)
+    assert svc.render("deep_research", str(tmp_path / "x.pdf"), "AAPL", {}) is None
+    assert os.listdir(svc.cache_dir) == []
+    assert not os.path.exists(tmp_path / "x.pdf")
+
+
+def test_real_batch_renderer_writes_pdf(tmp_path):
+    path = str(tmp_path / "batch.pdf")
+    prs.render_batch_pdf(path, ["AAA", "BBB"], '{"winner_symbol": "AAA", "ranking": ["AAA", "BBB"]}')
+    assert open(path, "rb").read(4) == b"%PDF"
+
+
+def test_real_deep_research_renderer_is_deterministic(tmp_path):
+    result = {"verdict": "BUY", "risk_level": "Low", "reasoning_bullet_points": ["cheap"],
+              "swot_analysis": {"strengths": ["moat"]}}
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")
+    prs.render_deep_research_pdf(a, "AAPL", result, "2026-05-01")
+    prs.render_deep_research_pdf(b, "AAPL", result, "2026-05-01")
+    assert open(a, "rb").read() == open(b, "rb").read()
+
+
+def test_concurrent_copies_to_one_target_use_separate_temp_files(tmp_path):
+    src = tmp_path / "cached.pdf"
+    src.write_bytes(b"%PDF-stub " * 100_000)
+    dst = str(tmp_path / "out" / "report.pdf")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: prs._copy_atomic(str(src), dst), range(32)))
+    assert open(dst, "rb").read() == src.read_bytes()
+    assert os.listdir(tmp_path / "out") == ["report.pdf"]
@@ -1,8 +1,21 @@
+import tempfile
 import unittest
 from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services.analytics import price_cache
 from app.services.performance_service import performance_service
 
 class TestPerformanceService(unittest.TestCase):
+    def setUp(self):
+        # Keep downloaded bars and the negative cache out of data/price_cache.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.object(price_cache, "CACHE_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_analyze_historical_trade_valid(self):
         # Test with a known stock and past date (e.g., AAPL one month ago)
         symbol = "AAPL"
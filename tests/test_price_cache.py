@@ -0,0 +1,205 @@
+"""Local price store: delta fetches, negative cache and range queries."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.analytics import price_cache as pc
+
+_IDX = pd.bdate_range("2025-01-01", "2025-12-31")
+
+
+def _bars(ratio=0.9):
+    close = 100 + np.arange(len(_IDX), dtype=float)
+    return pd.DataFrame({
+        "Open": close - 1, "High": close + 2, "Low": close - 2, "Close": close,
+        "Adj Close": close * ratio, "Volume": 1000,
+    }, index=_IDX)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point the store at tmp_path and record every ticker downloaded as (ticker, start, end)."""
+    calls = []
+    universe = {"AAA": _bars(), "SPY": _bars(0.95)}
+
+    def _download_many(tickers, start, end):
+        out = {}
+        for ticker in tickers:
+            calls.append((ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))
+            df = universe.get(ticker)
+            out[ticker] = pd.DataFrame() if df is None else df.loc[(df.index >= start) & (df.index <= end)].copy()
+        return out
+
+    monkeypatch.setattr(pc, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pc, "_download_many", _download_many)
+    return calls, universe
+
+
+def test_repeat_range_served_from_disk(store):
+    calls, _ = store
+    first = pc.get_bars("aaa", "2025-03-03", "2025-03-31")
+    second = pc.get_bars("AAA", "2025-03-03", "2025-03-31")
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert first.index[0] == pd.Timestamp("2025-03-03") and first.index[-1] == pd.Timestamp("2025-03-31")
+
+
+def test_only_missing_ends_are_fetched(store):
+    calls, _ = store
+    pc.get_bars("AAA", "2025-03-03", "2025-03-31")
+    pc.get_bars("AAA", "2025-02-03", "2025-04-30")
+    # Head up to the first cached bar, tail from the last cached bar.
+    assert calls[1:] == [("AAA", "2025-02-03", "2025-03-03"), ("AAA", "2025-03-31", "2025-04-30")]
+    out = pc.get_bars("AAA", "2025-02-10", "2025-04-15")
+    assert len(calls) == 3
+    assert out.index.equals(_IDX[(_IDX >= "2025-02-10") & (_IDX <= "2025-04-15")])
+
+
+def test_weekend_bounds_do_not_refetch(store):
+    calls, _ = store
+    pc.get_bars("AAA", "2025-03-01", "2025-03-09")  # Saturday .. Sunday
+    pc.get_bars("AAA", "2025-03-01", "2025-03-09")
+    assert len(calls) == 1
+
+
+def test_unknown_ticker_is_negative_cached(store):
+    calls, _ = store
+    assert pc.get_bars("DELISTED", "2025-03-03", "2025-03-31").empty
+    assert pc.get_bars("DELISTED", "2025-01-01", "2025-06-30").empty
+    assert len(calls) == 1
+    pc.get_bars("DELISTED", "2025-03-03", "2025-03-31", refresh=True)
+    assert len(calls) == 2
+
+
+def test_readjusted_history_is_redownloaded(store):
+    calls, universe = store
+    pc.get_bars("AAA", "2025-03-03", "2025-03-31")
+    universe["AAA"] = _bars(ratio=0.8)  # a dividend re-adjusted everything
+    out = pc.get_bars("AAA", "2025-03-03", "2025-04-30", adjusted=True)
+    assert calls[-1] == ("AAA", "2025-03-03", "2025-04-30")
+    expected = universe["AAA"].loc["2025-03-03":"2025-04-30", "Adj Close"]
+    np.testing.assert_allclose(out["Close"].to_numpy(), expected.to_numpy())
+
+
+def test_adjusted_scales_ohlc(store):
+    out = pc.get_bars("AAA", "2025-03-03", "2025-03-07", adjusted=True)
+    raw = _bars().loc["2025-03-03":"2025-03-07"]
+    assert "Adj Close" not in out
+    np.testing.assert_allclose(out["High"], raw["High"] * 0.9)
+    np.testing.assert_allclose(out["Close"], raw["Adj Close"])
+    np.testing.assert_allclose(out["Volume"], raw["Volume"])
+
+
+def test_get_closes_keys_and_skips_missing(store):
+    closes = pc.get_closes(["AAA", "NOPE", "SPY"], "2025-03-03", "2025-03-07")
+    assert set(closes) == {"AAA", "SPY"}
+    np.testing.assert_allclose(closes["SPY"], _bars(0.95).loc["2025-03-03":"2025-03-07", "Adj Close"])
+
+
+def test_legacy_file_without_coverage(store, tmp_path):
+    calls, _ = store
+    _bars().loc["2025-03-03":"2025-03-31"].to_parquet(tmp_path / "AAA.parquet")
+    out = pc.get_bars("AAA", "2025-03-10", "2025-03-20")
+    assert calls == [] and len(out) == 9
+
+
+def test_prefetch_groups_tickers_by_missing_range(store, monkeypatch, tmp_path):
+    calls, universe = store
+    for i in range(5):
+        universe[f"T{i}"] = _bars()
+    requests = []
+    download_many = pc._download_many
+    monkeypatch.setattr(pc, "_download_many", lambda t, s, e: requests.append(list(t)) or download_many(t, s, e))
+    monkeypatch.setattr(pc, "CHUNK_SIZE", 2)
+
+    pc.get_bars("T0", "2025-03-03", "2025-03-31")
+    requests.clear()
+    out = pc.prefetch([f"t{i}" for i in range(5)] + ["NOPE"], "2025-03-03", "2025-04-30")
+
+    # T0 only needs its tail; the other five share the full range, two per request.
+    assert sorted(requests) == [["NOPE", "T1"], ["T0"], ["T2", "T3"], ["T4"]]
+    assert ("T0", "2025-03-31", "2025-04-30") in calls
+    assert out["NOPE"].empty
+    assert all(len(out[f"T{i}"]) == len(_bars().loc["2025-03-03":"2025-04-30"]) for i in range(5))
+    assert not list(tmp_path.glob("*.tmp"))
+
+    requests.clear()
+    pc.prefetch([f"T{i}" for i in range(5)] + ["NOPE"], "2025-03-03", "2025-04-30")
+    assert requests == []
+
+
+def test_store_version_tracks_changed_bars(store):
+    _, universe = store
+    assert pc.store_version() == 0
+    pc.get_bars("AAA", "2025-03-03", "2025-03-31")
+    first = pc.store_version()
+    assert first > 0 and pc.rewritten_at(["aaa"]) == {"AAA": 0}
+
+    pc.get_bars("AAA", "2025-03-03", "2025-04-30")  # tail only: an append
+    assert pc.store_version() > first and pc.rewritten_at(["AAA"]) == {"AAA": 0}
+
+    universe["AAA"] = _bars(ratio=0.8)
+    pc.get_bars("AAA", "2025-03-03", "2025-05-30")  # re-adjusted history
+    assert pc.rewritten_at(["AAA"])["AAA"] == pc.store_version()
+
+
+def test_missing_reads_coverage_only(store):
+    calls, _ = store
+    pc.prefetch(["AAA", "NOPE"], "2025-03-03", "2025-03-31")
+    n = len(calls)
+    assert pc.missing(["AAA", "NOPE"], "2025-03-03", "2025-03-31") == []
+    assert pc.missing(["aaa", "SPY"], "2025-03-03", "2025-04-30") == ["AAA", "SPY"]
+    assert len(calls) == n
+
+
+def test_failed_download_is_not_negative_cached(store, monkeypatch):
+    calls, _ = store
+    download_many = pc._download_many
+    monkeypatch.setattr(pc, "_download_many", lambda t, s, e: {x: None for x in t})
+    assert pc.get_bars("AAA", "2025-03-03", "2025-03-31").empty
+    assert pc._load_failed() == {}
+
+    monkeypatch.setattr(pc, "_download_many", download_many)
+    assert len(pc.get_bars("AAA", "2025-03-03", "2025-03-31")) == 21
+    assert len(calls) == 1
+
+
+def _yf_download(frame, errors):
+    """Stand-in for yf.download that leaves errors in yfinance.shared like the real one."""
+    def download(tickers, **kwargs):
+        pc._yf_shared._ERRORS = dict(errors)
+        return frame
+    return download
+
+
+def test_empty_bulk_download_keeps_tickers_unmarked(tmp_path, monkeypatch):
+    monkeypatch.setattr(pc, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pc._yf_shared, "_ERRORS", {})
+    tickers = ["AAA", "BBB", "CCC"]
+    rate_limited = {t: "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')" for t in tickers}
+    monkeypatch.setattr(pc.yf, "download", _yf_download(pd.DataFrame(), rate_limited))
+
+    out = pc.prefetch(tickers, "2025-03-03", "2025-03-31")
+    assert all(out[t].empty for t in tickers)
+    assert pc._load_failed() == {}
+    assert pc.missing(tickers, "2025-03-03", "2025-03-31") == tickers
+
+
+def test_only_yahoo_no_data_answers_are_negative_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(pc, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pc._yf_shared, "_ERRORS", {})
+    bars = pd.concat({"AAA": _bars().loc["2025-03-03":"2025-03-31"]}, axis=1)
+    errors = {
+        "GONE": "YFPricesMissingError('$GONE: possibly delisted; no price data found')",
+        "TYPO": "YFTzMissingError('$TYPO: possibly delisted; no timezone found')",
+        "BLIP": "DNSError('Could not resolve host: guce.yahoo.com')",
+    }
+    monkeypatch.setattr(pc.yf, "download", _yf_download(bars, errors))
+
+    pc.prefetch(["AAA", "GONE", "TYPO", "BLIP"], "2025-03-03", "2025-03-31")
+    assert sorted(pc._load_failed()) == ["GONE", "TYPO"]
+
+    # Alone, a missing timezone may just mean Yahoo was unreachable.
+    monkeypatch.setattr(pc.yf, "download", _yf_download(pd.DataFrame(), {"LONE": errors["TYPO"]}))
+    assert pc.get_bars("LONE", "2025-03-03", "2025-03-31").empty
+    assert "LONE" not in pc._load_failed()
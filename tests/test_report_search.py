@@ -0,0 +1,116 @@
+"""FTS5 search over decision reasoning, DR text and council reports."""
+import json
+import os
+
+import pytest
+
+import app.database as db
+from app.services import report_search_service as rs
+
+
+def _symbols(query, **kwargs):
+    return [(h["kind"], h["symbol"]) for h in rs.search_reports(query, **kwargs)]
+
+
+def test_reasoning_is_indexed_on_insert_and_update(temp_db):
+    _, decision_id = temp_db
+    new_id = db.add_decision_point("ACME", 10.0, -8.0, "BUY", "PM flags a guidance cut after tariffs")
+    assert _symbols('"guidance cut"') == [("decision", "ACME")]
+    # Porter stemming: "tariff" matches "tariffs".
+    assert _symbols("tariff") == [("decision", "ACME")]
+
+    db.update_decision_point(new_id, "AVOID", "Demand collapse, nothing about the outlook", "Ignored")
+    assert _symbols('"guidance cut"') == []
+    hit = rs.search_reports("demand")[0]
+    assert hit["decision_id"] == new_id and "«Demand»" in hit["snippet"]
+
+
+def test_deep_research_text_is_indexed(temp_db):
+    _, decision_id = temp_db
+    db.update_deep_research_data(
+        decision_id, "BUY", "Low", "-", "False", 70,
+        swot='{"threats": ["export licence revoked"]}', reason="Channel checks fine",
+    )
+    assert _symbols("licence revoked") == [("decision", "TEST")]
+    assert _symbols('"channel checks"') == [("decision", "TEST")]
+
+
+def test_deleted_decision_leaves_index(temp_db):
+    _, decision_id = temp_db
+    db.update_decision_point(decision_id, "BUY", "unique-term zebrafish", "Owned")
+    assert _symbols("zebrafish")
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM decision_points WHERE id = ?", (decision_id,))
+    assert _symbols("zebrafish") == []
+
+
+def test_council_files_sync_incrementally(temp_db, tmp_path, monkeypatch):
+    council = tmp_path / "council_reports"
+    council.mkdir()
+    (council / "QXO_PB_2026-05-01_council1.json").write_text(json.dumps({"news": "Tariff headlines"}))
+    (council / "QXO_PB_2026-05-01_council2.json").write_text(
+        json.dumps({"news": "Tariff headlines", "bear": "Bear sees a guidance cut"})
+    )
+    (council / "notes.txt").write_text("ignored")
+
+    assert rs.sync_council_reports(str(council)) == 2
+    assert rs.sync_council_reports(str(council)) == 0
+    assert _symbols("tariff") == [("council", "QXO_PB")]  # one doc per (symbol, date, agent)
+    assert rs.search_reports('"guidance cut"')[0]["agent"] == "bear"
+
+    path = council / "QXO_PB_2026-05-01_council2.json"
+    path.write_text(json.dumps({"bear": "Bear now worried about churn"}))
+    os.utime(path, (1, 1))
+    assert rs.sync_council_reports(str(council)) == 1
+    assert _symbols('"guidance cut"') == []
+
+
+def test_index_council_report_marks_file_synced(temp_db, tmp_path):
+    path = tmp_path / "AAPL_2026-05-02_council1.json"
+    reports = {"technical": {"rsi": 28, "note": "oversold bounce"}}
+    path.write_text(json.dumps(reports))
+    assert rs.index_council_report("AAPL", "2026-05-02", reports, str(path)) == 1
+    assert rs.sync_council_reports(str(tmp_path)) == 0
+    assert _symbols("oversold") == [("council", "AAPL")]
+
+
+@pytest.mark.parametrize("query", ['tariff-', '(guidance', 'NEAR("x"', '"', 'AND OR NOT', "*"])
+def test_user_queries_never_raise(temp_db, query):
+    rs.search_reports(query)
+
+
+def test_symbol_filter(temp_db):
+    db.add_decision_point("AAA", 1.0, -6.0, "BUY", "inventory glut")
+    db.add_decision_point("BBB", 1.0, -6.0, "BUY", "inventory glut")
+    assert _symbols("inventory", symbol="BBB") == [("decision", "BBB")]
+
+
+def test_search_endpoint(temp_db, tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import api
+
+    monkeypatch.chdir(tmp_path)  # no data/council_reports here
+    db.add_decision_point("ACME", 1.0, -6.0, "BUY", "margin compression from tariffs")
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    body = TestClient(app).get("/api/search", params={"q": "tariff margin"}).json()
+    assert body["results"][0]["symbol"] == "ACME"
+    assert "«" in body["results"][0]["snippet"]
+
+
+def test_decision_and_council_hits_interleave_by_rank(temp_db, tmp_path):
+    for i in range(3):
+        db.add_decision_point(f"D{i}", 1.0, -6.0, "BUY", "margin squeeze " * (i + 1))
+    for i in range(3):
+        path = tmp_path / f"C{i}_2026-05-0{i + 1}_council1.json"
+        reports = {"bear": "margin squeeze " * (i + 1)}
+        path.write_text(json.dumps(reports))
+        rs.index_council_report(f"C{i}", f"2026-05-0{i + 1}", reports, str(path))
+
+    hits = rs.search_reports("margin", limit=5)
+    assert [h["kind"] for h in hits] == ["decision", "council"] * 2 + ["decision"]
+    assert [h["rank"] for h in hits] == [1, 1, 2, 2, 3]
+    for kind in ("decision", "council"):
+        scores = [h["score"] for h in hits if h["kind"] == kind]
+        assert scores == sorted(scores)
@@ -0,0 +1,116 @@
+"""Local SA cleaning pipeline: boilerplate/table stripping on fixtures, content-hash cache, LLM fallback gate."""
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("bs4")
+
+import app.services.sa_content_cleaner as cleaner
+import app.services.seeking_alpha_service as sas
+
+FIXTURES = Path(__file__).parent / "fixtures" / "seeking_alpha"
+
+
+def _fixture(name):
+    return (FIXTURES / name).read_text()
+
+
+def test_analysis_keeps_prose_and_drops_boilerplate():
+    text = cleaner.clean_html(_fixture("analysis_tru.html"))
+    assert "TransUnion (TRU) has an underrated business model" in text
+    assert "Management raised full-year guidance" in text
+    assert "I rate TRU a Buy." in text
+    assert "[financial statement table omitted]" in text
+    for noise in ("Disclosure", "Editor's Note", "Follow", "Getty", "<", "&nbsp;"):
+        assert noise not in text
+
+
+def test_press_release_drops_legalese_contacts_and_tables():
+    text = cleaner.clean_html(_fixture("press_release_acme.html"))
+    assert "Acme Robotics, Inc. (NASDAQ: ACMR) today announced" in text
+    assert "Backlog reached a record $1.9 billion" in text
+    assert "[financial statement table omitted]" in text
+    for noise in ("forward-looking", "Forward-Looking", "Investor Contact", "Source:", "window."):
+        assert noise not in text
+
+
+def test_news_truncates_related_links():
+    text = cleaner.clean_html(_fixture("news_nvda.html"), kind="news")
+    assert text.startswith("NVIDIA (NVDA) shares fell 4.2%")
+    assert "More on" not in text and "Quant Rating" not in text
+    # Outside news items a "More on X" line is ordinary text.
+    assert "More on NVIDIA" in cleaner.clean_html(_fixture("news_nvda.html"))
+
+
+def test_more_on_heading_inside_article_keeps_the_rest():
+    html = _fixture("analysis_more_on_heading.html")
+    for kind in ("article", "news"):
+        text = cleaner.clean_html(html, kind=kind)
+        assert "More on margins" in text
+        assert "Gross margin expanded 150 basis points" in text
+        assert "At 24x forward earnings" in text
+        assert "Disclosure" not in text
+
+
+def test_short_prose_mentioning_disclosure_is_kept():
+    text = cleaner.clean_html("<p>The company's disclosure of a probe hit the shares.</p>")
+    assert text == "The company's disclosure of a probe hit the shares."
+
+
+def test_cache_cleans_each_body_once(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cleaner, "clean_html", lambda c: calls.append(c) or c.upper())
+    cache = cleaner.CleanCache(tmp_path)
+    compute = lambda: cleaner.clean_html("<p>a</p>")  # noqa: E731
+
+    assert cache.get_or_compute("local", "<p>a</p>", compute) == "<P>A</P>"
+    assert cache.get_or_compute("local", "<p>a</p>", compute) == "<P>A</P>"
+    # A fresh instance (new process) reads the gzip'd file instead of recomputing.
+    assert cleaner.CleanCache(tmp_path).get_or_compute("local", "<p>a</p>", compute) == "<P>A</P>"
+    assert len(calls) == 1
+    assert cleaner.content_key("local", "x") != cleaner.content_key("llm", "x")
+    monkeypatch.setattr(cleaner, "PIPELINE_VERSION", cleaner.PIPELINE_VERSION + 1)
+    assert cleaner.CleanCache(tmp_path).get(cleaner.content_key("local", "<p>a</p>")) is None
+
+
+@pytest.fixture
+def svc(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY_SEEKING_ALPHA", "fake-key")
+    service = sas.SeekingAlphaService()
+    service.clean_cache = cleaner.CleanCache(tmp_path)
+    service.flash_model = MagicMock()
+    service.flash_model.generate_content.return_value = MagicMock(text="llm cleaned")
+    return service
+
+
+def test_llm_fallback_is_opt_in_and_only_for_unclean_output(svc, monkeypatch):
+    html = _fixture("analysis_tru.html")
+    assert svc._clean_content_with_ai(html) == cleaner.clean_html(html)
+    svc.flash_model.generate_content.assert_not_called()
+
+    monkeypatch.setattr(svc, "_LLM_CLEANING", True)
+    assert svc._clean_content_with_ai(html) == cleaner.clean_html(html)  # already clean
+    svc.flash_model.generate_content.assert_not_called()
+
+    dirty = "<p>Shares rose &lt;b&gt;5%&lt;/b&gt; on the print.</p>"
+    assert svc._clean_content_with_ai(dirty) == "llm cleaned"
+    assert svc._clean_content_with_ai(dirty) == "llm cleaned"
+    assert svc.flash_model.generate_content.call_count == 1
+
+    svc.flash_model.generate_content.side_effect = RuntimeError("quota")
+    other = "<p>Guidance &lt;i&gt;cut&lt;/i&gt;.</p>"
+    assert svc._clean_content_with_ai(other) == cleaner.clean_html(other)
+    # The failed LLM call was not cached: the next call retries it.
+    svc.flash_model.generate_content.side_effect = None
+    assert svc._clean_content_with_ai(other) == "llm cleaned"
+
+
+def test_failed_local_clean_is_not_cached(svc, monkeypatch):
+    html = "<p>Shares rose.</p>"
+    monkeypatch.setattr(sas, "clean_html", MagicMock(side_effect=RuntimeError("parser blew up")))
+    assert svc._clean_content_with_ai(html) == html
+    assert svc.clean_cache.get(cleaner.content_key("local:article", html)) is None
+
+    monkeypatch.setattr(sas, "clean_html", cleaner.clean_html)
+    assert svc._clean_content_with_ai(html) == "Shares rose."
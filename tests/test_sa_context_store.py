@@ -0,0 +1,69 @@
+"""Per-ticker Seeking Alpha context store: atomic shards and legacy migration."""
+import gzip
+import json
+import os
+import threading
+
+from app.services.sa_context_store import SAContextStore
+
+
+def _legacy(tmp_path, stocks, wsb=()):
+    path = tmp_path / "agent_context.json"
+    path.write_text(json.dumps({"stocks": stocks, "wall_street_breakfast": list(wsb)}, indent=2))
+    return path
+
+
+def _items(n):
+    return {"news": [{"title": f"n{n}", "content": "x" * n}], "analysis": [], "press_releases": []}
+
+
+def test_migrates_legacy_file_once_without_clobbering_newer_entries(tmp_path):
+    legacy = _legacy(tmp_path, {"AAA": _items(1), "BRK/B": _items(2)}, [{"title": "wsb"}])
+    root = tmp_path / "store"
+    store = SAContextStore(root, legacy_path=legacy)
+
+    assert store.get("AAA") == _items(1)
+    assert store.get("BRK/B") == _items(2)
+    assert store.get_wsb() == [{"title": "wsb"}]
+    assert store.get("ZZZ") is None
+    assert store.tickers() == ["AAA", "BRK_B"]
+
+    # A newer fetch wins over a re-import of the unchanged legacy file...
+    store.put("AAA", _items(9))
+    assert SAContextStore(root, legacy_path=legacy).get("AAA") == _items(9)
+    # ...and a regenerated legacy file only adds tickers the store lacks.
+    legacy = _legacy(tmp_path, {"AAA": _items(3), "CCC": _items(4)})
+    os.utime(legacy, (1, 1))
+    fresh = SAContextStore(root, legacy_path=legacy)
+    assert fresh.get("AAA") == _items(9) and fresh.get("CCC") == _items(4)
+
+
+def test_entries_are_compressed_atomic_files(tmp_path):
+    store = SAContextStore(tmp_path, legacy_path=None)
+    store.put("AAA", _items(5000))
+    path = tmp_path / "AAA.json.gz"
+    assert path.stat().st_size < 1000
+    with gzip.open(path, "rt") as f:
+        assert json.load(f) == _items(5000)
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+    # A corrupt legacy file is logged, never fatal.
+    bad = tmp_path / "bad.json"
+    bad.write_text("{not json")
+    assert SAContextStore(tmp_path / "other", legacy_path=bad).get("AAA") is None
+
+
+def test_concurrent_writers_keep_every_ticker(tmp_path):
+    store = SAContextStore(tmp_path, legacy_path=None)
+
+    def write(i):
+        for rep in range(5):
+            store.put(f"T{i}", _items(i + rep))
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store.tickers()) == 16
+    assert all(store.get(f"T{i}") == _items(i + 4) for i in range(16))
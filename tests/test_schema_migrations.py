@@ -0,0 +1,90 @@
+"""init_db() applies ordered migrations once and is a single query afterwards."""
+import sqlite3
+
+import pytest
+
+import app.database as db
+
+
+def _versions(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [r[0] for r in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    finally:
+        conn.close()
+
+
+def test_fresh_db_records_every_step(tmp_path, monkeypatch):
+    path = str(tmp_path / "fresh.db")
+    monkeypatch.setattr(db, "DB_NAME", path)
+    db.init_db()
+    assert _versions(path) == [v for v, _, _ in db.MIGRATIONS]
+    assert _versions(path)[-1] == db.SCHEMA_VERSION
+
+
+def test_current_db_costs_one_query(temp_db):
+    statements = []
+    conn = db.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        db.init_db()
+    finally:
+        conn.set_trace_callback(None)
+    assert statements == ["SELECT MAX(version) FROM schema_version"]
+
+
+def test_fresh_schema_matches_upgraded_legacy_schema(tmp_path, monkeypatch):
+    legacy = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(legacy)
+    conn.execute(
+        "CREATE TABLE decision_points (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL, "
+        "price_at_decision REAL NOT NULL, drop_percent REAL NOT NULL, recommendation TEXT NOT NULL, "
+        "reasoning TEXT, status TEXT DEFAULT 'Ignored', timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute(
+        "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, timestamp) "
+        "VALUES ('OLD', 1, -6, 'BUY', '2024-01-02 10:00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_NAME", legacy)
+    db.init_db()
+    monkeypatch.setattr(db, "DB_NAME", str(tmp_path / "fresh.db"))
+    db.init_db()
+
+    def columns(path):
+        c = sqlite3.connect(path)
+        try:
+            return {r[1] for r in c.execute("PRAGMA table_info(decision_points)")}
+        finally:
+            c.close()
+
+    assert columns(legacy) == columns(str(tmp_path / "fresh.db"))
+    assert _versions(legacy)[-1] == db.SCHEMA_VERSION
+    c = sqlite3.connect(legacy)
+    assert c.execute("SELECT decision_date FROM decision_points").fetchone() == ("2024-01-02",)
+    c.close()
+
+
+def test_failed_step_is_not_recorded_and_retried(temp_db, monkeypatch):
+    db_path, _ = temp_db
+    calls = []
+
+    def flaky(cursor):
+        calls.append(1)
+        cursor.execute("CREATE TABLE IF NOT EXISTS scratch (x)")
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS + ((db.SCHEMA_VERSION + 1, "scratch", flaky),))
+    monkeypatch.setattr(db, "SCHEMA_VERSION", db.SCHEMA_VERSION + 1)
+
+    db.init_db()
+    assert db.SCHEMA_VERSION not in _versions(db_path)
+    with pytest.raises(sqlite3.OperationalError):  # rolled back with the failed step
+        db.get_connection().execute("SELECT * FROM scratch")
+
+    db.init_db()
+    assert _versions(db_path)[-1] == db.SCHEMA_VERSION
+    assert len(calls) == 2
@@ -57,21 +57,21 @@ def _http_error_response(status):
 
 class TestCallEndpointRetries:
     def test_returns_payload_on_first_success(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    return_value=_ok_response({"data": [1]})) as g:
             result = svc._call_endpoint("foo", {"id": "AAPL"})
         assert result == {"data": [1]}
         assert g.call_count == 1
 
     def test_request_uses_explicit_timeout(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    return_value=_ok_response({"data": []})) as g:
             svc._call_endpoint("foo")
         _, kwargs = g.call_args
         assert kwargs.get("timeout"), "request must specify a timeout"
 
     def test_retries_once_on_timeout_then_succeeds(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    side_effect=[requests.Timeout("slow"),
                                 _ok_response({"data": [1]})]) as g:
             result = svc._call_endpoint("foo")
@@ -79,7 +79,7 @@ class TestCallEndpointRetries:
         assert g.call_count == 2
 
     def test_retries_once_on_429_then_succeeds(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    side_effect=[_http_error_response(429),
                                 _ok_response({"data": [1]})]) as g:
             result = svc._call_endpoint("foo")
@@ -87,7 +87,7 @@ class TestCallEndpointRetries:
         assert g.call_count == 2
 
     def test_retries_once_on_503_then_succeeds(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    side_effect=[_http_error_response(503),
                                 _ok_response({"data": [1]})]) as g:
             result = svc._call_endpoint("foo")
@@ -95,14 +95,14 @@ class TestCallEndpointRetries:
         assert g.call_count == 2
 
     def test_does_not_retry_on_401(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    return_value=_http_error_response(401)) as g:
             result = svc._call_endpoint("foo")
         assert result is None
         assert g.call_count == 1
 
     def test_does_not_retry_on_404(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    return_value=_http_error_response(404)) as g:
             result = svc._call_endpoint("foo")
         assert result is None
@@ -110,14 +110,14 @@ class TestCallEndpointRetries:
 
     def test_does_not_retry_on_empty_body(self, svc):
         """Empty body with 200 OK is a real 'no data' answer — retrying burns quota."""
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    return_value=_empty_response(200)) as g:
             result = svc._call_endpoint("foo")
         assert result is None
         assert g.call_count == 1
 
     def test_returns_none_after_two_failed_attempts(self, svc):
-        with patch("app.services.seeking_alpha_service.requests.get",
+        with patch("app.services.seeking_alpha_service.requests.Session.get",
                    side_effect=requests.Timeout("slow")) as g:
             result = svc._call_endpoint("foo")
         assert result is None
@@ -0,0 +1,97 @@
+"""Concurrent Seeking Alpha detail fetching: pooled session, rate limit, jitter, latency stats."""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app.services.seeking_alpha_service as sas
+
+
+@pytest.fixture
+def svc(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_KEY_SEEKING_ALPHA", "fake-key")
+    service = sas.SeekingAlphaService()
+    service._rate_limiter = sas._RateLimiter(0)  # unthrottled unless a test sets one
+    return service
+
+
+def _response(payload):
+    r = MagicMock()
+    r.status_code = 200
+    r.text = "{...}"
+    r.json.return_value = payload
+    return r
+
+
+class _FakeAPI:
+    """Lists return 4 ids per category; details echo the id after a short delay."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.urls = []
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = url.split(".com/", 1)[1]
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.urls.append(endpoint)
+        try:
+            time.sleep(0.02)
+            if endpoint.endswith("list") or endpoint.endswith("list-by-symbol"):
+                prefix = endpoint.split("/")[0]
+                return _response({"data": [{"id": f"{prefix}-{i}"} for i in range(6)]})
+            return _response({"data": {"attributes": {
+                "title": params["id"], "publishOn": "2026-10-01", "content": f"<p>{params['id']}</p>",
+            }}})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_details_fetched_in_parallel_in_list_order(svc):
+    api = _FakeAPI()
+    with patch.object(sas.requests.Session, "get", side_effect=api.get):
+        data = svc.fetch_data_for_ticker("AAPL")
+
+    assert [i["title"] for i in data["analysis"]] == [f"analysis-{i}" for i in range(4)]
+    assert [i["title"] for i in data["news"]] == [f"news-{i}" for i in range(4)]
+    assert [i["title"] for i in data["press_releases"]] == [f"press-releases-{i}" for i in range(4)]
+    assert len(api.urls) == 3 + 12
+    assert 1 < api.peak <= svc._DETAIL_WORKERS
+
+    stats = svc.latency_stats()
+    assert stats["news/get-details"]["calls"] == 4
+    assert stats["news/get-details"]["failures"] == 0
+    assert 0 < stats["news/get-details"]["p50_ms"] <= stats["news/get-details"]["max_ms"]
+    # One pooled session, reused for every call.
+    assert svc._get_session() is svc._get_session()
+
+
+def test_rate_limiter_spaces_calls_across_threads(monkeypatch):
+    clock = {"now": 100.0}
+    sleeps = []
+    monkeypatch.setattr(sas.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(sas.time, "sleep", sleeps.append)
+    limiter = sas._RateLimiter(4)
+    for _ in range(4):
+        limiter.wait()
+    assert sleeps == pytest.approx([0.25, 0.5, 0.75])
+    clock["now"] += 5  # idle long enough: no wait
+    limiter.wait()
+    assert len(sleeps) == 3
+
+
+def test_retry_backoff_is_jittered(svc, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sas.time, "sleep", sleeps.append)
+    monkeypatch.setattr(sas.random, "uniform", lambda lo, hi: hi * 0.5)
+    throttled = _response(None)
+    throttled.status_code = 429
+    with patch.object(sas.requests.Session, "get", side_effect=[throttled, _response({"data": [1]})]):
+        assert svc._call_endpoint("foo") == {"data": [1]}
+    assert sleeps == [svc._RETRY_BACKOFF_SEC + svc._RETRY_JITTER_SEC * 0.5]
+    assert svc.latency_stats()["foo"]["calls"] == 2
+    assert svc.latency_stats()["foo"]["failures"] == 1
@@ -15,6 +15,7 @@ def test_record_known_model_inserts_row_with_cost(temp_db):
         )
     finally:
         del token_pricing.GEMINI_PRICING["__test_model__"]
+    token_tracker.flush()
 
     conn = sqlite3.connect(path)
     row = conn.execute(
@@ -34,6 +35,7 @@ def test_record_unknown_model_stores_null_cost(temp_db):
         stage="pm", agent_name="pm", model="totally-unknown-model",
         tokens_in=100, tokens_out=200,
     )
+    token_tracker.flush()
     conn = sqlite3.connect(path)
     cost_usd = conn.execute("SELECT cost_usd FROM agent_token_usage").fetchone()[0]
     conn.close()
@@ -55,6 +57,7 @@ def test_concurrent_inserts_from_threads(temp_db):
     threads = [threading.Thread(target=writer, args=(f"sensor_{i}",)) for i in range(8)]
     for t in threads: t.start()
     for t in threads: t.join()
+    token_tracker.flush()
 
     conn = sqlite3.connect(path)
     count = conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0]
@@ -104,6 +107,35 @@ def test_rollup_is_idempotent(temp_db):
     assert calls == 1  # still 1, not 2
 
 
+def test_rollup_recomputes_totals_from_usage_rows(temp_db):
+    """Rows written without touching the totals (older code, or drift) are
+    picked up when the decision is rolled up."""
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO agent_token_usage (decision_id, ticker, run_date, stage, agent_name, "
+        "model, tokens_in, tokens_out, cost_usd) VALUES (?, 'TEST', '2026-05-23', 'pm', 'pm', 'm', 10, 20, 0.5)",
+        (decision_id,),
+    )
+    conn.execute("UPDATE decision_points SET total_llm_calls = 7 WHERE id = ?", (decision_id,))
+    conn.commit()
+    conn.close()
+
+    token_tracker.record_llm_call(
+        decision_id=decision_id, ticker="TEST", run_date="2026-05-23",
+        stage="pm", agent_name="pm", model="__unpriced__", tokens_in=1, tokens_out=2,
+    )
+    token_tracker.rollup_decision_totals(decision_id)
+    conn = sqlite3.connect(path)
+    row = conn.execute(
+        "SELECT total_tokens_in, total_tokens_out, total_cost_usd, total_llm_calls "
+        "FROM decision_points WHERE id = ?", (decision_id,)
+    ).fetchone()
+    conn.close()
+    assert row == (11, 22, 0.5, 2)
+
+
 def test_rollup_under_reports_when_some_rows_have_null_cost(temp_db):
     """SQLite's SUM skips NULLs, so total_cost_usd reflects only the priced rows.
     The 'pricing gap' is detected by comparing total_llm_calls (always full count)
@@ -151,3 +183,142 @@ def test_rollup_under_reports_when_some_rows_have_null_cost(temp_db):
     ).fetchone()[0]
     conn.close()
     assert priced_row_count == 1  # gap of 1 vs calls=2 → operator action needed
+
+
+def _record(token_tracker, decision_id, name="sensor_news", tokens_in=100, tokens_out=50,
+            model="gemini-3-flash-preview"):
+    token_tracker.record_llm_call(
+        decision_id=decision_id, ticker="TEST", run_date="2026-05-23",
+        stage="sensor", agent_name=name, model=model,
+        tokens_in=tokens_in, tokens_out=tokens_out,
+    )
+
+
+def test_rows_are_buffered_until_flush(temp_db, monkeypatch):
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    token_tracker.shutdown()  # restart the writer with the long interval below
+    monkeypatch.setattr(token_tracker._writer, "interval_s", 60)
+    for i in range(5):
+        _record(token_tracker, decision_id, name=f"sensor_{i}")
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 0
+    assert token_tracker.flush() == 5
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 5
+    conn.close()
+
+
+def test_background_writer_flushes_on_batch_size(temp_db, monkeypatch):
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    token_tracker.shutdown()
+    monkeypatch.setattr(token_tracker._writer, "interval_s", 60)
+    monkeypatch.setattr(token_tracker._writer, "max_batch", 3)
+    for i in range(3):
+        _record(token_tracker, decision_id, name=f"sensor_{i}")
+
+    import time
+    deadline = time.time() + 5
+    while token_tracker._writer.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    token_tracker._writer.flush()  # wait out an in-progress drain
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 3
+    conn.close()
+
+
+def test_totals_accumulate_across_flushes(temp_db):
+    path, decision_id = temp_db
+    from app.services import token_pricing, token_tracker
+    token_pricing.GEMINI_PRICING["__test_model__"] = {"in": 2.0, "out": 8.0}
+    try:
+        _record(token_tracker, decision_id, model="unknown-model")
+        token_tracker.flush()
+        conn = sqlite3.connect(path)
+        assert conn.execute(
+            "SELECT total_cost_usd, total_llm_calls FROM decision_points WHERE id = ?",
+            (decision_id,),
+        ).fetchone() == (None, 1)
+
+        _record(token_tracker, decision_id, tokens_in=1_000_000, tokens_out=0,
+                model="__test_model__")
+        _record(token_tracker, decision_id, tokens_in=0, tokens_out=1_000_000,
+                model="__test_model__")
+        token_tracker.rollup_decision_totals(decision_id)
+    finally:
+        del token_pricing.GEMINI_PRICING["__test_model__"]
+
+    row = conn.execute(
+        "SELECT total_tokens_in, total_tokens_out, total_cost_usd, total_llm_calls "
+        "FROM decision_points WHERE id = ?", (decision_id,)
+    ).fetchone()
+    conn.close()
+    assert row == (1_000_100, 1_000_050, 10.0, 3)
+
+
+def test_queued_rows_land_in_the_db_they_were_recorded_against(temp_db, tmp_path, monkeypatch):
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    import app.database as db
+    _record(token_tracker, decision_id)
+
+    monkeypatch.setattr(db, "DB_NAME", str(tmp_path / "other.db"))
+    db.init_db()
+    token_tracker.flush()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 1
+    conn.close()
+
+
+def test_shutdown_flushes_pending_rows(temp_db, monkeypatch):
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    monkeypatch.setattr(token_tracker._writer, "interval_s", 60)
+    _record(token_tracker, decision_id)
+    token_tracker.shutdown()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 1
+    conn.close()
+
+
+def test_failed_flush_requeues_rows(temp_db, monkeypatch):
+    path, decision_id = temp_db
+    from app.services import token_tracker
+    token_tracker.shutdown()
+    monkeypatch.setattr(token_tracker._writer, "interval_s", 60)
+    write_batch = token_tracker._write_batch
+    failures = {"left": 1}
+
+    def flaky(db_path, rows):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        write_batch(db_path, rows)
+
+    monkeypatch.setattr(token_tracker, "_write_batch", flaky)
+    for i in range(3):
+        _record(token_tracker, decision_id, name=f"sensor_{i}")
+
+    assert token_tracker.flush() == 0
+    assert token_tracker._writer.pending() == 3
+    assert token_tracker.flush() == 3
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM agent_token_usage").fetchone()[0] == 3
+    assert conn.execute("SELECT total_llm_calls FROM decision_points WHERE id = ?",
+                        (decision_id,)).fetchone()[0] == 3
+    conn.close()
+
+
+def test_rows_are_dropped_after_max_attempts(temp_db, monkeypatch):
+    _, decision_id = temp_db
+    from app.services import token_tracker
+    token_tracker.shutdown()
+    monkeypatch.setattr(token_tracker._writer, "interval_s", 60)
+    monkeypatch.setattr(token_tracker, "_write_batch",
+                        lambda db_path, rows: (_ for _ in ()).throw(sqlite3.OperationalError("locked")))
+    _record(token_tracker, decision_id)
+    for _ in range(token_tracker.MAX_ATTEMPTS):
+        assert token_tracker.flush() == 0
+    assert token_tracker._writer.pending() == 0
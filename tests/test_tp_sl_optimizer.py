@@ -0,0 +1,81 @@
+"""Vectorized TP/SL sweep matches the per-trade simulate_one loop."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from app.services.analytics import exits as ex
+from scripts.analysis import tp_sl_optimizer as opt
+
+
+def _cohort(n_trades=60, n_tickers=8, seed=3):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2026-01-05", periods=60)
+    bars = {}
+    for i in range(n_tickers):
+        close = 20 * np.cumprod(1 + rng.normal(0, 0.03, len(idx)))
+        # Round to cents so TP and SL levels are often hit exactly, and on
+        # the same bar (wide ranges), exercising the SL-first tie rule.
+        bars[f"T{i}"] = pd.DataFrame({
+            "Open": close,
+            "High": np.round(close * rng.uniform(1.0, 1.08, len(idx)), 2),
+            "Low": np.round(close * rng.uniform(0.92, 1.0, len(idx)), 2),
+            "Close": np.round(close, 2),
+        }, index=idx)
+    bars["EMPTY"] = pd.DataFrame()
+    symbols = [f"T{i}" for i in rng.integers(0, n_tickers, n_trades)] + ["EMPTY", "NONE", "T0", "T1"]
+    dates = list(idx[rng.integers(0, len(idx), n_trades)]) + [idx[0], idx[0], idx[-1], idx[-3]]
+    trades = pd.DataFrame({
+        "symbol": symbols,
+        "decision_date": dates,
+        "price_at_decision": [float(bars[s]["Close"].loc[d]) if s.startswith("T") else 10.0
+                              for s, d in zip(symbols, dates)],
+        "intent": "ENTER_NOW",
+        "risk_reward_ratio": 2.0,
+    })
+    trades.loc[5, "price_at_decision"] = 0.0
+    return trades, bars
+
+
+@pytest.mark.parametrize("max_days", [1, 5, 20])
+def test_sweep_matches_loop(max_days):
+    trades, bars = _cohort()
+    tp_grid = [0.01, 0.02, 0.035, 0.05, 0.1, 1000.0]
+    sl_grid = [0.01, 0.025, 0.04, 0.08, 1000.0]
+    expected = pd.DataFrame([
+        opt.aggregate(trades, bars, tp, sl, 750.0, 6.0, max_days)
+        for tp in tp_grid for sl in sl_grid
+    ])
+    actual = opt.sweep(trades, bars, tp_grid, sl_grid, 750.0, 6.0, max_days)
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_block_boundaries_and_holding_periods(monkeypatch):
+    trades, bars = _cohort()
+    monkeypatch.setattr(ex, "BLOCK_CELLS", 500)  # several parameter blocks
+    tp_grid = list(np.round(np.arange(0.01, 0.1, 0.01), 4))
+    sl_grid = [0.02, 0.05]
+    paths = ex.build_paths(trades, bars, 10)
+    out = opt.sweep_paths(paths, tp_grid, sl_grid, 750.0, 6.0, [3, 10])
+    for hold in (3, 10):
+        expected = opt.sweep(trades, bars, tp_grid, sl_grid, 750.0, 6.0, hold)
+        got = out[out["max_days"] == hold].drop(columns="max_days").reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_per_trade_reasons_match_simulate_one():
+    trades, bars = _cohort()
+    detail = opt.per_trade_at(trades, bars, 0.03, 0.03, 750.0, 6.0, 5)
+    expected = []
+    for _, row in trades.iterrows():
+        out = opt.simulate_one(float(row["price_at_decision"]), row["decision_date"],
+                               bars.get(row["symbol"]), 0.03, 0.03, max_days=5)
+        if out is not None:
+            expected.append((row["symbol"], row["decision_date"].strftime("%Y-%m-%d"),
+                             out["exit_reason"], out["exit_day"], round(out["exit_return"], 12)))
+    got = list(zip(detail["symbol"], detail["decision_date"], detail["exit_reason"],
+                   detail["exit_day"], detail["exit_return"].round(12)))
+    assert sorted(got) == sorted(expected)
+    assert "SL_FIRST" in set(detail["exit_reason"])
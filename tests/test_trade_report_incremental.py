@@ -0,0 +1,144 @@
+"""Incremental trade report: reused settled rows, delta recompute, CSV export of the table."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.database as db
+from app.services.analytics import price_cache
+from scripts.core import generate_trade_report as gtr
+
+WINDOW = 7
+
+
+@pytest.fixture
+def report_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "report.db")
+    monkeypatch.setattr(db, "DB_NAME", path)
+    monkeypatch.setattr(gtr, "DB_PATH", path)
+    db.init_db()
+    now = datetime.now()
+    rows = [
+        # symbol, days ago, price, recommendation
+        ("AAA", 60, 10.0, "BUY"),
+        ("BBB", 45, 0.0, "BUY_LIMIT"),       # price falls back to the decision-day close
+        ("AAA", 40, 11.0, "AVOID"),
+        ("CCC", 20, 20.0, "BUY"),            # 28d window still open
+        ("DDD", 3, 30.0, "HOLD"),            # 7d window still open
+        ("GONE", 50, 5.0, "BUY"),            # no bars at all
+    ]
+    conn = db.connect(path)
+    for i, (symbol, days, price, rec) in enumerate(rows):
+        conn.execute(
+            "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, "
+            "reasoning, status, timestamp, entry_price_low, risk_reward_ratio) "
+            "VALUES (?, ?, -6.0, ?, '', 'Done', ?, ?, ?)",
+            (symbol, price, rec, (now - timedelta(days=days, minutes=i)).isoformat(), 9.5, 2.0),
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Synthetic price store recording which tickers each prefetch asked for."""
+    idx = pd.bdate_range(datetime.now() - timedelta(days=400), datetime.now())
+    rng = np.random.default_rng(1)
+    frames = {}
+    for t in ["AAA", "BBB", "CCC", "DDD", "^GSPC", "^DJI", "^GDAXI"]:
+        close = 50 * np.cumprod(1 + rng.normal(0, 0.02, len(idx)))
+        close[rng.random(len(idx)) < 0.1] = np.nan  # present-but-empty bars
+        frames[t] = pd.DataFrame({"Close": close}, index=idx)
+    calls, stamps = [], {}
+
+    def prefetch(tickers, start, end, refresh=False, adjusted=False):
+        names = sorted({str(t).upper() for t in tickers})
+        calls.append(names)
+        return {t: frames.get(t, pd.DataFrame()) for t in names}
+
+    monkeypatch.setattr(price_cache, "prefetch", prefetch)
+    monkeypatch.setattr(price_cache, "rewritten_at",
+                        lambda tickers: {str(t).upper(): stamps.get(str(t).upper(), 0) for t in tickers})
+    return calls, stamps
+
+
+def _rows(full=False):
+    return gtr.update_report(gtr.get_decision_points(), WINDOW, full=full)
+
+
+def test_second_run_recomputes_only_open_rows(report_db, store):
+    calls, _ = store
+    first = _rows()
+    assert len(first) == 6 and len(calls[0]) == 5 + 3
+
+    second = _rows()
+    assert second == first
+    # Only the still-open CCC and DDD rows, and GONE (no bars yet, so its
+    # prices fell back to "latest"), were recomputed.
+    assert calls[1] == sorted(["CCC", "DDD", "GONE", "^GSPC", "^DJI", "^GDAXI"])
+    assert second == _rows(full=True)
+
+    bbb = next(r for r in first if r["Symbol"] == "BBB")
+    assert bbb["Price @ Dec"] != "-" and bbb["Limit"] == "9.50"
+    assert next(r for r in first if r["Symbol"] == "GONE")["Performance"] == "-"
+    assert [r["Date"] for r in first] == sorted((r["Date"] for r in first), reverse=True)
+
+
+def test_edits_deletes_and_rewrites_invalidate_rows(report_db, store):
+    calls, stamps = store
+    _rows()
+    conn = db.connect(report_db)
+    conn.execute("UPDATE decision_points SET recommendation = 'SELL' WHERE symbol = 'BBB'")
+    conn.execute("DELETE FROM decision_points WHERE symbol = 'GONE'")
+    conn.commit()
+    conn.close()
+    stamps["AAA"] = 7
+
+    rows = _rows()
+    assert "AAA" in calls[-1] and "BBB" in calls[-1]
+    assert next(r for r in rows if r["Symbol"] == "BBB")["Rec"] == "SELL"
+    assert "GONE" not in {r["Symbol"] for r in rows}
+    assert len(db.export_trade_report_rows(WINDOW, report_db)) == 5
+    assert rows == _rows(full=True)
+
+
+def test_row_maturing_today_is_not_frozen(report_db, store):
+    calls, _ = store
+    conn = db.connect(report_db)
+    # Its 28d target is today's (possibly intraday) bar.
+    cur = conn.execute(
+        "INSERT INTO decision_points (symbol, price_at_decision, drop_percent, recommendation, "
+        "reasoning, status, timestamp) VALUES ('BBB', 12.0, -6.0, 'BUY', '', 'Done', ?)",
+        ((datetime.now() - timedelta(days=28)).isoformat(),),
+    )
+    maturing = cur.lastrowid
+    conn.commit()
+    conn.close()
+
+    _rows()
+    stored = db.get_trade_report_rows(WINDOW, report_db)
+    assert stored[maturing][2] == 0
+    assert all(settled for i, (_, _, settled, row) in stored.items() if row["Symbol"] in ("AAA", "BBB") and i != maturing)
+    _rows()
+    assert "BBB" in calls[-1]
+
+
+def test_price_lookup_matches_date_probing():
+    idx = pd.date_range("2026-01-01", periods=30)
+    close = pd.Series(np.arange(30, dtype=float) + 1, index=idx)
+    close[idx.dayofweek >= 5] = np.nan
+    close.iloc[10:16] = np.nan
+    prices = gtr.PriceLookup({"xyz": pd.DataFrame({"Close": close})})
+
+    def probe(day):
+        for i in range(gtr.LOOKUP_SLACK_DAYS + 1):
+            key = (day + timedelta(days=i)).strftime("%Y-%m-%d")
+            if key in close.index and not np.isnan(close[key]):
+                return float(close[key])
+        return None
+
+    for day in pd.date_range("2025-12-28", "2026-02-03"):
+        assert prices.at("XYZ", day.to_pydatetime() + timedelta(hours=15)) == probe(day)
+    assert prices.latest("XYZ") == 30.0 and prices.latest("NOPE") is None
@@ -1,7 +1,12 @@
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 import pytest
 
-from app.services.visualization_service import build_basket_curves
+from app.services.visualization_service import build_basket_curves, price_grid
+from scripts.analysis import verdict_performance as vp
+from scripts.analysis.verdict_performance import INTENT_ORDER, ROI_CLIP
 
 
 def _series(dates, values):
@@ -98,6 +103,95 @@ def test_basket_curve_skips_nan_entry_price():
     assert curve["final_n"] == 1
 
 
+def _random_cohort(seed=11):
+    rng = np.random.default_rng(seed)
+    axis = pd.bdate_range("2025-06-02", periods=160)
+    spy = pd.Series(400 * np.cumprod(1 + rng.normal(0, 0.01, len(axis))), index=axis)
+    prices = {"SPY": spy}
+    for i in range(10):
+        s = pd.Series(30 * np.cumprod(1 + rng.normal(0, 0.04, len(axis))), index=axis)
+        prices[f"T{i}"] = s[rng.random(len(axis)) > 0.15]  # missing bars
+    prices["LATE"] = prices["T0"].iloc[90:]                 # lists mid-way
+    prices["GONE"] = prices["T1"].iloc[:20]                 # delisted early
+    n = 150
+    symbols = list(rng.choice(list(prices) + ["NONE"], n))
+    intents = ["ENTER_NOW", "ENTER_LIMIT", "AVOID", "NEUTRAL", ""]
+    df = pd.DataFrame({
+        "symbol": symbols,
+        "price_at_decision": rng.uniform(5, 60, n),
+        "date": axis[rng.integers(10, len(axis), n)] + pd.to_timedelta(rng.integers(0, 86400, n), "s"),
+        "council_intent": rng.choice(intents, n),
+    })
+    df.loc[::13, "price_at_decision"] = np.nan
+    df.loc[::17, "price_at_decision"] = 0.0
+    df.loc[3, "price_at_decision"] = 0.2  # clipped
+    return df, prices, spy
+
+
+def _loop_curves(df, prices, spy, intent_col):
+    """The per-position reference: reindex + ffill each series separately."""
+    positions = {}
+    for intent in INTENT_ORDER:
+        for _, r in df[df[intent_col] == intent].iterrows():
+            s = prices.get(r["symbol"])
+            if s is not None and float(r["price_at_decision"]) > 0:
+                positions.setdefault(intent, []).append(
+                    (pd.Timestamp(r["date"]).normalize(), float(r["price_at_decision"]), s))
+    axis = spy.index[spy.index >= min(p[0] for ps in positions.values() for p in ps)]
+    curves = {}
+    for intent, ps in positions.items():
+        cols = {}
+        for i, (ts, price, s) in enumerate(ps):
+            ratio = (s.reindex(axis).ffill() / price).clip(1.0 - ROI_CLIP, 1.0 + ROI_CLIP)
+            ratio[axis < ts] = np.nan
+            cols[i] = ratio
+        mat = pd.DataFrame(cols, index=axis)
+        mask = mat.count(axis=1) > 0
+        curves[intent] = (list(axis[mask]), list((mat.mean(axis=1)[mask] - 1.0) * 100.0),
+                          int(mat.count(axis=1)[mask].iloc[-1]))
+    return curves
+
+
+def test_basket_curves_match_per_position_loop():
+    df, prices, spy = _random_cohort()
+    grid = price_grid(prices, spy)
+    for sub in (df, df[df["date"] >= "2025-10-01"], df[df["council_intent"] == "AVOID"]):
+        out = build_basket_curves(sub, prices, spy, "council_intent", grid)
+        expected = _loop_curves(sub, prices, spy, "council_intent")
+        assert set(out["curves"]) == set(expected)
+        for intent, (dates, vals, final_n) in expected.items():
+            curve = out["curves"][intent]
+            assert curve["dates"] == dates
+            assert curve["vals"] == pytest.approx(vals, rel=1e-12)
+            assert curve["final_n"] == final_n
+        assert out["spy_dates"][0] == min(min(d) for d, _, _ in expected.values())
+
+
+def test_window_returns_match_window_alpha():
+    df, prices, spy = _random_cohort()
+    df = df.assign(date=df["date"] + pd.Timedelta(days=300))  # some windows not matured
+    prices = {k: v.set_axis(v.index + pd.Timedelta(days=300)) for k, v in prices.items()}
+    spy = prices["SPY"]
+    now = datetime.now()
+    returns = vp.window_returns(df, prices, spy, [2, 4, 12], now=now)
+    for w in (2, 4, 12):
+        expected = {}
+        for i, r in df.iterrows():
+            res = vp.window_alpha(prices, spy, r["symbol"], r["date"], w)
+            if res:
+                expected[i] = res
+        got = returns[w]
+        assert list(got.index) == list(expected)
+        assert got[["raw", "alpha"]].to_numpy().tolist() == [list(v) for v in expected.values()]
+    assert 0 < len(returns[12]) < len(returns[2])
+
+    table = vp.build_table(df, prices, spy, [2, 4, 12], "council_intent", returns)
+    for intent in INTENT_ORDER:
+        sub = df[df["council_intent"] == intent]
+        vals = [vp.window_alpha(prices, spy, r["symbol"], r["date"], 4) for _, r in sub.iterrows()]
+        assert table[intent][4] == vp.cohort_stats([v for v in vals if v])
+
+
 def test_render_basket_chart_runs_on_payload(capsys):
     from app.services.visualization_service import render_basket_chart
 
@@ -155,86 +249,77 @@ def test_parse_since_rejects_garbage():
         parse_since("banana")
 
 
-# --- price cache -----------------------------------------------------------
+# --- price cache ---------------------------------------------------------
+
+def _use_fake_store(tmp_path, monkeypatch):
+    """Point the price store at tmp_path with a downloader that records calls.
 
-def _fake_downloader(records):
-    """Return a fetch_prices stand-in that records calls and returns SPY + non-BAD symbols."""
-    axis = pd.to_datetime(["2025-12-05", "2025-12-06"])
+    Returns the list of downloaded tickers; BAD* symbols never resolve
+    (simulating a delisted/foreign ticker yfinance can't find).
+    """
+    from app.services.analytics import price_cache
+
+    records = []
+    axis = pd.bdate_range("2025-12-01", "2026-01-30")
 
-    def _fetch(symbols, start, end):
-        # Mimic the real fetch_prices contract: start/end must be datetime-like
-        # (the real one calls start.date()/start.strftime()). This guards against
-        # passing the cached ISO start string straight through.
-        start.strftime("%Y-%m-%d")
-        end.strftime("%Y-%m-%d")
-        records.append(sorted(symbols))
+    def _download_many(tickers, start, end):
         out = {}
-        for s in symbols:
-            if s.startswith("BAD"):
-                continue  # simulate a delisted/foreign ticker yfinance can't resolve
-            out[s] = pd.Series([100.0, 101.0], index=axis)
-        out["SPY"] = pd.Series([400.0, 402.0], index=axis)  # benchmark always present
+        for ticker in tickers:
+            records.append(ticker)
+            close = 400.0 if ticker == "SPY" else 100.0
+            df = pd.DataFrame({"Close": close, "Adj Close": close}, index=axis)
+            out[ticker] = pd.DataFrame() if ticker.startswith("BAD") else df.loc[start:end]
         return out
 
-    return _fetch
+    monkeypatch.setattr(price_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(price_cache, "_download_many", _download_many)
+    return records
 
 
 def test_cache_serves_second_call_without_download(tmp_path, monkeypatch):
     import app.services.visualization_service as viz
 
-    records = []
-    monkeypatch.setattr(viz, "fetch_prices", _fake_downloader(records))
-    monkeypatch.setattr(viz, "CACHE_PATH", str(tmp_path / "price_cache.pkl"))
-
-    start = pd.Timestamp("2025-12-05")
-    first = viz.fetch_prices_cached(["AAA", "BBB"], start, pd.Timestamp("2026-06-04"))
-    second = viz.fetch_prices_cached(["AAA", "BBB"], start, pd.Timestamp("2026-06-04"))
+    records = _use_fake_store(tmp_path, monkeypatch)
+    start, end = pd.Timestamp("2025-12-05"), pd.Timestamp("2026-01-20")
+    first = viz.fetch_prices_cached(["AAA", "BBB"], start, end)
+    second = viz.fetch_prices_cached(["AAA", "BBB"], start, end)
 
     assert set(first) == {"AAA", "BBB", "SPY"}
     assert set(second) == {"AAA", "BBB", "SPY"}
-    assert len(records) == 1  # only the FIRST call hit the network
+    assert sorted(records) == ["AAA", "BBB", "SPY"]  # only the FIRST call hit the network
 
 
 def test_cache_downloads_only_new_symbols(tmp_path, monkeypatch):
     import app.services.visualization_service as viz
 
-    records = []
-    monkeypatch.setattr(viz, "fetch_prices", _fake_downloader(records))
-    monkeypatch.setattr(viz, "CACHE_PATH", str(tmp_path / "price_cache.pkl"))
-
-    start = pd.Timestamp("2025-12-05")
-    viz.fetch_prices_cached(["AAA"], start, pd.Timestamp("2026-06-04"))
-    viz.fetch_prices_cached(["AAA", "CCC"], start, pd.Timestamp("2026-06-04"))
+    records = _use_fake_store(tmp_path, monkeypatch)
+    start, end = pd.Timestamp("2025-12-05"), pd.Timestamp("2026-01-20")
+    viz.fetch_prices_cached(["AAA"], start, end)
+    viz.fetch_prices_cached(["AAA", "CCC"], start, end)
 
     # First call downloaded AAA (+SPY); second downloaded ONLY the new CCC.
-    assert records[0] == ["AAA", "SPY"]
-    assert records[1] == ["CCC"]
+    assert records == ["AAA", "SPY", "CCC"]
 
 
 def test_cache_negative_caches_failed_symbols(tmp_path, monkeypatch):
     import app.services.visualization_service as viz
 
-    records = []
-    monkeypatch.setattr(viz, "fetch_prices", _fake_downloader(records))
-    monkeypatch.setattr(viz, "CACHE_PATH", str(tmp_path / "price_cache.pkl"))
-
-    start = pd.Timestamp("2025-12-05")
-    viz.fetch_prices_cached(["AAA", "BAD1"], start, pd.Timestamp("2026-06-04"))
-    viz.fetch_prices_cached(["AAA", "BAD1"], start, pd.Timestamp("2026-06-04"))
+    records = _use_fake_store(tmp_path, monkeypatch)
+    start, end = pd.Timestamp("2025-12-05"), pd.Timestamp("2026-01-20")
+    first = viz.fetch_prices_cached(["AAA", "BAD1"], start, end)
+    viz.fetch_prices_cached(["AAA", "BAD1"], start, end)
 
-    # BAD1 never resolves; it must NOT be retried on the second same-day call.
-    assert len(records) == 1
+    # BAD1 never resolves; it must NOT be retried on the second call.
+    assert "BAD1" not in first
+    assert records.count("BAD1") == 1
 
 
 def test_cache_refresh_forces_redownload(tmp_path, monkeypatch):
     import app.services.visualization_service as viz
 
-    records = []
-    monkeypatch.setattr(viz, "fetch_prices", _fake_downloader(records))
-    monkeypatch.setattr(viz, "CACHE_PATH", str(tmp_path / "price_cache.pkl"))
-
-    start = pd.Timestamp("2025-12-05")
-    viz.fetch_prices_cached(["AAA"], start, pd.Timestamp("2026-06-04"))
-    viz.fetch_prices_cached(["AAA"], start, pd.Timestamp("2026-06-04"), refresh=True)
+    records = _use_fake_store(tmp_path, monkeypatch)
+    start, end = pd.Timestamp("2025-12-05"), pd.Timestamp("2026-01-20")
+    viz.fetch_prices_cached(["AAA"], start, end)
+    viz.fetch_prices_cached(["AAA"], start, end, refresh=True)
 
-    assert len(records) == 2  # refresh ignores the cache
+    assert records.count("AAA") == 2  # refresh ignores the cache
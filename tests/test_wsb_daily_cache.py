@@ -21,7 +21,13 @@ class TestWSBDailyCache(unittest.TestCase):
             "GEMINI_API_KEY": "test-key",
         }), patch("app.services.seeking_alpha_service.genai"):
             from app.services.seeking_alpha_service import SeekingAlphaService
-            return SeekingAlphaService()
+            svc = SeekingAlphaService()
+        import tempfile
+        from app.services.sa_content_cleaner import CleanCache
+        clean_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(clean_dir.cleanup)
+        svc.clean_cache = CleanCache(clean_dir.name)
+        return svc
 
     def test_returns_cached_raw_wsb_if_file_exists(self):
         """If raw_YYYY-MM-DD.json exists, load it and skip API."""
@@ -112,6 +118,11 @@ class TestWSBDailyCache(unittest.TestCase):
         with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
             json.dump(stock_data, f)
             tmp_path = f.name
+        # The temp file stands in for the legacy agent_context.json; the
+        # service's store migrates it on first lookup.
+        from app.services.sa_context_store import SAContextStore
+        store_dir = tempfile.TemporaryDirectory()
+        svc.context_store = SAContextStore(store_dir.name, legacy_path=tmp_path)
 
         try:
             # Patch the sa_path inside get_evidence
@@ -132,6 +143,7 @@ class TestWSBDailyCache(unittest.TestCase):
             self.assertIn("WALL STREET BREAKFAST", result)
         finally:
             os.unlink(tmp_path)
+            store_dir.cleanup()
 
     def test_get_counts_uses_daily_cache(self):
         """get_counts should use _get_or_fetch_wsb for WSB counts."""
@@ -150,6 +162,9 @@ class TestWSBDailyCache(unittest.TestCase):
         with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
             json.dump(context, f)
             tmp_path = f.name
+        from app.services.sa_context_store import SAContextStore
+        store_dir = tempfile.TemporaryDirectory()
+        svc.context_store = SAContextStore(store_dir.name, legacy_path=tmp_path)
 
         try:
             counts = svc.get_counts("TEST")
@@ -157,8 +172,10 @@ class TestWSBDailyCache(unittest.TestCase):
             svc._get_or_fetch_wsb.assert_called_once()
             self.assertEqual(counts["wsb"], 1)
             self.assertEqual(counts["wsb_date"], "2026-04-09")
+            self.assertEqual(counts["analysis"], 1)
         finally:
             os.unlink(tmp_path)
+            store_dir.cleanup()
 
 
 if __name__ == "__main__":